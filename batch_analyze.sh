@@ -1,5 +1,6 @@
 #!/usr/bin/env bash
-# Analyze images one at a time, stopping Ollama between each to free memory.
+# Analyze images one at a time, keeping the Ollama model loaded for the whole batch.
+# The model is warmed once up front and unloaded by Ollama after KEEP_ALIVE idle seconds.
 # Usage: ./batch_analyze.sh [IMAGE_DIR] [OUTPUT_DIR]
 
 set -uo pipefail
@@ -8,6 +9,8 @@ IMAGE_DIR="${1:-Goes}"
 OUTPUT_DIR="${2}"
 MODEL="llama3.2-vision:11b"
 PYTHON=".venv/bin/python"
+OLLAMA_HOST="${OLLAMA_HOST:-http://127.0.0.1:11434}"
+KEEP_ALIVE="${KEEP_ALIVE:-3600}"
 
 mkdir -p "$OUTPUT_DIR"
 
@@ -22,6 +25,15 @@ fi
 
 echo "Found $total images in $IMAGE_DIR → output: $OUTPUT_DIR"
 echo "Model: $MODEL"
+
+# Warm the model once; every image below reuses the loaded weights
+load_start=$(date +%s)
+if curl -sf "$OLLAMA_HOST/api/generate" \
+        -d "{\"model\": \"$MODEL\", \"keep_alive\": $KEEP_ALIVE}" >/dev/null; then
+    echo "Loaded $MODEL in $(( $(date +%s) - load_start ))s (kept for ${KEEP_ALIVE}s idle)"
+else
+    echo "⚠ Could not pre-load $MODEL; the first image will load it"
+fi
 echo ""
 
 idx=0
@@ -86,10 +98,6 @@ for img in "${images[@]}"; do
         echo "  ✗ Failed or empty result after ${mins}m${secs}s (exit code: $exit_code)"
         ((fail_count++)) || true
     fi
-
-    echo "  Stopping Ollama model to free memory..."
-    ollama stop "$MODEL" 2>/dev/null || true
-    sleep 2
 done
 
 batch_end=$(date +%s)
@@ -8,7 +8,9 @@ This module provides:
 - Saturation adjustment
 - And more...
 
-For advanced filters (unsharp mask, color temperature, etc.), see enhancement_filters module.
+Advanced filters (unsharp mask, color temperature, etc.) are applied in memory
+through picture_analyzer.enhancers.FilterPipeline; the file-based versions
+remain available in the enhancement_filters module.
 """
 from PIL import Image, ImageEnhance, ImageFilter
 from typing import Optional, Tuple, List, Dict, Any
@@ -16,14 +18,19 @@ import os
 import json
 import re
 from pathlib import Path
-from enhancement_filters import (
-    apply_unsharp_mask,
-    adjust_color_temperature,
-    adjust_shadows_highlights,
-    apply_clarity_filter,
-    adjust_vibrance,
-    adjust_color_channel
+from picture_analyzer.enhancers.filters import (
+    BrightnessFilter,
+    ClarityFilter,
+    ColorChannelFilter,
+    ColorTemperatureFilter,
+    ContrastFilter,
+    SaturationFilter,
+    ShadowsHighlightsFilter,
+    SharpnessFilter,
+    UnsharpMaskFilter,
+    VibranceFilter,
 )
+from picture_analyzer.enhancers.pipeline import FilterPipeline
 
 
 class PictureEnhancer:
@@ -250,9 +257,27 @@ class PictureEnhancer:
 class SmartEnhancer:
     """Intelligent image enhancer that parses AI recommendations and applies enhancements"""
     
-    def __init__(self):
-        """Initialize smart enhancer"""
+    def __init__(
+        self,
+        memory_budget_mb: Optional[float] = None,
+        preview_long_edge: Optional[int] = None,
+        share_blurs: bool = False
+    ):
+        """
+        Initialize smart enhancer
+        
+        Args:
+            memory_budget_mb: Process large images in strips to stay under
+                this working-memory budget (None = whole image at once)
+            preview_long_edge: Render a low-resolution preview with this
+                long edge instead of the full image (None = full resolution)
+            share_blurs: Compute each blur once for consecutive sharpening
+                steps (slightly approximate; see FilterPipeline)
+        """
         self.enhancer = PictureEnhancer()
+        self.memory_budget_mb = memory_budget_mb
+        self.preview_long_edge = preview_long_edge
+        self.share_blurs = share_blurs
     
     def enhance_from_analysis(
         self,
@@ -622,6 +647,63 @@ class SmartEnhancer:
             'advanced': advanced_ops
         }
     
+    def _build_pipeline(self, adjustments: Dict[str, Any]) -> FilterPipeline:
+        """
+        Translate parsed adjustments into an in-memory filter pipeline
+        
+        Basic PIL adjustments come first in their optimal order (brightness,
+        contrast, saturation, sharpness), followed by the advanced operations
+        in the order they were recommended.
+        
+        Args:
+            adjustments: Dictionary with 'basic' and 'advanced' keys
+            
+        Returns:
+            FilterPipeline ready to run on a PIL image
+        """
+        basic_adjustments = adjustments.get('basic', {})
+        advanced_ops = adjustments.get('advanced', [])
+        pipeline = FilterPipeline(
+            memory_budget_mb=self.memory_budget_mb, share_blurs=self.share_blurs
+        )
+        
+        if 'brightness' in basic_adjustments:
+            pipeline.add(BrightnessFilter(basic_adjustments['brightness']))
+        if 'contrast' in basic_adjustments:
+            pipeline.add(ContrastFilter(basic_adjustments['contrast']))
+        if 'saturation' in basic_adjustments:
+            pipeline.add(SaturationFilter(basic_adjustments['saturation']))
+        if 'sharpness' in basic_adjustments:
+            pipeline.add(SharpnessFilter(basic_adjustments['sharpness']))
+        
+        for op in advanced_ops:
+            op_type = op.get('type')
+            if op_type == 'unsharp_mask':
+                pipeline.add(UnsharpMaskFilter(
+                    radius=op.get('radius', 1.5),
+                    percent=op.get('percent', 80),
+                    threshold=op.get('threshold', 0)
+                ))
+            elif op_type == 'color_temperature':
+                pipeline.add(ColorTemperatureFilter(kelvin=op.get('kelvin', 6500)))
+            elif op_type == 'shadows_highlights':
+                pipeline.add(ShadowsHighlightsFilter(
+                    shadow_adjust=op.get('shadow_adjust', 0),
+                    highlight_adjust=op.get('highlight_adjust', 0)
+                ))
+            elif op_type == 'vibrance':
+                pipeline.add(VibranceFilter(factor=op.get('factor', 1.0)))
+            elif op_type == 'clarity':
+                # Parsed strength is 0-1; the filter expects 0-100
+                pipeline.add(ClarityFilter(strength=op.get('strength', 20) * 100))
+            elif op_type == 'channel':
+                pipeline.add(ColorChannelFilter(
+                    channel=op.get('channel', 'red'),
+                    factor=op.get('factor', 1.0)
+                ))
+        
+        return pipeline
+    
     def _apply_adjustments(
         self,
         image_path: str,
@@ -640,136 +722,18 @@ class SmartEnhancer:
             Path to saved image
         """
         try:
-            image = Image.open(image_path)
-            if image.mode != 'RGB' and image.mode != 'RGBA':
-                image = image.convert('RGB')
-            
-            # Extract basic and advanced adjustments
-            basic_adjustments = adjustments.get('basic', {})
-            advanced_ops = adjustments.get('advanced', [])
-            
-            # Apply basic PIL adjustments in optimal order
-            # 1. Brightness (affects overall exposure)
-            if 'brightness' in basic_adjustments:
-                print(f"    → Adjusting brightness ({basic_adjustments['brightness']:.2f}x)...")
-                enhancer = ImageEnhance.Brightness(image)
-                image = enhancer.enhance(basic_adjustments['brightness'])
-            
-            # 2. Contrast (affects perception of lighting)
-            if 'contrast' in basic_adjustments:
-                print(f"    → Adjusting contrast ({basic_adjustments['contrast']:.2f}x)...")
-                enhancer = ImageEnhance.Contrast(image)
-                image = enhancer.enhance(basic_adjustments['contrast'])
-            
-            # 3. Saturation (affects color vibrancy)
-            if 'saturation' in basic_adjustments:
-                print(f"    → Adjusting saturation ({basic_adjustments['saturation']:.2f}x)...")
-                enhancer = ImageEnhance.Color(image)
-                image = enhancer.enhance(basic_adjustments['saturation'])
-            
-            # 4. Sharpness (final detail enhancement)
-            if 'sharpness' in basic_adjustments:
-                print(f"    → Adjusting sharpness ({basic_adjustments['sharpness']:.2f}x)...")
-                enhancer = ImageEnhance.Sharpness(image)
-                image = enhancer.enhance(basic_adjustments['sharpness'])
-            
-            # Save intermediate result after basic adjustments
-            if not advanced_ops:
-                # No advanced ops, save and return
-                if output_path:
-                    image.save(output_path, quality=95)
-                    return output_path
-                else:
-                    image.save(image_path, quality=95)
-                    return image_path
-            
-            # Create temporary directory for intermediate results
-            import tempfile
-            import os
-            temp_dir = tempfile.gettempdir()
-            temp_image = os.path.join(temp_dir, 'intermediate_enhancement.jpg')
-            image.save(temp_image, quality=95)
-            current_path = temp_image
-            
-            # Apply advanced operations sequentially
-            for op in advanced_ops:
-                op_type = op.get('type')
-                
-                if op_type == 'unsharp_mask':
-                    print("    → Applying unsharp mask...")
-                    current_path = apply_unsharp_mask(
-                        current_path,
-                        radius=op.get('radius', 1.5),
-                        percent=op.get('percent', 80),
-                        threshold=op.get('threshold', 0),
-                        output_path=current_path
-                    )
-                
-                elif op_type == 'color_temperature':
-                    print("    → Adjusting color temperature...")
-                    current_path = adjust_color_temperature(
-                        current_path,
-                        kelvin=op.get('kelvin', 6500),
-                        output_path=current_path
-                    )
-                
-                elif op_type == 'shadows_highlights':
-                    print("    → Adjusting shadows and highlights...")
-                    current_path = adjust_shadows_highlights(
-                        current_path,
-                        shadow_adjust=op.get('shadow_adjust', 0),
-                        highlight_adjust=op.get('highlight_adjust', 0),
-                        output_path=current_path
-                    )
-                
-                elif op_type == 'vibrance':
-                    print("    → Adjusting vibrance...")
-                    current_path = adjust_vibrance(
-                        current_path,
-                        factor=op.get('factor', 1.0),
-                        output_path=current_path
-                    )
-                
-                elif op_type == 'clarity':
-                    print("    → Applying clarity filter...")
-                    current_path = apply_clarity_filter(
-                        current_path,
-                        strength=op.get('strength', 20) * 100,  # Convert 0-1 to 0-100
-                        output_path=current_path
-                    )
-                
-                elif op_type == 'channel':
-                    print(f"    → Adjusting {op.get('channel', 'unknown')} channel...")
-                    current_path = adjust_color_channel(
-                        current_path,
-                        channel=op.get('channel', 'red'),
-                        factor=op.get('factor', 1.0),
-                        output_path=current_path
-                    )
-                
-                if not current_path:
-                    print(f"    → Error applying {op_type}")
-                    # Fall back to saved intermediate image
-                    break
-            
-            # Save final result
-            if output_path:
-                # Copy final result to output path
-                import shutil
-                shutil.copy(current_path, output_path)
-                result_path = output_path
+            # All adjustments run in memory; the result is encoded once
+            pipeline = self._build_pipeline(adjustments)
+            if self.preview_long_edge:
+                image = pipeline.preview(image_path, self.preview_long_edge)
             else:
-                # Copy final result back to original image
-                import shutil
-                shutil.copy(current_path, image_path)
-                result_path = image_path
-            
-            # Clean up temporary file
-            try:
-                os.remove(temp_image)
-            except:
-                pass
+                image = Image.open(image_path)
+                if image.mode != 'RGB' and image.mode != 'RGBA':
+                    image = image.convert('RGB')
+                image = pipeline.run(image)
             
+            result_path = output_path or image_path
+            image.save(result_path, quality=95)
             return result_path
         
         except Exception as e:
@@ -779,6 +743,3 @@ class SmartEnhancer:
             return None
 
 
-# Advanced filters are now in enhancement_filters module
-# They are already imported at the top of this file
-
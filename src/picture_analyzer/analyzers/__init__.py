@@ -8,8 +8,10 @@ def create_analyzer(
 	*,
 	openai_api_key: str | None = None,
 	openai_model: str | None = None,
+	openai_base_url: str | None = None,
 	ollama_model: str | None = None,
 	ollama_host: str | None = None,
+	ollama_hosts: list[str] | None = None,
 	max_tokens: int | None = None,
 ):
 	"""Create an analyzer instance from provider-specific options."""
@@ -21,6 +23,8 @@ def create_analyzer(
 			kwargs["api_key"] = openai_api_key
 		if openai_model is not None:
 			kwargs["model"] = openai_model
+		if openai_base_url is not None:
+			kwargs["base_url"] = openai_base_url
 		if max_tokens is not None:
 			kwargs["max_tokens"] = max_tokens
 		return OpenAIAnalyzer(**kwargs)
@@ -31,6 +35,8 @@ def create_analyzer(
 			kwargs["model"] = ollama_model
 		if ollama_host is not None:
 			kwargs["host"] = ollama_host
+		if ollama_hosts:
+			kwargs["hosts"] = ollama_hosts
 		if max_tokens is not None:
 			kwargs["max_tokens"] = max_tokens
 		return OllamaAnalyzer(**kwargs)
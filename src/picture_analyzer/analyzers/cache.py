@@ -0,0 +1,219 @@
+"""Persistent, content-addressed cache for model responses.
+
+Re-running a batch after a crash or a config tweak would otherwise send
+every image back to the model.  ``ResponseCache`` stores the raw text of
+each response on disk under a key derived from everything that
+determines it:
+
+  - the image payload actually sent (SHA-256 of its base64 text, so the
+    payload preparation settings are covered too);
+  - the fully resolved system and user prompt;
+  - provider, model and decoding options.
+
+Identical requests are answered from disk without a model call.  Any
+change to the prompt text, model or options produces a new key, so a
+prompt bugfix naturally invalidates old entries.
+
+Entries live as one JSON file each, sharded by the first two hex digits
+of the key.  The cache is bounded by total size; when it grows past
+``max_mb`` the least recently used entries (by file mtime, refreshed on
+every hit) are deleted.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from ..config.defaults import DEFAULT_RESPONSE_CACHE_DIR, DEFAULT_RESPONSE_CACHE_MAX_MB
+
+logger = logging.getLogger(__name__)
+
+# Bump to invalidate every stored entry after a format change.
+_CACHE_VERSION = 1
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for one :class:`ResponseCache`."""
+
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.hits} hit(s), {self.misses} miss(es) "
+            f"({self.hit_rate:.0%} hit rate), {self.evictions} eviction(s)"
+        )
+
+
+class ResponseCache:
+    """Disk-backed LRU cache of raw model responses.
+
+    Usage::
+
+        cache = ResponseCache(".response_cache", max_mb=200)
+        key = cache.key(image=payload, prompt=prompt, model="llava")
+        text = cache.get(key)
+        if text is None:
+            text = call_model(...)
+            cache.put(key, text)
+
+    Args:
+        directory: Where entries are stored.
+        max_mb: Size bound; least recently used entries are evicted
+            beyond it.
+        enabled: ``False`` turns every lookup into a miss and every
+            store into a no-op (the bypass switch).
+    """
+
+    def __init__(
+        self,
+        directory: str | Path = DEFAULT_RESPONSE_CACHE_DIR,
+        max_mb: float = DEFAULT_RESPONSE_CACHE_MAX_MB,
+        enabled: bool = True,
+    ):
+        self.directory = Path(directory).expanduser()
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.enabled = enabled
+        self.stats = CacheStats()
+        self._size: int | None = None  # total bytes on disk, computed lazily
+        self._lock = threading.Lock()  # steps may share one cache across threads
+
+    @classmethod
+    def from_settings(cls, settings) -> ResponseCache | None:
+        """Build from ``settings.response_cache``; ``None`` when disabled."""
+        cfg = settings.response_cache
+        if not cfg.enabled:
+            return None
+        return cls(directory=cfg.directory, max_mb=cfg.max_mb)
+
+    @staticmethod
+    def key(image: str | None = None, **parts: Any) -> str:
+        """Return the cache key for a request.
+
+        Args:
+            image: Base64 payload sent with the request (hashed, not stored).
+            **parts: Everything else that shapes the response — prompt
+                text, provider, model, options.  Must be JSON-serialisable.
+        """
+        request = {
+            "version": _CACHE_VERSION,
+            "image": hashlib.sha256(image.encode("ascii")).hexdigest() if image else None,
+            **parts,
+        }
+        blob = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Return the cached response for *key*, or ``None``."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            with self._lock:
+                self.stats.misses += 1
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        with self._lock:
+            self.stats.hits += 1
+        return entry.get("response")
+
+    def put(self, key: str, response: str, **meta: Any) -> None:
+        """Store *response* under *key*; *meta* is kept for inspection only."""
+        if not self.enabled:
+            return
+        path = self._path(key)
+        data = json.dumps(
+            {"response": response, "stored_at": time.time(), **meta},
+            ensure_ascii=False,
+            default=str,
+        ).encode("utf-8")
+        with self._lock:
+            size = self.size_bytes()  # scan before the new entry is on disk
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                previous = path.stat().st_size if path.exists() else 0
+                tmp = path.with_suffix(".tmp")
+                tmp.write_bytes(data)
+                tmp.replace(path)
+            except OSError as exc:
+                logger.warning("Could not write response cache entry %s: %s", path, exc)
+                return
+            self.stats.stores += 1
+            self._size = size + len(data) - previous
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def size_bytes(self) -> int:
+        """Total size of all stored entries."""
+        if self._size is None:
+            self._size = sum(size for _, _, size in self._entries())
+        return self._size
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        for path, _, _ in self._entries():
+            path.unlink(missing_ok=True)
+        self._size = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _entries(self) -> list[tuple[Path, float, int]]:
+        return disk_entries(self.directory, "*/*.json")
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under the size bound."""
+        self._size, evicted = evict_lru(self._entries(), self.max_bytes)
+        self.stats.evictions += evicted
+
+
+def disk_entries(directory: Path, pattern: str) -> list[tuple[Path, float, int]]:
+    """``(path, mtime, size)`` of the files under *directory* matching *pattern*."""
+    entries = []
+    for path in directory.glob(pattern):
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        entries.append((path, st.st_mtime, st.st_size))
+    return entries
+
+
+def evict_lru(entries: list[tuple[Path, float, int]], max_bytes: int) -> tuple[int, int]:
+    """Delete the oldest *entries* (by mtime) until they total at most *max_bytes*.
+
+    Returns:
+        ``(remaining_bytes, evicted_count)``.
+    """
+    total = sum(size for _, _, size in entries)
+    evicted = 0
+    for path, _, size in sorted(entries, key=lambda e: e[1]):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+        evicted += 1
+    return total, evicted
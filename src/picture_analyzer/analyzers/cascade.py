@@ -0,0 +1,152 @@
+"""Model cascade: a small model first, the large model only when needed.
+
+Most images are easy: a small, fast model gets the scene and the
+location right.  ``CascadeAnalyzer`` wraps two analyzers for one
+pipeline step.  Every section call goes to the *small* model first;
+its answer is kept unless :func:`escalation_reason` finds a reason to
+distrust it:
+
+  - a required field is missing or cut off (checked against the
+    section JSON Schema, see :func:`~.validation.find_missing`);
+  - ``location_detection.confidence`` is below ``min_confidence``;
+  - the best slide profile's confidence is below ``min_confidence``.
+
+Only then is the same call repeated on the *large* model.
+:class:`CascadeStats` counts the escalations and estimates the time
+saved, using the large model's measured duration per call.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from ..config.defaults import DEFAULT_CASCADE_MIN_CONFIDENCE
+from ..core.models import AnalysisContext, AnalysisResult, ImageData
+from .validation import find_missing
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CascadeStats:
+    """Counters for one :class:`CascadeAnalyzer`."""
+
+    calls: int = 0
+    escalated: int = 0
+    small_seconds: float = 0.0
+    large_seconds: float = 0.0
+
+    @property
+    def time_saved(self) -> Optional[float]:
+        """Seconds saved against sending every call to the large model.
+
+        Estimated from the large model's average call time, so ``None``
+        until at least one call has escalated.
+        """
+        if not self.escalated:
+            return None
+        return self.large_seconds / self.escalated * self.calls - (
+            self.small_seconds + self.large_seconds
+        )
+
+    def __str__(self) -> str:
+        saved = self.time_saved
+        return (
+            f"{self.escalated}/{self.calls} escalated, "
+            + (f"~{saved:.0f}s saved" if saved is not None else "time saved unknown (no escalations)")
+        )
+
+
+def escalation_reason(
+    result: AnalysisResult, sections: Optional[list[str]], min_confidence: int
+) -> Optional[str]:
+    """Why *result* should be redone on the large model, or ``None`` to keep it."""
+    from ..data.prompt_loader import PromptLoader
+
+    raw = result.raw_response if isinstance(result.raw_response, dict) else {}
+    schema = PromptLoader().schema(sections)
+    missing = find_missing(raw, schema) if schema is not None else []
+    if missing:
+        return f"{len(missing)} field(s) missing: {', '.join(missing)}"
+    if result.location is not None and result.location.confidence < min_confidence:
+        return f"location confidence {result.location.confidence}% < {min_confidence}%"
+    if result.slide_profile is not None and result.slide_profile.confidence < min_confidence:
+        return f"slide profile confidence {result.slide_profile.confidence}% < {min_confidence}%"
+    return None
+
+
+class CascadeAnalyzer:
+    """Try *small* first; re-run a call on *large* when its answer is doubtful.
+
+    Args:
+        small: Fast analyzer asked first.
+        large: Analyzer used when the small model's answer is incomplete
+            or below *min_confidence*.
+        min_confidence: Lowest location / slide profile confidence (0–100)
+            accepted from the small model.
+    """
+
+    def __init__(
+        self,
+        small: Any,
+        large: Any,
+        min_confidence: int = DEFAULT_CASCADE_MIN_CONFIDENCE,
+    ):
+        self.small = small
+        self.large = large
+        self.min_confidence = min_confidence
+        self.stats = CascadeStats()
+        self._lock = threading.Lock()
+        self._last_call_stats: dict = {}
+
+    @property
+    def model(self) -> str:
+        return f"{self.small.model}→{self.large.model}"
+
+    def analyze(self, image: ImageData, context: AnalysisContext) -> AnalysisResult:
+        return self._cascade(None, lambda analyzer: analyzer.analyze(image, context))
+
+    def analyze_section(
+        self,
+        image: ImageData,
+        context: AnalysisContext,
+        sections: list[str],
+    ) -> AnalysisResult:
+        return self._cascade(
+            sections, lambda analyzer: analyzer.analyze_section(image, context, sections)
+        )
+
+    def _cascade(self, sections: Optional[list[str]], call) -> AnalysisResult:
+        t0 = time.perf_counter()
+        reason: Optional[str]
+        try:
+            result = call(self.small)
+        except Exception as exc:
+            result, reason = None, f"{type(exc).__name__}: {exc}"
+        else:
+            reason = escalation_reason(result, sections, self.min_confidence)
+        small_seconds = time.perf_counter() - t0
+        if reason is None:
+            self._record(small_seconds)
+            self._last_call_stats = dict(self.small._last_call_stats)
+            return result
+
+        logger.info("Escalating to %s (%s)", self.large.model, reason)
+        t0 = time.perf_counter()
+        try:
+            result = call(self.large)
+        finally:
+            self._record(small_seconds, time.perf_counter() - t0)
+        self._last_call_stats = {**self.large._last_call_stats, "escalated": self.large.model}
+        return result
+
+    def _record(self, small_seconds: float, large_seconds: Optional[float] = None) -> None:
+        with self._lock:  # steps of different images may run at the same time
+            self.stats.calls += 1
+            self.stats.small_seconds += small_seconds
+            if large_seconds is not None:
+                self.stats.escalated += 1
+                self.stats.large_seconds += large_seconds
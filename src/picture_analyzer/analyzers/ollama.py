@@ -6,10 +6,10 @@ Implements the ``Analyzer`` protocol using locally hosted Ollama models
 """
 from __future__ import annotations
 
-import base64
+import asyncio
 import logging
 import time
-from pathlib import Path
+from types import SimpleNamespace
 from typing import Any
 
 import ollama
@@ -22,6 +22,10 @@ from ..config.defaults import (
 )
 from ..core.models import AnalysisContext, AnalysisResult, ImageData
 from .openai import OpenAIAnalyzer
+from .ollama_pool import OllamaPool, is_oom_error
+from .payload import attach_payload
+from .residency import ResidencyManager
+from .streaming import DRAIN_CHUNKS, STOP_COMPLETE, StreamMonitor
 
 
 class OllamaAnalyzer(OpenAIAnalyzer):
@@ -29,8 +33,22 @@ class OllamaAnalyzer(OpenAIAnalyzer):
 
     Reuses parsing and model-conversion helpers from ``OpenAIAnalyzer``
     so both providers yield the same internal ``AnalysisResult`` shape.
+
+    Set ``residency`` to a :class:`~.residency.ResidencyManager` to load
+    the model once and keep it resident between calls instead of
+    relying on whatever the server happens to have loaded.
+
+    With *hosts*, requests are spread over several Ollama servers by a
+    shared :class:`~.ollama_pool.OllamaPool` (least-loaded routing,
+    failover on OOM, timeouts and connection errors).
+
+    The async methods run the blocking calls in a worker thread; the
+    Ollama server, not the client, limits how many run in parallel.
     """
 
+    residency: ResidencyManager | None = None
+    _provider = "ollama"
+
     def __init__(
         self,
         model: str = DEFAULT_OLLAMA_MODEL,
@@ -39,23 +57,27 @@ class OllamaAnalyzer(OpenAIAnalyzer):
         timeout: int = 300,
         num_ctx: int | None = None,
         keep_alive: int = 3600,
+        hosts: list[str] | None = None,
     ):
         self.model = model
         self.max_tokens = max_tokens
         self.timeout = timeout
         self.num_ctx = num_ctx
         self.keep_alive = keep_alive
-        self.client = ollama.Client(host=host, timeout=timeout) if host else ollama.Client(timeout=timeout)
-
-    def _encode(self, path: Path) -> str:
-        with open(path, "rb") as f:
-            return base64.b64encode(f.read()).decode("utf-8")
+        self.host = host or ""
+        self.pool = OllamaPool.shared(hosts, timeout=timeout) if hosts else None
+        if self.pool is not None:
+            self.client = self.pool.hosts[0].client
+        else:
+            self.client = ollama.Client(host=host, timeout=timeout) if host else ollama.Client(timeout=timeout)
 
     def _call_api(
         self,
         image: ImageData,
         context: AnalysisContext,
         prompt_override: str | None = None,
+        sections: list[str] | None = None,
+        response_schema: dict | None = None,
     ) -> str:
         from ..data.prompt_loader import PromptLoader
 
@@ -104,33 +126,46 @@ class OllamaAnalyzer(OpenAIAnalyzer):
         if self.num_ctx is not None:
             options["num_ctx"] = self.num_ctx
 
+        # A JSON Schema constrains decoding to the expected keys; "json" only to valid JSON
+        response_format = self._response_schema(sections, response_schema) or "json"
+        payload = image.base64_data or self._encode(image.path)
+        cache_key = self._cache_key(
+            payload, system=system_prompt, prompt=prompt, options=options, format=response_format
+        )
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+
         messages = [
             {"role": "system", "content": system_prompt},
             {
                 "role": "user",
                 "content": prompt,
-                "images": [image.base64_data or self._encode(image.path)],
+                "images": [payload],
             },
         ]
+        del payload
 
         _OOM_RETRIES = 3
         _OOM_WAIT = 30  # seconds between retries
+        residency = self.residency if self.pool is None else None  # the pool tracks it per host
         for _attempt in range(1, _OOM_RETRIES + 1):
             try:
-                response = self.client.chat(
-                    model=self.model,
-                    format="json",  # Force the model to emit valid JSON directly
-                    options=options,
-                    keep_alive=self.keep_alive,
-                    messages=messages,
-                )
+                if residency is None:
+                    response = self._chat(options, messages, response_format)
+                else:
+                    residency.ensure_loaded(self.client, self.model, self.keep_alive, host=self.host)
+                    with residency.in_use(self.model, host=self.host):
+                        response = self._chat(options, messages, response_format)
                 break
             except ollama.ResponseError as exc:
-                if "system memory" in str(exc).lower() and _attempt < _OOM_RETRIES:
+                if is_oom_error(exc) and _attempt < _OOM_RETRIES:
                     logging.warning(
                         "Ollama OOM (attempt %d/%d): %s — retrying in %ds",
                         _attempt, _OOM_RETRIES, exc, _OOM_WAIT,
                     )
+                    if residency is not None:
+                        residency.memory_pressure(self.model, host=self.host)
                     time.sleep(_OOM_WAIT)
                 else:
                     raise
@@ -151,6 +186,8 @@ class OllamaAnalyzer(OpenAIAnalyzer):
             "output_tokens": getattr(response, "eval_count", None),
             "eval_duration_ns": getattr(response, "eval_duration", None),
         }
+        if self.streaming is not None:
+            text = self._finish_stream(response.monitor)
         del response  # release response object
 
         import os
@@ -158,8 +195,57 @@ class OllamaAnalyzer(OpenAIAnalyzer):
             import sys
             print("\n[DEBUG] Raw Ollama response:\n" + text + "\n", file=sys.stderr)
 
+        self._store_response(cache_key, text)
         return text
 
+    def _chat(self, options: dict, messages: list[dict], response_format: str | dict = "json") -> Any:
+        request = {
+            "model": self.model,
+            "format": response_format,  # Force the model to emit valid JSON directly
+            "options": options,
+            "keep_alive": self.keep_alive,
+            "messages": messages,
+        }
+        if self.streaming is not None:
+            request["stream"] = True
+        if self.pool is not None:
+            response = self.pool.chat(residency=self.residency, **request)
+        else:
+            response = self.client.chat(**request)
+        if self.streaming is not None:
+            return self._consume_stream(response, self.streaming.monitor())
+        return response
+
+    def _consume_stream(self, chunks: Any, monitor: StreamMonitor) -> SimpleNamespace:
+        """Read a streamed chat through *monitor* into a response-like object."""
+        final = None
+        drain = DRAIN_CHUNKS
+        try:
+            for chunk in chunks:
+                if getattr(chunk, "done", False):
+                    final = chunk
+                    break
+                if monitor.stop_reason == STOP_COMPLETE:
+                    drain -= 1  # only whitespace can follow; wait briefly for the stats
+                    if not drain:
+                        break
+                elif monitor.feed(chunk.message.content or ""):
+                    if monitor.stop_reason != STOP_COMPLETE:
+                        break
+                else:
+                    self._last_call_stats = self._live_stats(monitor)
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()  # drops the connection, so Ollama stops decoding
+        return SimpleNamespace(
+            message=SimpleNamespace(content=monitor.text),
+            prompt_eval_count=getattr(final, "prompt_eval_count", None),
+            eval_count=getattr(final, "eval_count", None) or monitor.chunks,
+            eval_duration=getattr(final, "eval_duration", None) or monitor.elapsed_ns,
+            monitor=monitor,
+        )
+
     @staticmethod
     def _enforce_location_from_description(raw_dict: dict, description_text: str) -> dict:
         """Override location fields with ground truth from description.txt.
@@ -233,12 +319,22 @@ class OllamaAnalyzer(OpenAIAnalyzer):
 
         lang = context.language or DEFAULT_METADATA_LANGUAGE
         prompt_override = PromptLoader().combined(sections=sections, language=lang)
-        if not image.base64_data:
-            image = image.model_copy(update={"base64_data": self._encode(image.path)})
-        raw_text = self._call_api(image, context, prompt_override=prompt_override)
-        raw_dict = self._parse_json(raw_text, sections=sections)
+        image, _ = attach_payload(image, self.payload_preparer)
+        raw_text = self._call_api(image, context, prompt_override=prompt_override, sections=sections)
+        raw_dict = self._parse_json(raw_text, normalise=False)
+        raw_dict = self._normalised(
+            self._reask_missing(raw_dict, image, context, sections), sections
+        )
 
         if context.description_text and "location" in sections:
             raw_dict = self._enforce_location_from_description(raw_dict, context.description_text)
 
-        return self._to_analysis_result(raw_dict, image, context)
\ No newline at end of file
+        return self._to_analysis_result(raw_dict, image, context)
+
+    async def analyze_async(self, image: ImageData, context: AnalysisContext) -> AnalysisResult:
+        return await asyncio.to_thread(self.analyze, image, context)
+
+    async def analyze_section_async(
+        self, image: ImageData, context: AnalysisContext, sections: list[str]
+    ) -> AnalysisResult:
+        return await asyncio.to_thread(self.analyze_section, image, context, sections)
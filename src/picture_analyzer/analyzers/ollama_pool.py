@@ -0,0 +1,234 @@
+"""Spread Ollama requests over several inference hosts.
+
+A single :class:`ollama.Client` talks to one server.  ``OllamaPool``
+holds one client per configured host and, for every request:
+
+  - routes it to the **least-loaded healthy host**: fewest requests in
+    flight, ties broken by the best rolling generation speed (tok/s
+    over the last few responses; hosts without a measurement yet go
+    first so every box gets probed);
+  - **retries on another host** when the chosen one runs out of memory,
+    times out or refuses the connection;
+  - takes a failing host out of rotation for ``cooldown`` seconds.  After
+    that it gets traffic again, and a success marks it healthy.  When
+    every host is cooling down, the one that failed longest ago is
+    tried anyway.
+
+The pool exposes ``chat`` like ``ollama.Client`` (including
+``stream=True``), so :class:`~.ollama.OllamaAnalyzer` can use either.
+Pools are shared per host list (:meth:`OllamaPool.shared`), so all
+pipeline steps running concurrently see the same in-flight counts.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+import ollama
+
+from ..config.defaults import DEFAULT_OLLAMA_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Seconds a host stays out of rotation after a failure.
+DEFAULT_HOST_COOLDOWN = 30.0
+
+# Responses per host in the rolling tok/s window.
+_SPEED_WINDOW = 8
+
+
+def is_oom_error(exc: BaseException) -> bool:
+    """True for the Ollama error raised when a model does not fit in memory."""
+    return isinstance(exc, ollama.ResponseError) and "system memory" in str(exc).lower()
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    return is_oom_error(exc) or isinstance(exc, (ConnectionError, httpx.TransportError))
+
+
+@dataclass
+class HostState:
+    """Routing state of one Ollama host."""
+
+    host: str
+    client: Any
+    in_flight: int = 0
+    requests: int = 0
+    failures: int = 0
+    unhealthy_until: float = 0.0
+    _speeds: deque[tuple[int, float]] = field(default_factory=lambda: deque(maxlen=_SPEED_WINDOW))
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.unhealthy_until
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        """Rolling generation speed, or ``None`` before the first response."""
+        seconds = sum(s for _, s in self._speeds)
+        if not seconds:
+            return None
+        return sum(t for t, _ in self._speeds) / seconds
+
+    def record_speed(self, response: Any) -> None:
+        tokens = getattr(response, "eval_count", None)
+        duration_ns = getattr(response, "eval_duration", None)
+        if tokens and duration_ns:
+            self._speeds.append((tokens, duration_ns / 1e9))
+
+    def __str__(self) -> str:
+        speed = self.tokens_per_second
+        rate = f"{speed:.1f} tok/s" if speed is not None else "no data"
+        return f"{self.host}: {self.requests} request(s), {self.failures} failure(s), {rate}"
+
+
+class OllamaPool:
+    """Least-loaded routing with failover across Ollama hosts.
+
+    Usage::
+
+        pool = OllamaPool(["http://gpu1:11434", "http://gpu2:11434"])
+        response = pool.chat(model="llava", messages=[...])
+
+    Args:
+        hosts: Ollama base URLs.
+        timeout: Per-request timeout in seconds.
+        cooldown: Seconds a failing host is skipped.
+        client_factory: Builds the client for a host (default
+            ``ollama.Client``).
+        clock: Monotonic time source (injectable for tests).
+    """
+
+    _shared: dict[tuple[tuple[str, ...], int], OllamaPool] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        hosts: Sequence[str],
+        timeout: int = DEFAULT_OLLAMA_TIMEOUT,
+        cooldown: float = DEFAULT_HOST_COOLDOWN,
+        client_factory: Callable[..., Any] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not hosts:
+            raise ValueError("OllamaPool needs at least one host")
+        factory = client_factory or ollama.Client
+        self.hosts = [HostState(host, factory(host=host, timeout=timeout)) for host in hosts]
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, hosts: Sequence[str], timeout: int = DEFAULT_OLLAMA_TIMEOUT) -> OllamaPool:
+        """Return the process-wide pool for *hosts*, creating it once."""
+        key = (tuple(hosts), timeout)
+        with cls._shared_lock:
+            pool = cls._shared.get(key)
+            if pool is None:
+                pool = cls._shared[key] = cls(hosts, timeout=timeout)
+            return pool
+
+    def chat(self, *, residency: Any = None, **request: Any) -> Any:
+        """Send a chat request, failing over between hosts.
+
+        Args:
+            residency: Optional :class:`~.residency.ResidencyManager`;
+                the model is loaded and tracked per host.
+            **request: Keyword arguments for ``ollama.Client.chat``.
+
+        Raises:
+            The last host's error when every host failed.
+        """
+        tried: set[str] = set()
+        last_error: BaseException | None = None
+        while len(tried) < len(self.hosts):
+            state = self._acquire(exclude=tried)
+            tried.add(state.host)
+            try:
+                response = self._send(state, request, residency)
+            except Exception as exc:
+                self._release(state, failed=_is_retryable(exc))
+                if not _is_retryable(exc):
+                    raise
+                if residency is not None and is_oom_error(exc):
+                    residency.memory_pressure(request.get("model", ""), host=state.host)
+                logger.warning("Ollama host %s failed (%s); trying another host", state.host, exc)
+                last_error = exc
+                continue
+            if request.get("stream"):
+                return response  # the host is released when the stream ends
+            self._release(state, response=response)
+            return response
+        assert last_error is not None
+        raise last_error
+
+    def summary(self) -> list[str]:
+        """One status line per host."""
+        return [str(state) for state in self.hosts]
+
+    def _send(self, state: HostState, request: dict[str, Any], residency: Any) -> Any:
+        model = request.get("model", "")
+        if residency is not None:
+            residency.ensure_loaded(state.client, model, request.get("keep_alive", 0), host=state.host)
+        if request.get("stream"):
+            chunks = state.client.chat(**request)
+            # The request is only sent on the first read; read it here so
+            # OOM and connection errors still fail over to another host.
+            first = next(chunks, None)
+            return self._relay(state, first, chunks, residency, model)
+        if residency is None:
+            return state.client.chat(**request)
+        with residency.in_use(model, host=state.host):
+            return state.client.chat(**request)
+
+    def _relay(
+        self, state: HostState, first: Any, chunks: Iterator[Any], residency: Any, model: str
+    ) -> Iterator[Any]:
+        """Yield a primed stream; release *state* once it ends or is closed."""
+        last = first
+        busy = residency.in_use(model, host=state.host) if residency is not None else nullcontext()
+        try:
+            with busy:
+                if first is not None:
+                    yield first
+                for last in chunks:
+                    yield last
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+            self._release(state, response=last if getattr(last, "done", False) else None)
+
+    def _acquire(self, exclude: set[str]) -> HostState:
+        with self._lock:
+            now = self._clock()
+            candidates = [s for s in self.hosts if s.host not in exclude]
+            healthy = [s for s in candidates if s.healthy(now)]
+            if healthy:
+                state = min(healthy, key=_load_key)
+            else:
+                state = min(candidates, key=lambda s: s.unhealthy_until)
+            state.in_flight += 1
+            state.requests += 1
+            return state
+
+    def _release(self, state: HostState, response: Any = None, failed: bool = False) -> None:
+        with self._lock:
+            state.in_flight -= 1
+            if failed:
+                state.failures += 1
+                state.unhealthy_until = self._clock() + self.cooldown
+            elif response is not None:
+                state.unhealthy_until = 0.0
+                state.record_speed(response)
+
+
+def _load_key(state: HostState) -> tuple[int, float]:
+    speed = state.tokens_per_second
+    return (state.in_flight, -(speed if speed is not None else float("inf")))
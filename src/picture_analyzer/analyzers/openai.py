@@ -6,25 +6,34 @@ Implements the ``Analyzer`` protocol using OpenAI's Vision models
 """
 from __future__ import annotations
 
-import base64
 import json
 import logging
 import os
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from ..config.defaults import (
     DEFAULT_METADATA_LANGUAGE,
     DEFAULT_OPENAI_MODEL,
+    DEFAULT_MAX_OUTPUT_TOKENS,
     DEFAULT_MAX_TOKENS,
+    DEFAULT_PACKED_TOKENS_PER_IMAGE,
     LANGUAGE_NAMES,
     MIME_TYPE_MAP,
 )
+from .cache import ResponseCache
+from .payload import PayloadPreparer, attach_payload, encode_file
+from .openai_batch import OfflineBatch, custom_id
+from .packing import packed_schema, split_packed
+from .rate_limit import RateLimiter
+from .streaming import DRAIN_CHUNKS, STOP_COMPLETE, StreamLimits, StreamMonitor
+from .validation import describe_fields, find_missing, merge_fields, skeleton, subset_schema
 from ..core.models import (
     AnalysisContext,
     AnalysisResult,
@@ -49,18 +58,58 @@ class OpenAIAnalyzer:
         api_key: OpenAI API key.  Falls back to ``OPENAI_APIKEY`` env var.
         model: Model name (default ``gpt-4o-mini``).
         max_tokens: Maximum response tokens.
+        base_url: OpenAI-compatible API base URL (default: the OpenAI API).
+
+    Set ``payload_preparer`` to a :class:`~.payload.PayloadPreparer` to
+    downscale images the analyzer has to encode itself, and
+    ``response_cache`` to a :class:`~.cache.ResponseCache` to answer
+    repeated identical requests from disk.  With ``streaming`` set to
+    :class:`~.streaming.StreamLimits` responses are streamed and stopped
+    as soon as the JSON is complete or the output runs away.  With
+    ``structured_output`` the section JSON Schemas are sent as a
+    structured-output ``response_format`` so responses are valid JSON
+    of the expected shape by construction.  With ``reask_max_fields``
+    a response with a few empty or truncated fields gets one short
+    follow-up call for just those fields (see :mod:`.validation`).
+
+    :meth:`analyze_async` and :meth:`analyze_section_async` send the same
+    requests through ``AsyncOpenAI``, so a batch can keep many images in
+    flight.  ``rate_limiter`` (a :class:`~.rate_limit.RateLimiter`)
+    bounds the concurrency and backs off on HTTP 429.  Async calls are
+    not streamed, and ``_last_call_stats`` only describes whichever
+    call finished last.
+
+    With ``offline_batch`` set (an :class:`~.openai_batch.OfflineBatch`)
+    requests are not sent: they are recorded for the Batch API, or
+    answered from a completed batch.
+
+    :meth:`analyze_sections_packed` sends several images with one
+    shared prompt (see :mod:`.packing`).
     """
 
+    payload_preparer: Optional[PayloadPreparer] = None
+    response_cache: Optional[ResponseCache] = None
+    streaming: Optional[StreamLimits] = None
+    structured_output: bool = False
+    reask_max_fields: int = 0
+    rate_limiter: Optional[RateLimiter] = None
+    offline_batch: Optional[OfflineBatch] = None
+    _provider = "openai"
+
     def __init__(
         self,
         api_key: Optional[str] = None,
         model: str = DEFAULT_OPENAI_MODEL,
         max_tokens: int = DEFAULT_MAX_TOKENS,
+        base_url: Optional[str] = None,
     ):
         resolved_key = api_key or os.getenv("OPENAI_APIKEY", "")
-        self.client = OpenAI(api_key=resolved_key)
+        self.client = OpenAI(api_key=resolved_key, base_url=base_url)
         self.model = model
         self.max_tokens = max_tokens
+        self._api_key = resolved_key
+        self._base_url = base_url
+        self._async_client: Optional[AsyncOpenAI] = None
         self._last_call_stats: dict = {}
 
     # ── Analyzer Protocol ────────────────────────────────────────────
@@ -68,11 +117,11 @@ class OpenAIAnalyzer:
     def analyze(self, image: ImageData, context: AnalysisContext) -> AnalysisResult:
         """Analyze an image and return a structured ``AnalysisResult``."""
         # Ensure we have base64 data
-        if not image.base64_data:
-            image = image.model_copy(update={"base64_data": self._encode(image.path)})
+        image, _ = attach_payload(image, self.payload_preparer)
 
         raw_text = self._call_api(image, context)
-        raw_dict = self._parse_json(raw_text)
+        raw_dict = self._parse_json(raw_text, normalise=False)
+        raw_dict = self._normalised(self._reask_missing(raw_dict, image, context))
 
         if os.environ.get("PA_ANALYZER_DEBUG"):
             import sys
@@ -80,12 +129,40 @@ class OpenAIAnalyzer:
 
         return self._to_analysis_result(raw_dict, image, context)
 
+    async def analyze_async(self, image: ImageData, context: AnalysisContext) -> AnalysisResult:
+        """Async :meth:`analyze`: one call through ``AsyncOpenAI``."""
+        image, _ = attach_payload(image, self.payload_preparer)
+        raw_text = await self._call_api_async(image, context)
+        raw_dict = self._parse_json(raw_text, normalise=False)
+        raw_dict = self._normalised(await self._reask_missing_async(raw_dict, image, context))
+        return self._to_analysis_result(raw_dict, image, context)
+
+    async def analyze_section_async(
+        self,
+        image: ImageData,
+        context: AnalysisContext,
+        sections: list[str],
+    ) -> AnalysisResult:
+        """Async :meth:`analyze_section`."""
+        from ..data.prompt_loader import PromptLoader
+
+        lang = context.language or DEFAULT_METADATA_LANGUAGE
+        prompt_override = PromptLoader().combined(sections=sections, language=lang)
+        image, _ = attach_payload(image, self.payload_preparer)
+        raw_text = await self._call_api_async(
+            image, context, prompt_override=prompt_override, sections=sections
+        )
+        raw_dict = self._parse_json(raw_text, normalise=False)
+        raw_dict = self._normalised(
+            await self._reask_missing_async(raw_dict, image, context, sections)
+        )
+        return self._to_analysis_result(raw_dict, image, context)
+
     # ── Internal helpers ─────────────────────────────────────────────
 
     def _encode(self, path: Path) -> str:
         """Base64-encode an image file."""
-        with open(path, "rb") as f:
-            return base64.b64encode(f.read()).decode("utf-8")
+        return encode_file(path)
 
     def analyze_section(
         self,
@@ -110,19 +187,221 @@ class OpenAIAnalyzer:
 
         lang = context.language or DEFAULT_METADATA_LANGUAGE
         prompt_override = PromptLoader().combined(sections=sections, language=lang)
-        if not image.base64_data:
-            image = image.model_copy(update={"base64_data": self._encode(image.path)})
-        raw_text = self._call_api(image, context, prompt_override=prompt_override)
-        raw_dict = self._parse_json(raw_text)
+        image, _ = attach_payload(image, self.payload_preparer)
+        raw_text = self._call_api(image, context, prompt_override=prompt_override, sections=sections)
+        raw_dict = self._parse_json(raw_text, normalise=False)
+        raw_dict = self._normalised(self._reask_missing(raw_dict, image, context, sections))
         return self._to_analysis_result(raw_dict, image, context)
 
+    def _response_schema(
+        self, sections: Optional[list[str]], override: Optional[dict] = None
+    ) -> Optional[dict]:
+        """JSON Schema for *sections* (or *override*) when structured output is on."""
+        if not self.structured_output:
+            return None
+        if override is not None:
+            return override
+        from ..data.prompt_loader import PromptLoader
+
+        return PromptLoader().schema(sections)
+
+    def _reask_plan(
+        self, raw_dict: dict[str, Any], sections: Optional[list[str]]
+    ) -> Optional[tuple[list[str], dict, str]]:
+        """Missing fields, their sub-schema and the follow-up prompt, if worth asking.
+
+        ``None`` when re-asking is off, no schema exists for *sections*,
+        nothing is missing, or more than ``reask_max_fields`` fields are.
+        """
+        if not self.reask_max_fields or self.offline_batch is not None:
+            return None
+        from ..data.prompt_loader import PromptLoader
+
+        loader = PromptLoader()
+        schema = loader.schema(sections)
+        if schema is None:
+            return None
+        missing = find_missing(raw_dict, schema)
+        if not missing:
+            return None
+        if len(missing) > self.reask_max_fields:
+            logger.warning(
+                "%d field(s) missing — more than reask_max_fields (%d), keeping the gaps",
+                len(missing), self.reask_max_fields,
+            )
+            return None
+        subset = subset_schema(schema, missing)
+        prompt = loader.load(
+            "reask", fields=describe_fields(schema, missing), example=skeleton(subset)
+        )
+        logger.info("Re-asking %s for %d field(s): %s", self.model, len(missing), ", ".join(missing))
+        return missing, subset, prompt
+
+    def _reask_missing(
+        self,
+        raw_dict: dict[str, Any],
+        image: ImageData,
+        context: AnalysisContext,
+        sections: Optional[list[str]] = None,
+    ) -> dict[str, Any]:
+        """Ask again for only the fields *raw_dict* lacks and merge the answers.
+
+        *raw_dict* is the response as parsed, before normalisation fills
+        in defaults (``_parse_json(normalise=False)``).  The follow-up sends the same image payload with a prompt listing
+        just the missing fields (see :meth:`_reask_plan`).  A failed
+        follow-up keeps the original response.
+        """
+        plan = self._reask_plan(raw_dict, sections)
+        if plan is None:
+            return raw_dict
+        missing, subset, prompt = plan
+        first_stats = self._last_call_stats
+        try:
+            raw_text = self._call_api(
+                image, context, prompt_override=prompt, sections=sections, response_schema=subset
+            )
+            answer = self._parse_json(raw_text, normalise=False)
+        except Exception as exc:
+            logger.warning("Re-ask for missing fields failed: %s", exc)
+            self._last_call_stats = first_stats
+            return raw_dict
+        self._last_call_stats = _combine_stats(first_stats, self._last_call_stats, len(missing))
+        return merge_fields(raw_dict, answer, missing)
+
+    async def _reask_missing_async(
+        self,
+        raw_dict: dict[str, Any],
+        image: ImageData,
+        context: AnalysisContext,
+        sections: Optional[list[str]] = None,
+    ) -> dict[str, Any]:
+        """Async :meth:`_reask_missing`."""
+        plan = self._reask_plan(raw_dict, sections)
+        if plan is None:
+            return raw_dict
+        missing, subset, prompt = plan
+        try:
+            raw_text = await self._call_api_async(
+                image, context, prompt_override=prompt, sections=sections, response_schema=subset
+            )
+            answer = self._parse_json(raw_text, normalise=False)
+        except Exception as exc:
+            logger.warning("Re-ask for missing fields failed: %s", exc)
+            return raw_dict
+        return merge_fields(raw_dict, answer, missing)
+
     def _call_api(
         self,
         image: ImageData,
         context: AnalysisContext,
         prompt_override: Optional[str] = None,
+        sections: Optional[list[str]] = None,
+        response_schema: Optional[dict] = None,
+    ) -> str:
+        """Call OpenAI Vision API and return the raw text response.
+
+        *response_schema* replaces the section schema (used by re-asks).
+        """
+        request, cache_key = self._build_request(
+            image, context, prompt_override, sections, response_schema
+        )
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+        if self.offline_batch is not None:
+            text = self.offline_batch.exchange(custom_id(image.path, sections), request)
+            self._last_call_stats = {"batch": True}
+            if self.offline_batch.collecting:
+                self._store_response(cache_key, text)
+            return text
+
+        if self.streaming is not None:
+            text = self._stream_completion(request, self.streaming.monitor())
+        else:
+            _t0 = time.perf_counter()
+            response = self.client.chat.completions.create(**request)
+            text = self._completion_text(response, int((time.perf_counter() - _t0) * 1e9))
+        if os.environ.get("PA_ANALYZER_DEBUG"):
+            import sys
+            print("\n[DEBUG] Raw OpenAI response:\n", text, "\n", file=sys.stderr)
+        self._store_response(cache_key, text)
+        return text
+
+    async def _call_api_async(
+        self,
+        image: ImageData,
+        context: AnalysisContext,
+        prompt_override: Optional[str] = None,
+        sections: Optional[list[str]] = None,
+        response_schema: Optional[dict] = None,
     ) -> str:
-        """Call OpenAI Vision API and return the raw text response."""
+        """Async :meth:`_call_api` through ``AsyncOpenAI`` and ``rate_limiter``."""
+        request, cache_key = self._build_request(
+            image, context, prompt_override, sections, response_schema
+        )
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+        if self.rate_limiter is None:
+            self.rate_limiter = RateLimiter()
+        client = self.async_client
+        _t0 = time.perf_counter()
+        response = await self.rate_limiter.call(lambda: client.chat.completions.create(**request))
+        text = self._completion_text(response, int((time.perf_counter() - _t0) * 1e9))
+        self._store_response(cache_key, text)
+        return text
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """``AsyncOpenAI`` client, created on first use.
+
+        Its own retries are off: :class:`~.rate_limit.RateLimiter` retries
+        429s, so that all concurrent calls back off together, as well as
+        5xx responses, connection errors and timeouts.
+        """
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(
+                api_key=self._api_key, base_url=self._base_url, max_retries=0
+            )
+        return self._async_client
+
+    def _build_request(
+        self,
+        image: ImageData,
+        context: AnalysisContext,
+        prompt_override: Optional[str] = None,
+        sections: Optional[list[str]] = None,
+        response_schema: Optional[dict] = None,
+    ) -> tuple[dict[str, Any], Optional[str]]:
+        """Chat completion request for *image* and its response-cache key."""
+        system_prompt, prompt = self._prompts(context, prompt_override)
+        schema = self._response_schema(sections, response_schema)
+        cache_key = self._cache_key(
+            image.base64_data, system=system_prompt, prompt=prompt, max_tokens=self.max_tokens,
+            **({"schema": schema} if schema else {}),
+        )
+
+        request = {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {
+                    "role": "user",
+                    "content": [{"type": "text", "text": prompt}, _image_part(image)],
+                },
+            ],
+        }
+        if schema is not None:
+            request["response_format"] = _response_format(schema)
+        return request, cache_key
+
+    def _prompts(
+        self, context: AnalysisContext, prompt_override: Optional[str] = None
+    ) -> tuple[str, str]:
+        """System prompt and user prompt (with the description hint) for *context*."""
         from ..data.prompt_loader import PromptLoader
 
         lang = context.language or DEFAULT_METADATA_LANGUAGE
@@ -141,53 +420,242 @@ class OpenAIAnalyzer:
                 f"{context.description_text}\n"
             )
 
-        import time as _time
-        _t0 = _time.perf_counter()
-        response = self.client.chat.completions.create(
-            model=self.model,
-            max_tokens=self.max_tokens,
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        f"You are an image analysis assistant. IMPORTANT: Only the METADATA section and the description context (if present) are in {lang_name} ({lang}). "
-                        f"All instructions, technical fields, and ENHANCEMENT RECOMMENDATIONS must remain in English. "
-                        f"Every metadata description must be in {lang_name}, while all technical enhancement parameters and instructions must stay in English."
-                    ),
-                },
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:{image.mime_type};base64,{image.base64_data}",
-                            },
-                        },
-                    ],
-                },
-            ],
+        system_prompt = (
+            f"You are an image analysis assistant. IMPORTANT: Only the METADATA section and the description context (if present) are in {lang_name} ({lang}). "
+            f"All instructions, technical fields, and ENHANCEMENT RECOMMENDATIONS must remain in English. "
+            f"Every metadata description must be in {lang_name}, while all technical enhancement parameters and instructions must stay in English."
         )
-        _elapsed_ns = int((_time.perf_counter() - _t0) * 1e9)
-        text = response.choices[0].message.content
+        return system_prompt, prompt
+
+    def _completion_text(self, response: Any, elapsed_ns: int) -> str:
+        """Text of a non-streamed completion; records ``_last_call_stats``."""
         usage = response.usage
         self._last_call_stats = {
             "prompt_tokens": usage.prompt_tokens if usage else None,
             "output_tokens": usage.completion_tokens if usage else None,
-            "eval_duration_ns": _elapsed_ns,
+            "eval_duration_ns": elapsed_ns,
         }
-        if os.environ.get("PA_ANALYZER_DEBUG"):
-            import sys
-            print("\n[DEBUG] Raw OpenAI response:\n", text, "\n", file=sys.stderr)
+        return response.choices[0].message.content
+
+    # ── Packed requests ──────────────────────────────────────────────
+
+    def analyze_sections_packed(
+        self,
+        images: list[ImageData],
+        context: AnalysisContext,
+        sections: list[str],
+    ) -> list[Optional[AnalysisResult]]:
+        """Analyze several images for *sections* with one request.
+
+        The section prompt goes out once, followed by ``packed.txt`` and
+        every image labelled with its index; the answer is split per
+        index (see :mod:`.packing`).  Output tokens scale with the
+        number of images: each gets ``DEFAULT_PACKED_TOKENS_PER_IMAGE``
+        (at most ``max_tokens``), within the model's output cap.  More
+        images than fit (:attr:`max_pack_size`) go out as several packs.
+
+        Returns:
+            One entry per image: its ``AnalysisResult``, or ``None`` when
+            the answer for that index is missing or incomplete, so the
+            caller can analyze that image on its own.
+        """
+        if self.offline_batch is not None:
+            return [None] * len(images)
+        if len(images) > self.max_pack_size:
+            return [
+                result
+                for start in range(0, len(images), self.max_pack_size)
+                for result in self.analyze_sections_packed(
+                    images[start:start + self.max_pack_size], context, sections
+                )
+            ]
+        from ..data.prompt_loader import PromptLoader
+
+        images = [attach_payload(image, self.payload_preparer)[0] for image in images]
+        loader = PromptLoader()
+        schema = loader.schema(sections)
+        request, cache_key = self._build_packed_request(images, context, sections, loader)
+        text = self._cached_response(cache_key)
+        if text is None:
+            _t0 = time.perf_counter()
+            response = self.client.chat.completions.create(**request)
+            text = self._completion_text(response, int((time.perf_counter() - _t0) * 1e9))
+            self._store_response(cache_key, text)
+            logger.info(
+                "Packed %d images into one %s request (%s→%s tok)",
+                len(images), self.model,
+                self._last_call_stats["prompt_tokens"], self._last_call_stats["output_tokens"],
+            )
+
+        answers = split_packed(text, len(images))
+        results: list[Optional[AnalysisResult]] = []
+        for index, image in enumerate(images):
+            raw_dict = answers.get(index)
+            if raw_dict is not None:
+                if schema is not None and find_missing(raw_dict, schema):
+                    raw_dict = None
+                else:
+                    raw_dict = self._normalise_response(raw_dict)
+            if raw_dict is None:
+                logger.warning("Packed answer for %s unusable — analyzing it separately", image.path.name)
+                results.append(None)
+            else:
+                results.append(self._to_analysis_result(raw_dict, image, context))
+        return results
+
+    @property
+    def max_pack_size(self) -> int:
+        """Most images one packed request can answer without truncation."""
+        return max(1, DEFAULT_MAX_OUTPUT_TOKENS // self._packed_tokens_per_image)
+
+    @property
+    def _packed_tokens_per_image(self) -> int:
+        return min(self.max_tokens, DEFAULT_PACKED_TOKENS_PER_IMAGE)
+
+    def _build_packed_request(
+        self,
+        images: list[ImageData],
+        context: AnalysisContext,
+        sections: list[str],
+        loader: Any,
+    ) -> tuple[dict[str, Any], Optional[str]]:
+        """Chat completion request sending all *images* and its response-cache key."""
+        lang = context.language or DEFAULT_METADATA_LANGUAGE
+        section_prompt = loader.combined(sections=sections, language=lang)
+        system_prompt, prompt = self._prompts(context, section_prompt)
+        prompt += "\n\n" + loader.load(
+            "packed", count=str(len(images)), last=str(len(images) - 1)
+        )
+        section_schema = self._response_schema(sections)
+        schema = packed_schema(section_schema) if section_schema is not None else None
+        max_tokens = min(self._packed_tokens_per_image * len(images), DEFAULT_MAX_OUTPUT_TOKENS)
+        cache_key = self._cache_key(
+            "\n".join(image.base64_data or "" for image in images),
+            system=system_prompt, prompt=prompt, max_tokens=max_tokens, packed=len(images),
+            **({"schema": schema} if schema else {}),
+        )
+
+        content: list[dict[str, Any]] = [{"type": "text", "text": prompt}]
+        for index, image in enumerate(images):
+            content += [{"type": "text", "text": f"Image {index}:"}, _image_part(image)]
+        request = {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": content},
+            ],
+        }
+        if schema is not None:
+            request["response_format"] = _response_format(schema)
+        return request, cache_key
+
+    # ── Streaming ────────────────────────────────────────────────────
+
+    def _stream_completion(self, request: dict[str, Any], monitor: StreamMonitor) -> str:
+        """Stream a chat completion through *monitor*; return the usable text."""
+        stream = self.client.chat.completions.create(
+            **request, stream=True, stream_options={"include_usage": True}
+        )
+        usage = None
+        drain = DRAIN_CHUNKS
+        try:
+            for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                    break
+                if not chunk.choices:
+                    continue
+                if monitor.stop_reason == STOP_COMPLETE:
+                    drain -= 1  # only whitespace can follow; wait briefly for usage
+                    if not drain:
+                        break
+                elif monitor.feed(chunk.choices[0].delta.content or ""):
+                    if monitor.stop_reason != STOP_COMPLETE:
+                        break
+                else:
+                    self._last_call_stats = self._live_stats(monitor)
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()  # drops the connection, so the server stops generating
+        self._last_call_stats = {
+            "prompt_tokens": usage.prompt_tokens if usage else None,
+            "output_tokens": usage.completion_tokens if usage else monitor.chunks,
+            "eval_duration_ns": monitor.elapsed_ns,
+        }
+        return self._finish_stream(monitor)
+
+    @staticmethod
+    def _live_stats(monitor: StreamMonitor) -> dict[str, Any]:
+        """``_last_call_stats`` while a streamed call is still running."""
+        return {
+            "prompt_tokens": None,
+            "output_tokens": monitor.chunks,
+            "eval_duration_ns": monitor.elapsed_ns,
+            "streaming": True,
+        }
+
+    def _finish_stream(self, monitor: StreamMonitor) -> str:
+        reason = monitor.stop_reason
+        if reason is not None and reason != STOP_COMPLETE:
+            logger.warning(
+                "%s response stopped early (%s) after %d chars — salvaging partial JSON",
+                self.model, reason, len(monitor.text),
+            )
+            self._last_call_stats["stopped"] = reason
+        return monitor.salvage()
+
+    # ── Response cache ───────────────────────────────────────────────
+
+    def _cache_key(self, payload: Optional[str], **request: Any) -> Optional[str]:
+        """Key for a request sending *payload* (``None`` = do not cache)."""
+        if self.response_cache is None or not payload:
+            return None
+        return self.response_cache.key(
+            image=payload, provider=self._provider, model=self.model, **request
+        )
+
+    def _cached_response(self, key: Optional[str]) -> Optional[str]:
+        """Return a cached response for *key* and mark the call as cached."""
+        if key is None:
+            return None
+        text = self.response_cache.get(key)
+        if text is not None:
+            logger.debug("Response cache hit (%s)", key[:12])
+            self._last_call_stats = {"cached": True}
         return text
 
-    def _parse_json(self, response: str, sections: list[str] | None = None) -> dict[str, Any]:
-        """Extract JSON from the AI response text."""
+    def _store_response(self, key: Optional[str], text: str) -> None:
+        if self._last_call_stats.get("stopped"):
+            return  # salvaged runaway output: let the next run try again
+        if key is not None and text:
+            self.response_cache.put(key, text, model=self.model)
+
+    def _parse_json(
+        self, response: str, sections: list[str] | None = None, normalise: bool = True
+    ) -> dict[str, Any]:
+        """Extract JSON from the AI response text.
+
+        With ``normalise=False`` the object is returned as the model sent
+        it, so :meth:`_reask_missing` sees real gaps rather than the
+        defaults :meth:`_normalise_response` fills in; :meth:`_normalised`
+        finishes it afterwards.
+        """
         # Strip DeepSeek-R1 style <think>...</think> reasoning blocks before parsing
         import re as _re
         response = _re.sub(r"<think>.*?</think>", "", response, flags=_re.DOTALL).strip()
 
+        # Fast path: schema-constrained output is already a bare JSON object
+        if response.startswith("{"):
+            try:
+                data = json.loads(response)
+            except json.JSONDecodeError:
+                pass
+            else:
+                if isinstance(data, dict):
+                    return self._normalised(data, sections) if normalise else data
+
         json_str = None
 
         # Try ```json code fence first
@@ -215,18 +683,14 @@ class OpenAIAnalyzer:
             try:
                 data = json.loads(cleaned)
                 if isinstance(data, dict):
-                    normalised = self._normalise_response(data)
-                    self._validate_response(normalised, sections)
-                    return normalised
+                    return self._normalised(data, sections) if normalise else data
             except json.JSONDecodeError:
                 pass
             # Try original (unmodified) string as fallback
             try:
                 data = json.loads(json_str)
                 if isinstance(data, dict):
-                    normalised = self._normalise_response(data)
-                    self._validate_response(normalised, sections)
-                    return normalised
+                    return self._normalised(data, sections) if normalise else data
             except json.JSONDecodeError:
                 pass
 
@@ -234,6 +698,14 @@ class OpenAIAnalyzer:
         logger.warning("LLM response could not be parsed as JSON — returning raw text fallback")
         return {"raw_response": response}
 
+    def _normalised(self, data: dict[str, Any], sections: list[str] | None = None) -> dict[str, Any]:
+        """Normalise and validate a dict from ``_parse_json(normalise=False)``."""
+        if data.keys() == {"raw_response"}:
+            return data  # unparseable response, kept as text
+        normalised = self._normalise_response(data)
+        self._validate_response(normalised, sections)
+        return normalised
+
     # Sections that are expected to populate all 11 metadata fields
     _METADATA_SECTIONS = frozenset({"metadata", "metadata_part1", "metadata_part2"})
     # Fields expected per metadata section (part1=fields 1-6, part2=fields 7-11)
@@ -624,6 +1096,32 @@ _CONFIDENCE_WORDS: dict[str, int] = {
 }
 
 
+def _image_part(image: ImageData) -> dict[str, Any]:
+    """Message content part carrying *image* as a data URL."""
+    return {
+        "type": "image_url",
+        "image_url": {"url": f"data:{image.mime_type};base64,{image.base64_data}"},
+    }
+
+
+def _response_format(schema: dict) -> dict[str, Any]:
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": "picture_analysis", "strict": True, "schema": schema},
+    }
+
+
+def _combine_stats(first: dict, second: dict, reasked: int) -> dict:
+    """Call stats of a response plus its re-ask, for the progress line."""
+    combined: dict[str, Any] = {"reasked": reasked}
+    for key in ("prompt_tokens", "output_tokens", "eval_duration_ns"):
+        values = [s.get(key) for s in (first, second) if s.get(key) is not None]
+        combined[key] = sum(values) if values else None
+    if first.get("stopped"):
+        combined["stopped"] = first["stopped"]
+    return combined
+
+
 def _parse_confidence(value: Any) -> int:
     """Convert any confidence representation to a 0-100 int.
 
@@ -0,0 +1,378 @@
+"""Send the pipeline's OpenAI requests through the Batch API.
+
+For archive backfills latency does not matter, but cost and throughput
+do.  The Batch API answers within 24 hours, at half the price, with its
+own and much higher rate limits.  ``analyze --batch --submit-offline``
+runs over the images twice:
+
+  1. **submit**: the stepped pipeline runs with an :class:`OfflineBatch`
+     attached to every OpenAI analyzer.  Each call records its chat
+     completion request as one JSONL line (``custom_id`` = image name and
+     prompt sections) and returns an empty answer.  The request file is
+     uploaded and a batch is created.
+  2. **collect**: once the batch has completed, its output is downloaded
+     and the pipeline runs again.  This time each call is answered from
+     the output by ``custom_id`` and goes through the usual parsing and
+     ``_to_analysis_result``, so the normal ``*_analyzed.json`` and EXIF
+     outputs are written.
+
+Slide profiles are not known at submit time.  Enhancement requests
+therefore never carry the slide-profile hint, and missing fields are not
+re-asked.
+
+:class:`OfflineBatchRunner` keeps the batch ids in a state file, so an
+interrupted run resumes waiting instead of submitting again.  It talks
+to a backend: :class:`OpenAIBatchBackend` for the real API, or
+:class:`FileBatchBackend`, a local directory stand-in with the same
+file formats.
+"""
+from __future__ import annotations
+
+import itertools
+import json
+import logging
+import shutil
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional, Protocol
+
+from ..config.defaults import (
+    DEFAULT_OPENAI_BATCH_COMPLETION_WINDOW,
+    DEFAULT_OPENAI_BATCH_POLL_SECONDS,
+)
+from ..core.exceptions import AnalysisError
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# Batch API input limits per file (50,000 requests, 200 MB); stay a little below.
+MAX_REQUESTS_PER_FILE = 50_000
+MAX_BYTES_PER_FILE = 190 * 1024 * 1024
+
+_TERMINAL = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+def custom_id(image_path: Any, sections: Optional[list[str]]) -> str:
+    """Request id for one analyzer call: image file name + prompt sections."""
+    return f"{Path(str(image_path)).name}#{'+'.join(sections) if sections else 'all'}"
+
+
+class OfflineBatch:
+    """Records requests (submit) or answers them from batch output (collect).
+
+    Attached to an :class:`~.openai.OpenAIAnalyzer` as ``offline_batch``;
+    the analyzer hands every request to :meth:`exchange` instead of
+    calling the API.
+
+    Args:
+        results: Response text per ``custom_id``.  ``None`` = submit
+            mode, requests are recorded.
+    """
+
+    def __init__(self, results: Optional[dict[str, str]] = None):
+        self.results = results
+        self.requests: list[dict[str, Any]] = []
+        self._ids: set[str] = set()
+        self._lock = threading.Lock()  # pipeline steps may run in parallel
+
+    @property
+    def collecting(self) -> bool:
+        return self.results is not None
+
+    def exchange(self, request_id: str, body: dict[str, Any]) -> str:
+        """Record *body* (submit) or return its batch answer (collect)."""
+        if self.results is None:
+            with self._lock:
+                if request_id not in self._ids:
+                    self._ids.add(request_id)
+                    self.requests.append({
+                        "custom_id": request_id,
+                        "method": "POST",
+                        "url": BATCH_ENDPOINT,
+                        "body": body,
+                    })
+            return "{}"
+        try:
+            return self.results[request_id]
+        except KeyError:
+            raise AnalysisError(f"No batch result for {request_id}") from None
+
+    def write_requests(self, path: Path) -> list[Path]:
+        """Write the recorded requests as JSONL, split to fit the API limits."""
+        files: list[Path] = []
+        lines: list[str] = []
+        size = 0
+
+        def flush() -> None:
+            nonlocal lines, size
+            if not lines:
+                return
+            target = path if not files else path.with_name(f"{path.stem}.{len(files)}{path.suffix}")
+            target.write_text("".join(lines), encoding="utf-8")
+            files.append(target)
+            lines, size = [], 0
+
+        for request in self.requests:
+            line = json.dumps(request, ensure_ascii=False) + "\n"
+            length = len(line.encode("utf-8"))
+            if lines and (len(lines) >= MAX_REQUESTS_PER_FILE or size + length > MAX_BYTES_PER_FILE):
+                flush()
+            lines.append(line)
+            size += length
+        flush()
+        return files
+
+
+def parse_output(text: str) -> tuple[dict[str, str], dict[str, str]]:
+    """Split a batch output/error file into answers and errors per ``custom_id``."""
+    results: dict[str, str] = {}
+    errors: dict[str, str] = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        request_id = entry.get("custom_id", "")
+        response = entry.get("response") or {}
+        body = response.get("body") or {}
+        if entry.get("error") or response.get("status_code", 200) != 200:
+            error = entry.get("error") or body.get("error") or {}
+            errors[request_id] = error.get("message", str(error)) if isinstance(error, dict) else str(error)
+            continue
+        try:
+            results[request_id] = body["choices"][0]["message"]["content"] or ""
+        except (KeyError, IndexError, TypeError):
+            errors[request_id] = "malformed batch response"
+    return results, errors
+
+
+# ── Backends ─────────────────────────────────────────────────────────
+
+
+@dataclass
+class BatchStatus:
+    """Snapshot of one batch."""
+
+    id: str
+    status: str
+    output_file_id: Optional[str] = None
+    error_file_id: Optional[str] = None
+    completed: int = 0
+    failed: int = 0
+    total: int = 0
+
+    @property
+    def done(self) -> bool:
+        return self.status in _TERMINAL
+
+
+class BatchBackend(Protocol):
+    def upload(self, path: Path) -> str: ...
+    def create(self, input_file_id: str) -> str: ...
+    def retrieve(self, batch_id: str) -> BatchStatus: ...
+    def download(self, file_id: str) -> str: ...
+
+
+class OpenAIBatchBackend:
+    """Files and batches endpoints of the OpenAI API."""
+
+    def __init__(self, client: Any, completion_window: str = DEFAULT_OPENAI_BATCH_COMPLETION_WINDOW):
+        self.client = client
+        self.completion_window = completion_window
+
+    def upload(self, path: Path) -> str:
+        with path.open("rb") as fh:
+            return self.client.files.create(file=fh, purpose="batch").id
+
+    def create(self, input_file_id: str) -> str:
+        return self.client.batches.create(
+            input_file_id=input_file_id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=self.completion_window,
+        ).id
+
+    def retrieve(self, batch_id: str) -> BatchStatus:
+        batch = self.client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        return BatchStatus(
+            id=batch.id,
+            status=batch.status,
+            output_file_id=batch.output_file_id,
+            error_file_id=batch.error_file_id,
+            completed=counts.completed if counts else 0,
+            failed=counts.failed if counts else 0,
+            total=counts.total if counts else 0,
+        )
+
+    def download(self, file_id: str) -> str:
+        return self.client.files.content(file_id).text
+
+
+class FileBatchBackend:
+    """Local stand-in for the Batch API, keeping files in *root*.
+
+    Batches stay ``in_progress`` until they are answered, either by
+    *responder* (request body → chat completion dict, run on the next
+    :meth:`retrieve`) or by an ``<batch_id>.output.jsonl`` file dropped
+    into ``root/batches``.  Output files use the Batch API format.
+    """
+
+    def __init__(self, root: Path, responder: Optional[Callable[[dict], dict]] = None):
+        self.root = Path(root)
+        self.responder = responder
+        (self.root / "files").mkdir(parents=True, exist_ok=True)
+        (self.root / "batches").mkdir(parents=True, exist_ok=True)
+        self._ids = itertools.count(1)
+
+    def upload(self, path: Path) -> str:
+        file_id = self._new_id("file", self.root / "files", ".jsonl")
+        shutil.copyfile(path, self.root / "files" / f"{file_id}.jsonl")
+        return file_id
+
+    def create(self, input_file_id: str) -> str:
+        batch_id = self._new_id("batch", self.root / "batches", ".json")
+        self._save(BatchStatus(batch_id, "in_progress"), input_file_id)
+        return batch_id
+
+    def retrieve(self, batch_id: str) -> BatchStatus:
+        record = json.loads(self._batch_path(batch_id).read_text(encoding="utf-8"))
+        status = BatchStatus(**record["status"])
+        if status.done:
+            return status
+        dropped = self.root / "batches" / f"{batch_id}.output.jsonl"
+        if dropped.exists():
+            output = dropped.read_text(encoding="utf-8")
+        elif self.responder is not None:
+            output = self._respond(record["input_file_id"])
+        else:
+            return status
+        results, errors = parse_output(output)
+        status.output_file_id = self._new_id("file", self.root / "files", ".jsonl")
+        (self.root / "files" / f"{status.output_file_id}.jsonl").write_text(output, encoding="utf-8")
+        status.status = "completed"
+        status.completed, status.failed = len(results), len(errors)
+        status.total = status.completed + status.failed
+        self._save(status, record["input_file_id"])
+        return status
+
+    def download(self, file_id: str) -> str:
+        return (self.root / "files" / f"{file_id}.jsonl").read_text(encoding="utf-8")
+
+    def _respond(self, input_file_id: str) -> str:
+        lines = []
+        for line in self.download(input_file_id).splitlines():
+            request = json.loads(line)
+            lines.append(json.dumps({
+                "id": f"req-{request['custom_id']}",
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "body": self.responder(request["body"])},
+                "error": None,
+            }))
+        return "\n".join(lines) + "\n"
+
+    def _new_id(self, prefix: str, directory: Path, suffix: str) -> str:
+        while True:
+            candidate = f"{prefix}-{next(self._ids)}"
+            if not (directory / f"{candidate}{suffix}").exists():
+                return candidate
+
+    def _batch_path(self, batch_id: str) -> Path:
+        return self.root / "batches" / f"{batch_id}.json"
+
+    def _save(self, status: BatchStatus, input_file_id: str) -> None:
+        record = {"status": status.__dict__, "input_file_id": input_file_id}
+        self._batch_path(status.id).write_text(json.dumps(record), encoding="utf-8")
+
+
+# ── Submit / collect ─────────────────────────────────────────────────
+
+
+@dataclass
+class OfflineBatchRunner:
+    """Submit recorded requests, wait for the batches and gather the answers.
+
+    Args:
+        backend: Where batches run (:class:`OpenAIBatchBackend` or
+            :class:`FileBatchBackend`).
+        state_path: JSON file holding the pending batch ids.
+        poll_interval: Seconds between status checks.
+        sleep: Sleep function (injectable for tests).
+        echo: Progress output.
+    """
+
+    backend: BatchBackend
+    state_path: Path
+    poll_interval: float = DEFAULT_OPENAI_BATCH_POLL_SECONDS
+    sleep: Callable[[float], Any] = time.sleep
+    echo: Callable[[str], Any] = logger.info
+    errors: dict[str, str] = field(default_factory=dict)
+
+    def pending(self) -> list[str]:
+        """Batch ids submitted by an earlier, unfinished run."""
+        if not self.state_path.exists():
+            return []
+        return json.loads(self.state_path.read_text(encoding="utf-8")).get("batch_ids", [])
+
+    def submit(self, batch: OfflineBatch, requests_path: Path) -> list[str]:
+        """Upload *batch*'s requests and create one batch per request file."""
+        batch_ids = []
+        for path in batch.write_requests(requests_path):
+            batch_ids.append(self.backend.create(self.backend.upload(path)))
+        self.state_path.write_text(
+            json.dumps({"batch_ids": batch_ids, "requests": len(batch.requests)}), encoding="utf-8"
+        )
+        self.echo(f"Submitted {len(batch.requests)} request(s) as batch {', '.join(batch_ids)}")
+        return batch_ids
+
+    def collect(self, batch_ids: list[str]) -> OfflineBatch:
+        """Wait for *batch_ids* and return an :class:`OfflineBatch` answering from them.
+
+        Raises:
+            AnalysisError: A batch ended without completing.
+        """
+        results: dict[str, str] = {}
+        for batch_id in batch_ids:
+            status = self._wait(batch_id)
+            if status.status != "completed":
+                raise AnalysisError(f"OpenAI batch {batch_id} ended as '{status.status}'")
+            if status.output_file_id:
+                answers, errors = parse_output(self.backend.download(status.output_file_id))
+                results.update(answers)
+                self.errors.update(errors)
+            if status.error_file_id:
+                self.errors.update(parse_output(self.backend.download(status.error_file_id))[1])
+        if self.errors:
+            self.echo(f"{len(self.errors)} batch request(s) failed")
+        return OfflineBatch(results)
+
+    def clear(self) -> None:
+        """Forget the pending batches once their results have been written."""
+        self.state_path.unlink(missing_ok=True)
+
+    def _wait(self, batch_id: str) -> BatchStatus:
+        while True:
+            status = self.backend.retrieve(batch_id)
+            if status.done:
+                return status
+            self.echo(f"Batch {batch_id}: {status.status} ({status.completed}/{status.total} done)")
+            self.sleep(self.poll_interval)
+
+
+def attach_offline_batch(analyzers: list[tuple[str, Any]], batch: Optional[OfflineBatch]) -> list[str]:
+    """Set ``offline_batch`` on the OpenAI analyzers; return their step names.
+
+    *analyzers* are ``(step name, analyzer)`` pairs as returned by
+    :meth:`~picture_analyzer.pipeline.AnalysisPipeline.analyzers`.
+    Ollama analyzers are left alone: they run live in both passes.
+    """
+    names: list[str] = []
+    for name, analyzer in analyzers:
+        if getattr(analyzer, "_provider", None) != "openai":
+            continue
+        analyzer.offline_batch = batch
+        if name not in names:
+            names.append(name)
+    return names
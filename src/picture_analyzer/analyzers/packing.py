@@ -0,0 +1,89 @@
+"""Several images in one request: the packed-prompt helpers.
+
+Each metadata call re-sends the full section prompt for a single image.
+Vision models accept several images per message, so the analyzer can
+send K images with that prompt once, followed by ``packed.txt``, and
+ask for one answer per image::
+
+    {"images": [{"index": 0, "metadata": {...}}, {"index": 1, ...}]}
+
+:func:`packed_schema` wraps a section schema into that shape for
+structured output; :func:`split_packed` parses a response back into
+one answer per index.  An index that is absent, duplicated or not an
+object is left out, and the caller analyses that image on its own.
+"""
+from __future__ import annotations
+
+import copy
+import json
+import re
+from typing import Any
+
+_THINK = re.compile(r"<think>.*?</think>", re.DOTALL)
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+
+def packed_schema(schema: dict[str, Any]) -> dict[str, Any]:
+    """*schema* for one image, wrapped into ``{"images": [{"index": …, …}]}``."""
+    item = copy.deepcopy(schema)
+    item["properties"] = {"index": {"type": "integer"}, **item["properties"]}
+    item["required"] = ["index", *item["required"]]
+    return {
+        "type": "object",
+        "properties": {"images": {"type": "array", "items": item}},
+        "required": ["images"],
+        "additionalProperties": False,
+    }
+
+
+def _load(text: str) -> Any:
+    text = _THINK.sub("", text).strip()
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1).strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    # Prose around the JSON: take the outermost object or array
+    starts = [pos for pos in (text.find("{"), text.find("[")) if pos != -1]
+    if not starts:
+        return None
+    start = min(starts)
+    end = text.rfind("}" if text[start] == "{" else "]") + 1
+    try:
+        return json.loads(text[start:end])
+    except json.JSONDecodeError:
+        return None
+
+
+def split_packed(text: str, count: int) -> dict[int, dict[str, Any]]:
+    """Per-index answers (without ``"index"``) from a packed response.
+
+    Accepts ``{"images": [...]}`` or a bare array.  Entries with an
+    index outside ``0..count-1``, or an index given more than once,
+    are dropped.
+    """
+    data = _load(text)
+    if isinstance(data, dict):
+        data = data.get("images")
+    if not isinstance(data, list):
+        return {}
+    answers: dict[int, dict[str, Any]] = {}
+    duplicates: set[int] = set()
+    for entry in data:
+        if not isinstance(entry, dict):
+            continue
+        entry = dict(entry)
+        try:
+            index = int(entry.pop("index"))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if not 0 <= index < count:
+            continue
+        if index in answers:
+            duplicates.add(index)
+        answers[index] = entry
+    for index in duplicates:
+        del answers[index]  # which answer belongs to the image is unclear
+    return answers
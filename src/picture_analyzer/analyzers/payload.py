@@ -0,0 +1,257 @@
+"""Image payload shared by every model call for one image.
+
+Vision models receive the image as base64 text.  Encoding a
+multi-megabyte scan costs a full file read plus roughly 1.3× its size
+in memory, so it should happen once per image, not once per prompt.
+
+Models also downscale internally, so sending a 30 MB scan only adds
+upload, serialisation and prompt-eval time.  :class:`PayloadPreparer`
+turns the source file into a model-sized payload first: EXIF
+orientation applied, long edge capped, re-encoded in a fixed format
+and quality.  Results are cached on disk per (file hash, settings), so
+re-analysing an image skips the decode and resize; like the response
+cache, the payload cache is bounded and evicts least recently used
+files.
+
+``AnalysisPipeline.run`` calls :func:`attach_payload` before the first
+step and passes the resulting ``ImageData`` to every step; analyzers
+only encode when they receive an image without ``base64_data``.
+
+Ownership: whoever attaches the payload releases it
+(:func:`release_payload`) when the image is done.  An ``ImageData``
+that already arrives with ``base64_data`` belongs to the caller and is
+left untouched.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import logging
+import os
+import threading
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from ..config.defaults import (
+    DEFAULT_PAYLOAD_CACHE_DIR,
+    DEFAULT_PAYLOAD_CACHE_MAX_MB,
+    DEFAULT_PAYLOAD_FORMAT,
+    DEFAULT_PAYLOAD_MAX_LONG_EDGE,
+    DEFAULT_PAYLOAD_QUALITY,
+)
+from ..core.models import ImageData
+from .cache import disk_entries, evict_lru
+
+try:
+    from pillow_heif import register_heif_opener
+
+    register_heif_opener()
+    HAS_HEIF = True
+except ImportError:  # pragma: no cover - optional dependency
+    HAS_HEIF = False
+
+logger = logging.getLogger(__name__)
+
+# PIL format name and MIME type per payload format.
+_FORMATS = {
+    "jpeg": ("JPEG", "image/jpeg"),
+    "png": ("PNG", "image/png"),
+    "webp": ("WEBP", "image/webp"),
+}
+_EXIF_ORIENTATION = 0x0112
+_HASH_CHUNK = 1 << 20
+
+
+def encode_file(path: str | Path) -> str:
+    """Base64-encode an image file."""
+    with open(path, "rb") as f:
+        return base64.b64encode(f.read()).decode("utf-8")
+
+
+def file_hash(path: str | Path) -> str:
+    """SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PayloadPreparer:
+    """Downscale and re-encode images before they are sent to a model.
+
+    Usage::
+
+        preparer = PayloadPreparer(max_long_edge=1536)
+        image = preparer.prepare(ImageData(path=p, mime_type="image/jpeg"))
+
+    Files that already match (target format, within *max_long_edge*, no
+    EXIF rotation) are sent as-is.  Files PIL cannot decode (e.g. HEIC
+    without ``pillow-heif``) are sent as-is with a warning.
+
+    Args:
+        max_long_edge: Cap for the longer side in pixels (``0`` = keep size).
+        format: ``"jpeg"``, ``"png"`` or ``"webp"``.
+        quality: Encoder quality for JPEG and WebP.
+        cache_dir: Directory for prepared payloads (``None`` = no cache).
+        cache_max_mb: Size bound of the cache; least recently used
+            payloads are evicted beyond it.
+    """
+
+    def __init__(
+        self,
+        max_long_edge: int = DEFAULT_PAYLOAD_MAX_LONG_EDGE,
+        format: str = DEFAULT_PAYLOAD_FORMAT,
+        quality: int = DEFAULT_PAYLOAD_QUALITY,
+        cache_dir: str | Path | None = DEFAULT_PAYLOAD_CACHE_DIR,
+        cache_max_mb: float = DEFAULT_PAYLOAD_CACHE_MAX_MB,
+    ):
+        if format not in _FORMATS:
+            raise ValueError(f"Unsupported payload format: {format}")
+        self.max_long_edge = max_long_edge
+        self.format = format
+        self.quality = quality
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+        self.cache_max_bytes = int(cache_max_mb * 1024 * 1024)
+        self._cache_size: int | None = None  # total bytes on disk, computed lazily
+        self._lock = threading.Lock()  # prefetch threads may share one preparer
+
+    @classmethod
+    def from_settings(cls, settings) -> PayloadPreparer | None:
+        """Build from ``settings.payload``; ``None`` when preparation is off."""
+        cfg = settings.payload
+        if not cfg.enabled:
+            return None
+        return cls(
+            max_long_edge=cfg.max_long_edge,
+            format=cfg.format,
+            quality=cfg.quality,
+            cache_dir=cfg.cache_dir if cfg.cache_enabled else None,
+            cache_max_mb=cfg.cache_max_mb,
+        )
+
+    @property
+    def settings_tag(self) -> str:
+        """Short string identifying the settings, part of every cache key."""
+        return f"{self.max_long_edge}-{self.format}-q{self.quality}"
+
+    def cache_path(self, digest: str) -> Path | None:
+        """Cache file for a source with content hash *digest*."""
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{digest}-{self.settings_tag}.{self.format}"
+
+    def prepare(self, image: ImageData) -> ImageData:
+        """Return a copy of *image* carrying the prepared payload."""
+        cached = self.cache_path(file_hash(image.path)) if self.cache_dir else None
+        if cached is not None and cached.is_file():
+            data = cached.read_bytes()
+            logger.debug("Payload cache hit for %s", image.path)
+            try:
+                os.utime(cached)  # mark as recently used
+            except OSError:
+                pass
+            return self._with_data(image, data)
+
+        data = self._render(Path(image.path))
+        if data is None:
+            # Undecodable or already model-sized: send the original bytes.
+            return image.model_copy(update={"base64_data": encode_file(image.path)})
+        if cached is not None:
+            self._store(cached, data)
+        return self._with_data(image, data)
+
+    def _store(self, cached: Path, data: bytes) -> None:
+        """Write *data* to the cache, then evict down to the size bound."""
+        with self._lock:
+            try:
+                cached.parent.mkdir(parents=True, exist_ok=True)
+                previous = cached.stat().st_size if cached.exists() else 0
+                tmp = cached.with_suffix(cached.suffix + ".tmp")
+                tmp.write_bytes(data)
+                tmp.replace(cached)
+            except OSError as exc:
+                logger.warning("Could not write payload cache %s: %s", cached, exc)
+                return
+            if self._cache_size is None:
+                self._cache_size = sum(size for _, _, size in self._cache_entries())
+            else:
+                self._cache_size += len(data) - previous
+            if self._cache_size > self.cache_max_bytes:
+                self._cache_size, evicted = evict_lru(self._cache_entries(), self.cache_max_bytes)
+                logger.debug("Evicted %d payload(s) from %s", evicted, self.cache_dir)
+
+    def _cache_entries(self) -> list[tuple[Path, float, int]]:
+        return [e for e in disk_entries(self.cache_dir, "*") if e[0].suffix != ".tmp"]
+
+    def _render(self, path: Path) -> bytes | None:
+        """Encode the prepared payload, or ``None`` to send the file as-is.
+
+        Source files that are already in the target format, within the
+        size cap and upright need no work and are not cached.
+        """
+        pil_format, _ = _FORMATS[self.format]
+        try:
+            source = Image.open(path)
+        except Exception as exc:
+            logger.warning("Cannot decode %s for payload preparation (%s); sending original", path, exc)
+            return None
+        with source:
+            orientation = source.getexif().get(_EXIF_ORIENTATION, 1)
+            too_large = self.max_long_edge and max(source.size) > self.max_long_edge
+            if source.format == pil_format and not too_large and orientation == 1:
+                return None
+
+            bound = (self.max_long_edge, self.max_long_edge)
+            if too_large:
+                source.draft("RGB", bound)
+            picture = ImageOps.exif_transpose(source)
+            if too_large:
+                picture.thumbnail(bound, Image.Resampling.LANCZOS, reducing_gap=3.0)
+            if pil_format == "JPEG" and picture.mode != "RGB":
+                picture = picture.convert("RGB")
+
+            buffer = io.BytesIO()
+            options = {} if pil_format == "PNG" else {"quality": self.quality}
+            picture.save(buffer, pil_format, **options)
+            return buffer.getvalue()
+
+    def _with_data(self, image: ImageData, data: bytes) -> ImageData:
+        with Image.open(io.BytesIO(data)) as decoded:
+            width, height = decoded.size
+            mime_type = Image.MIME.get(decoded.format or "", image.mime_type)
+        return image.model_copy(
+            update={
+                "base64_data": base64.b64encode(data).decode("utf-8"),
+                "mime_type": mime_type,
+                "width": width,
+                "height": height,
+            }
+        )
+
+
+def attach_payload(
+    image: ImageData, preparer: PayloadPreparer | None = None
+) -> tuple[ImageData, bool]:
+    """Return *image* with ``base64_data`` filled in.
+
+    The file is prepared by *preparer* when given, otherwise encoded
+    byte-for-byte.
+
+    Returns:
+        ``(image, owned)`` — *owned* is ``True`` when a new copy carrying
+        a freshly encoded payload was made, and the caller should
+        :func:`release_payload` it once done.
+    """
+    if image.base64_data:
+        return image, False
+    if preparer is not None:
+        return preparer.prepare(image), True
+    return image.model_copy(update={"base64_data": encode_file(image.path)}), True
+
+
+def release_payload(image: ImageData) -> None:
+    """Drop the encoded payload of an owned ``ImageData`` copy."""
+    image.base64_data = None
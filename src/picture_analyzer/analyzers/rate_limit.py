@@ -0,0 +1,192 @@
+"""Bounded concurrency and 429 backoff for async API calls.
+
+The async OpenAI path keeps many requests in flight at once.  Without a
+limit, a large batch would open one request per image and hit the
+account's rate limit on the first few hundred.  ``RateLimiter`` wraps
+each call:
+
+  - at most ``max_concurrency`` calls run at the same time (an
+    :class:`asyncio.Semaphore`);
+  - a **429** response is retried after the server's ``Retry-After``
+    (or an exponential backoff with jitter when the header is missing),
+    up to ``max_retries`` times;
+  - while one call is backing off, **every** call waits for the same
+    deadline before it is sent.  Otherwise the other requests in flight
+    would keep hitting the limit the server just reported.
+
+The async client's own retries are off, so ``RateLimiter`` also retries
+what the SDK would have: **5xx** responses, dropped connections and
+timeouts.  Those back off only the failing call.  Anything else
+propagates unchanged.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+import openai
+
+from ..config.defaults import (
+    DEFAULT_OPENAI_MAX_CONCURRENCY,
+    DEFAULT_OPENAI_RATE_LIMIT_RETRIES,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Backoff without a Retry-After header: 1 s, 2 s, 4 s, … capped at 60 s.
+_BASE_DELAY = 1.0
+_MAX_DELAY = 60.0
+
+
+@dataclass
+class RateLimitStats:
+    """Counters for one :class:`RateLimiter`."""
+
+    requests: int = 0
+    rate_limited: int = 0
+    transient_errors: int = 0
+    backoff_seconds: float = 0.0
+    max_in_flight: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.requests} request(s), up to {self.max_in_flight} in flight, "
+            f"{self.rate_limited} rate-limited, {self.transient_errors} transient error(s) "
+            f"({self.backoff_seconds:.1f}s backoff)"
+        )
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Seconds the server asked us to wait, from ``Retry-After(-Ms)`` headers."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for name, scale in (("retry-after-ms", 1000.0), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) / scale)
+        except ValueError:
+            continue
+    return None
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    return isinstance(exc, openai.RateLimitError) or getattr(exc, "status_code", None) == 429
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """5xx response, dropped connection or timeout: worth another try."""
+    if isinstance(exc, openai.APIConnectionError):  # includes APITimeoutError
+        return True
+    return isinstance(exc, openai.APIStatusError) and exc.status_code >= 500
+
+
+class RateLimiter:
+    """Semaphore plus shared 429 backoff around async calls.
+
+    Usage::
+
+        limiter = RateLimiter(max_concurrency=16)
+        response = await limiter.call(lambda: client.chat.completions.create(**request))
+
+    Args:
+        max_concurrency: Calls allowed in flight at once.
+        max_retries: Retries of one call after 429 responses or
+            transient errors.
+        sleep: Async sleep (injectable for tests).
+        clock: Monotonic time source (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_OPENAI_MAX_CONCURRENCY,
+        max_retries: int = DEFAULT_OPENAI_RATE_LIMIT_RETRIES,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(0, max_retries)
+        self.stats = RateLimitStats()
+        self._sleep = sleep
+        self._clock = clock
+        self._in_flight = 0
+        self._paused_until = 0.0
+        # Semaphores belong to one event loop; a new loop gets a new one.
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> RateLimiter:
+        return cls(
+            max_concurrency=settings.openai.max_concurrency,
+            max_retries=settings.openai.rate_limit_retries,
+        )
+
+    async def call(self, send: Callable[[], Awaitable[T]]) -> T:
+        """Run ``await send()`` within the limits; retry it on 429 or transient errors."""
+        attempt = 0
+        async with self._slot():
+            while True:
+                await self._wait_for_pause()
+                self.stats.requests += 1
+                try:
+                    return await send()
+                except Exception as exc:
+                    rate_limited = is_rate_limit_error(exc)
+                    if not (rate_limited or is_transient_error(exc)) or attempt >= self.max_retries:
+                        raise
+                    delay = self._backoff(exc, attempt)
+                    attempt += 1
+                    self.stats.backoff_seconds += delay
+                    if rate_limited:
+                        self.stats.rate_limited += 1
+                        self._paused_until = max(self._paused_until, self._clock() + delay)
+                        logger.warning(
+                            "Rate limited (429); retry %d/%d in %.1fs",
+                            attempt, self.max_retries, delay,
+                        )
+                    else:
+                        self.stats.transient_errors += 1
+                        logger.warning(
+                            "%s; retry %d/%d in %.1fs",
+                            type(exc).__name__, attempt, self.max_retries, delay,
+                        )
+                        await self._sleep(delay)  # the server is not throttling: only this call waits
+
+    def _backoff(self, exc: BaseException, attempt: int) -> float:
+        delay = retry_after(exc)
+        if delay is None:
+            delay = min(_MAX_DELAY, _BASE_DELAY * 2 ** attempt)
+            delay *= random.uniform(0.5, 1.0)  # spread the retries of concurrent calls
+        return delay
+
+    async def _wait_for_pause(self) -> None:
+        while True:
+            remaining = self._paused_until - self._clock()
+            if remaining <= 0:
+                return
+            await self._sleep(remaining)
+
+    @asynccontextmanager
+    async def _slot(self) -> AsyncIterator[None]:
+        """Hold one of the ``max_concurrency`` slots."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        async with self._semaphore:
+            self._in_flight += 1
+            self.stats.max_in_flight = max(self.stats.max_in_flight, self._in_flight)
+            try:
+                yield
+            finally:
+                self._in_flight -= 1
@@ -0,0 +1,241 @@
+"""Keep Ollama models loaded for as long as they are being used.
+
+Batch runs used to call ``ollama stop <model>`` after every image, so
+each image paid for loading several GB of weights again and the
+configured ``keep_alive`` never took effect.
+
+``ResidencyManager`` tracks which models this process has loaded on
+which Ollama host:
+
+  - the first request for a model **warms** it (an empty ``generate``
+    call, timed separately from inference);
+  - later requests find it resident and go straight to inference;
+  - a model is **unloaded** (``keep_alive=0``) only when
+      * the server reports it is out of memory (the OOM
+        ``ResponseError`` path in :class:`~.ollama.OllamaAnalyzer`), in
+        which case every idle model on that host is unloaded too, or
+      * it has been idle for its ``keep_alive`` seconds.
+
+Loading or unloading a model is an HTTP call that can take many
+seconds.  It holds only a lock for that (host, model), so other models
+and other hosts of a multi-host pool load and serve in parallel; the
+manager-wide lock guards the bookkeeping alone.
+
+Load and unload events are logged with the time spent, and summarised
+in :attr:`ResidencyManager.stats`.  One manager is shared per process
+(:func:`get_residency_manager`) because residency is a property of the
+server, not of a single analyzer.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ResidencyStats:
+    """Load/unload counters for one :class:`ResidencyManager`."""
+
+    loads: int = 0
+    unloads: int = 0
+    load_seconds: float = 0.0
+    oom_unloads: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.loads} load(s) in {self.load_seconds:.1f}s, "
+            f"{self.unloads} unload(s) ({self.oom_unloads} on memory pressure)"
+        )
+
+
+@dataclass
+class _Resident:
+    client: Any
+    keep_alive: int
+    loaded_at: float
+    last_used: float
+    in_flight: int = 0
+
+
+class ResidencyManager:
+    """Load each Ollama model once and unload it on idle or memory pressure.
+
+    Usage::
+
+        manager = get_residency_manager()
+        manager.ensure_loaded(client, "llava", keep_alive=3600, host=host)
+        with manager.in_use("llava", host=host):
+            client.chat(model="llava", keep_alive=3600, ...)
+
+    A ``keep_alive`` of ``0`` means "unload after every call"; such
+    models are left to Ollama and not tracked.
+
+    Args:
+        clock: Monotonic time source (injectable for tests).
+        idle_timers: Schedule a background timer that unloads idle
+            models; without it :meth:`check_idle` must be called.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        idle_timers: bool = True,
+    ):
+        self.stats = ResidencyStats()
+        self._clock = clock
+        self._idle_timers = idle_timers
+        self._resident: dict[tuple[str, str], _Resident] = {}
+        self._lock = threading.RLock()  # bookkeeping only, never held across HTTP calls
+        self._model_locks: dict[tuple[str, str], threading.Lock] = {}
+        self._timer: threading.Timer | None = None
+
+    def is_resident(self, model: str, host: str = "") -> bool:
+        return (host, model) in self._resident
+
+    def ensure_loaded(self, client: Any, model: str, keep_alive: int, host: str = "") -> bool:
+        """Load *model* unless this process already did; True if it loaded."""
+        if keep_alive <= 0:
+            return False
+        key = (host, model)
+        if self.is_resident(model, host):
+            return False
+        with self._model_lock(key):
+            if self.is_resident(model, host):  # loaded while we waited
+                return False
+            start = self._clock()
+            client.generate(model=model, prompt="", keep_alive=keep_alive)
+            now = self._clock()
+            with self._lock:
+                self._resident[key] = _Resident(client, keep_alive, loaded_at=now, last_used=now)
+                self.stats.loads += 1
+                self.stats.load_seconds += now - start
+        logger.info("Loaded Ollama model %s%s in %.1fs", model, _on(host), now - start)
+        return True
+
+    @contextmanager
+    def in_use(self, model: str, host: str = "") -> Iterator[None]:
+        """Mark *model* busy for the duration of a request."""
+        key = (host, model)
+        with self._lock:
+            if key in self._resident:
+                self._resident[key].in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                resident = self._resident.get(key)
+                if resident is not None:
+                    resident.in_flight = max(0, resident.in_flight - 1)
+                    resident.last_used = self._clock()
+            self._schedule_idle_check()
+
+    def memory_pressure(self, model: str, host: str = "") -> None:
+        """Free memory on *host* after an OOM error for *model*.
+
+        Unloads *model* itself (the caller is about to retry and will
+        reload it) and every other idle model on the same host.
+        """
+        unloaded = self._unload_where(
+            lambda key, resident: key[0] == host and (key[1] == model or resident.in_flight == 0),
+            "memory pressure",
+        )
+        with self._lock:
+            self.stats.oom_unloads += unloaded
+
+    def check_idle(self) -> None:
+        """Unload models that have been idle for their ``keep_alive``."""
+        now = self._clock()
+        self._unload_where(
+            lambda _, resident: (
+                resident.in_flight == 0 and now - resident.last_used >= resident.keep_alive
+            ),
+            "idle",
+        )
+        self._schedule_idle_check()
+
+    def unload_all(self, reason: str = "shutdown") -> None:
+        self._unload_where(lambda *_: True, reason)
+
+    def close(self) -> None:
+        """Stop the idle timer; loaded models stay until their keep_alive."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _model_lock(self, key: tuple[str, str]) -> threading.Lock:
+        with self._lock:
+            return self._model_locks.setdefault(key, threading.Lock())
+
+    def _unload_where(
+        self, predicate: Callable[[tuple[str, str], _Resident], bool], reason: str
+    ) -> int:
+        """Unload every resident model matching *predicate*; return how many.
+
+        The predicate is checked again under the model's lock, since the
+        model may have been taken into use in the meantime.
+        """
+        with self._lock:
+            keys = [key for key, resident in self._resident.items() if predicate(key, resident)]
+        unloaded = 0
+        for key in keys:
+            with self._model_lock(key):
+                with self._lock:
+                    resident = self._resident.get(key)
+                    if resident is None or not predicate(key, resident):
+                        continue
+                    del self._resident[key]
+                self._unload(key, resident, reason)
+                unloaded += 1
+        return unloaded
+
+    def _unload(self, key: tuple[str, str], resident: _Resident, reason: str) -> None:
+        host, model = key
+        try:
+            resident.client.generate(model=model, prompt="", keep_alive=0)
+        except Exception as exc:
+            logger.warning("Could not unload Ollama model %s%s: %s", model, _on(host), exc)
+        with self._lock:
+            self.stats.unloads += 1
+        logger.info(
+            "Unloaded Ollama model %s%s (%s) after %.0fs resident",
+            model, _on(host), reason, self._clock() - resident.loaded_at,
+        )
+
+    def _schedule_idle_check(self) -> None:
+        if not self._idle_timers:
+            return
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            idle = [r for r in self._resident.values() if r.in_flight == 0]
+            if not idle:
+                return
+            now = self._clock()
+            delay = max(0.0, min(r.last_used + r.keep_alive - now for r in idle))
+            self._timer = threading.Timer(delay, self.check_idle)
+            self._timer.daemon = True
+            self._timer.start()
+
+
+def _on(host: str) -> str:
+    return f" on {host}" if host else ""
+
+
+_manager: ResidencyManager | None = None
+
+
+def get_residency_manager() -> ResidencyManager:
+    """Return the process-wide :class:`ResidencyManager`."""
+    global _manager
+    if _manager is None:
+        _manager = ResidencyManager()
+    return _manager
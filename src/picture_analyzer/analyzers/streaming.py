@@ -0,0 +1,299 @@
+"""Watch a streamed model response and stop it as soon as it is useless.
+
+Without streaming, a bad generation costs the full ``num_predict`` /
+``max_tokens`` budget: the model keeps decoding whitespace after the
+JSON object has closed, or repeats ``"badkamermeubel, badkamermeubel,
+…"`` until it runs out of tokens.  :class:`StreamMonitor` is fed the
+response chunk by chunk and tells the caller to stop when:
+
+  - **complete**: the top-level JSON object has closed; nothing after
+    it is ever parsed.  Only an object at the start of the answer, or
+    at the start of a code fence, counts: ``<think>…</think>`` reasoning
+    is skipped, and braces in other prose (an example object in a
+    preamble) are not mistaken for the answer;
+  - **repetition**: the tail of the output is one short unit repeated
+    over and over (a runaway loop);
+  - **length**: the output grew past ``max_chars`` (a blow-up).
+
+After a runaway or length stop, :meth:`StreamMonitor.salvage` trims the
+repeated tail and closes any open string, array and object.  The
+partial answer can then still be parsed, and the usual "missing fields"
+handling applies to whatever is absent.
+
+The monitor also keeps live counters (chunks ≈ tokens, elapsed time),
+so analyzers can update ``_last_call_stats`` while a call is in
+progress.
+"""
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from ..config.defaults import (
+    DEFAULT_STREAM_MAX_CHARS,
+    DEFAULT_STREAM_MIN_REPEAT_SPAN,
+)
+
+STOP_COMPLETE = "complete"
+STOP_REPETITION = "repetition"
+STOP_LENGTH = "length"
+
+# A runaway unit must repeat at least this often back to back.
+_MIN_REPEATS = 4
+# Longest repeated unit looked for, in characters.
+_MAX_PERIOD = 200
+# Re-check for repetition after this many new characters.
+_CHECK_EVERY = 32
+# After the JSON closes, read at most this many more chunks for the final
+# statistics chunk before dropping the stream.
+DRAIN_CHUNKS = 8
+
+_THINK_OPEN = "<think>"
+_THINK_CLOSE = "</think>"
+_FENCE = "```"
+
+
+@dataclass(frozen=True)
+class StreamLimits:
+    """Abort thresholds for streamed responses; one monitor per call."""
+
+    max_chars: int = DEFAULT_STREAM_MAX_CHARS
+    min_repeat_span: int = DEFAULT_STREAM_MIN_REPEAT_SPAN
+
+    @classmethod
+    def from_config(cls, cfg: Any) -> Optional[StreamLimits]:
+        """Build from a ``streaming`` settings block; ``None`` when disabled."""
+        if cfg is None or not cfg.enabled:
+            return None
+        return cls(max_chars=cfg.max_chars, min_repeat_span=cfg.min_repeat_span)
+
+    def monitor(self) -> StreamMonitor:
+        return StreamMonitor(max_chars=self.max_chars, min_repeat_span=self.min_repeat_span)
+
+
+class StreamMonitor:
+    """Incremental JSON-completion, runaway and length detector.
+
+    Usage::
+
+        monitor = StreamMonitor()
+        for chunk in stream:
+            if monitor.feed(chunk_text):
+                break            # monitor.stop_reason says why
+        text = monitor.salvage()
+
+    Args:
+        max_chars: Stop once the response is longer than this.
+        min_repeat_span: Characters a repeated unit must cover before it
+            counts as a runaway loop.
+    """
+
+    def __init__(
+        self,
+        max_chars: int = DEFAULT_STREAM_MAX_CHARS,
+        min_repeat_span: int = DEFAULT_STREAM_MIN_REPEAT_SPAN,
+    ):
+        self.max_chars = max_chars
+        self.min_repeat_span = min_repeat_span
+        self.stop_reason: Optional[str] = None
+        self.chunks = 0
+        self._parts: list[str] = []
+        self._length = 0
+        self._started_at = time.perf_counter()
+        self._checked_at = 0
+        self._runaway_start: Optional[int] = None
+        # Where the answer starts: "lead" (only whitespace so far),
+        # "think", "prose", "fence" (rest of the ``` line) or "body"
+        # (only whitespace since the fence)
+        self._preamble = "lead"
+        self._preamble_pos = 0
+        self._json_start: Optional[int] = None
+        # Incremental JSON scanner state
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._complete_at: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    @property
+    def elapsed_ns(self) -> int:
+        return int((time.perf_counter() - self._started_at) * 1e9)
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Add *chunk*; return the stop reason once generation should stop."""
+        if self.stop_reason is not None:
+            return self.stop_reason
+        self.chunks += 1
+        if not chunk:
+            return None
+        offset = self._length
+        self._parts.append(chunk)
+        self._length += len(chunk)
+
+        if self._json_start is None:
+            self._json_start = self._find_start()
+            if self._json_start is None:
+                chunk = ""
+            else:
+                offset = self._json_start
+                chunk = self.text[offset:]
+        for i, ch in enumerate(chunk):
+            if self._scan(ch):
+                self._complete_at = offset + i + 1
+                self.stop_reason = STOP_COMPLETE
+                return self.stop_reason
+
+        if self._length > self.max_chars:
+            self.stop_reason = STOP_LENGTH
+        elif self._length - self._checked_at >= _CHECK_EVERY:
+            self._checked_at = self._length
+            start = find_runaway(self.text, self.min_repeat_span)
+            if start is not None:
+                self._runaway_start = start
+                self.stop_reason = STOP_REPETITION
+        return self.stop_reason
+
+    def salvage(self) -> str:
+        """The usable response: complete JSON as-is, otherwise trimmed and closed."""
+        text = self.text
+        if self.stop_reason == STOP_COMPLETE:
+            return text[: self._complete_at]
+        if self.stop_reason == STOP_REPETITION and self._runaway_start is not None:
+            text = text[: self._runaway_start]
+        elif self.stop_reason != STOP_LENGTH:
+            return text
+        start = self._json_start
+        if start is None or start > len(text):
+            return text
+        return text[:start] + close_json(text[start:])
+
+    def _find_start(self) -> Optional[int]:
+        """Index of the ``{`` that opens the answer, once it has arrived."""
+        text = self.text
+        while self._preamble_pos < len(text):
+            pos, mode = self._preamble_pos, self._preamble
+            if mode == "think":
+                end = text.find(_THINK_CLOSE, pos)
+                if end < 0:
+                    self._preamble_pos = max(pos, len(text) - len(_THINK_CLOSE) + 1)
+                    return None
+                self._preamble_pos, self._preamble = end + len(_THINK_CLOSE), "lead"
+            elif mode == "prose":
+                fence = text.find(_FENCE, pos)
+                if fence < 0:
+                    self._preamble_pos = max(pos, len(text) - len(_FENCE) + 1)
+                    return None
+                self._preamble_pos, self._preamble = fence + len(_FENCE), "fence"
+            elif mode == "fence":
+                end = text.find("\n", pos)
+                if end < 0:
+                    self._preamble_pos = len(text)
+                    return None
+                self._preamble_pos, self._preamble = end + 1, "body"
+            elif text[pos].isspace():
+                self._preamble_pos += 1
+            elif text[pos] == "{":
+                return pos
+            else:
+                for marker, follows in ((_THINK_OPEN, "think"), (_FENCE, "fence")):
+                    if mode == "body" and marker is _THINK_OPEN:
+                        continue
+                    head = text[pos:pos + len(marker)]
+                    if head == marker:
+                        self._preamble_pos, self._preamble = pos + len(marker), follows
+                        break
+                    if marker.startswith(head):
+                        return None  # wait for the rest of the marker
+                else:
+                    self._preamble = "prose"
+        return None
+
+    def _scan(self, ch: str) -> bool:
+        """Advance the JSON scanner by one character; True when the object closes."""
+        if self._in_string:
+            if self._escaped:
+                self._escaped = False
+            elif ch == "\\":
+                self._escaped = True
+            elif ch == '"':
+                self._in_string = False
+            return False
+        if ch == '"':
+            self._in_string = True
+        elif ch in "{[":
+            self._depth += 1
+        elif ch in "}]":
+            self._depth -= 1
+            return self._depth == 0
+        return False
+
+
+def find_runaway(text: str, min_span: int = DEFAULT_STREAM_MIN_REPEAT_SPAN) -> Optional[int]:
+    """Index where a runaway repetition at the end of *text* starts, or ``None``.
+
+    The tail must be a single unit of 1–200 characters repeated at least
+    four times and covering at least *min_span* characters.  The
+    returned index keeps one copy of the unit.
+    """
+    length = len(text)
+    for period in range(1, min(_MAX_PERIOD, length // _MIN_REPEATS) + 1):
+        repeats = max(_MIN_REPEATS, math.ceil(min_span / period))
+        span = period * repeats
+        if span > length:
+            continue
+        unit = text[-period:]
+        if text[-span:] != unit * repeats:
+            continue
+        start = length - span
+        while start > 0 and text[start - 1] == text[start - 1 + period]:
+            start -= 1
+        return start + period
+    return None
+
+
+def close_json(text: str) -> str:
+    """Close the open strings, arrays and objects of truncated JSON *text*."""
+    stack: list[str] = []
+    in_string = escaped = False
+    for ch in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack:
+            stack.pop()
+    if not stack:
+        return text
+    if in_string:
+        text += "\\" if escaped else ""
+        text += '"'
+    text = text.rstrip().rstrip(",").rstrip()
+    if text.endswith(":"):
+        text += " null"
+    elif stack[-1] == "}" and text.endswith('"') and _dangling_key(text):
+        text += ": null"
+    return text + "".join(reversed(stack))
+
+
+def _dangling_key(text: str) -> bool:
+    """True when *text* ends with an object key that has no value yet."""
+    body = text[:-1]
+    quote = body.rfind('"')
+    while quote > 0 and body[quote - 1] == "\\":
+        quote = body.rfind('"', 0, quote - 1)
+    before = body[:quote].rstrip()
+    return before.endswith(("{", ","))
@@ -0,0 +1,145 @@
+"""Find missing or cut-off fields in a parsed response and ask only for those.
+
+A response can parse fine and still be incomplete: a metadata field left
+empty, ``location_detection`` missing, a value that ends in ``"…"``
+because the model ran out of tokens.  Re-running the whole step for
+that costs a full analysis.  Instead the analyzer:
+
+  1. checks the parsed response against the section JSON Schemas
+     (:meth:`~picture_analyzer.data.prompt_loader.PromptLoader.schema`)
+     with :func:`find_missing`;
+  2. sends a short follow-up prompt (``reask.txt``) listing only those
+     fields, constrained by :func:`subset_schema`, with the same image
+     payload;
+  3. folds the answer back in with :func:`merge_fields`.
+
+Paths are dotted: ``"metadata.objects"`` for one field,
+``"location_detection"`` for a whole section.
+"""
+from __future__ import annotations
+
+import copy
+import json
+from typing import Any
+
+# A value ending like this was cut off mid-generation.
+_TRUNCATION_MARKERS = ("...", "…")
+
+# Fields an answer may leave empty together: an indoor photo or a
+# close-up has no country, region or city to name.  Only some of them
+# empty, or any absent or cut off, still counts as missing.
+_MAY_BE_EMPTY = {
+    "location_detection": frozenset({"country", "region", "city_or_area", "location_type"}),
+}
+
+
+def _is_empty(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, str):
+        text = value.strip()
+        return not text or text.endswith(_TRUNCATION_MARKERS)
+    if isinstance(value, (list, dict)):
+        return not value
+    return False
+
+
+def find_missing(data: dict[str, Any], schema: dict[str, Any]) -> list[str]:
+    """Dotted paths of the required fields in *schema* that *data* lacks.
+
+    A top-level section that is absent or not of the right type is
+    reported as a whole; inside an object section each empty, ``None``
+    or truncated field is reported on its own.  A location left
+    empty as a whole is an answer (nothing to name), not a gap.
+    """
+    missing: list[str] = []
+    for key in schema.get("required", []):
+        spec = schema["properties"][key]
+        value = data.get(key)
+        if spec.get("type") == "object":
+            if not isinstance(value, dict) or not value:
+                missing.append(key)
+                continue
+            group = _MAY_BE_EMPTY.get(key, frozenset())
+            if not all(value.get(field) == "" for field in group):
+                group = frozenset()
+            missing += [
+                f"{key}.{field}" for field in spec.get("required", [])
+                if field not in group and _is_empty(value.get(field))
+            ]
+        elif _is_empty(value):
+            missing.append(key)
+    return missing
+
+
+def subset_schema(schema: dict[str, Any], paths: list[str]) -> dict[str, Any]:
+    """*schema* reduced to the fields named by *paths* (still strict)."""
+    subset: dict[str, Any] = {
+        "type": "object",
+        "properties": {},
+        "required": [],
+        "additionalProperties": False,
+    }
+    for path in paths:
+        key, _, field = path.partition(".")
+        spec = schema["properties"][key]
+        if not field:
+            subset["properties"][key] = copy.deepcopy(spec)
+        else:
+            section = subset["properties"].setdefault(key, {
+                "type": "object",
+                "properties": {},
+                "required": [],
+                "additionalProperties": False,
+            })
+            section["properties"][field] = copy.deepcopy(spec["properties"][field])
+            section["required"].append(field)
+        if key not in subset["required"]:
+            subset["required"].append(key)
+    return subset
+
+
+def describe_fields(schema: dict[str, Any], paths: list[str]) -> str:
+    """One ``- path: description`` line per requested field."""
+    lines = []
+    for path in paths:
+        key, _, field = path.partition(".")
+        spec = schema["properties"][key]
+        if field:
+            spec = spec["properties"][field]
+        description = spec.get("description", "")
+        lines.append(f"- {path}: {description}" if description else f"- {path}")
+    return "\n".join(lines)
+
+
+def skeleton(schema: dict[str, Any]) -> str:
+    """Compact JSON example of *schema*'s structure for the prompt."""
+    def example(spec: dict[str, Any]) -> Any:
+        kind = spec.get("type")
+        if kind == "object":
+            return {name: example(sub) for name, sub in spec["properties"].items()}
+        if kind == "array":
+            return [example(spec["items"])]
+        if kind == "integer":
+            return 0
+        return "<text>"
+
+    return json.dumps(example(schema), ensure_ascii=False)
+
+
+def merge_fields(data: dict[str, Any], answer: dict[str, Any], paths: list[str]) -> dict[str, Any]:
+    """Copy the non-empty *paths* from *answer* into a copy of *data*."""
+    merged = dict(data)
+    for path in paths:
+        key, _, field = path.partition(".")
+        if not field:
+            if not _is_empty(answer.get(key)):
+                merged[key] = answer[key]
+            continue
+        section = answer.get(key)
+        if not isinstance(section, dict) or _is_empty(section.get(field)):
+            continue
+        target = dict(merged.get(key) or {})
+        target[field] = section[field]
+        merged[key] = target
+    return merged
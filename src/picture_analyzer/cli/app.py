@@ -11,12 +11,14 @@ Entry point registered in ``pyproject.toml``::
 """
 from __future__ import annotations
 
+import asyncio
 import gc
 import json
 import mimetypes
 import re
 import shutil
 import sys
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
@@ -26,7 +28,11 @@ import click
 from ..analyzers import create_analyzer
 from ..analyzers.openai import OpenAIAnalyzer
 from ..config.defaults import DEFAULT_SUPPORTED_FORMATS
-from ..config.settings import get_settings
+from ..config.settings import (
+    EnhancementConfig,
+    SlideRestorationConfig,
+    get_settings,
+)
 from ..core.models import AnalysisContext, ImageData
 from ..description import (
     extract_date,
@@ -157,8 +163,19 @@ def _resolve_profiles(restore_slide: str, analysis: dict) -> list[str]:
     return ["auto"]
 
 
+def _slide_restorer(config: SlideRestorationConfig | None = None):
+    """Construct the ``SlideRestorer`` from the slide-restoration settings."""
+    from ..enhancers.profiles.slide_restorer import SlideRestorer
+
+    config = config or get_settings().slide_restoration
+    return SlideRestorer(
+        profiles_dir=config.profiles_dir,
+        jpeg_quality=config.jpeg_quality,
+        memory_budget_mb=config.memory_budget_mb,
+    )
+
+
 def _restore_from_analysis(
-    SlideRestoration,
     MetadataManager,
     *,
     source_path: str,
@@ -166,46 +183,150 @@ def _restore_from_analysis(
     restore_slide: str,
     output_dir: str,
     image_stem: str,
+    config: SlideRestorationConfig | None = None,
 ) -> None:
-    """Run slide restoration for one image (shared by single + batch)."""
+    """Run slide restoration for one image (shared by single + batch).
+
+    One profile or several, the same ``SlideRestorer`` renders them, so a
+    profile looks the same whichever path produced it.
+    """
     profiles = _resolve_profiles(restore_slide, analysis)
+    restorer = _slide_restorer(config)
     if len(profiles) > 1:
         click.echo(f"  → Suggested profiles: {', '.join(profiles)}")
-
-    for profile in profiles:
-        if len(profiles) > 1:
-            restored_path = str(Path(output_dir) / f"{image_stem}_restored_{profile}.jpg")
-        else:
-            restored_path = str(Path(output_dir) / f"{image_stem}_restored.jpg")
-
-        if profile == "auto":
-            SlideRestoration.auto_restore_slide(source_path, analysis, restored_path)
+        outputs = {
+            profile: str(Path(output_dir) / f"{image_stem}_restored_{profile}.jpg")
+            for profile in profiles
+        }
+        # One decode and despeckle, shared by every profile
+        restored = list(restorer.restore_many(source_path, outputs).values())
+    else:
+        restored_path = str(Path(output_dir) / f"{image_stem}_restored.jpg")
+        if profiles[0] == "auto":
+            restored = [restorer.auto_restore(
+                source_path, analysis_data=analysis, output_path=restored_path,
+            )]
         else:
-            SlideRestoration.restore_slide(
-                source_path, profile=profile, output_path=restored_path,
-            )
+            restored = [restorer.restore(source_path, profiles[0], restored_path)]
 
-        if Path(restored_path).exists():
+    for restored_path in restored:
+        if restored_path and Path(restored_path).exists():
             MetadataManager().copy_exif(source_path, restored_path, restored_path)
 
 
+def _postprocess_image(
+    source_path: str,
+    analysis: dict,
+    output_dir: str,
+    image_stem: str,
+    do_enhance: bool,
+    restore_slide: str | None,
+    enhancement: EnhancementConfig | None = None,
+    slide_restoration: SlideRestorationConfig | None = None,
+) -> None:
+    """Enhance and/or restore one analyzed image.
+
+    Module-level so it can run in an ``EnhancementPool`` worker process.
+    Pass the caller's *enhancement* and *slide_restoration* settings: a
+    worker calling ``get_settings()`` would load the config afresh and
+    lose the overrides made in the parent.
+    """
+    _, SmartEnhancer, _, MetadataManager, _ = _get_legacy_modules()
+
+    if do_enhance and "enhancement" in analysis:
+        enhanced_path = str(Path(output_dir) / f"{image_stem}_enhanced.jpg")
+        enhancer = _smart_enhancer(SmartEnhancer, config=enhancement)
+        result = enhancer.enhance_from_analysis(
+            source_path, analysis["enhancement"], enhanced_path,
+        )
+        if result:
+            MetadataManager().copy_exif(source_path, enhanced_path, enhanced_path)
+            click.echo(f"  ✓ Enhanced: {enhanced_path}")
+
+    if restore_slide:
+        _restore_from_analysis(
+            MetadataManager,
+            source_path=source_path,
+            analysis=analysis,
+            restore_slide=restore_slide,
+            output_dir=output_dir,
+            image_stem=image_stem,
+            config=slide_restoration,
+        )
+
+
+def _smart_enhancer(
+    SmartEnhancer,
+    preview_long_edge: int | None = None,
+    config: EnhancementConfig | None = None,
+):
+    """Construct the legacy ``SmartEnhancer`` from the enhancement settings."""
+    config = config or get_settings().enhancement
+    return SmartEnhancer(
+        memory_budget_mb=config.memory_budget_mb,
+        preview_long_edge=preview_long_edge,
+        share_blurs=config.share_blurs,
+    )
+
+
+def _resolve_cpu_workers(cpu_workers: int | None) -> int:
+    return get_settings().cpu_workers if cpu_workers is None else max(0, cpu_workers)
+
+
 def _build_runtime_provider(provider: str | None) -> str:
     settings = get_settings()
     return (provider or settings.analyzer_provider).lower()
 
 
 def _build_analyzer(provider: str | None = None):
+    from ..analyzers.cache import ResponseCache
+    from ..analyzers.payload import PayloadPreparer
+    from ..analyzers.streaming import StreamLimits
+
     settings = get_settings()
     selected = _build_runtime_provider(provider)
 
-    return create_analyzer(
+    analyzer = create_analyzer(
         provider=selected,
         openai_api_key=settings.openai.api_key.get_secret_value(),
         openai_model=settings.openai.model,
+        openai_base_url=settings.openai.base_url,
         ollama_model=settings.ollama.model,
         ollama_host=settings.ollama.host,
+        ollama_hosts=settings.ollama.hosts,
         max_tokens=settings.openai.max_tokens,
     )
+    analyzer.payload_preparer = PayloadPreparer.from_settings(settings)
+    analyzer.response_cache = ResponseCache.from_settings(settings)
+    analyzer.streaming = StreamLimits.from_config(settings.streaming)
+    provider_cfg = settings.ollama if selected == "ollama" else settings.openai
+    analyzer.structured_output = provider_cfg.structured_output
+    analyzer.reask_max_fields = settings.pipeline.reask_max_fields
+    if selected == "openai":
+        from ..analyzers.rate_limit import RateLimiter
+        analyzer.rate_limiter = RateLimiter.from_settings(settings)
+    if selected == "ollama":
+        from ..analyzers.residency import get_residency_manager
+        analyzer.residency = get_residency_manager()
+    return analyzer
+
+
+def _prepare_image_data(image_path: Path, preparer=None) -> ImageData:
+    """Build the ``ImageData`` for *image_path* with its model payload attached.
+
+    Used by the batch prefetch stage so decoding and encoding happen off
+    the inference thread.  If preparation fails the plain ``ImageData``
+    is returned and the analyzer encodes the file itself.
+    """
+    from ..analyzers.payload import attach_payload
+
+    mime_type, _ = mimetypes.guess_type(str(image_path))
+    image = ImageData(path=image_path, mime_type=mime_type or "image/jpeg")
+    try:
+        image, _ = attach_payload(image, preparer)
+    except Exception as exc:
+        click.echo(f"  ⚠ Could not prepare payload for {image_path.name}: {exc}", err=True)
+    return image
 
 
 def _analyze_with_provider(
@@ -216,16 +337,33 @@ def _analyze_with_provider(
     partial=None,
     only_steps: list[str] | None = None,
     detect_location: bool | None = None,
+    image: ImageData | None = None,
 ):
     settings = get_settings()
     effective_mode = pipeline_mode or settings.pipeline.mode
+    context = _analysis_context(image_path, settings, detect_location)
+    if image is None:
+        mime_type, _ = mimetypes.guess_type(str(image_path))
+        image = ImageData(path=image_path, mime_type=mime_type or "image/jpeg")
+
+    if effective_mode == "stepped":
+        from ..pipeline import build_pipeline
+        active_pipeline = pipeline or build_pipeline(settings)
+        return active_pipeline.run(image, context, partial=partial, only_steps=only_steps)
+
+    analyzer = _build_analyzer(provider)
+    result = analyzer.analyze(image, context)
+    return _geocode_result(result, settings)
+
 
+def _analysis_context(image_path: Path, settings, detect_location: bool | None = None) -> AnalysisContext:
+    """``AnalysisContext`` for *image_path* from settings and its description file."""
     # Per-image description takes priority over the folder-wide description.txt
     per_image_desc = image_path.parent / (image_path.stem + ".txt")
     folder_desc = image_path.parent / "description.txt"
     desc_file = per_image_desc if per_image_desc.is_file() else (folder_desc if folder_desc.is_file() else None)
     description_text = desc_file.read_text(encoding="utf-8").strip() if desc_file else None
-    context = AnalysisContext(
+    return AnalysisContext(
         language=settings.metadata.language,
         detect_slide_profiles=settings.prompt.detect_slide_profiles,
         recommend_enhancements=settings.prompt.recommend_enhancements,
@@ -233,18 +371,10 @@ def _analyze_with_provider(
         custom_instructions=settings.prompt.custom_instructions,
         description_text=description_text,
     )
-    mime_type, _ = mimetypes.guess_type(str(image_path))
-    image = ImageData(path=image_path, mime_type=mime_type or "image/jpeg")
-
-    if effective_mode == "stepped":
-        from ..pipeline import build_pipeline
-        active_pipeline = pipeline or build_pipeline(settings)
-        return active_pipeline.run(image, context, partial=partial, only_steps=only_steps)
 
-    analyzer = _build_analyzer(provider)
-    result = analyzer.analyze(image, context)
 
-    # ── Geocoding: resolve GPS coordinates from AI-detected location ──
+def _geocode_result(result, settings):
+    """Single-call mode: resolve GPS coordinates from the AI-detected location."""
     if result.location and settings.geo.provider != "none":
         try:
             from ..geo.nominatim import NominatimGeocoder
@@ -601,10 +731,20 @@ def cli(ctx: click.Context):
 @click.option("--update-existing", "update_existing", is_flag=True,
               help="Load existing JSON as starting point and merge new step results into it. "
                    "Use with --steps to re-run only specific steps without re-analyzing everything.")
+@click.option("--cpu-workers", "cpu_workers", type=click.IntRange(min=0), default=None,
+              help="Batch only: worker processes for enhancement/restoration, overlapping "
+                   "with analysis of the next image (0 = inline; default from config).")
+@click.option("--no-cache", "no_cache", is_flag=True,
+              help="Bypass the model response cache: always call the model and store nothing.")
+@click.option("--submit-offline", "submit_offline", is_flag=True,
+              help="Batch only: send the OpenAI step requests through the OpenAI Batch API "
+                   "(half price, done within 24 h), wait for it and write the usual outputs. "
+                   "Re-run the same command to resume waiting.")
 def analyze(image: str, output: str | None, provider: str | None, batch: bool,
             do_enhance: bool, restore_slide: str | None, no_json: bool, debug: bool,
             pipeline_mode: str | None, skip_existing: bool,
-            only_steps: str | None, update_existing: bool):
+            only_steps: str | None, update_existing: bool, cpu_workers: int | None,
+            no_cache: bool, submit_offline: bool):
     """Analyze a single image or batch-process a directory.
 
     IMAGE is a path to an image file, or a directory when --batch is used.
@@ -618,6 +758,9 @@ def analyze(image: str, output: str | None, provider: str | None, batch: bool,
     Batch-analyze a directory with enhancement:
         picture-analyzer analyze photos/ --batch --enhance
 
+    Enhance/restore in 4 background processes while analysis continues:
+        picture-analyzer analyze photos/ --batch --enhance --cpu-workers 4
+
     Re-run only slide_profiles on existing analyses:
         picture-analyzer analyze photos/ --batch --steps slide_profiles --update-existing
 
@@ -626,6 +769,12 @@ def analyze(image: str, output: str | None, provider: str | None, batch: bool,
 
     Use stepped pipeline mode:
         picture-analyzer analyze photo.jpg --pipeline-mode stepped
+
+    Force fresh model answers after changing a prompt file:
+        picture-analyzer analyze photos/ --batch --no-cache
+
+    Backfill a large archive through the OpenAI Batch API:
+        picture-analyzer analyze archive/ --batch --submit-offline
     """
     image_path = Path(image)
 
@@ -635,12 +784,18 @@ def analyze(image: str, output: str | None, provider: str | None, batch: bool,
     if debug:
         import os; os.environ["PA_ANALYZER_DEBUG"] = "1"
 
+    if no_cache:
+        get_settings(response_cache={"enabled": False})
+
     steps_list = [s.strip() for s in only_steps.split(",")] if only_steps else None
 
     if batch or image_path.is_dir():
         _batch_analyze(image_path, output, do_enhance, restore_slide, provider, pipeline_mode,
                        skip_existing=skip_existing, only_steps=steps_list,
-                       update_existing=update_existing)
+                       update_existing=update_existing, cpu_workers=cpu_workers,
+                       submit_offline=submit_offline)
+    elif submit_offline:
+        raise click.ClickException("--submit-offline needs a directory (--batch)")
     else:
         _single_analyze(image_path, output, do_enhance, restore_slide, no_json, provider,
                         pipeline_mode, only_steps=steps_list, update_existing=update_existing)
@@ -691,7 +846,7 @@ def _single_analyze(
     update_existing: bool = False,
 ) -> None:
     """Analyze a single image."""
-    _, SmartEnhancer, SlideRestoration, MetadataManager, _ = _get_legacy_modules()
+    _, SmartEnhancer, _, MetadataManager, _ = _get_legacy_modules()
 
     click.echo(f"Analyzing: {image_path}")
 
@@ -740,7 +895,7 @@ def _single_analyze(
 
     # Optional enhancement
     if do_enhance and "enhancement" in analysis:
-        enhancer = SmartEnhancer()
+        enhancer = _smart_enhancer(SmartEnhancer)
         out_dir = output or "output"
         enhanced_path = str(Path(out_dir) / f"{image_path.stem}_enhanced.jpg")
         result = enhancer.enhance_from_analysis(
@@ -756,7 +911,7 @@ def _single_analyze(
     if restore_slide:
         out_dir = output or "output"
         _restore_from_analysis(
-            SlideRestoration, MetadataManager,
+            MetadataManager,
             source_path=str(analyzed_target),
             analysis=analysis,
             restore_slide=restore_slide,
@@ -780,6 +935,86 @@ def _is_complete_analysis(json_path: Path) -> bool:
     return any(v for v in metadata.values() if v)
 
 
+def _offline_batch_backend(settings):
+    """Batch API backend for ``--submit-offline``."""
+    from openai import OpenAI
+
+    from ..analyzers.openai_batch import OpenAIBatchBackend
+
+    client = OpenAI(
+        api_key=settings.openai.api_key.get_secret_value() or None,
+        base_url=settings.openai.base_url,
+    )
+    return OpenAIBatchBackend(client, settings.openai.batch_completion_window)
+
+
+def _run_offline_batch(pipeline, work, output_dir, settings, preparer, only_steps, detect_location):
+    """Submit (or resume) the OpenAI Batch API run for *work* and wait for it.
+
+    On return the pipeline's OpenAI analyzers answer from the batch
+    output, so the normal batch loop writes the results.  The pending
+    batch ids are kept in ``.openai_batch.json`` in *output_dir* until
+    every image has been written.
+    """
+    from ..analyzers.openai_batch import OfflineBatch, OfflineBatchRunner, attach_offline_batch
+
+    runner = OfflineBatchRunner(
+        backend=_offline_batch_backend(settings),
+        state_path=Path(output_dir) / ".openai_batch.json",
+        poll_interval=settings.openai.batch_poll_seconds,
+        echo=lambda msg: click.echo(f"  {msg}"),
+    )
+    batch_ids = runner.pending()
+    if batch_ids:
+        click.echo(f"↺ Resuming OpenAI batch {', '.join(batch_ids)}")
+    else:
+        recorder = OfflineBatch()
+        step_names = attach_offline_batch(pipeline.analyzers(), recorder)
+        if only_steps:
+            step_names = [name for name in step_names if name in only_steps]
+        if not step_names:
+            raise click.ClickException("--submit-offline: no pipeline step uses OpenAI")
+        click.echo(f"Recording {', '.join(step_names)} request(s) for {len(work)} image(s)")
+        for _, img in work:
+            context = _analysis_context(img, settings, detect_location)
+            try:
+                pipeline.run(_prepare_image_data(img, preparer), context, only_steps=step_names)
+            except Exception as exc:
+                click.echo(f"  ⚠ Could not record requests for {img.name}: {exc}", err=True)
+        batch_ids = runner.submit(recorder, Path(output_dir) / "batch_requests.jsonl")
+    answers = runner.collect(batch_ids)
+    attach_offline_batch(pipeline.analyzers(), answers)
+    click.echo(f"Collected {len(answers.results)} batch answer(s)\n")
+    return runner
+
+
+def _prime_pack(pipeline, chunk, settings, only_steps, detect_location) -> None:
+    """Analyse the metadata of the images in *chunk* with packed requests."""
+    items = []
+    for _, img in chunk:
+        mime_type, _ = mimetypes.guess_type(str(img))
+        image = ImageData(path=img, mime_type=mime_type or "image/jpeg")
+        items.append((image, _analysis_context(img, settings, detect_location)))
+    try:
+        pipeline.prime(items, only_steps=only_steps)
+    except Exception as exc:
+        # Every image still gets its own metadata call in the normal loop
+        click.echo(f"  ⚠ Packed metadata request failed: {exc}", err=True)
+
+
+def _async_batch_analyzer(provider: str | None, pipeline_mode: str | None, settings):
+    """OpenAI analyzer for the concurrent batch path, or ``None`` to run one image at a time.
+
+    Only single-call mode goes async; the stepped pipeline and Ollama keep
+    the sequential :class:`~picture_analyzer.pipeline.batch.BatchExecutor`.
+    """
+    if _build_runtime_provider(provider) != "openai":
+        return None
+    if (pipeline_mode or settings.pipeline.mode) != "single" or settings.openai.max_concurrency <= 1:
+        return None
+    return _build_analyzer(provider)
+
+
 def _batch_analyze(
     directory: Path,
     output: str | None,
@@ -790,14 +1025,26 @@ def _batch_analyze(
     skip_existing: bool = False,
     only_steps: list[str] | None = None,
     update_existing: bool = False,
+    cpu_workers: int | None = None,
+    submit_offline: bool = False,
 ) -> None:
-    """Batch-analyze all images in a directory."""
-    _, SmartEnhancer, SlideRestoration, MetadataManager, _ = _get_legacy_modules()
+    """Batch-analyze all images in a directory.
+
+    Enhancement and slide restoration run through an ``EnhancementPool``;
+    with ``cpu_workers > 0`` they happen in worker processes while the
+    next image is being analyzed.
+
+    With *submit_offline* the stepped pipeline's OpenAI requests go
+    through the Batch API first (see :mod:`~picture_analyzer.analyzers.openai_batch`);
+    the batch loop then answers them from its output.
+    """
+    _get_legacy_modules()  # fail fast when the legacy modules are missing
+    from ..enhancers.workers import EnhancementPool
 
     if not directory.is_dir():
         raise click.ClickException(f"Not a directory: {directory}")
 
-    enhancer = SmartEnhancer() if do_enhance else None
+    workers = _resolve_cpu_workers(cpu_workers)
     if output is None:
         output = _default_output_from_description(directory)
     output_dir = output or _fallback_output(directory.name)
@@ -858,113 +1105,222 @@ def _batch_analyze(
     click.echo(f"Found {total} image(s) to process")
     if skip_existing:
         click.echo("  + Skipping already-completed images")
-    if enhancer:
+    if do_enhance:
         click.echo("  + Enhancement enabled")
     if restore_slide:
         click.echo(f"  + Slide restoration enabled ({restore_slide} profile)")
+    if workers and (do_enhance or restore_slide):
+        click.echo(f"  + {workers} CPU worker(s) for enhancement/restoration")
+    if submit_offline:
+        pipeline_mode = "stepped"  # the Batch API requests are the stepped prompts
+        click.echo("  + OpenAI requests via the Batch API (offline)")
     click.echo()
 
     success_count = 0
     skipped_count = 0
     errors: list[tuple[str, str]] = []  # (filename, error_message)
 
+    def _on_postprocessed(name: str):
+        def callback(_result, error: BaseException | None) -> None:
+            nonlocal success_count
+            if error is not None:
+                errors.append((name, f"Post-processing: {error}"))
+                click.echo(f"  ✗ Error ({name}): {error}", err=True)
+            else:
+                success_count += 1
+                click.echo(f"  ✓ Complete: {name}" if workers else "  ✓ Complete")
+        return callback
+
     # Build the pipeline once — reusing the same 4 OllamaClient instances for all images
     shared_pipeline = None
     if (pipeline_mode or settings.pipeline.mode) == "stepped":
         from ..pipeline import build_pipeline
         shared_pipeline = build_pipeline(settings)
 
+    work: list[tuple[int, Path]] = []
     for idx, img in enumerate(image_files, 1):
         json_path = Path(output_dir) / f"{img.stem}_analyzed.json"
         if skip_existing and _is_complete_analysis(json_path):
             click.echo(f"[{idx}/{total}] Skipping (already done): {img.name}")
             skipped_count += 1
             continue
+        work.append((idx, img))
+
+    from ..analyzers.payload import PayloadPreparer
+    from ..analyzers.residency import get_residency_manager
+    from ..pipeline.batch import BatchExecutor
+
+    preparer = PayloadPreparer.from_settings(settings)
+    # Ollama models stay loaded across images; unloaded on OOM or after keep_alive idle
+    residency = get_residency_manager()
+
+    offline_runner = None
+    if submit_offline and work:
+        offline_runner = _run_offline_batch(
+            shared_pipeline, work, output_dir, settings, preparer, only_steps,
+            detect_location=False if ground_truth["status"] == "ok" else None,
+        )
+
+    # Several images per metadata request: prime the pipeline one pack ahead
+    pack_size = 1
+    packing = settings.pipeline.metadata_pack_size > 1 and offline_runner is None
+    if packing and shared_pipeline is not None:
+        pack_size = shared_pipeline.pack_size(only_steps)
+    positions = {idx: n for n, (idx, _) in enumerate(work)}
+    if pack_size > 1:
+        click.echo(f"  + Metadata for up to {pack_size} images per request\n")
+
+    # ── Stage 1 (prefetch thread): existing JSON + model payload ────────
+    def _prepare(item: tuple[int, Path]):
+        _, img = item
+        partial = _load_partial_if_requested(update_existing, only_steps, img, output_dir)
+        return partial, _prepare_image_data(img, preparer)
+
+    # ── Stage 2 (this thread): model inference, one image at a time ─────
+    def _analyze(item: tuple[int, Path], prepared):
+        nonlocal gt_timestamp
+        idx, img = item
+        partial, image_data = prepared
         click.echo(f"[{idx}/{total}] Processing: {img.name}")
+        if pack_size > 1 and positions[idx] % pack_size == 0:
+            _prime_pack(
+                shared_pipeline, work[positions[idx]:positions[idx] + pack_size], settings,
+                only_steps, detect_location=False if ground_truth["status"] == "ok" else None,
+            )
         try:
-            analyzed_path = str(Path(output_dir) / f"{img.stem}_analyzed.jpg")
             analysis_result = _analyze_with_provider(
                 img, provider, pipeline_mode, pipeline=shared_pipeline,
-                partial=_load_partial_if_requested(update_existing, only_steps, img, output_dir),
+                partial=partial,
                 only_steps=only_steps,
                 # Ground truth overrides location/GPS/date, so skip the LLM
                 # location step (and per-image geocoding) to avoid wasted inference.
                 detect_location=False if ground_truth["status"] == "ok" else None,
+                image=image_data,
             )
-            analysis = _analysis_to_legacy_dict(analysis_result)
-            
-            # Translate to configured language if not English
-            if settings.metadata.language != "en":
-                analysis = translate_analysis_dict(analysis, settings.metadata.language)
-
-            # Override LLM location/date with description.txt ground truth
-            if ground_truth["status"] == "ok":
-                _apply_description_ground_truth(analysis, ground_truth, gt_timestamp)
-                gt_timestamp += timedelta(seconds=1)
-
-            del analysis_result  # release model result immediately
-            shutil.copy2(img, analyzed_path)  # copy without loading into Python memory
-
-            # Embed EXIF metadata into the analyzed image copy
-            try:
-                from ..metadata.exif_writer import ExifWriter
-                ExifWriter(language=get_settings().metadata.language).write_from_dict(
-                    analyzed_path, analyzed_path, analysis
-                )
-            except Exception as exc:
-                click.echo(f"  ⚠ Could not embed EXIF metadata: {exc}", err=True)
+        finally:
+            del image_data  # release the encoded payload
+            gc.collect()
+            if settings.ollama.flush_between_images:
+                residency.unload_all("between images")
+        timestamp = None
+        if ground_truth["status"] == "ok":
+            timestamp = gt_timestamp
+            gt_timestamp += timedelta(seconds=1)
+        return analysis_result, timestamp
+
+    # ── Stage 3 (write-back thread): translate, copy, EXIF, JSON ─────────
+    def _finish(item: tuple[int, Path], analyzed):
+        _, img = item
+        analysis_result, timestamp = analyzed
+        analyzed_path = str(Path(output_dir) / f"{img.stem}_analyzed.jpg")
+        analysis = _analysis_to_legacy_dict(analysis_result)
+
+        # Translate to configured language if not English
+        if settings.metadata.language != "en":
+            analysis = translate_analysis_dict(analysis, settings.metadata.language)
+
+        # Override LLM location/date with description.txt ground truth
+        if timestamp is not None:
+            _apply_description_ground_truth(analysis, ground_truth, timestamp)
+
+        shutil.copy2(img, analyzed_path)  # copy without loading into Python memory
+
+        # Embed EXIF metadata into the analyzed image copy
+        try:
+            from ..metadata.exif_writer import ExifWriter
+            ExifWriter(language=get_settings().metadata.language).write_from_dict(
+                analyzed_path, analyzed_path, analysis
+            )
+        except Exception as exc:
+            click.echo(f"  ⚠ Could not embed EXIF metadata: {exc}", err=True)
 
-            Path(analyzed_path).with_suffix(".json").write_text(
-                json.dumps({k: v for k, v in analysis.items() if k not in ("source_description", "raw_response")}, indent=2), encoding="utf-8"
+        Path(analyzed_path).with_suffix(".json").write_text(
+            json.dumps({k: v for k, v in analysis.items() if k not in ("source_description", "raw_response")}, indent=2), encoding="utf-8"
+        )
+        return analyzed_path, analysis
+
+    def _done(item: tuple[int, Path], written) -> None:
+        nonlocal success_count
+        _, img = item
+        analyzed_path, analysis = written
+        if do_enhance or restore_slide:
+            pool.submit(
+                _postprocess_image,
+                analyzed_path, analysis, output_dir, img.stem,
+                do_enhance, restore_slide,
+                settings.enhancement, settings.slide_restoration,
+                callback=_on_postprocessed(img.name),
             )
+        else:
+            success_count += 1
+            click.echo(f"  ✓ Complete: {img.name}" if pipelined else "  ✓ Complete")
+
+    def _failed(item: tuple[int, Path], stage: str, exc: BaseException) -> None:
+        from ..core.exceptions import AnalysisError, ValidationError
+        _, img = item
+        if isinstance(exc, ValidationError):
+            msg = f"Validation: {exc}"
+        elif isinstance(exc, AnalysisError):
+            msg = f"Analysis failed: {exc}"
+        else:
+            msg = str(exc)
+        errors.append((img.name, msg))
+        click.echo(f"  ✗ Error ({img.name}): {msg}" if pipelined else f"  ✗ Error: {msg}", err=True)
 
-            if enhancer and "enhancement" in analysis:
-                enhanced_path = str(Path(output_dir) / f"{img.stem}_enhanced.jpg")
-                result = enhancer.enhance_from_analysis(
-                    analyzed_path, analysis["enhancement"], enhanced_path,
-                )
-                if result:
-                    MetadataManager().copy_exif(analyzed_path, enhanced_path, enhanced_path)
-                    click.echo(f"  ✓ Enhanced: {enhanced_path}")
-
-            if restore_slide:
-                _restore_from_analysis(
-                    SlideRestoration, MetadataManager,
-                    source_path=analyzed_path,
-                    analysis=analysis,
-                    restore_slide=restore_slide,
-                    output_dir=output_dir,
-                    image_stem=img.stem,
-                )
+    async_analyzer = _async_batch_analyzer(provider, pipeline_mode, settings)
+    pool = EnhancementPool(workers)
+    try:
+        if async_analyzer is not None:
+            from ..pipeline.batch import AsyncBatchExecutor
 
-            success_count += 1
-            click.echo("  ✓ Complete")
-        except Exception as exc:
-            from ..core.exceptions import AnalysisError, ValidationError
-            if isinstance(exc, ValidationError):
-                msg = f"Validation: {exc}"
-            elif isinstance(exc, AnalysisError):
-                msg = f"Analysis failed: {exc}"
-            else:
-                msg = str(exc)
-            errors.append((img.name, msg))
-            click.echo(f"  ✗ Error: {msg}", err=True)
-        finally:
-            # Free analysis data and force GC to reclaim image buffers
-            analysis = None  # type: ignore[assignment]
-            gc.collect()
-            # "ollama stop" ensures the model is unloaded on the Ollama side too
-            try:
-                import subprocess as _sub
-                _sub.run(
-                    ["ollama", "stop", settings.ollama.model],
-                    timeout=30,
-                    capture_output=True,
+            # Images finish out of order, so each one's ground-truth timestamp is fixed up front
+            timestamps: dict[int, datetime] = {}
+            if ground_truth["status"] == "ok":
+                timestamps = {idx: gt_timestamp + timedelta(seconds=n) for n, (idx, _) in enumerate(work)}
+
+            async def _analyze_async(item: tuple[int, Path], prepared):
+                idx, img = item
+                _, image_data = prepared
+                click.echo(f"[{idx}/{total}] Processing: {img.name}")
+                context = _analysis_context(
+                    img, settings, detect_location=False if ground_truth["status"] == "ok" else None
                 )
-            except Exception:
-                pass  # non-fatal: cache flush is best-effort
+                result = await async_analyzer.analyze_async(image_data, context)
+                result = await asyncio.to_thread(_geocode_result, result, settings)
+                return result, timestamps.get(idx)
+
+            concurrency = settings.openai.max_concurrency
+            click.echo(f"  + Up to {concurrency} OpenAI request(s) in flight")
+            pipelined = True
+            AsyncBatchExecutor(concurrency=concurrency, io_workers=settings.io_workers).run(
+                work, _prepare, _analyze_async, _finish, on_done=_done, on_error=_failed
+            )
+        else:
+            executor = BatchExecutor(prefetch=settings.prefetch, io_workers=settings.io_workers)
+            pipelined = bool(executor.prefetch or executor.io_workers)
+            executor.run(work, _prepare, _analyze, _finish, on_done=_done, on_error=_failed)
+    finally:
+        pool.close()  # wait for outstanding enhancement/restoration jobs
+
+    if offline_runner is not None:
+        from ..analyzers.openai_batch import attach_offline_batch
+        attach_offline_batch(shared_pipeline.analyzers(), None)
+        if not errors:
+            offline_runner.clear()
 
     click.echo(f"\n{'=' * 50}")
+    cache = getattr(shared_pipeline, "response_cache", None)
+    if cache is not None and cache.stats.lookups:
+        click.echo(f"Response cache: {cache.stats}")
+    if residency.stats.loads:
+        click.echo(f"Ollama models: {residency.stats}")
+    if shared_pipeline is not None:
+        from ..analyzers.cascade import CascadeAnalyzer
+        for name, analyzer in shared_pipeline.analyzers():
+            if isinstance(analyzer, CascadeAnalyzer) and analyzer.stats.calls:
+                click.echo(f"Model cascade [{name}] {analyzer.model}: {analyzer.stats}")
+    if async_analyzer is not None:
+        click.echo(f"OpenAI requests: {async_analyzer.rate_limiter.stats}")
     failed_count = len(errors)
     parts = [f"✓ {success_count} succeeded"]
     if skipped_count:
@@ -999,7 +1355,11 @@ def _batch_analyze(
               type=click.Choice(PROFILE_CHOICES, case_sensitive=False),
               default=None,
               help="Slide restoration profile to apply (or 'auto' to use the detected profile).")
-def regenerate(source: str, output: str | None, batch: bool, restore_slide: str | None):
+@click.option("--cpu-workers", "cpu_workers", type=click.IntRange(min=0), default=None,
+              help="Batch only: worker processes for enhancement/restoration "
+                   "(0 = inline; default from config).")
+def regenerate(source: str, output: str | None, batch: bool, restore_slide: str | None,
+               cpu_workers: int | None):
     """Regenerate enhanced/restored images from existing analysis JSON files.
 
     No LLM calls are made — the existing JSON is used as-is.
@@ -1016,8 +1376,13 @@ def regenerate(source: str, output: str | None, batch: bool, restore_slide: str
 
     Regenerate with slide restoration:
         picture-analyzer regenerate output/ --batch --restore-slide auto
+
+    Regenerate a folder using 4 worker processes:
+        picture-analyzer regenerate output/ --batch --cpu-workers 4
     """
-    _, SmartEnhancer, SlideRestoration, MetadataManager, _ = _get_legacy_modules()
+    _get_legacy_modules()  # fail fast when the legacy modules are missing
+    from ..enhancers.workers import EnhancementPool
+
     source_path = Path(source)
 
     if batch or source_path.is_dir():
@@ -1026,35 +1391,47 @@ def regenerate(source: str, output: str | None, batch: bool, restore_slide: str
             raise click.ClickException(f"No *_analyzed.json files found in {source_path}")
         click.echo(f"Found {len(json_files)} analysis file(s) to regenerate")
         success, failed = 0, 0
-        for json_file in json_files:
-            try:
-                _regenerate_from_json(json_file, output or str(source_path),
-                                      SmartEnhancer, SlideRestoration, MetadataManager,
-                                      restore_slide)
-                success += 1
-            except Exception as exc:
-                click.echo(f"  ✗ {json_file.name}: {exc}", err=True)
-                failed += 1
+
+        def _on_done(name: str):
+            def callback(_result, error: BaseException | None) -> None:
+                nonlocal success, failed
+                if error is not None:
+                    click.echo(f"  ✗ {name}: {error}", err=True)
+                    failed += 1
+                else:
+                    success += 1
+            return callback
+
+        with EnhancementPool(_resolve_cpu_workers(cpu_workers)) as pool:
+            for json_file in json_files:
+                try:
+                    _regenerate_from_json(json_file, output or str(source_path),
+                                          restore_slide, pool=pool,
+                                          callback=_on_done(json_file.name))
+                except Exception as exc:
+                    click.echo(f"  ✗ {json_file.name}: {exc}", err=True)
+                    failed += 1
         click.echo(f"\nRegenerate complete: ✓ {success} succeeded" + (f", ✗ {failed} failed" if failed else ""))
     else:
         # Single JSON file
         if source_path.suffix != ".json":
             raise click.ClickException("SOURCE must be a *_analyzed.json file or a directory with --batch")
         out_dir = output or str(source_path.parent)
-        _regenerate_from_json(source_path, out_dir,
-                              SmartEnhancer, SlideRestoration, MetadataManager,
-                              restore_slide)
+        _regenerate_from_json(source_path, out_dir, restore_slide)
 
 
 def _regenerate_from_json(
     json_path: Path,
     output_dir: str,
-    SmartEnhancer,
-    SlideRestoration,
-    MetadataManager,
     restore_slide: str | None,
+    pool=None,
+    callback=None,
 ) -> None:
-    """Regenerate enhanced/restored images for one JSON file."""
+    """Regenerate enhanced/restored images for one JSON file.
+
+    With *pool* the image work is queued on the ``EnhancementPool`` and
+    *callback* reports its outcome; otherwise it runs immediately.
+    """
     import json as _json
 
     analysis = _json.loads(json_path.read_text(encoding="utf-8"))
@@ -1074,27 +1451,16 @@ def _regenerate_from_json(
 
     click.echo(f"  Regenerating: {stem}")
     Path(output_dir).mkdir(parents=True, exist_ok=True)
-    settings = get_settings()
-
-    # Enhancement
-    if "enhancement" in analysis:
-        enhanced_path = str(Path(output_dir) / f"{stem}_enhanced.jpg")
-        enhancer = SmartEnhancer()
-        result = enhancer.enhance_from_analysis(str(analyzed_jpg), analysis["enhancement"], enhanced_path)
-        if result:
-            MetadataManager().copy_exif(str(analyzed_jpg), enhanced_path, enhanced_path)
-            click.echo(f"    ✓ Enhanced: {Path(enhanced_path).name}")
 
-    # Slide restoration
-    if restore_slide:
-        _restore_from_analysis(
-            SlideRestoration, MetadataManager,
-            source_path=str(analyzed_jpg),
-            analysis=analysis,
-            restore_slide=restore_slide,
-            output_dir=output_dir,
-            image_stem=stem,
-        )
+    settings = get_settings()
+    job = (
+        str(analyzed_jpg), analysis, output_dir, stem, True, restore_slide,
+        settings.enhancement, settings.slide_restoration,
+    )
+    if pool is None:
+        _postprocess_image(*job)
+    else:
+        pool.submit(_postprocess_image, *job, callback=callback)
 
 
 # ══════════════════════════════════════════════════════════════════════
@@ -1128,7 +1494,7 @@ def process(image: str, output: str | None, provider: str | None, restore_slide:
     Custom output:
         picture-analyzer process photo.jpg -o results/
     """
-    _, SmartEnhancer, SlideRestoration, MetadataManager, _ = _get_legacy_modules()
+    _, SmartEnhancer, _, MetadataManager, _ = _get_legacy_modules()
 
     image_path = Path(image)
 
@@ -1167,7 +1533,7 @@ def process(image: str, output: str | None, provider: str | None, restore_slide:
 
     # Step 2 — Enhance
     click.echo(f"\n[2/{step_total}] Enhancing based on recommendations")
-    enhancer = SmartEnhancer()
+    enhancer = _smart_enhancer(SmartEnhancer)
     if "enhancement" in analysis:
         result = enhancer.enhance_from_analysis(
             analyzed_path, analysis["enhancement"], enhanced_path,
@@ -1184,7 +1550,7 @@ def process(image: str, output: str | None, provider: str | None, restore_slide:
     if restore_slide:
         click.echo(f"\n[3/{step_total}] Restoring slide")
         _restore_from_analysis(
-            SlideRestoration, MetadataManager,
+            MetadataManager,
             source_path=analyzed_path,
             analysis=analysis,
             restore_slide=restore_slide,
@@ -1253,11 +1619,13 @@ def gallery(directory: str, output: str | None):
 @click.option("--enhance", "do_enhance", is_flag=True)
 @click.option("--restore-slide",
               type=click.Choice(PROFILE_CHOICES, case_sensitive=False), default=None)
+@click.option("--submit-offline", "submit_offline", is_flag=True)
 def batch_cmd(directory: str, output: str | None,
-              do_enhance: bool, restore_slide: str | None):
+              do_enhance: bool, restore_slide: str | None, submit_offline: bool):
     """[LEGACY] Batch-analyze images — use 'analyze --batch' instead."""
     click.echo("Tip: use 'picture-analyzer analyze DIR --batch' instead.\n")
-    _batch_analyze(Path(directory), output, do_enhance, restore_slide)
+    _batch_analyze(Path(directory), output, do_enhance, restore_slide,
+                   submit_offline=submit_offline)
 
 
 @cli.command(name="enhance", hidden=True)
@@ -1266,9 +1634,15 @@ def batch_cmd(directory: str, output: str | None,
               type=click.Path(exists=True), default=None,
               help="Path to *_analyzed.json.")
 @click.option("-o", "--output", type=click.Path(), default=None)
-def enhance_cmd(image: str, analysis_path: str | None, output: str | None):
+@click.option("--preview", is_flag=True,
+              help="Render a fast low-resolution preview instead of the full image.")
+@click.option("--preview-size", "preview_size", type=click.IntRange(min=64), default=None,
+              help="Long edge of the preview in pixels (default: enhancement.preview_long_edge).")
+def enhance_cmd(image: str, analysis_path: str | None, output: str | None,
+                preview: bool, preview_size: int | None):
     """[LEGACY] Enhance an image from analysis JSON — use 'process' instead."""
     _, SmartEnhancer, _, _, _ = _get_legacy_modules()
+    settings = get_settings()
 
     image_path = Path(image)
 
@@ -1281,14 +1655,19 @@ def enhance_cmd(image: str, analysis_path: str | None, output: str | None):
             )
         analysis_path = str(candidate)
 
-    output_path = output or str(image_path.parent / f"{image_path.stem}_enhanced.jpg")
+    suffix = "_enhanced_preview" if preview else "_enhanced"
+    output_path = output or str(image_path.parent / f"{image_path.stem}{suffix}.jpg")
+    preview_edge = (preview_size or settings.enhancement.preview_long_edge) if preview else None
 
     click.echo(f"Enhancing: {image}")
     click.echo(f"Using analysis: {analysis_path}")
-    enhancer = SmartEnhancer()
+    enhancer = _smart_enhancer(SmartEnhancer, preview_long_edge=preview_edge)
+    started = time.perf_counter()
     result = enhancer.enhance_from_json(str(image_path), analysis_path, output_path)
 
-    if result:
+    if result and preview:
+        click.echo(f"✓ Preview ({preview_edge}px, {time.perf_counter() - started:.2f}s): {result}")
+    elif result:
         click.echo(f"✓ Enhanced: {result}")
     else:
         raise click.ClickException("Enhancement failed")
@@ -1305,14 +1684,19 @@ def enhance_cmd(image: str, analysis_path: str | None, output: str | None):
 @click.option("-o", "--output", type=click.Path(), default=None)
 @click.option("--no-denoise", is_flag=True, help="Disable noise reduction.")
 @click.option("--no-despeckle", is_flag=True, help="Disable despeckle filter.")
+@click.option("--preview", is_flag=True,
+              help="Render a fast low-resolution preview instead of the full image.")
+@click.option("--preview-size", "preview_size", type=click.IntRange(min=64), default=None,
+              help="Long edge of the preview in pixels (default: enhancement.preview_long_edge).")
 def restore_slide_cmd(image: str, profile: str, analysis_path: str | None,
-                      output: str | None, no_denoise: bool, no_despeckle: bool):
+                      output: str | None, no_denoise: bool, no_despeckle: bool,
+                      preview: bool, preview_size: int | None):
     """[LEGACY] Restore a scanned slide — use 'process --restore-slide' instead."""
-    _, _, SlideRestoration, _, _ = _get_legacy_modules()
-
     image_path = Path(image)
-    output_path = output or str(image_path.parent / f"{image_path.stem}_restored.jpg")
+    suffix = "_restored_preview" if preview else "_restored"
+    output_path = output or str(image_path.parent / f"{image_path.stem}{suffix}.jpg")
 
+    restorer = _slide_restorer()
     if profile == "auto":
         if analysis_path is None:
             candidate = image_path.parent / f"{image_path.stem}_analyzed.json"
@@ -1324,16 +1708,22 @@ def restore_slide_cmd(image: str, profile: str, analysis_path: str | None,
 
         with open(analysis_path) as fh:
             analysis = json.load(fh)
+        # The preview and the full render apply the same profile
+        profile = restorer.select_profile(analysis_data=analysis)
 
-        result = SlideRestoration.auto_restore_slide(
-            str(image_path), analysis, output_path,
-        )
-    else:
-        click.echo(f"Restoring slide with '{profile}' profile: {image}")
-        result = SlideRestoration.restore_slide(
-            str(image_path), profile=profile, output_path=output_path,
+    if preview:
+        _preview_slide(
+            restorer, image_path, profile, output_path,
+            long_edge=preview_size or get_settings().enhancement.preview_long_edge,
             denoise=not no_denoise, despeckle=not no_despeckle,
         )
+        return
+
+    click.echo(f"Restoring slide with '{profile}' profile: {image}")
+    result = restorer.restore(
+        image_path, profile, output_path,
+        denoise=not no_denoise, despeckle=not no_despeckle,
+    )
 
     if result:
         click.echo(f"✓ Restored: {result}")
@@ -1341,6 +1731,28 @@ def restore_slide_cmd(image: str, profile: str, analysis_path: str | None,
         raise click.ClickException("Slide restoration failed")
 
 
+def _preview_slide(
+    restorer,
+    image_path: Path,
+    profile: str,
+    output_path: str,
+    *,
+    long_edge: int,
+    denoise: bool,
+    despeckle: bool,
+) -> None:
+    """Render and save a low-resolution restoration preview."""
+    started = time.perf_counter()
+    try:
+        image = restorer.preview(
+            image_path, profile, long_edge, denoise=denoise, despeckle=despeckle,
+        )
+        image.save(output_path, "JPEG", quality=restorer.jpeg_quality)
+    except Exception as e:
+        raise click.ClickException(f"Slide preview failed: {e}")
+    click.echo(f"✓ Preview ({long_edge}px, {time.perf_counter() - started:.2f}s): {output_path}")
+
+
 # ══════════════════════════════════════════════════════════════════════
 # UTILITY COMMANDS
 # ══════════════════════════════════════════════════════════════════════
@@ -1653,6 +2065,74 @@ def config_cmd():
     click.echo(settings.model_dump_json(indent=2))
 
 
+def _parse_sizes(ctx, param, value: str) -> list[float]:
+    try:
+        sizes = [float(v) for v in value.split(",") if v.strip()]
+    except ValueError:
+        raise click.BadParameter("expected comma-separated megapixel counts, e.g. 1,12,100")
+    if not sizes or any(s <= 0 for s in sizes):
+        raise click.BadParameter("sizes must be positive")
+    return sizes
+
+
+@cli.command()
+@click.option("--sizes", default="1,4,12,24,50,100", show_default=True, callback=_parse_sizes,
+              help="Comma-separated synthetic image sizes in megapixels.")
+@click.option("--only", default=None,
+              help="Only run cases whose group/name contains this text (e.g. 'profile/').")
+@click.option("--repeat", type=click.IntRange(min=1), default=3, show_default=True,
+              help="Runs per case; the fastest is reported.")
+@click.option("--baseline", "baseline_path", type=click.Path(exists=True, dir_okay=False),
+              default=None, help="Fail if throughput drops below this baseline JSON.")
+@click.option("--save-baseline", "save_path", type=click.Path(dir_okay=False), default=None,
+              help="Write the results as a new baseline JSON.")
+@click.option("--tolerance", type=click.FloatRange(0.0, 1.0), default=0.25, show_default=True,
+              help="Allowed relative throughput drop against the baseline.")
+def benchmark(sizes: list[float], only: str | None, repeat: int,
+              baseline_path: str | None, save_path: str | None, tolerance: float):
+    """Benchmark filters, slide profiles and recommendation pipelines.
+
+    Runs on synthetic images and reports throughput (MP/s) and peak
+    memory per case.  With --baseline, exits non-zero when any case is
+    slower than the baseline by more than --tolerance.
+
+    \b
+    Examples:
+      picture-analyzer benchmark --sizes 1,12 --save-baseline benchmarks/baseline.json
+      picture-analyzer benchmark --sizes 1,12 --baseline benchmarks/baseline.json
+      picture-analyzer benchmark --only filter/Vibrance --sizes 100
+    """
+    from ..enhancers import benchmark as bench
+
+    cases = bench.select_cases(bench.default_cases(), only)
+    if not cases:
+        raise click.ClickException(f"No benchmark cases match '{only}'")
+
+    click.echo(f"Benchmarking {len(cases)} case(s) at {', '.join(f'{s:g}' for s in sizes)} MP")
+    results = bench.run_benchmarks(
+        sizes, cases, repeat=repeat,
+        progress=lambda r: click.echo(bench.format_result(r)),
+    )
+
+    if save_path:
+        bench.save_baseline(results, save_path)
+        click.echo(f"✓ Baseline saved: {save_path}")
+
+    if baseline_path:
+        regressions = bench.compare(results, bench.load_baseline(baseline_path), tolerance)
+        if regressions:
+            for r in regressions:
+                click.echo(
+                    f"  ✗ {r.key}: {r.mp_per_s:.1f} MP/s vs baseline "
+                    f"{r.baseline_mp_per_s:.1f} ({r.change:+.0%})",
+                    err=True,
+                )
+            raise click.ClickException(
+                f"{len(regressions)} benchmark regression(s) beyond {tolerance:.0%}"
+            )
+        click.echo(f"✓ No regressions against {baseline_path}")
+
+
 @cli.command()
 @click.argument("directory", type=click.Path(exists=True, file_okay=False),
                 default=".")
@@ -6,8 +6,19 @@ in ``settings.py`` references these constants as field defaults.
 """
 from __future__ import annotations
 
+import os
+from pathlib import Path
+
 # ── Pipeline ────────────────────────────────────────────────────────
 DEFAULT_PIPELINE_MODE = "single"  # "single" | "stepped"
+DEFAULT_MAX_PARALLEL_STEPS = 1  # stepped mode: steps run concurrently when their inputs are ready
+DEFAULT_METADATA_PASSES = 2  # metadata step: two shorter calls (1 = single call)
+DEFAULT_METADATA_PACK_SIZE = 1  # batch: images per metadata request (OpenAI; 1 = one image per call)
+DEFAULT_REASK_MAX_FIELDS = 6  # re-ask only missing fields when at most this many (0 = off)
+DEFAULT_LOCAL_QUALITY = "off"  # "off" | "replace" (measured, no LLM call) | "context" (measurements in the LLM prompt)
+DEFAULT_CASCADE_MIN_CONFIDENCE = 70  # cascade: escalate to the step's model below this location/profile confidence
+DEFAULT_SLIDE_CLASSIFIER = "llm"  # "llm" | "local" (histogram classifier, LLM on low confidence)
+DEFAULT_SLIDE_CLASSIFIER_MIN_CONFIDENCE = 60  # below this the local classifier defers to the LLM
 
 # ── AI / OpenAI ──────────────────────────────────────────────────────
 DEFAULT_ANALYZER_PROVIDER = "openai"  # "openai" | "ollama"
@@ -18,7 +29,32 @@ DEFAULT_OLLAMA_TIMEOUT = 1200  # 20 minutes per step; CPU inference + cold model
 DEFAULT_OLLAMA_NUM_CTX = 16384  # mllama image tiles use ~8000 tokens; 16384 leaves room for prompt+output
 DEFAULT_OLLAMA_KEEP_ALIVE = 3600  # seconds to keep model loaded between steps (0 = unload immediately)
 DEFAULT_MAX_TOKENS = 16384
+DEFAULT_MAX_OUTPUT_TOKENS = 16384  # hard output cap of GPT-4o-class models; a request asking for more is rejected
+DEFAULT_PACKED_TOKENS_PER_IMAGE = 2048  # output budget per image in a packed metadata request
 DEFAULT_DETAIL_LEVEL = "auto"  # "auto" | "low" | "high"
+DEFAULT_OPENAI_MAX_CONCURRENCY = 1  # batch: OpenAI requests in flight (1 = sequential; >1 = async batch)
+DEFAULT_OPENAI_RATE_LIMIT_RETRIES = 6  # retries of one request after HTTP 429
+DEFAULT_OPENAI_BATCH_POLL_SECONDS = 60  # --submit-offline: seconds between Batch API status checks
+DEFAULT_OPENAI_BATCH_COMPLETION_WINDOW = "24h"  # the only window the Batch API offers
+
+# ── Caches ───────────────────────────────────────────────────────────
+# Per-user, outside any checkout or photo folder ($XDG_CACHE_HOME or ~/.cache)
+DEFAULT_CACHE_ROOT = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "picture-analyzer"
+
+# ── Model Payload ────────────────────────────────────────────────────
+DEFAULT_PAYLOAD_MAX_LONG_EDGE = 2048  # px; OpenAI "high" detail tops out at 2048, Ollama models lower
+DEFAULT_PAYLOAD_FORMAT = "jpeg"  # "jpeg" | "png" | "webp"
+DEFAULT_PAYLOAD_QUALITY = 90
+DEFAULT_PAYLOAD_CACHE_DIR = str(DEFAULT_CACHE_ROOT / "payloads")
+DEFAULT_PAYLOAD_CACHE_MAX_MB = 500  # LRU eviction beyond this size
+
+# ── Response Cache ───────────────────────────────────────────────────
+DEFAULT_RESPONSE_CACHE_DIR = str(DEFAULT_CACHE_ROOT / "responses")
+DEFAULT_RESPONSE_CACHE_MAX_MB = 200  # LRU eviction beyond this size
+
+# ── Streaming ────────────────────────────────────────────────────────
+DEFAULT_STREAM_MAX_CHARS = 24000  # abort a response that grows past this (a blow-up)
+DEFAULT_STREAM_MIN_REPEAT_SPAN = 200  # chars a repeated unit must cover to count as a runaway loop
 
 # ── Image Processing ────────────────────────────────────────────────
 DEFAULT_JPEG_QUALITY = 95
@@ -27,6 +63,7 @@ DEFAULT_KELVIN_RANGE = (1500, 15000)
 DEFAULT_CHANNEL_FACTOR_RANGE = (0.1, 2.5)
 DEFAULT_UNSHARP_MASK = {"radius": 2, "percent": 150, "threshold": 3}
 DEFAULT_DENOISE_RADIUS = 0.5
+DEFAULT_PREVIEW_LONG_EDGE = 1024  # px; proxy size for --preview renders
 
 # ── Supported Formats ───────────────────────────────────────────────
 DEFAULT_SUPPORTED_FORMATS = frozenset({
@@ -105,6 +142,9 @@ DEFAULT_THUMBNAIL_QUALITY = 85
 # ── Batch Processing ────────────────────────────────────────────────
 DEFAULT_BATCH_SIZE = 5
 DEFAULT_CLEANUP_TEMP = True
+DEFAULT_CPU_WORKERS = 0  # enhancement/restoration worker processes (0 = inline)
+DEFAULT_PREFETCH = 1  # images prepared ahead of the one in inference (0 = no prefetch)
+DEFAULT_IO_WORKERS = 1  # threads writing copies/EXIF/JSON behind inference (0 = inline)
 
 # ── Slide Restoration ───────────────────────────────────────────────
 DEFAULT_PROFILE_CONFIDENCE_THRESHOLD = 0  # apply all detected profiles regardless of confidence
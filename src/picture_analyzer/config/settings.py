@@ -33,6 +33,19 @@ class OpenAIConfig(BaseModel):
     model: str = Field(default=d.DEFAULT_OPENAI_MODEL, description="Vision model name")
     max_tokens: int = Field(default=d.DEFAULT_MAX_TOKENS, ge=1, le=16384)
     detail: str = Field(default=d.DEFAULT_DETAIL_LEVEL, pattern="^(auto|low|high)$")
+    structured_output: Optional[bool] = Field(default=None, description="Constrain responses to the section JSON Schemas (structured outputs); default: on for api.openai.com, off with a custom base_url")
+    base_url: Optional[str] = Field(default=None, description="OpenAI-compatible API base URL (default: api.openai.com)")
+    max_concurrency: int = Field(default=d.DEFAULT_OPENAI_MAX_CONCURRENCY, ge=1, le=256, description="Batch (single mode): requests in flight at once; > 1 runs the async batch")
+    rate_limit_retries: int = Field(default=d.DEFAULT_OPENAI_RATE_LIMIT_RETRIES, ge=0, le=20, description="Retries of a request after HTTP 429 (honours Retry-After)")
+    batch_poll_seconds: int = Field(default=d.DEFAULT_OPENAI_BATCH_POLL_SECONDS, ge=1, description="--submit-offline: seconds between Batch API status checks")
+    batch_completion_window: str = Field(default=d.DEFAULT_OPENAI_BATCH_COMPLETION_WINDOW, description="--submit-offline: Batch API completion window")
+
+    @model_validator(mode="after")
+    def _default_structured_output(self) -> "OpenAIConfig":
+        # OpenAI-compatible servers often reject response_format: json_schema
+        if self.structured_output is None:
+            self.structured_output = self.base_url is None
+        return self
 
 
 class OllamaConfig(BaseModel):
@@ -40,10 +53,41 @@ class OllamaConfig(BaseModel):
 
     model: str = Field(default=d.DEFAULT_OLLAMA_MODEL, description="Vision model name")
     host: str = Field(default=d.DEFAULT_OLLAMA_HOST, description="Ollama host URL")
+    hosts: list[str] = Field(default_factory=list, description="Several Ollama host URLs to load-balance over (overrides host)")
     docker_host: Optional[str] = Field(default=None, description="Ollama host URL override used automatically when running inside Docker")
     timeout: int = Field(default=d.DEFAULT_OLLAMA_TIMEOUT, ge=10, le=3600, description="Request timeout in seconds")
     num_ctx: int = Field(default=d.DEFAULT_OLLAMA_NUM_CTX, ge=512, description="KV-cache context window size (tokens); lower = less VRAM")
     keep_alive: int = Field(default=d.DEFAULT_OLLAMA_KEEP_ALIVE, ge=0, description="Seconds to keep model loaded between calls (0 = unload immediately after each call)")
+    structured_output: bool = Field(default=False, description="Pass the section JSON Schemas as format= (opt-in: needs Ollama >= 0.5)")
+    flush_between_images: bool = Field(default=False, description="Batch: unload the model after every image (slow; only for memory-starved hosts)")
+
+
+class PayloadConfig(BaseModel):
+    """Resize/re-encode of images before they are sent to a vision model."""
+
+    enabled: bool = True
+    max_long_edge: int = Field(default=d.DEFAULT_PAYLOAD_MAX_LONG_EDGE, ge=0, le=16384, description="Cap for the longer side (0 = original size)")
+    format: str = Field(default=d.DEFAULT_PAYLOAD_FORMAT, pattern="^(jpeg|png|webp)$")
+    quality: int = Field(default=d.DEFAULT_PAYLOAD_QUALITY, ge=1, le=100)
+    cache_dir: Path = Field(default=Path(d.DEFAULT_PAYLOAD_CACHE_DIR))
+    cache_enabled: bool = True
+    cache_max_mb: float = Field(default=d.DEFAULT_PAYLOAD_CACHE_MAX_MB, gt=0, description="LRU-evict payloads beyond this total size")
+
+
+class ResponseCacheConfig(BaseModel):
+    """Disk cache of model responses, keyed by image, prompt and model."""
+
+    enabled: bool = True
+    directory: Path = Field(default=Path(d.DEFAULT_RESPONSE_CACHE_DIR))
+    max_mb: float = Field(default=d.DEFAULT_RESPONSE_CACHE_MAX_MB, gt=0, description="LRU-evict entries beyond this total size")
+
+
+class StreamingConfig(BaseModel):
+    """Streamed model responses with early stop on completion or runaway output."""
+
+    enabled: bool = True
+    max_chars: int = Field(default=d.DEFAULT_STREAM_MAX_CHARS, ge=256, description="Abort responses longer than this")
+    min_repeat_span: int = Field(default=d.DEFAULT_STREAM_MIN_REPEAT_SPAN, ge=16, description="Repeated output covering this many chars is a runaway loop")
 
 
 class GeoConfig(BaseModel):
@@ -85,6 +129,9 @@ class EnhancementConfig(BaseModel):
     kelvin_range: Tuple[int, int] = Field(default=d.DEFAULT_KELVIN_RANGE)
     channel_factor_range: Tuple[float, float] = Field(default=d.DEFAULT_CHANNEL_FACTOR_RANGE)
     unsharp_mask_defaults: dict[str, int] = Field(default_factory=lambda: dict(d.DEFAULT_UNSHARP_MASK))
+    memory_budget_mb: Optional[float] = Field(default=None, gt=0, description="Process large images in strips to stay under this working-memory budget")
+    share_blurs: bool = Field(default=False, description="Compute each blur once for consecutive sharpening filters (approximate)")
+    preview_long_edge: int = Field(default=d.DEFAULT_PREVIEW_LONG_EDGE, ge=64, le=8192, description="Long edge of the proxy used by --preview")
 
 
 class SlideRestorationConfig(BaseModel):
@@ -96,6 +143,7 @@ class SlideRestorationConfig(BaseModel):
     confidence_threshold: int = Field(default=d.DEFAULT_PROFILE_CONFIDENCE_THRESHOLD, ge=0, le=100)
     jpeg_quality: int = Field(default=d.DEFAULT_JPEG_QUALITY, ge=1, le=100)
     denoise_radius: float = Field(default=d.DEFAULT_DENOISE_RADIUS, ge=0.0, le=5.0)
+    memory_budget_mb: Optional[float] = Field(default=None, gt=0, description="Restore large scans in strips to stay under this working-memory budget")
 
 
 class OutputConfig(BaseModel):
@@ -164,16 +212,29 @@ class StepConfig(BaseModel):
     model: Optional[str] = None           # falls back to openai.model / ollama.model
     max_tokens: Optional[int] = Field(default=None, ge=1, le=16384)
     prompt_template: Optional[str] = None  # falls back to built-in template
+    hosts: Optional[list[str]] = None      # Ollama only; falls back to ollama.hosts
+    cascade_model: Optional[str] = None    # small model tried first; ``model`` only on escalation
+    cascade_provider: Optional[str] = None  # provider of cascade_model; falls back to ``provider``
+    cascade_min_confidence: int = Field(default=d.DEFAULT_CASCADE_MIN_CONFIDENCE, ge=0, le=100)
 
 
 class PipelineConfig(BaseModel):
     """Pipeline execution and per-step configuration."""
 
     mode: str = Field(default=d.DEFAULT_PIPELINE_MODE, pattern="^(single|stepped)$")
+    max_parallel_steps: int = Field(default=d.DEFAULT_MAX_PARALLEL_STEPS, ge=1, le=16, description="Steps run concurrently once their dependencies are done (1 = sequential)")
     metadata: StepConfig = Field(default_factory=StepConfig)
     location: StepConfig = Field(default_factory=StepConfig)
     enhancement: StepConfig = Field(default_factory=StepConfig)
     slide_profiles: StepConfig = Field(default_factory=StepConfig)
+    metadata_passes: int = Field(default=d.DEFAULT_METADATA_PASSES, ge=1, le=2, description="2 = split metadata into two shorter calls; 1 = one call")
+    metadata_pack_size: int = Field(default=d.DEFAULT_METADATA_PACK_SIZE, ge=1, le=16, description="Batch: images sent together in one metadata request (OpenAI only; 1 = off)")
+    reask_max_fields: int = Field(default=d.DEFAULT_REASK_MAX_FIELDS, ge=0, le=32, description="Re-ask only the missing/truncated fields when at most this many (0 = off)")
+    local_quality: str = Field(default=d.DEFAULT_LOCAL_QUALITY, pattern="^(off|replace|context)$", description="Enhancement step: measure exposure/contrast/colour/sharpness locally and skip (replace) or inform (context) the LLM call")
+    slide_classifier: str = Field(default=d.DEFAULT_SLIDE_CLASSIFIER, pattern="^(llm|local)$")
+    slide_classifier_min_confidence: int = Field(
+        default=d.DEFAULT_SLIDE_CLASSIFIER_MIN_CONFIDENCE, ge=0, le=100
+    )
 
 
 # ── Root Settings ────────────────────────────────────────────────────
@@ -240,6 +301,9 @@ class Settings(BaseSettings):
     analyzer_provider: str = Field(default=d.DEFAULT_ANALYZER_PROVIDER, pattern="^(openai|ollama)$")
     openai: OpenAIConfig = Field(default_factory=OpenAIConfig)
     ollama: OllamaConfig = Field(default_factory=OllamaConfig)
+    payload: PayloadConfig = Field(default_factory=PayloadConfig)
+    response_cache: ResponseCacheConfig = Field(default_factory=ResponseCacheConfig)
+    streaming: StreamingConfig = Field(default_factory=StreamingConfig)
     geo: GeoConfig = Field(default_factory=GeoConfig)
     metadata: MetadataConfig = Field(default_factory=MetadataConfig)
     enhancement: EnhancementConfig = Field(default_factory=EnhancementConfig)
@@ -253,6 +317,9 @@ class Settings(BaseSettings):
     # Top-level settings
     supported_formats: FrozenSet[str] = Field(default=d.DEFAULT_SUPPORTED_FORMATS)
     batch_size: int = Field(default=d.DEFAULT_BATCH_SIZE, ge=1, le=100)
+    cpu_workers: int = Field(default=d.DEFAULT_CPU_WORKERS, ge=0, le=64, description="Worker processes for batch enhancement/restoration (0 = inline)")
+    prefetch: int = Field(default=d.DEFAULT_PREFETCH, ge=0, le=16, description="Batch: images whose payload is prepared ahead of inference")
+    io_workers: int = Field(default=d.DEFAULT_IO_WORKERS, ge=0, le=16, description="Batch: threads for copy/EXIF/JSON write-back (0 = inline)")
     log_level: str = Field(default=d.DEFAULT_LOG_LEVEL, pattern="^(DEBUG|INFO|WARNING|ERROR|CRITICAL)$")
 
     @model_validator(mode="before")
@@ -379,11 +446,24 @@ def resolve_step_config(step: StepConfig, settings: "Settings") -> dict:
         step: Per-step config (possibly all-defaults).
         settings: Root settings instance supplying global provider defaults.
 
+    With ``cascade_model`` set, ``cascade`` holds the resolved config of
+    that small model (see :class:`~picture_analyzer.analyzers.cascade.CascadeAnalyzer`).
+
     Returns:
         Dict with keys ``provider``, ``model``, ``max_tokens``, ``prompt_template``.
     """
     provider = step.provider or settings.analyzer_provider
     base = settings.openai if provider == "openai" else settings.ollama
+    cascade = None
+    if step.cascade_model:
+        small = step.model_copy(
+            update={
+                "provider": step.cascade_provider or provider,
+                "model": step.cascade_model,
+                "cascade_model": None,
+            }
+        )
+        cascade = resolve_step_config(small, settings)
     return {
         "provider": provider,
         "model": step.model or base.model,
@@ -392,5 +472,12 @@ def resolve_step_config(step: StepConfig, settings: "Settings") -> dict:
         "timeout": getattr(base, "timeout", None),
         "num_ctx": getattr(base, "num_ctx", None),
         "host": getattr(base, "host", None),
+        "hosts": step.hosts or getattr(base, "hosts", None) or None,
         "keep_alive": getattr(base, "keep_alive", None),
+        "streaming": settings.streaming,
+        "structured_output": getattr(base, "structured_output", False),
+        "reask_max_fields": settings.pipeline.reask_max_fields,
+        "base_url": getattr(base, "base_url", None),
+        "cascade": cascade,
+        "cascade_min_confidence": step.cascade_min_confidence,
     }
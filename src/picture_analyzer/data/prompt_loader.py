@@ -6,6 +6,10 @@ Templates live in ``src/picture_analyzer/data/templates/``:
     enhancement.txt     — Sections 13–18 (lighting, color, sharpness) — English only
     slide_profiles.txt  — Section 19 (profile classification)         — English only
 
+Each section's ``footer_<name>.txt`` describes the expected JSON in
+prose; ``schema_<name>.json`` is the same structure as a JSON Schema,
+used for schema-constrained (structured) output.
+
 Usage::
 
     loader = PromptLoader()
@@ -13,9 +17,14 @@ Usage::
     text = loader.load("metadata", language="Dutch")
     # combined (mirrors the legacy monolithic ANALYSIS_PROMPT)
     full = loader.combined(language="Dutch")
+    # JSON Schema for the response to a set of sections
+    schema = loader.schema(["location", "enhancement"])
 """
 from __future__ import annotations
 
+import copy
+import json
+from functools import cache
 from pathlib import Path
 
 _TEMPLATES_DIR = Path(__file__).parent / "templates"
@@ -110,9 +119,43 @@ class PromptLoader:
         parts.append(self.load("footer", **kwargs))
         return "\n".join(parts)
 
+    def schema(self, sections: list[str] | None = None) -> dict | None:
+        """JSON Schema for the response to *sections*.
+
+        The per-section ``schema_<name>.json`` files each describe one
+        top-level key; they are merged into a single object schema with
+        every key required and no extra keys allowed.
+
+        Returns:
+            The merged schema, or ``None`` if any section has no schema
+            file (the caller then falls back to plain JSON mode).
+        """
+        if sections is None:
+            sections = _DEFAULT_SECTIONS
+        merged: dict = {
+            "type": "object",
+            "properties": {},
+            "required": [],
+            "additionalProperties": False,
+        }
+        for section in sections:
+            part = _read_schema(self._dir / f"schema_{section}.json")
+            if part is None:
+                return None
+            merged["properties"].update(copy.deepcopy(part["properties"]))
+            merged["required"] += [k for k in part["required"] if k not in merged["required"]]
+        return merged
+
 
 # ── helpers ──────────────────────────────────────────────────────────
 
+@cache
+def _read_schema(path: Path) -> dict | None:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
 class _SafeFormatMap(dict):
     """dict subclass that returns the original ``{key}`` for missing keys."""
 
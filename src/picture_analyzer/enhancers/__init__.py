@@ -3,15 +3,26 @@
 Key components:
   - ``FilterPipeline``:         Compose and apply image filters
   - ``RecommendationParser``:   Convert AI text → FilterPipeline
+  - ``load_preview``:           Decode a low-resolution proxy for previews
   - ``SlideRestorer``:          Restore scanned slides with typed profiles
+  - ``SlideClassifier``:        Pick a slide profile from image statistics
+  - ``assess_quality``:         Measure exposure/colour/sharpness → recommendations
+  - ``EnhancementPool``:        Bounded process pool for batch image work
   - ``filters``:                Individual ImageFilter implementations
 """
-from .pipeline import FilterPipeline, RecommendationParser, enhance_image
+from .pipeline import FilterPipeline, RecommendationParser, enhance_image, load_preview
+from .profiles.classifier import SlideClassifier
 from .profiles.slide_restorer import SlideRestorer
+from .quality import assess_quality
+from .workers import EnhancementPool
 
 __all__ = [
+    "EnhancementPool",
     "FilterPipeline",
     "RecommendationParser",
+    "SlideClassifier",
     "SlideRestorer",
+    "assess_quality",
     "enhance_image",
+    "load_preview",
 ]
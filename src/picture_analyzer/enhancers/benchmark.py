@@ -0,0 +1,380 @@
+"""Throughput benchmarks for filters, slide profiles and AI recommendations.
+
+Times every filter in :mod:`~picture_analyzer.enhancers.filters`, every
+slide restoration profile and a few representative
+``RecommendationParser`` → ``FilterPipeline`` runs on synthetic images
+of increasing size, so the resolution scaling of each hot path is
+visible at a glance::
+
+    results = run_benchmarks(sizes=[1, 12, 100])
+    save_baseline(results, "benchmarks/baseline.json")
+
+    # later, on the same machine
+    regressions = compare(run_benchmarks(sizes=[1, 12]), load_baseline(...))
+
+Each result records throughput (megapixels per second, best of
+``repeat`` runs) and peak resident memory above the pre-run level.
+Peak memory is sampled from ``/proc/self/statm``; where that is not
+available it falls back to the process high-water mark and is only
+reported when the case raised it.
+
+Baselines are plain JSON keyed by ``group/name@MP``.  They are
+machine-specific: record one per host and compare like with like.
+"""
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from PIL import Image
+
+from .filters import (
+    BrightnessFilter,
+    ClarityFilter,
+    ColorBalanceFilter,
+    ColorChannelFilter,
+    ColorTemperatureFilter,
+    ContrastFilter,
+    DenoiseFilter,
+    DespeckleFilter,
+    SaturationFilter,
+    ShadowsHighlightsFilter,
+    SharedBlurFilter,
+    SharpnessFilter,
+    UnsharpMaskFilter,
+    VibranceFilter,
+)
+from .pipeline import FilterPipeline, RecommendationParser
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+# Default resolution ladder in megapixels.
+DEFAULT_SIZES: tuple[float, ...] = (1, 4, 12, 24, 50, 100)
+
+# A throughput drop larger than this fraction of the baseline is a regression.
+DEFAULT_TOLERANCE = 0.25
+
+# Representative settings for each filter; the values sit in the range the
+# analysis prompt typically recommends.
+FILTER_CASES: dict[str, Callable[[], Any]] = {
+    "Brightness": lambda: BrightnessFilter(1.15),
+    "Contrast": lambda: ContrastFilter(1.2),
+    "Saturation": lambda: SaturationFilter(1.25),
+    "Sharpness": lambda: SharpnessFilter(1.4),
+    "UnsharpMask": lambda: UnsharpMaskFilter(radius=1.5, percent=80, threshold=0),
+    "ColorTemperature": lambda: ColorTemperatureFilter(5800),
+    "ShadowsHighlights": lambda: ShadowsHighlightsFilter(20, -10),
+    "Clarity": lambda: ClarityFilter(20),
+    "Vibrance": lambda: VibranceFilter(1.2),
+    "ColorChannel": lambda: ColorChannelFilter("red", 0.9),
+    "Despeckle": lambda: DespeckleFilter(3),
+    "ColorBalance": lambda: ColorBalanceFilter(0.95, 1.0, 1.08),
+    "Denoise": lambda: DenoiseFilter(0.5),
+    "SharedBlur": lambda: SharedBlurFilter(
+        [ClarityFilter(20), UnsharpMaskFilter(radius=2.0, percent=60, threshold=0)]
+    ),
+}
+
+# Recommendation sets in the format produced by the analysis prompt.
+RECOMMENDATION_CASES: dict[str, list[str]] = {
+    "basic": [
+        "BRIGHTNESS: increase by 10%",
+        "CONTRAST: boost by 15%",
+        "SATURATION: increase by 10%",
+    ],
+    "color": [
+        "COLOR_TEMPERATURE: warm by 500K",
+        "RED_CHANNEL: reduce by 8%",
+        "VIBRANCE: increase by 20%",
+        "SHADOWS_HIGHLIGHTS: shadows +15%, highlights -10%",
+    ],
+    "full": [
+        "BRIGHTNESS: increase by 10%",
+        "CONTRAST: boost by 15%",
+        "COLOR_TEMPERATURE: warm by 500K",
+        "SATURATION: increase by 10%",
+        "CLARITY: boost by 20%",
+        "UNSHARP_MASK: radius=1.5px, strength=80%, threshold=0",
+        "SHARPNESS: increase by 20%",
+    ],
+    "sharpening": [
+        "SHARPNESS: increase by 30%",
+        "CLARITY: boost by 25%",
+        "UNSHARP_MASK: radius=2px, strength=60%, threshold=0",
+    ],
+}
+
+# Recommendation sets also timed with ``share_blurs=True``.
+SHARED_BLUR_CASES = ("full", "sharpening")
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing for one case at one resolution."""
+
+    group: str
+    name: str
+    megapixels: float
+    seconds: float
+    mp_per_s: float
+    peak_mb: float | None
+
+    @property
+    def key(self) -> str:
+        """Baseline key, e.g. ``filter/Vibrance@12``."""
+        return f"{self.group}/{self.name}@{self.megapixels:g}"
+
+
+@dataclass
+class Regression:
+    """A case whose throughput fell below the baseline tolerance."""
+
+    key: str
+    baseline_mp_per_s: float
+    mp_per_s: float
+
+    @property
+    def change(self) -> float:
+        """Relative throughput change (negative = slower)."""
+        return self.mp_per_s / self.baseline_mp_per_s - 1.0
+
+
+@dataclass
+class BenchmarkCase:
+    """A named pipeline factory to time."""
+
+    group: str
+    name: str
+    build: Callable[[], FilterPipeline]
+
+
+# ── Synthetic input ─────────────────────────────────────────────────
+
+
+def synthetic_image(megapixels: float) -> Image.Image:
+    """Synthetic 3:2 RGB test image of roughly *megapixels* MP.
+
+    Smooth gradients with noise on top, so histogram-driven filters
+    (contrast) and edge-driven ones (sharpening, despeckle) both see
+    realistic content.
+    """
+    height = max(2, round((megapixels * 1_000_000 / 1.5) ** 0.5))
+    width = max(2, round(height * 1.5))
+    horizontal = Image.linear_gradient("L").transpose(Image.Transpose.ROTATE_90).resize(
+        (width, height)
+    )
+    vertical = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 40)
+    return Image.merge("RGB", (horizontal, vertical, noise))
+
+
+# ── Cases ───────────────────────────────────────────────────────────
+
+
+def default_cases() -> list[BenchmarkCase]:
+    """Every filter, every slide profile and the recommendation sets."""
+    from .profiles.slide_restorer import SlideRestorer
+
+    cases = [
+        BenchmarkCase("filter", name, lambda make=make: FilterPipeline([make()], verbose=False))
+        for name, make in FILTER_CASES.items()
+    ]
+
+    restorer = SlideRestorer()
+    for profile_name in restorer.available_profiles:
+        profile = restorer.get_profile(profile_name)
+
+        def build(profile=profile) -> FilterPipeline:
+            with contextlib.redirect_stdout(io.StringIO()):
+                return restorer.build_pipeline(profile)
+
+        cases.append(BenchmarkCase("profile", profile_name, build))
+
+    parser = RecommendationParser()
+    variants = [(name, False) for name in RECOMMENDATION_CASES]
+    variants += [(name, True) for name in SHARED_BLUR_CASES]
+    for name, share_blurs in variants:
+
+        def build(recommendations=RECOMMENDATION_CASES[name], share_blurs=share_blurs):
+            with contextlib.redirect_stdout(io.StringIO()):
+                pipeline = parser.parse(recommendations)
+            pipeline.verbose = False
+            pipeline.share_blurs = share_blurs
+            return pipeline
+
+        label = f"{name}+shared_blurs" if share_blurs else name
+        cases.append(BenchmarkCase("recommendations", label, build))
+
+    return cases
+
+
+def select_cases(cases: Iterable[BenchmarkCase], only: str | None) -> list[BenchmarkCase]:
+    """Cases whose ``group/name`` contains *only* (case-insensitive)."""
+    if not only:
+        return list(cases)
+    needle = only.lower()
+    return [c for c in cases if needle in f"{c.group}/{c.name}".lower()]
+
+
+# ── Measurement ─────────────────────────────────────────────────────
+
+
+def _rss_mb() -> float | None:
+    try:
+        with open("/proc/self/statm") as fh:
+            pages = int(fh.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1_048_576
+
+
+def _max_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class _PeakMemory:
+    """Samples resident memory on a background thread while active."""
+
+    _INTERVAL = 0.005
+
+    def __init__(self):
+        self.peak_mb: float | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> _PeakMemory:
+        self._start = _rss_mb()
+        if self._start is None:
+            self._start_max = _max_rss_mb()
+            return self
+        self._peak = self._start
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self) -> None:
+        while not self._stop.is_set():
+            rss = _rss_mb()
+            if rss is not None and rss > self._peak:
+                self._peak = rss
+            self._stop.wait(self._INTERVAL)
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            rss = _rss_mb() or self._peak
+            self.peak_mb = max(self._peak, rss) - self._start
+        elif self._start_max is not None:
+            grown = (_max_rss_mb() or 0.0) - self._start_max
+            self.peak_mb = grown if grown > 0 else None
+
+
+def measure(
+    case: BenchmarkCase, image: Image.Image, repeat: int = 3
+) -> BenchmarkResult:
+    """Time *case* on *image*; throughput is taken from the fastest run."""
+    megapixels = image.width * image.height / 1_000_000
+    pipeline = case.build()
+    best = float("inf")
+    peak: float | None = None
+    for _ in range(max(1, repeat)):
+        with _PeakMemory() as memory:
+            started = time.perf_counter()
+            result = pipeline.run(image)
+            elapsed = time.perf_counter() - started
+            del result
+        best = min(best, elapsed)
+        if memory.peak_mb is not None:
+            peak = max(peak or 0.0, memory.peak_mb)
+    return BenchmarkResult(
+        group=case.group,
+        name=case.name,
+        megapixels=round(megapixels, 2),
+        seconds=best,
+        mp_per_s=megapixels / best if best > 0 else float("inf"),
+        peak_mb=peak,
+    )
+
+
+def run_benchmarks(
+    sizes: Sequence[float] = DEFAULT_SIZES,
+    cases: Sequence[BenchmarkCase] | None = None,
+    repeat: int = 3,
+    progress: Callable[[BenchmarkResult], None] | None = None,
+) -> list[BenchmarkResult]:
+    """Run every case at every size, smallest size first.
+
+    One synthetic image is generated per size and shared by all cases.
+    Result ``megapixels`` are the requested sizes, so keys stay stable
+    across runs.
+    """
+    cases = default_cases() if cases is None else list(cases)
+    results: list[BenchmarkResult] = []
+    for size in sorted(sizes):
+        image = synthetic_image(size)
+        for case in cases:
+            result = measure(case, image, repeat=repeat)
+            result.megapixels = size
+            results.append(result)
+            if progress is not None:
+                progress(result)
+        del image
+    return results
+
+
+# ── Baselines ───────────────────────────────────────────────────────
+
+
+def save_baseline(results: Iterable[BenchmarkResult], path: str | Path) -> None:
+    """Write *results* as a JSON baseline."""
+    data = {r.key: asdict(r) for r in results}
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def load_baseline(path: str | Path) -> dict[str, float]:
+    """Read a baseline written by :func:`save_baseline` as ``{key: MP/s}``."""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {key: float(entry["mp_per_s"]) for key, entry in data.items()}
+
+
+def compare(
+    results: Iterable[BenchmarkResult],
+    baseline: dict[str, float],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[Regression]:
+    """Cases slower than ``(1 - tolerance)`` × their baseline throughput.
+
+    Cases without a baseline entry are ignored.
+    """
+    regressions = []
+    for result in results:
+        reference = baseline.get(result.key)
+        if reference and result.mp_per_s < reference * (1.0 - tolerance):
+            regressions.append(Regression(result.key, reference, result.mp_per_s))
+    return regressions
+
+
+def format_result(result: BenchmarkResult) -> str:
+    """One aligned report line for *result*."""
+    peak = "     n/a" if result.peak_mb is None else f"{result.peak_mb:7.0f}M"
+    return (
+        f"{result.group + '/' + result.name:<40} {result.megapixels:>6g} MP "
+        f"{result.seconds * 1000:9.1f} ms {result.mp_per_s:9.1f} MP/s {peak}"
+    )
@@ -14,9 +14,13 @@ from .basic import (
 )
 from .advanced import (
     ClarityFilter,
+    ColorBalanceFilter,
     ColorChannelFilter,
     ColorTemperatureFilter,
+    DenoiseFilter,
+    DespeckleFilter,
     ShadowsHighlightsFilter,
+    SharedBlurFilter,
     UnsharpMaskFilter,
     VibranceFilter,
 )
@@ -27,9 +31,13 @@ __all__ = [
     "SaturationFilter",
     "SharpnessFilter",
     "ClarityFilter",
+    "ColorBalanceFilter",
     "ColorChannelFilter",
     "ColorTemperatureFilter",
+    "DenoiseFilter",
+    "DespeckleFilter",
     "ShadowsHighlightsFilter",
+    "SharedBlurFilter",
     "UnsharpMaskFilter",
     "VibranceFilter",
 ]
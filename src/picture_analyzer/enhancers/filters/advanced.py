@@ -7,12 +7,21 @@ from the legacy ``enhancement_filters.py`` module.
 Where possible, each filter operates on an in-memory PIL ``Image``
 rather than file paths (unlike the legacy functions).  This makes
 them composable via ``FilterPipeline``.
+
+Per-channel colour maps (colour temperature, single channel) run as a
+256-entry lookup table through ``Image.point``.  Filters that mix
+channels (shadows/highlights, vibrance) use the NumPy kernels in
+:mod:`.vectorized` and fall back to per-pixel loops without NumPy.
+
+Sharpening filters expose ``detail()`` so ``SharedBlurFilter`` can run
+several of them off one set of blurs.
 """
 from __future__ import annotations
 
 import colorsys
+import math
 
-from PIL import Image, ImageFilter as PILFilter
+from PIL import Image, ImageEnhance, ImageFilter as PILFilter
 
 from ...config.defaults import (
     DEFAULT_COLOR_TEMP_BASELINE,
@@ -20,6 +29,25 @@ from ...config.defaults import (
     LUMINANCE_GREEN,
     LUMINANCE_RED,
 )
+from . import vectorized
+from .lut import IDENTITY
+
+
+def blur_halo(radius: float) -> int:
+    """Rows of context a PIL Gaussian blur of *radius* reads on each side.
+
+    PIL approximates the Gaussian with three box-blur passes; each pass
+    reaches at most ``ceil(radius) + 1`` pixels.
+    """
+    return 3 * (math.ceil(radius) + 1)
+
+
+def detail_blur(image: Image.Image, kernel: tuple[str, float]) -> Image.Image:
+    """Blur *image* with a kernel returned by a filter's ``detail()``."""
+    kind, radius = kernel
+    if kind == "smooth":
+        return image.filter(PILFilter.SMOOTH)
+    return image.filter(PILFilter.GaussianBlur(radius))
 
 
 class UnsharpMaskFilter:
@@ -42,6 +70,10 @@ class UnsharpMaskFilter:
     def name(self) -> str:
         return "UnsharpMask"
 
+    @property
+    def halo(self) -> int:
+        return blur_halo(self.radius)
+
     def apply(self, image: Image.Image) -> Image.Image:
         return image.filter(
             PILFilter.UnsharpMask(
@@ -51,6 +83,10 @@ class UnsharpMaskFilter:
             )
         )
 
+    def detail(self) -> tuple[tuple[str, float], float, int]:
+        """Return ``(blur kernel, amount, threshold)`` for blur sharing."""
+        return ("gaussian", float(self.radius)), self.percent / 100.0, self.threshold
+
     def __repr__(self) -> str:
         return (
             f"UnsharpMaskFilter(radius={self.radius}, "
@@ -77,21 +113,14 @@ class ColorTemperatureFilter:
         if image.mode != "RGB":
             image = image.convert("RGB")
 
-        ratio = self.kelvin / DEFAULT_COLOR_TEMP_BASELINE
-        pixels = image.load()
-        width, height = image.size
-
-        out = Image.new("RGB", image.size)
-        out_px = out.load()
-
-        for y in range(height):
-            for x in range(width):
-                r, g, b = pixels[x, y][:3]
-                r = int(min(255, r * ratio))
-                b = int(min(255, b / ratio))
-                out_px[x, y] = (r, g, b)
+        return image.point(self.lut())
 
-        return out
+    def lut(self) -> list[int]:
+        """Return the filter as a 768-entry RGB lookup table."""
+        ratio = self.kelvin / DEFAULT_COLOR_TEMP_BASELINE
+        red = [int(min(255, v * ratio)) for v in range(256)]
+        blue = [int(min(255, v / ratio)) for v in range(256)]
+        return red + IDENTITY + blue
 
     def __repr__(self) -> str:
         return f"ColorTemperatureFilter(kelvin={self.kelvin})"
@@ -117,6 +146,18 @@ class ShadowsHighlightsFilter:
         if image.mode != "RGB":
             image = image.convert("RGB")
 
+        if vectorized.HAS_NUMPY:
+            return vectorized.from_array(
+                vectorized.shadows_highlights(
+                    vectorized.to_array(image),
+                    self.shadow_adjust,
+                    self.highlight_adjust,
+                )
+            )
+        return self._apply_pixelwise(image)
+
+    def _apply_pixelwise(self, image: Image.Image) -> Image.Image:
+        """Reference per-pixel implementation (used without NumPy)."""
         pixels = image.load()
         width, height = image.size
         out = Image.new("RGB", image.size)
@@ -167,6 +208,10 @@ class ClarityFilter:
     def name(self) -> str:
         return "Clarity"
 
+    @property
+    def halo(self) -> int:
+        return blur_halo(2.0)
+
     def apply(self, image: Image.Image) -> Image.Image:
         factor = 1.0 + (self.strength / 100.0)
         return image.filter(
@@ -175,6 +220,11 @@ class ClarityFilter:
             )
         )
 
+    def detail(self) -> tuple[tuple[str, float], float, int]:
+        """Return ``(blur kernel, amount, threshold)`` for blur sharing."""
+        percent = int((1.0 + self.strength / 100.0) * 100)
+        return ("gaussian", 2.0), percent / 100.0, 3
+
     def __repr__(self) -> str:
         return f"ClarityFilter(strength={self.strength})"
 
@@ -197,6 +247,14 @@ class VibranceFilter:
         if image.mode != "RGB":
             image = image.convert("RGB")
 
+        if vectorized.HAS_NUMPY:
+            return vectorized.from_array(
+                vectorized.vibrance(vectorized.to_array(image), self.factor)
+            )
+        return self._apply_pixelwise(image)
+
+    def _apply_pixelwise(self, image: Image.Image) -> Image.Image:
+        """Reference per-pixel implementation (used without NumPy)."""
         pixels = image.load()
         width, height = image.size
         out = Image.new("RGB", image.size)
@@ -238,21 +296,185 @@ class ColorChannelFilter:
         if image.mode != "RGB":
             image = image.convert("RGB")
 
+        return image.point(self.lut())
+
+    def lut(self) -> list[int]:
+        """Return the filter as a 768-entry RGB lookup table."""
         idx = self.CHANNEL_INDEX.get(self.channel, 0)
-        pixels = image.load()
-        width, height = image.size
+        table = [IDENTITY] * 3
+        table[idx] = [int(min(255, v * self.factor)) for v in range(256)]
+        return table[0] + table[1] + table[2]
 
-        # Operate in-place on a copy
-        out = image.copy()
-        out_px = out.load()
+    def __repr__(self) -> str:
+        return f"ColorChannelFilter(channel='{self.channel}', factor={self.factor})"
 
-        for y in range(height):
-            for x in range(width):
-                channels = list(pixels[x, y][:3])
-                channels[idx] = int(min(255, channels[idx] * self.factor))
-                out_px[x, y] = tuple(channels)
 
-        return out
+# ── Restoration filters ─────────────────────────────────────────────
+
+
+class DespeckleFilter:
+    """Remove dust and speckles with a median filter.
+
+    Args:
+        size: Median window size (odd, 3 = 3×3).
+    """
+
+    def __init__(self, size: int = 3):
+        self.size = size
+
+    @property
+    def name(self) -> str:
+        return "Despeckle"
+
+    @property
+    def halo(self) -> int:
+        return self.size // 2
+
+    def apply(self, image: Image.Image) -> Image.Image:
+        return image.filter(PILFilter.MedianFilter(size=self.size))
 
     def __repr__(self) -> str:
-        return f"ColorChannelFilter(channel='{self.channel}', factor={self.factor})"
+        return f"DespeckleFilter(size={self.size})"
+
+
+class ColorBalanceFilter:
+    """Scale the red, green and blue channels independently.
+
+    Args:
+        red: Red channel multiplier.
+        green: Green channel multiplier.
+        blue: Blue channel multiplier.
+    """
+
+    def __init__(self, red: float = 1.0, green: float = 1.0, blue: float = 1.0):
+        self.red = red
+        self.green = green
+        self.blue = blue
+
+    @property
+    def name(self) -> str:
+        return "ColorBalance"
+
+    def apply(self, image: Image.Image) -> Image.Image:
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        return image.point(self.lut())
+
+    def lut(self) -> list[int]:
+        """Return the filter as a 768-entry RGB lookup table."""
+        # Brightness per band, exactly as the legacy split/enhance/merge did.
+        ramp = Image.frombytes("L", (256, 1), bytes(IDENTITY))
+        return [
+            v
+            for factor in (self.red, self.green, self.blue)
+            for v in ImageEnhance.Brightness(ramp).enhance(factor).tobytes()
+        ]
+
+    def __repr__(self) -> str:
+        return (
+            f"ColorBalanceFilter(red={self.red}, "
+            f"green={self.green}, blue={self.blue})"
+        )
+
+
+class DenoiseFilter:
+    """Soften film grain with a light Gaussian blur.
+
+    Args:
+        radius: Blur radius in pixels (0.5 is a light touch).
+    """
+
+    def __init__(self, radius: float = 0.5):
+        self.radius = radius
+
+    @property
+    def name(self) -> str:
+        return "Denoise"
+
+    @property
+    def halo(self) -> int:
+        return blur_halo(self.radius)
+
+    def apply(self, image: Image.Image) -> Image.Image:
+        return image.filter(PILFilter.GaussianBlur(radius=self.radius))
+
+    def __repr__(self) -> str:
+        return f"DenoiseFilter(radius={self.radius})"
+
+
+class SharedBlurFilter:
+    """Run several sharpening filters off one set of blurs.
+
+    Sharpness, unsharp mask and clarity each add a detail layer
+    ``image - blur(image)``.  Applied one after another, every filter
+    blurs the previous filter's output.  This filter instead measures
+    all detail layers against the same input, so members that use the
+    same kernel (e.g. clarity and a 2 px unsharp mask) share one blur.
+
+    Layers with the same kernel and threshold collapse into one; if
+    only one layer remains it runs as a single PIL unsharp mask (or
+    sharpness blend).  Otherwise the blurs are computed once each and
+    the layers are summed in one NumPy pass; without NumPy the members
+    run sequentially.
+
+    This is an approximation.  Layers that share a kernel become one
+    mask with the summed amount, whereas applied in turn the second
+    mask also sharpens the first one's edges; and the parallel form
+    drops those cross terms between different kernels too.  Results
+    differ from sequential application by 1–3 levels on average and up
+    to ~30 levels on fine noise and hard edges.
+
+    Args:
+        filters: Filters that provide ``detail()``.
+    """
+
+    def __init__(self, filters):
+        self.filters = list(filters)
+
+    @property
+    def name(self) -> str:
+        return "+".join(f.name for f in self.filters)
+
+    @property
+    def halo(self) -> int:
+        return max(f.halo for f in self.filters)
+
+    def layers(self) -> dict[tuple[tuple[str, float], int], float]:
+        """Summed amount per ``(kernel, threshold)``, in first-use order."""
+        merged: dict[tuple[tuple[str, float], int], float] = {}
+        for f in self.filters:
+            kernel, amount, threshold = f.detail()
+            merged[kernel, threshold] = merged.get((kernel, threshold), 0.0) + amount
+        return merged
+
+    def apply(self, image: Image.Image) -> Image.Image:
+        layers = self.layers()
+        if len(layers) == 1:
+            ((kernel, threshold), amount), = layers.items()
+            kind, radius = kernel
+            if kind == "smooth":
+                return ImageEnhance.Sharpness(image).enhance(1.0 + amount)
+            return image.filter(
+                PILFilter.UnsharpMask(
+                    radius=radius, percent=round(amount * 100), threshold=threshold
+                )
+            )
+
+        if not vectorized.HAS_NUMPY or image.mode != "RGB":
+            for f in self.filters:
+                image = f.apply(image)
+            return image
+
+        blurs: dict = {}
+        for kernel, _ in layers:
+            if kernel not in blurs:
+                blurs[kernel] = vectorized.to_array(detail_blur(image, kernel))
+        return vectorized.from_array(
+            vectorized.add_details(
+                vectorized.to_array(image),
+                [(blurs[kernel], amount, threshold) for (kernel, threshold), amount in layers.items()],
+            )
+        )
+
+    def __repr__(self) -> str:
+        return f"SharedBlurFilter({self.filters!r})"
@@ -7,6 +7,8 @@ from __future__ import annotations
 
 from PIL import Image, ImageEnhance
 
+from . import lut as _lut
+
 
 class BrightnessFilter:
     """Adjust image brightness.
@@ -25,6 +27,10 @@ class BrightnessFilter:
     def apply(self, image: Image.Image) -> Image.Image:
         return ImageEnhance.Brightness(image).enhance(self.factor)
 
+    def lut(self) -> list[int]:
+        """Return the filter as a 768-entry RGB lookup table."""
+        return _lut.read_lut(self.apply(_lut.ramp()))
+
     def __repr__(self) -> str:
         return f"BrightnessFilter(factor={self.factor})"
 
@@ -32,21 +38,44 @@ class BrightnessFilter:
 class ContrastFilter:
     """Adjust image contrast.
 
+    Contrast is stretched around the image's mean grey level.  Passing
+    *mean* pins that pivot, which makes the filter a pure point-wise map
+    (used when fusing filters or processing an image in strips).
+
     Args:
         factor: 1.0 = unchanged, <1 = less contrast, >1 = more contrast.
+        mean: Fixed pivot grey level (0–255), or ``None`` to measure it.
     """
 
-    def __init__(self, factor: float = 1.0):
+    def __init__(self, factor: float = 1.0, mean: int | None = None):
         self.factor = factor
+        self.mean = mean
 
     @property
     def name(self) -> str:
         return "Contrast"
 
     def apply(self, image: Image.Image) -> Image.Image:
-        return ImageEnhance.Contrast(image).enhance(self.factor)
+        if self.mean is None:
+            return ImageEnhance.Contrast(image).enhance(self.factor)
+        # Same blend as ImageEnhance.Contrast, against a fixed grey.
+        grey = Image.new("L", image.size, self.mean).convert(image.mode)
+        if "A" in image.getbands():
+            grey.putalpha(image.getchannel("A"))
+        return Image.blend(grey, image, self.factor)
+
+    def lut(self) -> list[int]:
+        """Return the filter as a 768-entry RGB lookup table.
+
+        Only defined once the pivot is fixed via ``mean``.
+        """
+        if self.mean is None:
+            raise ValueError("ContrastFilter.lut() requires a fixed mean")
+        return _lut.read_lut(self.apply(_lut.ramp()))
 
     def __repr__(self) -> str:
+        if self.mean is not None:
+            return f"ContrastFilter(factor={self.factor}, mean={self.mean})"
         return f"ContrastFilter(factor={self.factor})"
 
 
@@ -85,8 +114,21 @@ class SharpnessFilter:
     def name(self) -> str:
         return "Sharpness"
 
+    @property
+    def halo(self) -> int:
+        # ImageEnhance.Sharpness blends with a 3×3 SMOOTH kernel.
+        return 1
+
     def apply(self, image: Image.Image) -> Image.Image:
         return ImageEnhance.Sharpness(image).enhance(self.factor)
 
+    def detail(self) -> tuple[tuple[str, float], float, int]:
+        """Return ``(blur kernel, amount, threshold)`` as an unsharp mask.
+
+        Blending away from the smoothed image is
+        ``image + (factor - 1) * (image - smooth)``.
+        """
+        return ("smooth", 0.0), self.factor - 1.0, 0
+
     def __repr__(self) -> str:
         return f"SharpnessFilter(factor={self.factor})"
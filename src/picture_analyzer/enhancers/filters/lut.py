@@ -0,0 +1,89 @@
+"""Lookup-table helpers for point-wise filters.
+
+A point-wise filter maps every pixel independently of its neighbours,
+so it can be captured once as a table and replayed over the whole image
+in a single ``Image.point`` (per channel) or ``Color3DLUT`` (channels
+mixed) pass.  ``FilterPipeline`` uses these helpers to fuse runs of such
+filters instead of materialising an intermediate image per filter.
+
+Per-channel tables use PIL's layout for RGB: 768 entries, 256 for each
+of R, G and B.
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from PIL import Image
+from PIL import ImageFilter as PILFilter
+
+from ...config.defaults import LUMINANCE_BLUE, LUMINANCE_GREEN, LUMINANCE_RED
+
+IDENTITY = list(range(256))
+
+# Grid size for 3D tables.  255 / (52 - 1) == 5, so every grid point is an
+# exact 8-bit level and filters can be evaluated on real pixel values.
+LUT3D_SIZE = 52
+_LUT3D_STEP = 255 // (LUT3D_SIZE - 1)
+
+
+def ramp() -> Image.Image:
+    """Return a 256×1 RGB image whose pixel *i* is ``(i, i, i)``."""
+    return Image.frombytes("RGB", (256, 1), bytes(v for v in range(256) for _ in range(3)))
+
+
+def read_lut(image: Image.Image) -> list[int]:
+    """Read a filtered :func:`ramp` back as a 768-entry RGB table."""
+    data = image.convert("RGB").tobytes()
+    return list(data[0::3]) + list(data[1::3]) + list(data[2::3])
+
+
+def compose(first: Sequence[int], second: Sequence[int]) -> list[int]:
+    """Return the table equivalent to applying *first* then *second*."""
+    return [
+        second[base + first[base + v]]
+        for base in (0, 256, 512)
+        for v in range(256)
+    ]
+
+
+def grey_mean(histogram: Sequence[int], table: Sequence[int]) -> int:
+    """Mean grey level of an image after *table*, from its RGB histogram.
+
+    Mirrors ``ImageEnhance.Contrast``'s ``int(mean(L) + 0.5)`` using the
+    ITU-R 601 weights on the per-channel means, so it can be evaluated
+    without materialising the mapped image.  Per-pixel rounding in PIL's
+    ``L`` conversion is not reproduced, which can move the mean by one
+    level in rare cases.
+    """
+    count = sum(histogram[0:256]) or 1
+    means = [
+        sum(histogram[base + v] * table[base + v] for v in range(256)) / count
+        for base in (0, 256, 512)
+    ]
+    luminance = (
+        LUMINANCE_RED * means[0] + LUMINANCE_GREEN * means[1] + LUMINANCE_BLUE * means[2]
+    )
+    return int(luminance + 0.5)
+
+
+def grid() -> Image.Image:
+    """Return the ``LUT3D_SIZE``³ sample points as a one-row RGB image.
+
+    Points are ordered red-fastest, blue-slowest, matching the table
+    layout expected by ``ImageFilter.Color3DLUT``.
+    """
+    levels = [i * _LUT3D_STEP for i in range(LUT3D_SIZE)]
+    data = bytes(
+        channel
+        for b in levels
+        for g in levels
+        for r in levels
+        for channel in (r, g, b)
+    )
+    return Image.frombytes("RGB", (LUT3D_SIZE**3, 1), data)
+
+
+def read_lut3d(image: Image.Image) -> PILFilter.Color3DLUT:
+    """Turn a filtered :func:`grid` into a ``Color3DLUT`` filter."""
+    table = [v / 255.0 for v in image.convert("RGB").tobytes()]
+    return PILFilter.Color3DLUT(LUT3D_SIZE, table)
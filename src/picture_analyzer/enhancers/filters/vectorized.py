@@ -0,0 +1,160 @@
+"""Whole-array kernels for the per-pixel colour filters.
+
+The advanced colour filters were originally written as nested Python
+loops over ``Image.load()`` pixel access, which costs several seconds
+per megapixel.  This module holds equivalent NumPy implementations that
+operate on ``uint8`` ``(height, width, 3)`` arrays.
+
+Each kernel reproduces the arithmetic of the original loop in the same
+order and in float64, then truncates like ``int()`` did, so results
+match the per-pixel reference exactly (the tests allow ±1 level).
+
+Work is done in horizontal bands of ``BAND_ROWS`` rows so the float64
+temporaries stay small even for 100 MP scans.
+
+NumPy is optional (``pip install picture-analyzer[numpy]``).  When it is
+not installed ``HAS_NUMPY`` is ``False`` and the filters fall back to
+their pure-Python loops.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from PIL import Image
+
+from ...config.defaults import LUMINANCE_BLUE, LUMINANCE_GREEN, LUMINANCE_RED
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None  # type: ignore[assignment]
+    HAS_NUMPY = False
+
+# Rows processed per band; 256 rows of a 100 MP frame is ~60 MB of float64.
+BAND_ROWS = 256
+
+
+def to_array(image: Image.Image) -> Any:
+    """Return *image* as a ``uint8`` ``(h, w, 3)`` array (RGB)."""
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    return np.asarray(image, dtype=np.uint8)
+
+
+def from_array(array: Any) -> Image.Image:
+    """Wrap a ``uint8`` ``(h, w, 3)`` array as an RGB image."""
+    return Image.fromarray(array, mode="RGB")
+
+
+def map_bands(array: Any, kernel: Callable[[Any], Any]) -> Any:
+    """Apply *kernel* to consecutive row bands of *array*.
+
+    *kernel* receives a float64 view of one band and returns the float
+    result for it; the result is truncated into a fresh ``uint8`` array.
+    """
+    out = np.empty_like(array)
+    for top in range(0, array.shape[0], BAND_ROWS):
+        band = array[top : top + BAND_ROWS].astype(np.float64)
+        result = kernel(band)
+        np.clip(result, 0, 255, out=result)
+        out[top : top + BAND_ROWS] = result.astype(np.uint8)
+    return out
+
+
+def shadows_highlights(array: Any, shadow_adjust: float, highlight_adjust: float) -> Any:
+    """Scale dark pixels by the shadow factor and bright ones by the highlight factor."""
+    shadow_factor = 1.0 + (shadow_adjust / 100.0)
+    highlight_factor = 1.0 + (highlight_adjust / 100.0)
+
+    def kernel(band: Any) -> Any:
+        luminance = (
+            LUMINANCE_RED * band[..., 0]
+            + LUMINANCE_GREEN * band[..., 1]
+            + LUMINANCE_BLUE * band[..., 2]
+        ) / 255.0
+        factor = np.where(
+            luminance < 0.5,
+            shadow_factor,
+            np.where(luminance > 0.5, highlight_factor, 1.0),
+        )
+        return band * factor[..., None]
+
+    return map_bands(array, kernel)
+
+
+def vibrance(array: Any, factor: float) -> Any:
+    """Scale HSV saturation by *factor*, mirroring :mod:`colorsys`."""
+
+    def kernel(band: Any) -> Any:
+        rgb = band / 255.0
+        r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+
+        # colorsys.rgb_to_hsv
+        maxc = rgb.max(axis=-1)
+        minc = rgb.min(axis=-1)
+        rangec = maxc - minc
+        grey = minc == maxc
+        safe_range = np.where(grey, 1.0, rangec)
+        s = np.where(grey, 0.0, rangec / np.where(maxc == 0.0, 1.0, maxc))
+        rc = (maxc - r) / safe_range
+        gc = (maxc - g) / safe_range
+        bc = (maxc - b) / safe_range
+        h = np.where(
+            r == maxc,
+            bc - gc,
+            np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc),
+        )
+        h = np.where(grey, 0.0, (h / 6.0) % 1.0)
+        v = maxc
+
+        s = np.minimum(1.0, s * factor)
+
+        # colorsys.hsv_to_rgb
+        sector = np.trunc(h * 6.0)
+        f = (h * 6.0) - sector
+        p = v * (1.0 - s)
+        q = v * (1.0 - s * f)
+        t = v * (1.0 - s * (1.0 - f))
+        sector = sector.astype(np.int64) % 6
+
+        choices_r = (v, q, p, p, t, v)
+        choices_g = (t, v, v, q, p, p)
+        choices_b = (p, p, t, v, v, q)
+        conditions = [sector == i for i in range(6)]
+        achromatic = s == 0.0
+
+        out = np.empty_like(band)
+        out[..., 0] = np.where(achromatic, v, np.select(conditions, choices_r))
+        out[..., 1] = np.where(achromatic, v, np.select(conditions, choices_g))
+        out[..., 2] = np.where(achromatic, v, np.select(conditions, choices_b))
+        return out * 255
+
+    return map_bands(array, kernel)
+
+
+def add_details(array: Any, layers: Iterable[tuple[Any, float, int]]) -> Any:
+    """Add several unsharp-mask detail layers to *array* in one pass.
+
+    Each layer is ``(blurred, amount, threshold)``: the detail
+    ``array - blurred`` is scaled by *amount* and, like PIL's
+    ``UnsharpMask``, dropped where its magnitude does not exceed
+    *threshold*.
+    All layers are measured against the same *array*.
+    """
+    layers = list(layers)
+    out = np.empty_like(array)
+    for top in range(0, array.shape[0], BAND_ROWS):
+        band = array[top : top + BAND_ROWS].astype(np.float32)
+        result = band.copy()
+        for blurred, amount, threshold in layers:
+            detail = band - blurred[top : top + BAND_ROWS]
+            if threshold:
+                detail[np.abs(detail) <= threshold] = 0.0
+            result += amount * detail
+        result += 0.5
+        np.clip(result, 0, 255, out=result)
+        out[top : top + BAND_ROWS] = result.astype(np.uint8)
+    return out
@@ -4,19 +4,22 @@ Provides:
   - ``FilterPipeline``: composes multiple ``ImageFilter`` instances
   - ``RecommendationParser``: converts AI text recommendations to filters
   - ``enhance_from_analysis``: top-level convenience function
+  - ``load_preview`` / ``make_proxy``: low-resolution proxies for previews
 """
 from __future__ import annotations
 
 import re
+from pathlib import Path
 from typing import Any, Dict, List, Optional, Sequence
 
-from PIL import Image
+from PIL import ExifTags, Image, ImageOps
 
 from ..config.defaults import (
     DEFAULT_CHANNEL_FACTOR_RANGE,
     DEFAULT_COLOR_TEMP_BASELINE,
     DEFAULT_JPEG_QUALITY,
     DEFAULT_KELVIN_RANGE,
+    DEFAULT_PREVIEW_LONG_EDGE,
 )
 from ..core.models import AnalysisResult, Enhancement
 from .filters.basic import (
@@ -30,9 +33,19 @@ from .filters.advanced import (
     ColorChannelFilter,
     ColorTemperatureFilter,
     ShadowsHighlightsFilter,
+    SharedBlurFilter,
     UnsharpMaskFilter,
     VibranceFilter,
 )
+from .filters import lut as _lut
+
+# Point-wise filters that mix channels; fusable only through a 3D LUT.
+_COLOR_MAP_FILTERS = (SaturationFilter, ShadowsHighlightsFilter, VibranceFilter)
+
+# Strip mode: full-width copies of a strip alive at once (input, output
+# and a filter temporary such as a blur), and the smallest useful strip.
+_STRIP_WORKING_COPIES = 4
+_MIN_STRIP_ROWS = 64
 
 
 class FilterPipeline:
@@ -45,10 +58,57 @@ class FilterPipeline:
         pipeline.add(ContrastFilter(1.15))
         result = pipeline.run(Image.open("photo.jpg"))
         result.save("enhanced.jpg")
+
+    Consecutive point-wise filters (those with a ``lut()`` method:
+    brightness, contrast, colour temperature, colour channel) are fused
+    into one 768-entry table and applied with a single ``Image.point``
+    pass.  With ``lut3d=True`` runs may also include the channel-mixing
+    colour maps (saturation, shadows/highlights, vibrance); they are then
+    sampled into a ``Color3DLUT``, which interpolates between grid points
+    and is therefore not bit-exact.
+
+    With ``memory_budget_mb`` set, images whose working set would exceed
+    the budget are processed in horizontal strips (see :meth:`run_tiled`).
+
+    With ``share_blurs=True``, consecutive sharpening filters (sharpness,
+    unsharp mask, clarity) that use the same blur kernel run as one
+    ``SharedBlurFilter``: each distinct blur is computed once and every
+    detail layer is taken from the same input.  Like ``lut3d`` this
+    trades exactness for speed: same-kernel layers are summed into one
+    mask instead of sharpening each other's output, so multi-pass
+    sharpening comes out a little softer than applied in turn (see
+    ``SharedBlurFilter``).
+
+    :meth:`preview` runs the same filters on a low-resolution proxy for
+    quick looks while tuning; :meth:`run` stays the full-resolution path.
+
+    Args:
+        filters: Initial filters, applied in order.
+        fuse: Fuse consecutive point-wise filters (default ``True``).
+        lut3d: Also fuse channel-mixing colour maps via a 3D LUT.
+        memory_budget_mb: Approximate working-memory cap for strip mode,
+            or ``None`` to always process the whole image at once.
+        share_blurs: Share blurs between consecutive sharpening filters
+            (approximate; see ``SharedBlurFilter``).
+        verbose: Print a progress line per filter.
     """
 
-    def __init__(self, filters: Sequence | None = None):
+    def __init__(
+        self,
+        filters: Sequence | None = None,
+        *,
+        fuse: bool = True,
+        lut3d: bool = False,
+        memory_budget_mb: float | None = None,
+        share_blurs: bool = False,
+        verbose: bool = True,
+    ):
         self._filters: list = list(filters or [])
+        self.fuse = fuse
+        self.lut3d = lut3d
+        self.memory_budget_mb = memory_budget_mb
+        self.share_blurs = share_blurs
+        self.verbose = verbose
 
     def add(self, f: Any) -> "FilterPipeline":
         """Add a filter to the end of the pipeline. Returns self for chaining."""
@@ -57,18 +117,284 @@ class FilterPipeline:
 
     def run(self, image: Image.Image) -> Image.Image:
         """Apply all filters in order and return the final image."""
+        return self._run(image, strips=True)
+
+    def _run(self, image: Image.Image, strips: bool) -> Image.Image:
         result = image
         if result.mode not in ("RGB", "RGBA"):
             result = result.convert("RGB")
 
-        for f in self._filters:
+        rows = self.strip_rows(result) if strips else None
+        if rows is not None and rows < result.height:
+            return self.run_tiled(result, rows)
+
+        for group in self._groups(fusable=self.fuse and result.mode == "RGB"):
+            self._announce(group)
+            result = self._apply_group(group, result)
+
+        return result
+
+    def preview(
+        self,
+        image: Image.Image | str | Path,
+        long_edge: int = DEFAULT_PREVIEW_LONG_EDGE,
+    ) -> Image.Image:
+        """Apply all filters to a proxy no larger than *long_edge* pixels.
+
+        *image* may be a path, in which case JPEGs are decoded at a
+        reduced scale (see :func:`load_preview`).  Filter parameters are
+        not rescaled, so spatial filters (sharpening, blur, despeckle)
+        act relatively stronger on the proxy than at full resolution.
+        """
+        if isinstance(image, (str, Path)):
+            proxy = load_preview(image, long_edge)
+        else:
+            proxy = make_proxy(image, long_edge)
+
+        return self._run(proxy, strips=False)  # a proxy always fits in memory
+
+    # ── Strip processing ─────────────────────────────────────────────
+
+    @property
+    def halo(self) -> int | None:
+        """Rows of context each strip needs above and below.
+
+        The sum of the spatial filters' reach, or ``None`` when a filter
+        does not declare one (such pipelines always run on the whole image).
+        """
+        total = 0
+        for f in self._stage_filters():
+            if hasattr(f, "halo"):
+                total += f.halo
+            elif not (hasattr(f, "lut") or isinstance(f, _COLOR_MAP_FILTERS)):
+                return None
+        return total
+
+    def strip_rows(self, image: Image.Image) -> int | None:
+        """Strip height that keeps *image* within ``memory_budget_mb``.
+
+        Returns ``None`` when no budget is set or the pipeline cannot be
+        split into strips.
+        """
+        if not self.memory_budget_mb or self.halo is None:
+            return None
+        row_bytes = image.width * len(image.getbands()) * _STRIP_WORKING_COPIES
+        rows = int(self.memory_budget_mb * 1024 * 1024 // row_bytes) - 2 * self.halo
+        return max(rows, _MIN_STRIP_ROWS, self.halo)
+
+    def run_tiled(
+        self, image: Image.Image, strip_rows: int, *, in_place: bool = False
+    ) -> Image.Image:
+        """Apply the filters strip by strip, overlapping strips by ``halo``.
+
+        Every strip is read with ``halo`` extra rows above and below so
+        blurs, unsharp masks and median filters see the same
+        neighbourhood as on the whole image; only the interior rows are
+        kept.  Contrast filters that measure the image mean split the
+        work into phases: the mean is accumulated from the finished
+        previous phase, exactly as ``ImageEnhance.Contrast`` would see it.
+
+        Args:
+            image: Source image (RGB or RGBA).
+            strip_rows: Interior rows per strip.
+            in_place: Write results back into *image*, so only one full
+                frame is ever held (the caller must own *image*).
+
+        Returns:
+            The processed image (*image* itself when ``in_place``).
+        """
+        halo = self.halo
+        if halo is None:
+            raise ValueError("Pipeline contains filters without a declared halo")
+
+        # Later phases run in place; the saved copy of overwritten rows
+        # must cover a full halo.
+        strip_rows = max(strip_rows, halo)
+        target = image if in_place else Image.new(image.mode, image.size)
+        source = image
+        fusable = self.fuse and image.mode == "RGB"
+
+        for phase in self._phases():
+            first = phase[0]
+            if isinstance(first, ContrastFilter) and first.mean is None:
+                phase = [
+                    ContrastFilter(first.factor, mean=self._strip_mean(source, strip_rows))
+                ] + phase[1:]
+            groups = FilterPipeline(phase, fuse=fusable, lut3d=self.lut3d)._groups(fusable)
+            stages = [self._compile(group) for group in groups]
+            for group in groups:
+                self._announce(group)
+            phase_halo = sum(getattr(f, "halo", 0) for f in phase)
+            self._process_strips(source, target, stages, strip_rows, phase_halo)
+            source = target
+
+        return target
+
+    def _phases(self) -> list[list]:
+        """Split the filters before every contrast filter that needs a mean."""
+        phases: list[list] = [[]]
+        for f in self._stage_filters():
+            if isinstance(f, ContrastFilter) and f.mean is None and phases[-1]:
+                phases.append([])
+            phases[-1].append(f)
+        return [phase for phase in phases if phase]
+
+    @staticmethod
+    def _strip_mean(image: Image.Image, strip_rows: int) -> int:
+        """Grey mean of *image* as ``ImageEnhance.Contrast`` measures it."""
+        histogram = [0] * 256
+        for top in range(0, image.height, strip_rows):
+            box = (0, top, image.width, min(image.height, top + strip_rows))
+            for level, count in enumerate(image.crop(box).convert("L").histogram()):
+                histogram[level] += count
+        total = sum(histogram) or 1
+        return int(sum(level * count for level, count in enumerate(histogram)) / total + 0.5)
+
+    @staticmethod
+    def _process_strips(
+        source: Image.Image,
+        target: Image.Image,
+        stages: list,
+        strip_rows: int,
+        halo: int,
+    ) -> None:
+        """Run *stages* over *source* in strips and paste them into *target*."""
+        width, height = source.size
+        in_place = source is target
+        saved: Image.Image | None = None  # original rows above the next strip
+
+        for top in range(0, height, strip_rows):
+            bottom = min(height, top + strip_rows)
+            read_top = max(0, top - halo)
+            read_bottom = min(height, bottom + halo)
+
+            if in_place and saved is not None and read_top < top:
+                # Rows above ``top`` were already overwritten; use the saved copy.
+                strip = Image.new(source.mode, (width, read_bottom - read_top))
+                strip.paste(saved.crop((0, saved.height - (top - read_top), width, saved.height)), (0, 0))
+                strip.paste(source.crop((0, top, width, read_bottom)), (0, top - read_top))
+            else:
+                strip = source.crop((0, read_top, width, read_bottom))
+
+            for stage in stages:
+                strip = stage(strip)
+
+            if in_place and halo:
+                saved = source.crop((0, max(0, bottom - halo), width, bottom))
+            interior = strip.crop((0, top - read_top, width, top - read_top + bottom - top))
+            target.paste(interior, (0, top))
+
+    # ── Group execution ──────────────────────────────────────────────
+
+    def _announce(self, group: list) -> None:
+        if not self.verbose:
+            return
+        for f in (m for g in group for m in getattr(g, "filters", [g])):
             factor_info = f""
             if hasattr(f, 'factor'):
                 factor_info = f" ({f.factor:.2f}x)"
             print(f"    → Adjusting {f.name.lower()}{factor_info}...")
-            result = f.apply(result)
 
-        return result
+    def _apply_group(self, group: list, image: Image.Image) -> Image.Image:
+        if len(group) == 1:
+            return group[0].apply(image)
+        return self._compile(group, image)(image)
+
+    def _stage_filters(self) -> list:
+        """The filters as executed: sharpening runs merged when sharing blurs.
+
+        A run of consecutive sharpening filters is merged only when two
+        of them use the same blur kernel; otherwise nothing is saved.
+        """
+        if not self.share_blurs:
+            return self._filters
+
+        stages: list = []
+        run: list = []
+        for f in self._filters + [None]:
+            if f is not None and hasattr(f, "detail"):
+                run.append(f)
+                continue
+            kernels = [member.detail()[0] for member in run]
+            if len(set(kernels)) < len(kernels):
+                stages.append(SharedBlurFilter(run))
+            else:
+                stages.extend(run)
+            run = []
+            if f is not None:
+                stages.append(f)
+        return stages
+
+    def _is_point(self, f: Any) -> bool:
+        return hasattr(f, "lut") or (self.lut3d and isinstance(f, _COLOR_MAP_FILTERS))
+
+    def _groups(self, fusable: bool) -> list[list]:
+        """Split the filters into runs that can be applied in one pass.
+
+        A contrast filter that still has to measure its pivot cannot follow
+        a channel-mixing filter in the same run: the grey mean is derived
+        from per-channel histograms, which such filters do not preserve.
+        """
+        filters = self._stage_filters()
+        if not fusable:
+            return [[f] for f in filters]
+
+        groups: list[list] = []
+        run: list = []
+        mixed = False
+        for f in filters:
+            if not self._is_point(f):
+                if run:
+                    groups.append(run)
+                groups.append([f])
+                run, mixed = [], False
+                continue
+            needs_mean = isinstance(f, ContrastFilter) and f.mean is None
+            if needs_mean and mixed:
+                groups.append(run)
+                run, mixed = [], False
+            run.append(f)
+            mixed = mixed or not hasattr(f, "lut")
+        if run:
+            groups.append(run)
+        return groups
+
+    @staticmethod
+    def _compile(group: list, image: Image.Image | None = None) -> Any:
+        """Turn a group into a callable ``image -> image``.
+
+        Single filters are returned as their ``apply``.  Runs of
+        point-wise filters become one ``Image.point`` table, or a
+        ``Color3DLUT`` when the run mixes channels.  *image* is only
+        needed when a contrast filter has to measure its mean.
+        """
+        if len(group) == 1:
+            return group[0].apply
+
+        table = _lut.IDENTITY * 3
+        histogram: list[int] | None = None
+        bound: list = []
+        mixed = False
+        for f in group:
+            if not hasattr(f, "lut"):
+                mixed = True
+            elif isinstance(f, ContrastFilter) and f.mean is None:
+                # Grouping guarantees no channel-mixing filter precedes this.
+                if histogram is None:
+                    histogram = image.histogram()
+                f = ContrastFilter(f.factor, mean=_lut.grey_mean(histogram, table))
+            if not mixed:
+                table = _lut.compose(table, f.lut())
+            bound.append(f)
+
+        if not mixed:
+            return lambda img: img.point(table)
+
+        sample = _lut.grid()
+        for f in bound:
+            sample = f.apply(sample)
+        lut3d = _lut.read_lut3d(sample)
+        return lambda img: img.filter(lut3d)
 
     @property
     def filters(self) -> list:
@@ -331,11 +657,58 @@ class RecommendationParser:
             print("  → Red Cast Removal → Red Channel: -15%")
 
 
+# ══════════════════════════════════════════════════════════════════════
+# Preview proxies
+# ══════════════════════════════════════════════════════════════════════
+
+
+def _proxy_size(size: tuple[int, int], long_edge: int) -> tuple[int, int]:
+    width, height = size
+    scale = long_edge / max(width, height)
+    if scale >= 1:
+        return width, height
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def upright(image: Image.Image) -> Image.Image:
+    """*image* turned by its EXIF orientation; *image* itself if already upright.
+
+    Enhanced and restored files are saved without EXIF, so the rotation
+    has to be applied to the pixels.
+    """
+    if image.getexif().get(ExifTags.Base.Orientation, 1) == 1:
+        return image
+    return ImageOps.exif_transpose(image)
+
+
+def make_proxy(image: Image.Image, long_edge: int = DEFAULT_PREVIEW_LONG_EDGE) -> Image.Image:
+    """Return an RGB copy of *image* scaled to at most *long_edge* pixels."""
+    proxy = image if image.mode in ("RGB", "RGBA") else image.convert("RGB")
+    size = _proxy_size(proxy.size, long_edge)
+    if size == proxy.size:
+        return proxy.copy()
+    return proxy.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+
+def load_preview(path: str | Path, long_edge: int = DEFAULT_PREVIEW_LONG_EDGE) -> Image.Image:
+    """Decode *path* straight to a proxy of at most *long_edge* pixels.
+
+    JPEGs are decoded with draft reduction (1/2, 1/4 or 1/8 scale in the
+    DCT domain), so a 100 MP scan never materialises at full size.  The
+    proxy is turned upright by its EXIF orientation, like the full render.
+    """
+    with Image.open(str(path)) as image:
+        image.draft("RGB", _proxy_size(image.size, long_edge))
+        return make_proxy(upright(image), long_edge)
+
+
 def enhance_image(
     image_path: str,
     recommendations: list[str | dict],
     output_path: str | None = None,
     jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+    memory_budget_mb: float | None = None,
+    share_blurs: bool = False,
 ) -> str | None:
     """Convenience function: parse recommendations and enhance an image.
 
@@ -344,6 +717,9 @@ def enhance_image(
         recommendations: AI recommendation strings.
         output_path: Where to save the result (defaults to overwrite source).
         jpeg_quality: JPEG save quality.
+        memory_budget_mb: Process in strips to stay under this budget.
+        share_blurs: Share blurs between consecutive sharpening filters
+            (approximate; see ``SharedBlurFilter``).
 
     Returns:
         Path to the saved image, or None on failure.
@@ -356,7 +732,9 @@ def enhance_image(
             print("No enhancement recommendations found")
             return None
 
-        image = Image.open(image_path)
+        pipeline.memory_budget_mb = memory_budget_mb
+        pipeline.share_blurs = share_blurs
+        image = upright(Image.open(image_path))
         result = pipeline.run(image)
         out = output_path or image_path
         result.save(out, quality=jpeg_quality)
@@ -0,0 +1,206 @@
+"""Local slide-condition classifier.
+
+Picks a restoration profile from image statistics alone, in a few
+milliseconds, as an alternative to asking a vision model
+(``SlideProfileStep``).  The image is reduced to a small proxy and
+summarised by:
+
+  - **colour cast**: the channel means projected on a red–green and a
+    yellow–blue axis (grey-world assumption), giving a cast strength
+    and direction;
+  - **saturation**: mean and spread of the HSV saturation channel;
+  - **contrast range**: the 2nd–98th percentile span of luminance.
+
+Each of the six built-in profiles gets a score in ``[0, 1]``:
+
+  - ``red_cast`` / ``yellow_cast`` / ``color_cast`` from the cast
+    strength, split by cast direction;
+  - ``faded`` from low saturation, low saturation spread and a
+    compressed tonal range;
+  - ``aged`` peaks for mild overall degradation;
+  - ``well_preserved`` is high when there is no degradation at all.
+
+Confidence combines the winning score with its margin over the
+runner-up, so ambiguous images report low confidence and can be handed
+to the LLM step instead.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image
+
+from ...config.defaults import LUMINANCE_BLUE, LUMINANCE_GREEN, LUMINANCE_RED
+
+# Long edge of the proxy the statistics are measured on.
+PROXY_LONG_EDGE = 256
+
+# Profiles reported with a score below this are dropped from the ranking.
+_MIN_SCORE = 0.15
+
+# Degradation level at which ``aged`` peaks, and its half-width.
+_AGED_PEAK = 0.35
+_AGED_WIDTH = 0.3
+
+
+@dataclass(frozen=True)
+class SlideFeatures:
+    """Image statistics used for classification (all roughly 0–1)."""
+
+    red_green: float
+    """Red minus green, relative to mean brightness (+ = red, − = green)."""
+    yellow_blue: float
+    """Red/green average minus blue, relative to mean brightness (+ = yellow)."""
+    saturation: float
+    """Mean HSV saturation."""
+    saturation_spread: float
+    """Standard deviation of HSV saturation."""
+    contrast_range: float
+    """Luminance span between the 2nd and 98th percentile."""
+
+    @property
+    def cast_strength(self) -> float:
+        return math.hypot(self.red_green, self.yellow_blue)
+
+    @property
+    def cast_angle(self) -> float:
+        """Direction of the cast in degrees: 0 = red, 90 = yellow, 180 = green."""
+        return math.degrees(math.atan2(self.yellow_blue, self.red_green))
+
+
+@dataclass(frozen=True)
+class ClassifierResult:
+    """Ranked profile suggestions for one image."""
+
+    profiles: list[tuple[str, int]]
+    """``(profile, confidence)`` pairs, best first."""
+    features: SlideFeatures
+
+    @property
+    def best(self) -> tuple[str, int]:
+        return self.profiles[0]
+
+    @property
+    def confidence(self) -> int:
+        return self.profiles[0][1]
+
+    def as_slide_profiles(self) -> list[dict[str, int | str]]:
+        """The ranking in the ``slide_profiles`` format the LLM returns."""
+        return [{"profile": name, "confidence": conf} for name, conf in self.profiles]
+
+
+def _ramp(value: float, low: float, high: float) -> float:
+    """0 below *low*, 1 above *high*, linear in between."""
+    return min(1.0, max(0.0, (value - low) / (high - low)))
+
+
+def _percentile(histogram: list[int], total: int, fraction: float) -> int:
+    threshold = fraction * total
+    seen = 0
+    for level, count in enumerate(histogram):
+        seen += count
+        if seen >= threshold:
+            return level
+    return len(histogram) - 1
+
+
+def extract_features(image: Image.Image) -> SlideFeatures:
+    """Measure :class:`SlideFeatures` on *image* (any size or mode)."""
+    from ..pipeline import make_proxy
+
+    proxy = make_proxy(image, PROXY_LONG_EDGE)
+    if proxy.mode != "RGB":
+        proxy = proxy.convert("RGB")
+
+    histogram = proxy.histogram()
+    total = sum(histogram[:256]) or 1
+    red, green, blue = (
+        sum(level * histogram[base + level] for level in range(256)) / total / 255
+        for base in (0, 256, 512)
+    )
+    brightness = max(
+        LUMINANCE_RED * red + LUMINANCE_GREEN * green + LUMINANCE_BLUE * blue, 1e-3
+    )
+
+    luminance = proxy.convert("L").histogram()
+    contrast_range = (
+        _percentile(luminance, total, 0.98) - _percentile(luminance, total, 0.02)
+    ) / 255
+
+    saturation_hist = proxy.convert("HSV").getchannel("S").histogram()
+    mean_s = sum(level * count for level, count in enumerate(saturation_hist)) / total
+    var_s = sum(level * level * count for level, count in enumerate(saturation_hist)) / total
+    spread_s = math.sqrt(max(0.0, var_s - mean_s * mean_s))
+
+    return SlideFeatures(
+        red_green=(red - green) / brightness,
+        yellow_blue=((red + green) / 2 - blue) / brightness,
+        saturation=mean_s / 255,
+        saturation_spread=spread_s / 255,
+        contrast_range=contrast_range,
+    )
+
+
+def score_profiles(features: SlideFeatures) -> dict[str, float]:
+    """Score every built-in profile in ``[0, 1]`` from *features*."""
+    cast = _ramp(features.cast_strength, 0.05, 0.20)
+    angle = features.cast_angle
+    if -30.0 <= angle <= 45.0:
+        direction = "red_cast"
+    elif 45.0 < angle <= 120.0:
+        direction = "yellow_cast"
+    else:
+        direction = "color_cast"
+
+    fade = (
+        0.4 * _ramp(0.45 - features.saturation, 0.0, 0.30)
+        + 0.4 * _ramp(0.65 - features.contrast_range, 0.0, 0.35)
+        + 0.2 * _ramp(0.18 - features.saturation_spread, 0.0, 0.15)
+    )
+    degradation = max(fade, cast)
+
+    scores = {
+        "well_preserved": _ramp(0.30 - degradation, 0.0, 0.30),
+        "aged": max(0.0, 1.0 - abs(degradation - _AGED_PEAK) / _AGED_WIDTH),
+        "faded": fade,
+        "red_cast": 0.0,
+        "yellow_cast": 0.0,
+        "color_cast": 0.0,
+    }
+    scores[direction] = cast
+    return scores
+
+
+class SlideClassifier:
+    """Classify slide condition from pixel statistics.
+
+    Usage::
+
+        result = SlideClassifier().classify("scan.jpg")
+        profile, confidence = result.best
+    """
+
+    def classify(self, image: Image.Image | str | Path) -> ClassifierResult:
+        """Rank the built-in profiles for *image* (a PIL image or a path)."""
+        if isinstance(image, (str, Path)):
+            from ..pipeline import load_preview
+
+            image = load_preview(image, PROXY_LONG_EDGE)
+        features = extract_features(image)
+        return self.rank(features)
+
+    @staticmethod
+    def rank(features: SlideFeatures) -> ClassifierResult:
+        """Turn :func:`score_profiles` into a confidence-ranked list."""
+        scores = sorted(score_profiles(features).items(), key=lambda kv: kv[1], reverse=True)
+        best, runner_up = scores[0][1], scores[1][1]
+        separation = 0.5 + 0.5 * (best - runner_up) / best if best > 0 else 0.0
+
+        ranked = [
+            (name, round(100 * score * separation))
+            for name, score in scores
+            if score >= _MIN_SCORE or name == scores[0][0]
+        ]
+        return ClassifierResult(profiles=ranked, features=features)
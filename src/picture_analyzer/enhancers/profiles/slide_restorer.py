@@ -6,14 +6,28 @@ externalized YAML profiles loaded via ``config.loader``.
 """
 from __future__ import annotations
 
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
-from PIL import Image, ImageEnhance, ImageFilter
+from PIL import Image
 
-from ...config.defaults import DEFAULT_JPEG_QUALITY
+from ...config.defaults import DEFAULT_JPEG_QUALITY, DEFAULT_PREVIEW_LONG_EDGE
 from ...config.loader import load_slide_profiles
 from ...core.models import ColorBalance, SlideProfile, SlideProfileDetection
+from ..filters import (
+    BrightnessFilter,
+    ColorBalanceFilter,
+    ContrastFilter,
+    DenoiseFilter,
+    DespeckleFilter,
+    SaturationFilter,
+    SharpnessFilter,
+)
+from ..pipeline import FilterPipeline, upright
+
+if TYPE_CHECKING:
+    from ...core.models import AnalysisResult
 
 
 # Module-level cache of typed profiles (loaded from YAML → defaults fallback)
@@ -31,6 +45,21 @@ class SlideRestorer:
     The restorer can also auto-detect the best profile from AI analysis::
 
         result_path = restorer.auto_restore("scan.jpg", analysis_result, "restored.jpg")
+
+    Several profiles can be produced from one decode with
+    :meth:`restore_many`::
+
+        results = restorer.restore_many("scan.jpg", {
+            "faded": "scan_faded.jpg",
+            "red_cast": "scan_red_cast.jpg",
+        })
+
+    :meth:`preview` renders a profile on a low-resolution proxy in well
+    under a second, for tuning profiles before a full-resolution run.
+
+    With ``memory_budget_mb`` set, large scans are restored in overlapping
+    horizontal strips, written back into the decoded image, so only one
+    full frame is held in memory.
     """
 
     def __init__(
@@ -38,6 +67,7 @@ class SlideRestorer:
         profiles: dict[str, SlideProfile] | None = None,
         profiles_dir: str | Path | None = None,
         jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+        memory_budget_mb: float | None = None,
     ):
         if profiles is not None:
             self._profiles = profiles
@@ -46,6 +76,7 @@ class SlideRestorer:
         else:
             self._profiles = dict(BUILTIN_PROFILES)
         self.jpeg_quality = jpeg_quality
+        self.memory_budget_mb = memory_budget_mb
 
     @property
     def available_profiles(self) -> list[str]:
@@ -82,55 +113,16 @@ class SlideRestorer:
         Returns:
             Path to restored image, or None on failure.
         """
-        profile = self._profiles.get(profile_name)
-        if not profile:
-            print(f"Unknown profile: {profile_name}. Using 'aged'")
-            profile = self._profiles["aged"]
-            profile_name = "aged"
+        profile_name, profile = self._resolve(profile_name)
 
         try:
-            image = Image.open(str(image_path))
-            if image.mode != "RGB":
-                image = image.convert("RGB")
+            image = self._load(image_path)
 
             print(f"\nRestoring slide with '{profile_name}' profile:")
             print(f"  Description: {profile.description}")
 
-            # 1. Optional despeckle
-            if despeckle:
-                print("  → Removing dust and speckles...")
-                image = image.filter(ImageFilter.MedianFilter(size=3))
-
-            # 2. Color balance
-            cb = profile.color_balance
-            if (cb.red, cb.green, cb.blue) != (1.0, 1.0, 1.0):
-                print("  → Correcting color balance...")
-                r, g, b = image.split()
-                r = ImageEnhance.Brightness(r).enhance(cb.red)
-                g = ImageEnhance.Brightness(g).enhance(cb.green)
-                b = ImageEnhance.Brightness(b).enhance(cb.blue)
-                image = Image.merge("RGB", (r, g, b))
-
-            # 3. Brightness
-            print(f"  → Adjusting brightness ({profile.brightness:.2f}x)...")
-            image = ImageEnhance.Brightness(image).enhance(profile.brightness)
-
-            # 4. Contrast
-            print(f"  → Restoring contrast ({profile.contrast:.2f}x)...")
-            image = ImageEnhance.Contrast(image).enhance(profile.contrast)
-
-            # 5. Saturation
-            print(f"  → Restoring color saturation ({profile.saturation:.2f}x)...")
-            image = ImageEnhance.Color(image).enhance(profile.saturation)
-
-            # 6. Optional denoise
-            if denoise and profile.denoise:
-                print("  → Reducing film grain and noise...")
-                image = image.filter(ImageFilter.GaussianBlur(radius=profile.denoise_radius))
-
-            # 7. Sharpness
-            print(f"  → Enhancing sharpness ({profile.sharpness:.2f}x)...")
-            image = ImageEnhance.Sharpness(image).enhance(profile.sharpness)
+            pipeline = self.build_pipeline(profile, denoise=denoise, despeckle=despeckle)
+            image = self._run(pipeline, image)
 
             # Save
             out = str(output_path or image_path)
@@ -142,6 +134,157 @@ class SlideRestorer:
             print(f"✗ Error during slide restoration: {e}")
             return None
 
+    def restore_many(
+        self,
+        image_path: str | Path,
+        outputs: Mapping[str, str | Path],
+        denoise: bool = True,
+        despeckle: bool = True,
+    ) -> dict[str, str | None]:
+        """Apply several profiles to one scan, sharing the common work.
+
+        The source is decoded and despeckled once; each profile then runs
+        only its own colour and tone stages on that shared base image.
+
+        Args:
+            image_path: Source image path.
+            outputs: Output path per profile name, in the order to produce
+                them.
+            denoise: Apply noise reduction.
+            despeckle: Apply median filter for dust/speckle removal.
+
+        Returns:
+            Output path per profile name; ``None`` for profiles that
+            failed.
+        """
+        results: dict[str, str | None] = {name: None for name in outputs}
+
+        try:
+            base = self._load(image_path)
+            if despeckle:
+                print("\nRemoving dust and speckles (shared by all profiles)...")
+                shared = FilterPipeline(
+                    [DespeckleFilter(size=3)],
+                    memory_budget_mb=self.memory_budget_mb,
+                    verbose=False,
+                )
+                base = self._run(shared, base)
+        except Exception as e:
+            print(f"✗ Error during slide restoration: {e}")
+            return results
+
+        for requested, output_path in outputs.items():
+            profile_name, profile = self._resolve(requested)
+            try:
+                print(f"\nRestoring slide with '{profile_name}' profile:")
+                print(f"  Description: {profile.description}")
+
+                pipeline = self.build_pipeline(profile, denoise=denoise, despeckle=False)
+                image = self._run(pipeline, base, in_place=False)
+
+                out = str(output_path)
+                image.save(out, "JPEG", quality=self.jpeg_quality)
+                print(f"\n✓ Slide restoration complete: {out}")
+                results[requested] = out
+            except Exception as e:
+                print(f"✗ Error during slide restoration ({profile_name}): {e}")
+
+        return results
+
+    def preview(
+        self,
+        image_path: str | Path,
+        profile_name: str = "aged",
+        long_edge: int = DEFAULT_PREVIEW_LONG_EDGE,
+        denoise: bool = True,
+        despeckle: bool = True,
+    ) -> Image.Image:
+        """Render *profile_name* on a proxy of at most *long_edge* pixels.
+
+        Runs the same filters as :meth:`restore`; JPEG sources are
+        decoded at reduced scale.  Raises on unreadable input.
+        """
+        profile_name, profile = self._resolve(profile_name)
+        print(f"\nPreviewing '{profile_name}' profile at {long_edge}px:")
+        pipeline = self.build_pipeline(profile, denoise=denoise, despeckle=despeckle)
+        return pipeline.preview(image_path, long_edge)
+
+    def build_pipeline(
+        self,
+        profile: SlideProfile,
+        denoise: bool = True,
+        despeckle: bool = True,
+    ) -> FilterPipeline:
+        """Translate a profile into the ordered restoration filters.
+
+        Prints the progress line for each step as it is added.
+        """
+        filters: list = []
+
+        # 1. Optional despeckle
+        if despeckle:
+            print("  → Removing dust and speckles...")
+            filters.append(DespeckleFilter(size=3))
+
+        # 2. Color balance
+        cb = profile.color_balance
+        if (cb.red, cb.green, cb.blue) != (1.0, 1.0, 1.0):
+            print("  → Correcting color balance...")
+            filters.append(ColorBalanceFilter(cb.red, cb.green, cb.blue))
+
+        # 3. Brightness
+        print(f"  → Adjusting brightness ({profile.brightness:.2f}x)...")
+        filters.append(BrightnessFilter(profile.brightness))
+
+        # 4. Contrast
+        print(f"  → Restoring contrast ({profile.contrast:.2f}x)...")
+        filters.append(ContrastFilter(profile.contrast))
+
+        # 5. Saturation
+        print(f"  → Restoring color saturation ({profile.saturation:.2f}x)...")
+        filters.append(SaturationFilter(profile.saturation))
+
+        # 6. Optional denoise
+        if denoise and profile.denoise:
+            print("  → Reducing film grain and noise...")
+            filters.append(DenoiseFilter(radius=profile.denoise_radius))
+
+        # 7. Sharpness
+        print(f"  → Enhancing sharpness ({profile.sharpness:.2f}x)...")
+        filters.append(SharpnessFilter(profile.sharpness))
+
+        return FilterPipeline(
+            filters, memory_budget_mb=self.memory_budget_mb, verbose=False
+        )
+
+    def _resolve(self, profile_name: str) -> tuple[str, SlideProfile]:
+        """Look up *profile_name*, falling back to ``aged``."""
+        profile = self._profiles.get(profile_name)
+        if not profile:
+            print(f"Unknown profile: {profile_name}. Using 'aged'")
+            return "aged", self._profiles["aged"]
+        return profile_name, profile
+
+    @staticmethod
+    def _load(image_path: str | Path) -> Image.Image:
+        image = upright(Image.open(str(image_path)))
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        return image
+
+    def _run(
+        self, pipeline: FilterPipeline, image: Image.Image, in_place: bool = True
+    ) -> Image.Image:
+        """Run *pipeline* on a decoded image.
+
+        With *in_place* the restorer owns *image* and strips may be
+        written back into it; otherwise *image* is left untouched.
+        """
+        rows = pipeline.strip_rows(image)
+        if rows is not None and rows < image.height:
+            return pipeline.run_tiled(image, rows, in_place=in_place)
+        return pipeline.run(image)
+
     # ── Auto-detect ──────────────────────────────────────────────────
 
     def auto_restore(
@@ -165,6 +308,16 @@ class SlideRestorer:
         Returns:
             Path to restored image, or None on failure.
         """
+        profile_name = self.select_profile(analysis_data, analysis_result)
+        print(f"\nApplying restoration profile: {profile_name}")
+        return self.restore(image_path, profile_name, output_path)
+
+    def select_profile(
+        self,
+        analysis_data: dict[str, Any] | None = None,
+        analysis_result: "AnalysisResult | None" = None,
+    ) -> str:
+        """Pick the profile :meth:`auto_restore` would apply."""
         profile_name = "aged"  # default
 
         # Prefer typed AnalysisResult
@@ -193,8 +346,7 @@ class SlideRestorer:
                 print(f"  Condition: {assessment.get('condition', 'unknown')}")
                 print(f"  Recommended: {profile_name}")
 
-        print(f"\nApplying restoration profile: {profile_name}")
-        return self.restore(image_path, profile_name, output_path)
+        return profile_name
 
     # ── Heuristic assessment (ported from legacy) ────────────────────
 
@@ -0,0 +1,223 @@
+"""Local image-quality measurement.
+
+The enhancement step asks a vision model to *guess* brightness,
+contrast and saturation percentages that can be measured directly from
+the pixels.  :func:`assess_quality` measures them on a proxy of the
+image, with PIL's histogram, filter and statistics routines (each one
+pass in C, no per-pixel Python):
+
+  - **exposure**: mean luminance and the fraction of pixels clipped to
+    black or white;
+  - **contrast**: the 2nd–98th percentile span of luminance;
+  - **colour cast** and **saturation**: as measured for the slide
+    classifier (:func:`~.profiles.classifier.extract_features`);
+  - **sharpness**: the variance of the Laplacian of the grey image.
+
+:class:`QualityReport` turns the measurements into
+``recommended_enhancements`` strings in the ``"ACTION: … by N%"`` form
+that :class:`~.pipeline.RecommendationParser` reads, an
+``enhancement`` section like the one the model returns, or a short text
+of the numbers to hand the model as context.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from PIL import Image, ImageFilter, ImageStat
+
+from .profiles.classifier import _percentile, extract_features
+
+# Long edge of the proxy; sharpness depends on scale, so it is fixed.
+PROXY_LONG_EDGE = 1024
+
+# Levels at or beyond these count as clipped.
+_BLACK = 2
+_WHITE = 253
+
+# Thresholds (fractions of full scale unless noted).
+_DARK = 0.35            # mean luminance below: underexposed
+_CLIPPED = 0.02         # clipped fraction above: crushed shadows / blown highlights
+_LOW_CONTRAST = 0.60    # tonal range below: flat
+_CAST = 0.08            # red–green / yellow–blue imbalance above: visible cast
+_DESATURATED = 0.25     # mean saturation below: dull colours
+_MONOCHROME = 0.03      # mean saturation below: black and white, nothing to boost
+_OVERSATURATED = 0.60
+_SOFT = 60.0            # Laplacian variance (grey levels²) below: soft
+_VERY_SOFT = 20.0
+
+_LAPLACIAN = ImageFilter.Kernel((3, 3), [0, 1, 0, 1, -4, 1, 0, 1, 0], scale=1, offset=128)
+
+
+@dataclass(frozen=True)
+class QualityStats:
+    """Pixel statistics of one image (fractions of full scale unless noted)."""
+
+    luminance: float
+    """Mean luminance."""
+    shadows_clipped: float
+    """Fraction of pixels at or near black."""
+    highlights_clipped: float
+    """Fraction of pixels at or near white."""
+    tonal_range: float
+    """Luminance span between the 2nd and 98th percentile."""
+    red_green: float
+    """Red minus green, relative to brightness (+ = red, − = green)."""
+    yellow_blue: float
+    """Red/green average minus blue, relative to brightness (+ = yellow)."""
+    saturation: float
+    """Mean HSV saturation."""
+    sharpness: float
+    """Variance of the Laplacian, in grey levels²."""
+
+
+def measure_quality(image: Image.Image) -> QualityStats:
+    """Measure :class:`QualityStats` on *image* (any size or mode)."""
+    from .pipeline import make_proxy
+
+    proxy = make_proxy(image, PROXY_LONG_EDGE)
+    grey = proxy.convert("L")
+    histogram = grey.histogram()
+    total = sum(histogram) or 1
+    features = extract_features(proxy)
+    # The kernel leaves the outermost pixels unfiltered; leave them out
+    laplacian = grey.filter(_LAPLACIAN).crop((1, 1, grey.width - 1, grey.height - 1))
+    return QualityStats(
+        luminance=sum(level * count for level, count in enumerate(histogram)) / total / 255,
+        shadows_clipped=sum(histogram[: _BLACK + 1]) / total,
+        highlights_clipped=sum(histogram[_WHITE:]) / total,
+        tonal_range=(_percentile(histogram, total, 0.98) - _percentile(histogram, total, 0.02)) / 255,
+        red_green=features.red_green,
+        yellow_blue=features.yellow_blue,
+        saturation=features.saturation,
+        sharpness=ImageStat.Stat(laplacian).var[0],
+    )
+
+
+def _pct(value: float, low: int, high: int) -> int:
+    return max(low, min(high, round(value)))
+
+
+def recommend(stats: QualityStats) -> list[str]:
+    """``recommended_enhancements`` for *stats*, most important first.
+
+    At most one exposure correction is made (highlights, brightness or
+    shadows), as the enhancement prompt asks of the model: together they
+    overbrighten.
+    """
+    recs: list[str] = []
+    if stats.yellow_blue > _CAST:
+        recs.append(f"COLOR_TEMPERATURE: cool by {_pct(stats.yellow_blue * 4000 / 50, 6, 16) * 50}K")
+    elif stats.yellow_blue < -_CAST:
+        recs.append(f"COLOR_TEMPERATURE: warm by {_pct(-stats.yellow_blue * 4000 / 50, 6, 16) * 50}K")
+    if stats.red_green > _CAST:
+        recs.append(f"RED_CHANNEL: reduce by {_pct(stats.red_green * 60, 3, 12)}%")
+    elif stats.red_green < -_CAST:
+        recs.append(f"GREEN_CHANNEL: decrease by {_pct(-stats.red_green * 60, 3, 12)}%")
+
+    if stats.highlights_clipped > _CLIPPED:
+        recs.append(f"HIGHLIGHTS: reduce by {_pct(stats.highlights_clipped * 300, 5, 20)}%")
+    elif stats.luminance < _DARK:
+        recs.append(f"BRIGHTNESS: increase by {_pct((_DARK + 0.1 - stats.luminance) * 40, 3, 10)}%")
+    elif stats.shadows_clipped > _CLIPPED:
+        recs.append(f"SHADOWS: brighten by {_pct(stats.shadows_clipped * 300, 5, 20)}%")
+
+    if stats.tonal_range < _LOW_CONTRAST:
+        recs.append(f"CONTRAST: boost by {_pct((_LOW_CONTRAST + 0.15 - stats.tonal_range) * 60, 5, 25)}%")
+    if _MONOCHROME < stats.saturation < _DESATURATED:
+        recs.append(f"SATURATION: increase by {_pct((_DESATURATED + 0.1 - stats.saturation) * 100, 5, 25)}%")
+
+    if stats.sharpness < _VERY_SOFT:
+        recs.append("UNSHARP_MASK: radius=2.0px, strength=100%, threshold=2")
+    elif stats.sharpness < _SOFT:
+        recs.append(f"SHARPNESS: increase by {_pct((_SOFT - stats.sharpness) / 2, 10, 30)}%")
+    return recs
+
+
+@dataclass(frozen=True)
+class QualityReport:
+    """Measurements for one image and the recommendations derived from them."""
+
+    stats: QualityStats
+    recommendations: list[str] = field(default_factory=list)
+
+    @property
+    def lighting(self) -> str:
+        s = self.stats
+        if s.highlights_clipped > _CLIPPED:
+            state = "overexposed"
+        elif s.luminance < _DARK:
+            state = "underexposed"
+        else:
+            state = "properly exposed"
+        return (
+            f"{state} (mean luminance {s.luminance:.0%}; "
+            f"{s.shadows_clipped:.1%} shadows, {s.highlights_clipped:.1%} highlights clipped)"
+        )
+
+    def as_enhancement(self) -> dict[str, Any]:
+        """The measurements as an ``enhancement`` section, as the model returns it."""
+        s = self.stats
+        casts = []
+        if abs(s.yellow_blue) > _CAST:
+            casts.append("yellow" if s.yellow_blue > 0 else "blue")
+        if abs(s.red_green) > _CAST:
+            casts.append("red" if s.red_green > 0 else "green")
+        if s.saturation < _DESATURATED:
+            saturation = "desaturated"
+        elif s.saturation > _OVERSATURATED:
+            saturation = "oversaturated"
+        else:
+            saturation = "normal"
+        if s.sharpness < _VERY_SOFT:
+            sharpness = "soft"
+        elif s.sharpness < _SOFT:
+            sharpness = "slightly soft"
+        else:
+            sharpness = "sharp"
+        return {
+            "lighting_quality": self.lighting,
+            "color_analysis": (
+                f"{' and '.join(casts) + ' cast' if casts else 'no visible cast'}; "
+                f"saturation {s.saturation:.0%} ({saturation})"
+            ),
+            "sharpness_clarity": f"{sharpness} (Laplacian variance {s.sharpness:.0f})",
+            "contrast_level": (
+                f"{'low' if s.tonal_range < _LOW_CONTRAST else 'normal'} "
+                f"(tonal range {s.tonal_range:.0%})"
+            ),
+            "composition_issues": "not assessed (measured locally)",
+            "recommended_enhancements": list(self.recommendations),
+            "overall_priority": self.recommendations[0] if self.recommendations else "none",
+        }
+
+    def as_context(self) -> str:
+        """The measurements as a prompt hint for the enhancement model."""
+        s = self.stats
+        lines = [
+            "[MEASURED IMAGE STATISTICS — computed from the pixels, use them for "
+            "exposure, contrast, colour and saturation percentages]",
+            f"Lighting: {self.lighting}",
+            f"Tonal range (2nd–98th percentile): {s.tonal_range:.0%}",
+            f"Colour balance: red–green {s.red_green:+.2f}, yellow–blue {s.yellow_blue:+.2f} "
+            f"(|value| > {_CAST} is a visible cast)",
+            f"Mean saturation: {s.saturation:.0%}",
+            f"Sharpness (Laplacian variance): {s.sharpness:.0f} (below {_SOFT:.0f} is soft)",
+        ]
+        if self.recommendations:
+            lines.append("Suggested from the measurements: " + "; ".join(self.recommendations))
+        return "\n".join(lines)
+
+    def as_dict(self) -> dict[str, float]:
+        return {key: round(value, 4) for key, value in asdict(self.stats).items()}
+
+
+def assess_quality(image: Image.Image | str | Path) -> QualityReport:
+    """Measure *image* (a PIL image or a path) and derive recommendations."""
+    if isinstance(image, (str, Path)):
+        from .pipeline import load_preview
+
+        image = load_preview(image, PROXY_LONG_EDGE)
+    stats = measure_quality(image)
+    return QualityReport(stats=stats, recommendations=recommend(stats))
@@ -0,0 +1,129 @@
+"""Process pool for CPU-bound enhancement and restoration work.
+
+Enhancement and slide restoration are pure CPU work on decoded pixels,
+while analysis mostly waits on the model.  ``EnhancementPool`` lets the
+batch loop hand finished analyses to worker processes and move on to
+the next image, so inference and image processing overlap.
+
+The queue is bounded: once ``max_pending`` jobs are in flight,
+:meth:`EnhancementPool.submit` blocks until one finishes.  That keeps a
+slow disk or a huge scan from piling up decoded images in memory.
+
+With ``workers=0`` jobs run inline in the calling process, which is the
+behaviour of the plain sequential batch loop.
+
+Workers are started with ``forkserver`` (``spawn`` where that is not
+available), never a bare ``fork``: the batch loop submits from a process
+that already runs prefetch and write-back threads, and a forked child
+can inherit a lock one of those threads was holding.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Jobs in flight per worker before submit() blocks.
+_PENDING_PER_WORKER = 2
+
+Callback = Callable[[Any, BaseException | None], None]
+
+
+def _mp_context() -> multiprocessing.context.BaseContext:
+    """Start method for the workers: thread-safe, unlike a plain fork."""
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+class EnhancementPool:
+    """Bounded process pool with completion callbacks.
+
+    Usage::
+
+        with EnhancementPool(workers=4) as pool:
+            for job in jobs:
+                pool.submit(run_job, job, callback=report)
+
+    *callback* is called in the submitting process as
+    ``callback(result, error)`` when a job completes, so it may safely
+    print or update shared counters.
+
+    Args:
+        workers: Worker processes; ``0`` runs jobs inline.
+        max_pending: Jobs in flight before :meth:`submit` blocks
+            (default: twice the worker count).
+    """
+
+    def __init__(self, workers: int = 0, max_pending: int | None = None):
+        self.workers = max(0, workers)
+        self.max_pending = max_pending or max(1, self.workers * _PENDING_PER_WORKER)
+        self._executor: ProcessPoolExecutor | None = (
+            ProcessPoolExecutor(max_workers=self.workers, mp_context=_mp_context())
+            if self.workers
+            else None
+        )
+        self._pending: dict[Future, Callback | None] = {}
+
+    def submit(self, fn: Callable[..., Any], *args: Any, callback: Callback | None = None) -> None:
+        """Queue ``fn(*args)``; blocks while the queue is full."""
+        if self._executor is None:
+            try:
+                result = fn(*args)
+            except Exception as exc:
+                self._notify(callback, None, exc)
+            else:
+                self._notify(callback, result, None)
+            return
+
+        while len(self._pending) >= self.max_pending:
+            self._reap(block=True)
+        self._pending[self._executor.submit(fn, *args)] = callback
+        self._reap(block=False)
+
+    def drain(self) -> None:
+        """Wait for every queued job and run its callback."""
+        while self._pending:
+            self._reap(block=True)
+
+    def close(self) -> None:
+        """Drain the queue and shut the workers down."""
+        try:
+            self.drain()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs submitted but not yet reported."""
+        return len(self._pending)
+
+    def _reap(self, block: bool) -> None:
+        if not self._pending:
+            return
+        if block:
+            done, _ = wait(self._pending, return_when=FIRST_COMPLETED)
+        else:
+            done = {f for f in self._pending if f.done()}
+        for future in done:
+            callback = self._pending.pop(future)
+            error = future.exception()
+            self._notify(callback, None if error else future.result(), error)
+
+    @staticmethod
+    def _notify(callback: Callback | None, result: Any, error: BaseException | None) -> None:
+        if callback is not None:
+            callback(result, error)
+        elif error is not None:
+            logger.error("Enhancement job failed: %s", error)
+
+    def __enter__(self) -> EnhancementPool:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,273 @@
+"""Staged batch executor: prefetch → inference → write-back.
+
+A batch used to process one image at a time: read the file, run the
+model, then copy, tag and write results before the next file was even
+opened.  The model sat idle during all the disk and CPU work.
+
+``BatchExecutor`` connects three stages with bounded queues:
+
+  1. **prepare** (thread pool, ``prefetch`` items ahead): decode and
+     build the model payload for upcoming images;
+  2. **analyze** (the calling thread, one image at a time, in order):
+     the model calls;
+  3. **finish** (thread pool, ``io_workers`` threads): copy, EXIF and
+     JSON writes for images whose analysis is done.
+
+While image *N* is in inference, image *N+1* is being prepared and
+image *N-1* written.  Both pools are bounded, which gives backpressure.
+At most ``prefetch`` prepared payloads are held in memory, and the
+analysis loop blocks once ``max_pending_writes`` results are waiting to
+be written.
+
+Per-image callbacks (``on_done``, ``on_error``) always run in the
+calling thread, so they may touch non-thread-safe state such as
+counters or an :class:`~picture_analyzer.enhancers.workers.EnhancementPool`.
+
+``AsyncBatchExecutor`` is the variant for analyzers with an async API
+(``analyze_async``).  It keeps up to ``concurrency`` images going
+through the same three stages at once.  Results may then finish out of
+order.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Finished analyses waiting for write-back, per io worker, before analysis blocks.
+_PENDING_WRITES_PER_WORKER = 2
+
+_END = object()
+
+
+class BatchExecutor:
+    """Run items through prepare → analyze → finish with overlap.
+
+    Usage::
+
+        executor = BatchExecutor(prefetch=1, io_workers=2)
+        executor.run(
+            paths,
+            prepare=load_payload,          # item -> prepared          (worker thread)
+            analyze=run_model,             # (item, prepared) -> result (calling thread)
+            finish=write_outputs,          # (item, result) -> written  (worker thread)
+            on_done=report,                # (item, written)            (calling thread)
+            on_error=record_failure,       # (item, stage, exc)         (calling thread)
+        )
+
+    An item whose stage raises is reported to *on_error* with the stage
+    name (``"prepare"``, ``"analyze"`` or ``"finish"``) and dropped; the
+    batch continues.
+
+    Args:
+        prefetch: Items prepared ahead of the one in inference
+            (``0`` = prepare inline, just before analysis).
+        io_workers: Threads for the finish stage (``0`` = finish inline).
+        max_pending_writes: Finished analyses queued for write-back
+            before :meth:`run` waits (default: twice *io_workers*).
+    """
+
+    def __init__(
+        self,
+        prefetch: int = 1,
+        io_workers: int = 1,
+        max_pending_writes: int | None = None,
+    ):
+        self.prefetch = max(0, prefetch)
+        self.io_workers = max(0, io_workers)
+        self.max_pending_writes = max_pending_writes or max(
+            1, self.io_workers * _PENDING_WRITES_PER_WORKER
+        )
+
+    def run(
+        self,
+        items: Iterable[Any],
+        prepare: Callable[[Any], Any],
+        analyze: Callable[[Any, Any], Any],
+        finish: Callable[[Any, Any], Any],
+        on_done: Callable[[Any, Any], None] | None = None,
+        on_error: Callable[[Any, str, BaseException], None] | None = None,
+    ) -> None:
+        """Process every item; returns once all stages have drained."""
+
+        def fail(item: Any, stage: str, exc: BaseException) -> None:
+            if on_error is not None:
+                on_error(item, stage, exc)
+            else:
+                logger.error("Batch item %s failed in %s: %s", item, stage, exc)
+
+        def complete(item: Any, written: Any) -> None:
+            if on_done is not None:
+                on_done(item, written)
+
+        preparers = ThreadPoolExecutor(self.prefetch, "prefetch") if self.prefetch else None
+        writers = ThreadPoolExecutor(self.io_workers, "writeback") if self.io_workers else None
+        prepared: deque[tuple[Any, Future]] = deque()
+        writes: deque[tuple[Any, Future]] = deque()
+
+        def reap(block: bool) -> None:
+            # Report finished writes in submission order.
+            while writes and (block or writes[0][1].done()):
+                item, future = writes.popleft()
+                error = future.exception()
+                if error is not None:
+                    fail(item, "finish", error)
+                else:
+                    complete(item, future.result())
+                block = False
+
+        source = iter(items)
+        try:
+            while True:
+                if preparers is not None:
+                    # Keep the prefetch window full (current item + prefetch ahead).
+                    while len(prepared) <= self.prefetch:
+                        item = next(source, _END)
+                        if item is _END:
+                            break
+                        prepared.append((item, preparers.submit(prepare, item)))
+                    if not prepared:
+                        break
+                    item, future = prepared.popleft()
+                    try:
+                        payload = future.result()
+                    except Exception as exc:
+                        fail(item, "prepare", exc)
+                        continue
+                else:
+                    item = next(source, _END)
+                    if item is _END:
+                        break
+                    try:
+                        payload = prepare(item)
+                    except Exception as exc:
+                        fail(item, "prepare", exc)
+                        continue
+
+                try:
+                    result = analyze(item, payload)
+                except Exception as exc:
+                    fail(item, "analyze", exc)
+                    continue
+                finally:
+                    del payload  # release the encoded image before the next one
+
+                if writers is None:
+                    try:
+                        written = finish(item, result)
+                    except Exception as exc:
+                        fail(item, "finish", exc)
+                    else:
+                        complete(item, written)
+                    continue
+                while len(writes) >= self.max_pending_writes:
+                    reap(block=True)
+                writes.append((item, writers.submit(finish, item, result)))
+                reap(block=False)
+        finally:
+            while writes:
+                reap(block=True)
+            if preparers is not None:
+                for _, future in prepared:
+                    future.cancel()
+                preparers.shutdown()
+            if writers is not None:
+                writers.shutdown()
+
+
+class AsyncBatchExecutor:
+    """Run items through prepare → async analyze → finish, many at a time.
+
+    Usage::
+
+        executor = AsyncBatchExecutor(concurrency=16, io_workers=2)
+        executor.run(
+            paths,
+            prepare=load_payload,          # item -> prepared          (worker thread)
+            analyze=run_model_async,       # async (item, prepared) -> result
+            finish=write_outputs,          # (item, result) -> written  (worker thread)
+            on_done=report,                # (item, written)            (callback thread)
+            on_error=record_failure,       # (item, stage, exc)         (calling thread)
+        )
+
+    Each of the *concurrency* workers takes the next item and carries it
+    through all three stages, so at most *concurrency* prepared payloads
+    are held in memory.  *on_done* runs on a single callback thread, one
+    call at a time, so a slow or blocking callback (e.g. handing the
+    image to a full enhancement pool) does not stall the requests in
+    flight on the event loop.  Errors are reported per stage as in
+    :class:`BatchExecutor`.  The analyzer's own limiter (see
+    :class:`~picture_analyzer.analyzers.rate_limit.RateLimiter`) still
+    decides how many model calls are actually sent.
+
+    Args:
+        concurrency: Items in flight at once.
+        io_workers: Threads shared by the prepare and finish stages.
+    """
+
+    def __init__(self, concurrency: int = 8, io_workers: int = 1):
+        self.concurrency = max(1, concurrency)
+        self.io_workers = max(1, io_workers)
+
+    def run(
+        self,
+        items: Iterable[Any],
+        prepare: Callable[[Any], Any],
+        analyze: Callable[[Any, Any], Awaitable[Any]],
+        finish: Callable[[Any, Any], Any],
+        on_done: Callable[[Any, Any], None] | None = None,
+        on_error: Callable[[Any, str, BaseException], None] | None = None,
+    ) -> None:
+        """Process every item; returns once all of them are done."""
+        asyncio.run(self.run_async(items, prepare, analyze, finish, on_done, on_error))
+
+    async def run_async(
+        self,
+        items: Iterable[Any],
+        prepare: Callable[[Any], Any],
+        analyze: Callable[[Any, Any], Awaitable[Any]],
+        finish: Callable[[Any, Any], Any],
+        on_done: Callable[[Any, Any], None] | None = None,
+        on_error: Callable[[Any, str, BaseException], None] | None = None,
+    ) -> None:
+        """:meth:`run` inside an already running event loop."""
+        loop = asyncio.get_running_loop()
+        source = iter(items)
+
+        def fail(item: Any, stage: str, exc: BaseException) -> None:
+            if on_error is not None:
+                on_error(item, stage, exc)
+            else:
+                logger.error("Batch item %s failed in %s: %s", item, stage, exc)
+
+        async def worker(threads: ThreadPoolExecutor) -> None:
+            # Workers share one iterator; next() runs between awaits, so no lock.
+            for item in source:
+                try:
+                    payload = await loop.run_in_executor(threads, prepare, item)
+                except Exception as exc:
+                    fail(item, "prepare", exc)
+                    continue
+                try:
+                    result = await analyze(item, payload)
+                except Exception as exc:
+                    fail(item, "analyze", exc)
+                    continue
+                finally:
+                    del payload  # release the encoded image before the next one
+                try:
+                    written = await loop.run_in_executor(threads, finish, item, result)
+                except Exception as exc:
+                    fail(item, "finish", exc)
+                    continue
+                if on_done is not None:
+                    await loop.run_in_executor(callbacks, on_done, item, written)
+
+        with ThreadPoolExecutor(self.io_workers, "batch-io") as threads, \
+                ThreadPoolExecutor(1, "batch-done") as callbacks:
+            await asyncio.gather(*(worker(threads) for _ in range(self.concurrency)))
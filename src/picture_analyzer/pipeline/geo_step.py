@@ -25,6 +25,8 @@ class GeocodingStep:
     """Resolves a location name from a prior step to GPS coordinates."""
 
     name = "geocoding"
+    needs_payload = False
+    depends_on = ("location",)
 
     def __init__(self, settings: Settings) -> None:
         self._settings = settings
@@ -13,6 +13,7 @@ import logging
 import sys
 import time
 from datetime import datetime
+from typing import Any
 
 _RETRY_WAIT = 30  # seconds to wait before retrying on timeout
 _TIMEOUT_NAMES = ("ReadTimeout", "ConnectTimeout", "TimeoutException", "Timeout")
@@ -29,6 +30,12 @@ def _format_tok_stats(step) -> str:
     stats = getattr(analyzer, "_last_call_stats", None)
     if not stats:
         return ""
+    if stats.get("cached"):
+        return "  (cached)"
+    if stats.get("batch"):
+        return "  (batch)"
+    if stats.get("packed"):
+        return "  (packed)"
     in_t = stats.get("prompt_tokens")
     out_t = stats.get("output_tokens")
     ev_ns = stats.get("eval_duration_ns")
@@ -37,11 +44,20 @@ def _format_tok_stats(step) -> str:
         parts.append(f"{in_t}→{out_t} tok")
     if out_t and ev_ns:
         parts.append(f"{out_t / (ev_ns / 1e9):.1f} tok/s")
+    if stats.get("stopped"):
+        parts.append(f"stopped: {stats['stopped']}")
+    if stats.get("escalated"):
+        parts.append(f"escalated to {stats['escalated']}")
+    if stats.get("reasked"):
+        parts.append(f"re-asked {stats['reasked']} field(s)")
     return f"  ({', '.join(parts)})" if parts else ""
 
+from ..analyzers.cache import ResponseCache
+from ..analyzers.payload import PayloadPreparer, attach_payload, release_payload
 from ..core.models import AnalysisContext, AnalysisResult, ImageData
 from ..core.exceptions import AnalysisError
 from ..config.settings import Settings
+from .scheduler import StepScheduler, step_name
 from .steps import build_steps
 from .geo_step import GeocodingStep
 
@@ -54,10 +70,81 @@ class AnalysisPipeline:
     Each step receives the accumulated ``AnalysisResult`` from the
     previous step and returns an updated copy.  Steps that are disabled
     or whose context flag is off return the partial result unchanged.
+
+    The image is prepared (see :class:`PayloadPreparer`) and
+    base64-encoded once per :meth:`run` and the same payload is shared
+    by every step; steps that never send the image to a model declare
+    ``needs_payload = False``.
+
+    With ``max_parallel_steps > 1`` independent steps run concurrently
+    (see :class:`~.scheduler.StepScheduler`); steps that read an earlier
+    step's output list it in ``depends_on``.  The merged result is the
+    same as a sequential run.
+
+    A batch can :meth:`prime` the next few images first, so steps that
+    pack several images into one request (``pack_size > 1``) answer them
+    together.
     """
 
-    def __init__(self, steps: list) -> None:
+    def __init__(
+        self,
+        steps: list,
+        preparer: PayloadPreparer | None = None,
+        response_cache: ResponseCache | None = None,
+        max_parallel_steps: int = 1,
+    ) -> None:
         self._steps = steps
+        self._preparer = preparer
+        self.response_cache = response_cache
+        self.max_parallel_steps = max_parallel_steps
+
+    def analyzers(self) -> list[tuple[str, Any]]:
+        """``(step name, analyzer)`` for every model-backed step, fallbacks included."""
+        pairs = []
+        for step in self._steps:
+            for owner in (step, getattr(step, "_fallback", None)):
+                analyzer = getattr(owner, "_analyzer", None)
+                if analyzer is not None:
+                    pairs.append((step_name(step), analyzer))
+        return pairs
+
+    def pack_size(self, only_steps: list[str] | None = None) -> int:
+        """Most images any of the (selected) steps packs into one request."""
+        return max(
+            [
+                getattr(step, "pack_size", 1) for step in self._steps
+                if only_steps is None or step_name(step) in only_steps
+            ],
+            default=1,
+        )
+
+    def prime(
+        self,
+        items: list[tuple[ImageData, AnalysisContext]],
+        only_steps: list[str] | None = None,
+    ) -> None:
+        """Let packing steps analyse *items* together ahead of :meth:`run`.
+
+        A batch calls this with the next :meth:`pack_size` images before
+        running the first of them; each packing step answers its share of
+        those images from one request and calls the model per image only
+        for what the packed request could not answer.
+        """
+        steps = [
+            step for step in self._steps
+            if getattr(step, "pack_size", 1) > 1
+            and (only_steps is None or step_name(step) in only_steps)
+        ]
+        if not steps:
+            return
+        prepared = [(attach_payload(image, self._preparer), context) for image, context in items]
+        try:
+            for step in steps:
+                step.prime([(image, context) for (image, _), context in prepared])
+        finally:
+            for (image, owned), _ in prepared:
+                if owned:
+                    release_payload(image)
 
     def run(
         self,
@@ -69,7 +156,9 @@ class AnalysisPipeline:
         """Execute all steps, accumulating a single ``AnalysisResult``.
 
         Args:
-            image: Image to analyse (base64 encoding handled by each step).
+            image: Image to analyse.  If it has no ``base64_data`` the
+                   pipeline encodes it once, shares the payload with all
+                   steps and drops it again before returning.
             context: Flags and language settings for the analysis.
             partial: Optional existing result to use as starting state.
                      When provided, steps merge into it rather than starting fresh.
@@ -86,63 +175,100 @@ class AnalysisPipeline:
         """
         if partial is None:
             partial = AnalysisResult(analyzed_at=datetime.now())
+        steps = [
+            step for step in self._steps
+            if only_steps is None or getattr(step, "name", repr(step)) in only_steps
+        ]
+        owned = False
+        if any(getattr(step, "needs_payload", True) for step in steps):
+            image, owned = attach_payload(image, self._preparer)
+        try:
+            partial = self._run_steps(steps, image, context, partial)
+        finally:
+            if owned:
+                release_payload(image)
+        # Carry description_text through so callers can embed it in EXIF
+        if context.description_text and partial.description_context is None:
+            partial = partial.model_copy(update={"description_context": context.description_text})
+        return partial
+
+    def _run_steps(
+        self,
+        steps: list,
+        image: ImageData,
+        context: AnalysisContext,
+        partial: AnalysisResult,
+    ) -> AnalysisResult:
         total_start = time.perf_counter()
         for step in self._steps:
-            step_name = getattr(step, "name", repr(step))
-            if only_steps is not None and step_name not in only_steps:
-                logger.debug("Pipeline: skipping step '%s' (not in only_steps)", step_name)
-                continue
-            logger.debug("Pipeline: running step '%s'", step_name)
-            _print(f"  → [{step_name}] starting at {time.strftime('%H:%M:%S')}")
-            t0 = time.perf_counter()
-            try:
-                partial = step.run(image, context, partial)
-                elapsed = time.perf_counter() - t0
-                logger.info("Pipeline: step '%s' completed in %.3fs", step_name, elapsed)
-                _print(f"  ✓ [{step_name}] done in {elapsed:.1f}s{_format_tok_stats(step)}")
-            except Exception as exc:
-                elapsed = time.perf_counter() - t0
-                is_timeout = any(
-                    name in type(exc).__name__
-                    for name in _TIMEOUT_NAMES
-                )
-                if is_timeout:
-                    _print(f"  ⚠ [{step_name}] timed out after {elapsed:.0f}s — waiting {_RETRY_WAIT}s then retrying")
-                    logger.warning(
-                        "Pipeline: step '%s' timed out after %.3fs — waiting %ds then retrying once",
-                        step_name, elapsed, _RETRY_WAIT,
-                    )
-                    time.sleep(_RETRY_WAIT)
-                    try:
-                        t0 = time.perf_counter()
-                        partial = step.run(image, context, partial)
-                        elapsed = time.perf_counter() - t0
-                        logger.info("Pipeline: step '%s' completed on retry in %.3fs", step_name, elapsed)
-                        _print(f"  ✓ [{step_name}] done on retry in {elapsed:.1f}s{_format_tok_stats(step)}")
-                        continue
-                    except Exception as retry_exc:
-                        elapsed = time.perf_counter() - t0
-                        _print(f"  ✗ [{step_name}] failed on retry after {elapsed:.0f}s — skipping")
-                        logger.exception(
-                            "Pipeline: step '%s' failed on retry after %.3fs — skipping",
-                            step_name, elapsed,
-                        )
-                        raise AnalysisError(
-                            f"Step '{step_name}' timed out and failed on retry"
-                        ) from retry_exc
-                else:
-                    _print(f"  ✗ [{step_name}] error after {elapsed:.1f}s — skipping")
-                    logger.exception(
-                        "Pipeline: step '%s' raised an exception after %.3fs — skipping",
-                        step_name,
-                        elapsed,
-                    )
-                    raise AnalysisError(f"Step '{step_name}' failed: {exc}") from exc
+            if step not in steps:
+                logger.debug("Pipeline: skipping step '%s' (not in only_steps)", step_name(step))
+        if self.max_parallel_steps > 1 and len(steps) > 1:
+            scheduler = StepScheduler(self.max_parallel_steps)
+            partial = scheduler.run(
+                steps, lambda step, p: self._run_step(step, image, context, p), partial
+            )
+        else:
+            for step in steps:
+                partial = self._run_step(step, image, context, partial)
         total_elapsed = time.perf_counter() - total_start
         _print(f"  Pipeline total: {total_elapsed:.1f}s")
-        # Carry description_text through so callers can embed it in EXIF
-        if context.description_text and partial.description_context is None:
-            partial = partial.model_copy(update={"description_context": context.description_text})
+        return partial
+
+    def _run_step(
+        self,
+        step,
+        image: ImageData,
+        context: AnalysisContext,
+        partial: AnalysisResult,
+    ) -> AnalysisResult:
+        """Run one step, retrying once after a timeout."""
+        name = step_name(step)
+        logger.debug("Pipeline: running step '%s'", name)
+        _print(f"  → [{name}] starting at {time.strftime('%H:%M:%S')}")
+        t0 = time.perf_counter()
+        try:
+            partial = step.run(image, context, partial)
+            elapsed = time.perf_counter() - t0
+            logger.info("Pipeline: step '%s' completed in %.3fs", name, elapsed)
+            _print(f"  ✓ [{name}] done in {elapsed:.1f}s{_format_tok_stats(step)}")
+            return partial
+        except Exception as exc:
+            elapsed = time.perf_counter() - t0
+            is_timeout = any(
+                timeout_name in type(exc).__name__
+                for timeout_name in _TIMEOUT_NAMES
+            )
+            if not is_timeout:
+                _print(f"  ✗ [{name}] error after {elapsed:.1f}s — skipping")
+                logger.exception(
+                    "Pipeline: step '%s' raised an exception after %.3fs — skipping",
+                    name,
+                    elapsed,
+                )
+                raise AnalysisError(f"Step '{name}' failed: {exc}") from exc
+            _print(f"  ⚠ [{name}] timed out after {elapsed:.0f}s — waiting {_RETRY_WAIT}s then retrying")
+            logger.warning(
+                "Pipeline: step '%s' timed out after %.3fs — waiting %ds then retrying once",
+                name, elapsed, _RETRY_WAIT,
+            )
+        time.sleep(_RETRY_WAIT)
+        t0 = time.perf_counter()
+        try:
+            partial = step.run(image, context, partial)
+        except Exception as retry_exc:
+            elapsed = time.perf_counter() - t0
+            _print(f"  ✗ [{name}] failed on retry after {elapsed:.0f}s — skipping")
+            logger.exception(
+                "Pipeline: step '%s' failed on retry after %.3fs — skipping",
+                name, elapsed,
+            )
+            raise AnalysisError(
+                f"Step '{name}' timed out and failed on retry"
+            ) from retry_exc
+        elapsed = time.perf_counter() - t0
+        logger.info("Pipeline: step '%s' completed on retry in %.3fs", name, elapsed)
+        _print(f"  ✓ [{name}] done on retry in {elapsed:.1f}s{_format_tok_stats(step)}")
         return partial
 
 
@@ -152,9 +278,12 @@ def build_pipeline(settings: Settings) -> AnalysisPipeline:
     The canonical step order is:
     1. MetadataStep
     2. LocationStep
-    3. EnhancementStep
-    4. SlideProfileStep
-    5. GeocodingStep  (no LLM)
+    3. SlideProfileStep
+    4. EnhancementStep  (depends on slide_profiles)
+    5. GeocodingStep    (no LLM; depends on location)
+
+    ``pipeline.max_parallel_steps`` sets how many of them may run at
+    the same time.
 
     Args:
         settings: Root settings instance.
@@ -162,6 +291,12 @@ def build_pipeline(settings: Settings) -> AnalysisPipeline:
     Returns:
         Configured :class:`AnalysisPipeline`.
     """
-    steps = build_steps(settings)
+    response_cache = ResponseCache.from_settings(settings)
+    steps = build_steps(settings, response_cache=response_cache)
     steps.append(GeocodingStep(settings))
-    return AnalysisPipeline(steps)
+    return AnalysisPipeline(
+        steps,
+        preparer=PayloadPreparer.from_settings(settings),
+        response_cache=response_cache,
+        max_parallel_steps=settings.pipeline.max_parallel_steps,
+    )
@@ -15,6 +15,14 @@ class AnalysisStep(Protocol):
 
     Steps that are disabled (``StepConfig.enabled=False``) or whose
     matching context flag is off should return *partial* unchanged.
+
+    Steps that never send the image to a model may set a class
+    attribute ``needs_payload = False`` so the pipeline can skip the
+    base64 encode when only such steps run.
+
+    A step that reads fields written by other steps lists their names in
+    a ``depends_on`` tuple; the concurrent scheduler starts it only after
+    those steps have finished.
     """
 
     name: str
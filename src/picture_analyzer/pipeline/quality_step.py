@@ -0,0 +1,106 @@
+"""LocalQualityStep — measured enhancement recommendations.
+
+Wraps the LLM ``EnhancementStep`` with
+:func:`~picture_analyzer.enhancers.quality.assess_quality`, which
+measures exposure, clipping, contrast, colour cast, saturation and
+sharpness from the pixels in a few milliseconds.  Two modes
+(``pipeline.local_quality``):
+
+  - ``replace``: the measured recommendations are the ``enhancement``
+    section; the model is not asked at all;
+  - ``context``: the model is still asked, with the measured numbers
+    added to its prompt so its percentages follow the pixels.
+
+The measurements are kept in ``raw_response["local_quality"]``.  When
+the image cannot be read the step runs *fallback* unchanged.  It is
+skipped when:
+- the step is disabled
+- ``context.recommend_enhancements`` is ``False``
+"""
+from __future__ import annotations
+
+import logging
+
+from ..analyzers.openai import _extract_action
+from ..core.models import AnalysisContext, AnalysisResult, Enhancement, ImageData
+from ..enhancers.quality import QualityReport, assess_quality
+
+logger = logging.getLogger(__name__)
+
+LOCAL_QUALITY_MODES = ("off", "replace", "context")
+
+
+class LocalQualityStep:
+    """Measures enhancement needs locally; replaces or informs the LLM step."""
+
+    name = "enhancement"
+
+    def __init__(
+        self,
+        mode: str = "replace",
+        fallback=None,
+        enabled: bool = True,
+    ) -> None:
+        if mode not in LOCAL_QUALITY_MODES[1:]:
+            raise ValueError(f"LocalQualityStep mode must be 'replace' or 'context', not {mode!r}")
+        self._mode = mode
+        self._fallback = fallback
+        self._enabled = enabled
+        # Only the model call needs the payload and the detected slide profile.
+        self.needs_payload = mode == "context"
+        self.depends_on = getattr(fallback, "depends_on", ()) if mode == "context" else ()
+        # Exposes the fallback's analyzer for token stats when it was used.
+        self._analyzer = None
+
+    def run(
+        self,
+        image: ImageData,
+        context: AnalysisContext,
+        partial: AnalysisResult,
+    ) -> AnalysisResult:
+        self._analyzer = None
+        if not self._enabled or not context.recommend_enhancements:
+            return partial
+
+        try:
+            report = assess_quality(image.path)
+        except Exception:
+            logger.exception("LocalQualityStep: could not measure %s", image.path)
+            return self._run_fallback(image, context, partial)
+        partial = partial.model_copy(
+            update={"raw_response": {**partial.raw_response, "local_quality": report.as_dict()}}
+        )
+
+        if self._mode == "context":
+            hint = report.as_context()
+            existing = context.description_text or ""
+            measured = context.model_copy(
+                update={"description_text": f"{hint}\n{existing}".strip()}
+            )
+            return self._run_fallback(image, measured, partial)
+        return self._merge(partial, report)
+
+    @staticmethod
+    def _merge(partial: AnalysisResult, report: QualityReport) -> AnalysisResult:
+        enhancement = report.as_enhancement()
+        return partial.model_copy(
+            update={
+                "enhancement_recommendations": [
+                    Enhancement(raw_text=text, action=_extract_action(text))
+                    for text in report.recommendations
+                ],
+                "lighting_quality": enhancement["lighting_quality"],
+                "raw_response": {**partial.raw_response, "enhancement": enhancement},
+            }
+        )
+
+    def _run_fallback(
+        self,
+        image: ImageData,
+        context: AnalysisContext,
+        partial: AnalysisResult,
+    ) -> AnalysisResult:
+        if self._fallback is None:
+            return partial
+        self._analyzer = getattr(self._fallback, "_analyzer", None)
+        return self._fallback.run(image, context, partial)
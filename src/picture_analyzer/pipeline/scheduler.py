@@ -0,0 +1,138 @@
+"""Dependency-aware concurrent execution of pipeline steps.
+
+Most analysis steps only read the image: ``metadata``, ``location`` and
+``slide_profiles`` are independent model calls.  Only a few steps read
+an earlier step's output, and they say so with a ``depends_on`` class
+attribute:
+
+    EnhancementStep  depends_on = ("slide_profiles",)   # slide hint
+    GeocodingStep    depends_on = ("location",)         # location name
+
+:class:`StepScheduler` starts every step as soon as its dependencies
+have finished, up to ``max_workers`` at a time, so a full analysis
+takes about as long as its critical path rather than the sum of all
+steps.  Threads are enough: each step spends its time waiting on HTTP
+(OpenAI, one or more Ollama hosts, or parallel Ollama slots).
+
+Steps return an updated copy of the partial result they were given.
+Each step's *delta* (the fields it changed, and for ``raw_response``
+the keys it changed) is recorded and the deltas are applied in the
+canonical step order.  The merged result is therefore the same as a
+sequential run, regardless of which step finished first.
+"""
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any
+
+from ..core.models import AnalysisResult
+
+logger = logging.getLogger(__name__)
+
+RunStep = Callable[[Any, AnalysisResult], AnalysisResult]
+
+
+def step_name(step: Any) -> str:
+    return getattr(step, "name", repr(step))
+
+
+def result_delta(before: AnalysisResult, after: AnalysisResult) -> dict[str, Any]:
+    """Fields of *after* that differ from *before*.
+
+    ``raw_response`` is compared key by key and reported as a dict of
+    the changed keys only.
+    """
+    delta: dict[str, Any] = {}
+    for field in type(after).model_fields:
+        old, new = getattr(before, field), getattr(after, field)
+        if field == "raw_response":
+            changed = {k: v for k, v in new.items() if k not in old or old[k] != v}
+            if changed:
+                delta[field] = changed
+        elif new != old:
+            delta[field] = new
+    return delta
+
+
+def apply_delta(result: AnalysisResult, delta: dict[str, Any]) -> AnalysisResult:
+    """Return *result* with a :func:`result_delta` applied."""
+    if not delta:
+        return result
+    update = dict(delta)
+    if "raw_response" in update:
+        update["raw_response"] = {**result.raw_response, **update["raw_response"]}
+    return result.model_copy(update=update)
+
+
+class StepScheduler:
+    """Run pipeline steps concurrently, respecting ``depends_on``.
+
+    Usage::
+
+        scheduler = StepScheduler(max_workers=3)
+        result = scheduler.run(steps, lambda step, partial: step.run(img, ctx, partial), partial)
+
+    Dependencies on steps that are not in *steps* (e.g. filtered out by
+    ``only_steps``) count as already satisfied.  On the first failure no
+    further steps are started; running ones are awaited and the
+    exception is re-raised.
+
+    Args:
+        max_workers: Steps allowed to run at the same time.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max(1, max_workers)
+
+    def run(
+        self,
+        steps: Sequence[Any],
+        run_step: RunStep,
+        partial: AnalysisResult,
+    ) -> AnalysisResult:
+        order = {id(step): index for index, step in enumerate(steps)}
+        names = {step_name(step) for step in steps}
+        waiting_on = {
+            id(step): {dep for dep in getattr(step, "depends_on", ()) if dep in names}
+            for step in steps
+        }
+        pending = list(steps)
+        deltas: dict[int, dict[str, Any]] = {}
+        finished: set[str] = set()
+        running: dict[Future, tuple[Any, AnalysisResult]] = {}
+        error: BaseException | None = None
+
+        def merged() -> AnalysisResult:
+            result = partial
+            for step in sorted((s for s in steps if id(s) in deltas), key=lambda s: order[id(s)]):
+                result = apply_delta(result, deltas[id(step)])
+            return result
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                if error is None:
+                    ready = [s for s in pending if waiting_on[id(s)] <= finished]
+                    for step in ready[: self.max_workers - len(running)]:
+                        pending.remove(step)
+                        snapshot = merged()
+                        running[executor.submit(run_step, step, snapshot)] = (step, snapshot)
+                if not running:
+                    if pending and error is None:
+                        cycle = ", ".join(step_name(s) for s in pending)
+                        raise ValueError(f"Unsatisfiable step dependencies: {cycle}")
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step, snapshot = running.pop(future)
+                    exc = future.exception()
+                    if exc is not None:
+                        error = error or exc
+                        continue
+                    deltas[id(step)] = result_delta(snapshot, future.result())
+                    finished.add(step_name(step))
+
+        if error is not None:
+            raise error
+        return merged()
@@ -0,0 +1,96 @@
+"""LocalSlideProfileStep — histogram-based slide profile detection.
+
+Replaces the LLM ``SlideProfileStep`` with
+:class:`~picture_analyzer.enhancers.profiles.classifier.SlideClassifier`,
+which ranks the restoration profiles from colour-cast, saturation and
+contrast statistics of a small proxy in a few milliseconds.
+
+When the classifier is unsure (best confidence below *min_confidence*)
+or fails to read the image, the step hands over to *fallback* — normally
+the LLM ``SlideProfileStep`` — so ambiguous slides still get a model
+opinion.  It is skipped when:
+- the step is disabled
+- ``context.detect_slide_profiles`` is ``False``
+"""
+from __future__ import annotations
+
+import logging
+
+from ..config.defaults import DEFAULT_SLIDE_CLASSIFIER_MIN_CONFIDENCE
+from ..core.models import (
+    AnalysisContext,
+    AnalysisResult,
+    ImageData,
+    SlideProfileDetection,
+)
+from ..enhancers.profiles.classifier import SlideClassifier
+
+logger = logging.getLogger(__name__)
+
+
+class LocalSlideProfileStep:
+    """Classifies slide condition locally, with an optional LLM fallback."""
+
+    name = "slide_profiles"
+    # Reads pixels from ``image.path``; the fallback encodes only if it runs.
+    needs_payload = False
+
+    def __init__(
+        self,
+        min_confidence: int = DEFAULT_SLIDE_CLASSIFIER_MIN_CONFIDENCE,
+        fallback=None,
+        classifier: SlideClassifier | None = None,
+        enabled: bool = True,
+    ) -> None:
+        self._min_confidence = min_confidence
+        self._fallback = fallback
+        self._classifier = classifier or SlideClassifier()
+        self._enabled = enabled
+        # Exposes the fallback's analyzer for token stats when it was used.
+        self._analyzer = None
+
+    def run(
+        self,
+        image: ImageData,
+        context: AnalysisContext,
+        partial: AnalysisResult,
+    ) -> AnalysisResult:
+        self._analyzer = None
+        if not self._enabled or not context.detect_slide_profiles:
+            return partial
+
+        try:
+            ranking = self._classifier.classify(image.path)
+        except Exception:
+            logger.exception("LocalSlideProfileStep: could not classify %s", image.path)
+            return self._run_fallback(image, context, partial)
+
+        profile, confidence = ranking.best
+        if confidence < self._min_confidence and self._fallback is not None:
+            logger.debug(
+                "LocalSlideProfileStep: '%s' at %d%% < %d%% — using fallback",
+                profile, confidence, self._min_confidence,
+            )
+            return self._run_fallback(image, context, partial)
+
+        profiles = ranking.as_slide_profiles()
+        if not any(p["profile"] == "well_preserved" for p in profiles):
+            profiles.append({"profile": "well_preserved", "confidence": 20})
+        merged = {**partial.raw_response, "slide_profiles": profiles}
+        return partial.model_copy(
+            update={
+                "slide_profile": SlideProfileDetection(profile_name=profile, confidence=confidence),
+                "raw_response": merged,
+            }
+        )
+
+    def _run_fallback(
+        self,
+        image: ImageData,
+        context: AnalysisContext,
+        partial: AnalysisResult,
+    ) -> AnalysisResult:
+        if self._fallback is None:
+            return partial
+        self._analyzer = getattr(self._fallback, "_analyzer", None)
+        return self._fallback.run(image, context, partial)
@@ -14,18 +14,34 @@ whose matching ``AnalysisContext`` flag is off returns *partial* unchanged.
 from __future__ import annotations
 
 import logging
+from pathlib import Path
 from typing import Any
 
+from ..analyzers.cache import ResponseCache
+from ..analyzers.cascade import CascadeAnalyzer
 from ..analyzers.openai import OpenAIAnalyzer
 from ..analyzers.ollama import OllamaAnalyzer
+from ..analyzers.residency import get_residency_manager
+from ..analyzers.streaming import StreamLimits
+from ..config.defaults import DEFAULT_METADATA_PACK_SIZE, DEFAULT_METADATA_PASSES
 from ..config.settings import Settings, StepConfig, resolve_step_config
 from ..core.models import AnalysisContext, AnalysisResult, ImageData
 
 logger = logging.getLogger(__name__)
 
 
-def _build_analyzer(resolved: dict[str, Any]):
-    """Instantiate the right analyzer from a resolved step config dict."""
+def _build_analyzer(resolved: dict[str, Any], response_cache: ResponseCache | None = None):
+    """Instantiate the right analyzer from a resolved step config dict.
+
+    A config with a ``cascade`` model gets a :class:`CascadeAnalyzer`
+    that asks that small model first and this step's model on escalation.
+    """
+    if resolved.get("cascade"):
+        return CascadeAnalyzer(
+            small=_build_analyzer(resolved["cascade"], response_cache),
+            large=_build_analyzer({**resolved, "cascade": None}, response_cache),
+            min_confidence=resolved["cascade_min_confidence"],
+        )
     provider = resolved["provider"]
     model = resolved["model"]
     max_tokens = resolved["max_tokens"]
@@ -34,7 +50,9 @@ def _build_analyzer(resolved: dict[str, Any]):
         kwargs: dict[str, Any] = {"model": model}
         if max_tokens is not None:
             kwargs["max_tokens"] = max_tokens
-        return OpenAIAnalyzer(**kwargs)
+        if resolved.get("base_url") is not None:
+            kwargs["base_url"] = resolved["base_url"]
+        analyzer = OpenAIAnalyzer(**kwargs)
     else:
         kwargs = {"model": model}
         if max_tokens is not None:
@@ -45,21 +63,98 @@ def _build_analyzer(resolved: dict[str, Any]):
             kwargs["num_ctx"] = resolved["num_ctx"]
         if resolved.get("host") is not None:
             kwargs["host"] = resolved["host"]
+        if resolved.get("hosts"):
+            kwargs["hosts"] = resolved["hosts"]
         if resolved.get("keep_alive") is not None:
             kwargs["keep_alive"] = resolved["keep_alive"]
-        return OllamaAnalyzer(**kwargs)
+        analyzer = OllamaAnalyzer(**kwargs)
+        analyzer.residency = get_residency_manager()
+    analyzer.response_cache = response_cache
+    analyzer.streaming = StreamLimits.from_config(resolved.get("streaming"))
+    analyzer.structured_output = bool(resolved.get("structured_output"))
+    analyzer.reask_max_fields = resolved.get("reask_max_fields") or 0
+    return analyzer
+
+
+def _pack_groups(
+    items: list[tuple[ImageData, AnalysisContext]], size: int
+) -> list[list[tuple[ImageData, AnalysisContext]]]:
+    """Consecutive runs of *items* sharing one context, at most *size* long."""
+    groups: list[list[tuple[ImageData, AnalysisContext]]] = []
+    for item in items:
+        if groups and len(groups[-1]) < size and groups[-1][0][1] == item[1]:
+            groups[-1].append(item)
+        else:
+            groups.append([item])
+    return groups
 
 
 class MetadataStep:
-    """Runs sections 1–11: scene description, objects, people, mood, era, …"""
+    """Runs sections 1–11: scene description, objects, people, mood, era, …
+
+    With ``pack_size > 1`` and an analyzer that supports it (OpenAI),
+    :meth:`prime` analyses upcoming images ``pack_size`` at a time in
+    one request each; :meth:`run` then uses those answers and only
+    calls the model for images whose packed answer was unusable.
+    """
 
     name = "metadata"
     _sections = ["metadata"]
 
-    def __init__(self, config: dict[str, Any], enabled: bool = True) -> None:
+    def __init__(
+        self,
+        config: dict[str, Any],
+        enabled: bool = True,
+        response_cache: ResponseCache | None = None,
+        passes: int = DEFAULT_METADATA_PASSES,
+        pack_size: int = DEFAULT_METADATA_PACK_SIZE,
+    ) -> None:
         self._config = config
         self._enabled = enabled
-        self._analyzer = _build_analyzer(config)
+        self._passes = passes
+        self._analyzer = _build_analyzer(config, response_cache)
+        packs = self._enabled and getattr(self._analyzer, "_provider", None) == "openai"
+        # No larger than one request's output cap can answer in full
+        self.pack_size = min(pack_size, self._analyzer.max_pack_size) if packs else 1
+        self._packed: dict[tuple[Path, tuple[str, ...]], AnalysisResult] = {}
+
+    def _section_groups(self) -> list[list[str]]:
+        if self._passes == 1:
+            return [self._sections]
+        return [["metadata_part1"], ["metadata_part2"]]
+
+    def prime(self, items: list[tuple[ImageData, AnalysisContext]]) -> None:
+        """Analyse *items* ahead of :meth:`run`, ``pack_size`` images per request.
+
+        Only images with the same context share a request.  Answers from
+        an earlier call to :meth:`prime` that were never used are dropped.
+        """
+        self._packed.clear()
+        if self.pack_size < 2:
+            return
+        for group in _pack_groups(items, self.pack_size):
+            if len(group) < 2:
+                continue
+            images = [image for image, _ in group]
+            for sections in self._section_groups():
+                try:
+                    results = self._analyzer.analyze_sections_packed(images, group[0][1], sections)
+                except Exception as exc:
+                    logger.warning(
+                        "Packed %s call for %d images failed — analysing them one by one: %s",
+                        "+".join(sections), len(images), exc,
+                    )
+                    continue
+                for image, result in zip(images, results):
+                    if result is not None:
+                        self._packed[(image.path, tuple(sections))] = result
+
+    def _analyze(self, image: ImageData, context: AnalysisContext, sections: list[str]) -> AnalysisResult:
+        result = self._packed.pop((image.path, tuple(sections)), None)
+        if result is None:
+            return self._analyzer.analyze_section(image, context, sections)
+        self._analyzer._last_call_stats = {"packed": True}  # shown on the step's progress line
+        return result
 
     def run(
         self,
@@ -69,15 +164,31 @@ class MetadataStep:
     ) -> AnalysisResult:
         if not self._enabled:
             return partial
+        if self._passes == 1:
+            # One call for all 11 fields; with a response schema the model
+            # cannot drop fields, which is what the split guarded against.
+            result = self._analyze(image, context, self._sections)
+            raw = result.raw_response if isinstance(result.raw_response, dict) else {}
+            return self._merge(partial, result, result, raw)
         # Two-pass: part1 = fields 1-6 (objects/persons/weather/mood/time/season)
         #           part2 = fields 7-11 (scene_type/location/activity/style/composition)
         # Each pass has fewer fields so the LLM can provide rich detail without truncation.
-        r1 = self._analyzer.analyze_section(image, context, ["metadata_part1"])
-        r2 = self._analyzer.analyze_section(image, context, ["metadata_part2"])
+        r1 = self._analyze(image, context, ["metadata_part1"])
+        r2 = self._analyze(image, context, ["metadata_part2"])
         raw1 = r1.raw_response if isinstance(r1.raw_response, dict) else {}
         raw2 = r2.raw_response if isinstance(r2.raw_response, dict) else {}
         merged_meta = {**raw1.get("metadata", {}), **raw2.get("metadata", {})}
         merged_raw = {**raw1, **raw2, "metadata": merged_meta}
+        return self._merge(partial, r1, r2, merged_raw)
+
+    @staticmethod
+    def _merge(
+        partial: AnalysisResult,
+        r1: AnalysisResult,
+        r2: AnalysisResult,
+        merged_raw: dict[str, Any],
+    ) -> AnalysisResult:
+        """Fold the part-1 (*r1*) and part-2 (*r2*) results into *partial*."""
         return partial.model_copy(
             update={
                 "title": r2.title or r1.title or partial.title,
@@ -102,10 +213,15 @@ class LocationStep:
     name = "location"
     _sections = ["location"]
 
-    def __init__(self, config: dict[str, Any], enabled: bool = True) -> None:
+    def __init__(
+        self,
+        config: dict[str, Any],
+        enabled: bool = True,
+        response_cache: ResponseCache | None = None,
+    ) -> None:
         self._config = config
         self._enabled = enabled
-        self._analyzer = _build_analyzer(config)
+        self._analyzer = _build_analyzer(config, response_cache)
 
     def run(
         self,
@@ -138,11 +254,17 @@ class EnhancementStep:
 
     name = "enhancement"
     _sections = ["enhancement"]
+    depends_on = ("slide_profiles",)  # uses the detected profile as a prompt hint
 
-    def __init__(self, config: dict[str, Any], enabled: bool = True) -> None:
+    def __init__(
+        self,
+        config: dict[str, Any],
+        enabled: bool = True,
+        response_cache: ResponseCache | None = None,
+    ) -> None:
         self._config = config
         self._enabled = enabled
-        self._analyzer = _build_analyzer(config)
+        self._analyzer = _build_analyzer(config, response_cache)
 
     def run(
         self,
@@ -197,10 +319,15 @@ class SlideProfileStep:
     name = "slide_profiles"
     _sections = ["slide_profiles"]
 
-    def __init__(self, config: dict[str, Any], enabled: bool = True) -> None:
+    def __init__(
+        self,
+        config: dict[str, Any],
+        enabled: bool = True,
+        response_cache: ResponseCache | None = None,
+    ) -> None:
         self._config = config
         self._enabled = enabled
-        self._analyzer = _build_analyzer(config)
+        self._analyzer = _build_analyzer(config, response_cache)
 
     def run(
         self,
@@ -236,28 +363,60 @@ class SlideProfileStep:
         )
 
 
-def build_steps(settings: Settings) -> list:
+def build_steps(settings: Settings, response_cache: ResponseCache | None = None) -> list:
     """Build the canonical list of LLM steps from *settings*.
 
     Returns instances of MetadataStep, LocationStep, EnhancementStep,
-    SlideProfileStep — each configured from ``settings.pipeline``.
+    SlideProfileStep — each configured from ``settings.pipeline``.  With
+    ``pipeline.slide_classifier: local`` the slide step is a
+    :class:`~.slide_step.LocalSlideProfileStep` that defers to the LLM
+    step only when its own confidence is low.  With ``pipeline.local_quality``
+    set to ``replace`` or ``context`` the enhancement step is a
+    :class:`~.quality_step.LocalQualityStep` that measures the image and
+    skips or informs the LLM step.
+
+    All LLM steps share *response_cache* when one is given.
     """
     pipeline_cfg = settings.pipeline
+    slide_step = SlideProfileStep(
+        config=resolve_step_config(pipeline_cfg.slide_profiles, settings),
+        enabled=pipeline_cfg.slide_profiles.enabled,
+        response_cache=response_cache,
+    )
+    if pipeline_cfg.slide_classifier == "local":
+        from .slide_step import LocalSlideProfileStep
+
+        slide_step = LocalSlideProfileStep(
+            min_confidence=pipeline_cfg.slide_classifier_min_confidence,
+            fallback=slide_step,
+            enabled=pipeline_cfg.slide_profiles.enabled,
+        )
+    enhancement_step = EnhancementStep(
+        config=resolve_step_config(pipeline_cfg.enhancement, settings),
+        enabled=pipeline_cfg.enhancement.enabled,
+        response_cache=response_cache,
+    )
+    if pipeline_cfg.local_quality != "off":
+        from .quality_step import LocalQualityStep
+
+        enhancement_step = LocalQualityStep(
+            mode=pipeline_cfg.local_quality,
+            fallback=enhancement_step,
+            enabled=pipeline_cfg.enhancement.enabled,
+        )
     return [
         MetadataStep(
             config=resolve_step_config(pipeline_cfg.metadata, settings),
             enabled=pipeline_cfg.metadata.enabled,
+            response_cache=response_cache,
+            passes=pipeline_cfg.metadata_passes,
+            pack_size=pipeline_cfg.metadata_pack_size,
         ),
         LocationStep(
             config=resolve_step_config(pipeline_cfg.location, settings),
             enabled=pipeline_cfg.location.enabled,
+            response_cache=response_cache,
         ),
-        SlideProfileStep(
-            config=resolve_step_config(pipeline_cfg.slide_profiles, settings),
-            enabled=pipeline_cfg.slide_profiles.enabled,
-        ),
-        EnhancementStep(
-            config=resolve_step_config(pipeline_cfg.enhancement, settings),
-            enabled=pipeline_cfg.enhancement.enabled,
-        ),
+        slide_step,
+        enhancement_step,
     ]
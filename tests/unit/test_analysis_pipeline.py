@@ -14,6 +14,7 @@ from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
+from PIL import Image
 
 from picture_analyzer.core.models import (
     AnalysisContext,
@@ -25,7 +26,9 @@ from picture_analyzer.core.models import (
     LocationInfo,
     SlideProfileDetection,
 )
+from picture_analyzer.analyzers.openai import _extract_action
 from picture_analyzer.config.settings import Settings, PipelineConfig, StepConfig
+from picture_analyzer.core.exceptions import AnalysisError
 from picture_analyzer.pipeline import AnalysisPipeline, build_pipeline, AnalysisStep
 from picture_analyzer.pipeline.steps import (
     MetadataStep,
@@ -35,6 +38,10 @@ from picture_analyzer.pipeline.steps import (
     build_steps,
 )
 from picture_analyzer.pipeline.geo_step import GeocodingStep
+from picture_analyzer.pipeline.quality_step import LocalQualityStep
+from picture_analyzer.pipeline.slide_step import LocalSlideProfileStep
+from picture_analyzer.pipeline.scheduler import StepScheduler, apply_delta, result_delta
+from picture_analyzer.enhancers.profiles.classifier import ClassifierResult, SlideFeatures
 
 
 # ── Fixtures ──────────────────────────────────────────────────────────
@@ -123,6 +130,93 @@ class TestMetadataStep:
         assert result.mood == "calm"
         assert "tree" in result.keywords
 
+    @pytest.mark.parametrize("passes, expected", [
+        (2, [["metadata_part1"], ["metadata_part2"]]),
+        (1, [["metadata"]]),
+    ])
+    def test_metadata_passes(self, image, context, empty_result, passes, expected, monkeypatch):
+        monkeypatch.setenv("OPENAI_APIKEY", "sk-test")
+        step = MetadataStep(config=_step_config(), passes=passes)
+        returned = _mock_analyzer_result(
+            scene_type="harbour",
+            raw_response={"metadata": {"scene_type": "harbour"}},
+        )
+        from picture_analyzer.analyzers.openai import OpenAIAnalyzer
+        with patch.object(OpenAIAnalyzer, "analyze_section", return_value=returned) as call:
+            result = step.run(image, context, empty_result)
+        assert [c.args[2] for c in call.call_args_list] == expected
+        assert result.scene_type == "harbour"
+        assert result.raw_response["metadata"] == {"scene_type": "harbour"}
+
+
+class TestMetadataPacking:
+    @pytest.fixture
+    def images(self) -> list[ImageData]:
+        return [
+            ImageData(path=Path(f"img{n}.jpg"), mime_type="image/jpeg", base64_data="abc123==")
+            for n in range(3)
+        ]
+
+    def test_prime_answers_run_and_falls_back(self, images, context, empty_result, monkeypatch):
+        monkeypatch.setenv("OPENAI_APIKEY", "sk-test")
+        step = MetadataStep(config=_step_config(), passes=1, pack_size=3)
+        packed = [AnalysisResult(title="packed 0"), None, AnalysisResult(title="packed 2")]
+        from picture_analyzer.analyzers.openai import OpenAIAnalyzer
+        with patch.object(OpenAIAnalyzer, "analyze_sections_packed", return_value=packed) as pack, \
+             patch.object(OpenAIAnalyzer, "analyze_section",
+                          return_value=AnalysisResult(title="single")) as single:
+            step.prime([(image, context) for image in images])
+            titles = [step.run(image, context, empty_result).title for image in images]
+        pack.assert_called_once_with(images, context, ["metadata"])
+        assert titles == ["packed 0", "single", "packed 2"]
+        assert [c.args[0] for c in single.call_args_list] == [images[1]]
+
+    def test_images_with_different_context_are_not_packed_together(self, images, context, monkeypatch):
+        monkeypatch.setenv("OPENAI_APIKEY", "sk-test")
+        step = MetadataStep(config=_step_config(), passes=2, pack_size=4)
+        other = context.model_copy(update={"description_text": "Venice, 1972"})
+        items = [(images[0], context), (images[1], context), (images[2], other)]
+        from picture_analyzer.analyzers.openai import OpenAIAnalyzer
+        with patch.object(OpenAIAnalyzer, "analyze_sections_packed", return_value=[None, None]) as pack:
+            step.prime(items)
+        # one pack of two images per metadata pass; the lone image is left alone
+        assert [(c.args[0], c.args[2]) for c in pack.call_args_list] == [
+            (images[:2], ["metadata_part1"]),
+            (images[:2], ["metadata_part2"]),
+        ]
+
+    def test_failed_pack_call_leaves_images_to_run(self, images, context, empty_result, monkeypatch):
+        monkeypatch.setenv("OPENAI_APIKEY", "sk-test")
+        step = MetadataStep(config=_step_config(), passes=1, pack_size=3)
+        from picture_analyzer.analyzers.openai import OpenAIAnalyzer
+        with patch.object(OpenAIAnalyzer, "analyze_sections_packed", side_effect=RuntimeError("boom")), \
+             patch.object(OpenAIAnalyzer, "analyze_section",
+                          return_value=AnalysisResult(title="single")) as single:
+            step.prime([(image, context) for image in images])
+            step.run(images[0], context, empty_result)
+        single.assert_called_once()
+
+    def test_ollama_step_does_not_pack(self):
+        config = {**_step_config(), "provider": "ollama", "model": "llava"}
+        assert MetadataStep(config=config, pack_size=4).pack_size == 1
+
+    def test_pipeline_primes_packing_steps(self, tmp_path, context):
+        paths = []
+        for n in range(2):
+            paths.append(tmp_path / f"img{n}.jpg")
+            paths[-1].write_bytes(b"jpeg bytes")
+        packing = MagicMock(pack_size=2)
+        packing.name = "metadata"
+        pipeline = AnalysisPipeline(steps=[packing, _RecordingStep("location")])
+        assert pipeline.pack_size() == 2
+        assert pipeline.pack_size(only_steps=["location"]) == 1
+        items = [(ImageData(path=path, mime_type="image/jpeg"), context) for path in paths]
+        with patch("picture_analyzer.analyzers.payload.encode_file", return_value="ZW5j"):
+            pipeline.prime(items)
+        primed = packing.prime.call_args.args[0]
+        assert [image.path for image, _ in primed] == paths
+        assert all(image.base64_data is None for image, _ in primed)  # released afterwards
+
 
 # ── LocationStep ──────────────────────────────────────────────────────
 
@@ -199,6 +293,121 @@ class TestSlideProfileStep:
         assert result.slide_profile.profile_name == "faded"
 
 
+# ── LocalSlideProfileStep ─────────────────────────────────────────────
+
+def _classifier(*profiles) -> MagicMock:
+    classifier = MagicMock()
+    classifier.classify.return_value = ClassifierResult(
+        profiles=list(profiles), features=SlideFeatures(0.0, 0.0, 0.3, 0.1, 0.7)
+    )
+    return classifier
+
+
+class TestLocalSlideProfileStep:
+    def test_satisfies_protocol(self):
+        assert isinstance(LocalSlideProfileStep(), AnalysisStep)
+
+    def test_skip_when_context_flag_off(self, image, empty_result):
+        classifier = _classifier(("faded", 90))
+        step = LocalSlideProfileStep(classifier=classifier)
+        result = step.run(image, AnalysisContext(detect_slide_profiles=False), empty_result)
+        assert result is empty_result
+        classifier.classify.assert_not_called()
+
+    def test_confident_result_skips_fallback(self, image, context, empty_result):
+        fallback = MagicMock()
+        step = LocalSlideProfileStep(
+            min_confidence=60, fallback=fallback, classifier=_classifier(("faded", 85), ("aged", 30))
+        )
+        result = step.run(image, context, empty_result)
+        fallback.run.assert_not_called()
+        assert result.slide_profile == SlideProfileDetection(profile_name="faded", confidence=85)
+        assert result.raw_response["slide_profiles"] == [
+            {"profile": "faded", "confidence": 85},
+            {"profile": "aged", "confidence": 30},
+            {"profile": "well_preserved", "confidence": 20},
+        ]
+
+    def test_low_confidence_uses_fallback(self, image, context, empty_result):
+        fallback = MagicMock()
+        fallback.run.return_value = AnalysisResult(title="from llm")
+        step = LocalSlideProfileStep(
+            min_confidence=60, fallback=fallback, classifier=_classifier(("aged", 40))
+        )
+        result = step.run(image, context, empty_result)
+        fallback.run.assert_called_once_with(image, context, empty_result)
+        assert result.title == "from llm"
+        assert step._analyzer is fallback._analyzer
+
+    def test_low_confidence_without_fallback_keeps_local_result(self, image, context, empty_result):
+        step = LocalSlideProfileStep(min_confidence=60, classifier=_classifier(("aged", 40)))
+        result = step.run(image, context, empty_result)
+        assert result.slide_profile.profile_name == "aged"
+
+    def test_unreadable_image_uses_fallback(self, image, context, empty_result):
+        classifier = MagicMock()
+        classifier.classify.side_effect = FileNotFoundError("test.jpg")
+        fallback = MagicMock()
+        fallback.run.return_value = empty_result
+        step = LocalSlideProfileStep(fallback=fallback, classifier=classifier)
+        assert step.run(image, context, empty_result) is empty_result
+        fallback.run.assert_called_once()
+
+
+class TestLocalQualityStep:
+    @pytest.fixture
+    def dark_image(self, tmp_path) -> ImageData:
+        path = tmp_path / "dark.jpg"
+        Image.effect_noise((200, 150), 20).point(lambda v: v // 3).convert("RGB").save(path)
+        return ImageData(path=path, mime_type="image/jpeg")
+
+    def test_satisfies_protocol(self):
+        assert isinstance(LocalQualityStep(), AnalysisStep)
+
+    def test_replace_measures_without_llm(self, dark_image, context, empty_result):
+        fallback = MagicMock()
+        step = LocalQualityStep(mode="replace", fallback=fallback)
+        result = step.run(dark_image, context, empty_result)
+        fallback.run.assert_not_called()
+        recs = result.raw_response["enhancement"]["recommended_enhancements"]
+        assert any(rec.startswith("BRIGHTNESS: increase by") for rec in recs)
+        assert [e.raw_text for e in result.enhancement_recommendations] == recs
+        assert [e.action for e in result.enhancement_recommendations] == [
+            _extract_action(rec) for rec in recs
+        ]
+        assert result.lighting_quality.startswith("underexposed")
+        assert result.raw_response["local_quality"]["luminance"] < 0.35
+        assert not step.needs_payload and step.depends_on == ()
+
+    def test_context_passes_measurements_to_llm(self, dark_image, context, empty_result):
+        fallback = MagicMock(depends_on=("slide_profiles",))
+        fallback.run.side_effect = lambda img, ctx, p: p.model_copy(update={"title": "from llm"})
+        step = LocalQualityStep(mode="context", fallback=fallback)
+        result = step.run(dark_image, context.model_copy(update={"description_text": "Rome"}), empty_result)
+        hint = fallback.run.call_args.args[1].description_text
+        assert hint.startswith("[MEASURED IMAGE STATISTICS")
+        assert hint.endswith("Rome")
+        assert result.title == "from llm"
+        assert "local_quality" in result.raw_response
+        assert step.needs_payload and step.depends_on == ("slide_profiles",)
+
+    def test_unreadable_image_uses_fallback(self, image, context, empty_result):
+        fallback = MagicMock()
+        fallback.run.return_value = empty_result
+        step = LocalQualityStep(mode="replace", fallback=fallback)
+        assert step.run(image, context, empty_result) is empty_result
+        fallback.run.assert_called_once_with(image, context, empty_result)
+
+    def test_skip_when_context_flag_off(self, dark_image, empty_result):
+        step = LocalQualityStep(mode="replace")
+        ctx = AnalysisContext(recommend_enhancements=False)
+        assert step.run(dark_image, ctx, empty_result) is empty_result
+
+    def test_rejects_off_mode(self):
+        with pytest.raises(ValueError):
+            LocalQualityStep(mode="off")
+
+
 # ── GeocodingStep ─────────────────────────────────────────────────────
 
 class TestGeocodingStep:
@@ -254,6 +463,19 @@ class TestGeocodingStep:
 
 # ── AnalysisPipeline ──────────────────────────────────────────────────
 
+class _RecordingStep:
+    """Pass-through step that records the ImageData it receives."""
+
+    def __init__(self, name: str, needs_payload: bool = True) -> None:
+        self.name = name
+        self.needs_payload = needs_payload
+        self.seen: list[ImageData] = []
+
+    def run(self, image, context, partial):
+        self.seen.append(image)
+        return partial
+
+
 class TestAnalysisPipeline:
     def test_empty_pipeline_returns_empty_result(self, image, context):
         pipeline = AnalysisPipeline(steps=[])
@@ -284,6 +506,33 @@ class TestAnalysisPipeline:
         assert result.title == "from_a"
         assert result.scene_type == "from_b"
 
+    def test_payload_encoded_once_and_shared(self, tmp_path, context):
+        path = tmp_path / "photo.jpg"
+        path.write_bytes(b"jpeg bytes")
+        steps = [_RecordingStep("a"), _RecordingStep("b")]
+        image = ImageData(path=path, mime_type="image/jpeg")
+        with patch(
+            "picture_analyzer.analyzers.payload.encode_file", return_value="ZW5j"
+        ) as encode:
+            AnalysisPipeline(steps=steps).run(image, context)
+        encode.assert_called_once_with(path)
+        assert steps[0].seen[0] is steps[1].seen[0]
+        # Payload is released once the image is done; the caller's copy is untouched
+        assert steps[0].seen[0].base64_data is None
+        assert image.base64_data is None
+
+    def test_caller_payload_is_kept(self, image, context):
+        step = _RecordingStep("a")
+        AnalysisPipeline(steps=[step]).run(image, context)
+        assert step.seen == [image]
+        assert image.base64_data == "abc123=="
+
+    def test_no_encode_for_payload_free_steps(self, tmp_path, context):
+        step = _RecordingStep("local", needs_payload=False)
+        image = ImageData(path=tmp_path / "missing.jpg", mime_type="image/jpeg")
+        AnalysisPipeline(steps=[step]).run(image, context)
+        assert step.seen[0].base64_data is None
+
     def test_step_exception_is_skipped(self, image, context):
         bad_step = MagicMock()
         bad_step.name = "bad"
@@ -296,6 +545,105 @@ class TestAnalysisPipeline:
         assert result.title == "good"
 
 
+# ── StepScheduler ────────────────────────────────────────────────────
+
+class _TimedStep:
+    """Step that sleeps, then sets fields; records what it saw."""
+
+    def __init__(self, name, delay=0.0, depends_on=(), raw=None, **fields):
+        self.name = name
+        self.depends_on = depends_on
+        self.needs_payload = False
+        self._delay = delay
+        self._raw = raw or {}
+        self._fields = fields
+        self.seen: AnalysisResult | None = None
+        self.started = self.finished = 0.0
+
+    def run(self, image, context, partial):
+        import time
+
+        self.started = time.perf_counter()
+        self.seen = partial
+        time.sleep(self._delay)
+        self.finished = time.perf_counter()
+        return partial.model_copy(
+            update={**self._fields, "raw_response": {**partial.raw_response, **self._raw}}
+        )
+
+
+class TestResultDelta:
+    def test_reports_changed_fields_and_raw_keys(self):
+        before = AnalysisResult(title="a", raw_response={"x": 1, "y": 2})
+        after = before.model_copy(update={"title": "b", "raw_response": {"x": 1, "y": 3, "z": 4}})
+        assert result_delta(before, after) == {"title": "b", "raw_response": {"y": 3, "z": 4}}
+
+    def test_apply_merges_raw_response(self):
+        result = apply_delta(
+            AnalysisResult(raw_response={"x": 1}), {"raw_response": {"y": 2}, "mood": "calm"}
+        )
+        assert result.raw_response == {"x": 1, "y": 2}
+        assert result.mood == "calm"
+
+
+class TestStepScheduler:
+    def test_independent_steps_overlap(self, image, context):
+        steps = [_TimedStep(n, delay=0.2) for n in ("metadata", "location", "slide_profiles")]
+        pipeline = AnalysisPipeline(steps, max_parallel_steps=3)
+        import time
+
+        t0 = time.perf_counter()
+        pipeline.run(image, context)
+        assert time.perf_counter() - t0 < 0.45
+
+    def test_dependent_step_waits_and_sees_dependency(self, image, context):
+        slide = _TimedStep(
+            "slide_profiles", delay=0.1,
+            slide_profile=SlideProfileDetection(profile_name="faded", confidence=90),
+        )
+        enhancement = _TimedStep("enhancement", depends_on=("slide_profiles",), lighting_quality="ok")
+        metadata = _TimedStep("metadata", delay=0.1, title="t")
+        result = AnalysisPipeline([metadata, slide, enhancement], max_parallel_steps=3).run(image, context)
+        assert enhancement.started >= slide.finished
+        assert enhancement.seen.slide_profile.profile_name == "faded"
+        assert (result.title, result.lighting_quality) == ("t", "ok")
+
+    def test_merge_matches_sequential_order(self, image, context):
+        def steps():
+            # metadata finishes last but must not override location's raw key
+            return [
+                _TimedStep("metadata", delay=0.15, raw={"metadata": {"a": 1}, "location_detection": {}}),
+                _TimedStep("location", raw={"location_detection": {"country": "NL"}}),
+            ]
+
+        sequential = AnalysisPipeline(steps()).run(image, context)
+        concurrent = AnalysisPipeline(steps(), max_parallel_steps=2).run(image, context)
+        assert concurrent.raw_response == sequential.raw_response
+        assert concurrent.raw_response["location_detection"] == {"country": "NL"}
+
+    def test_missing_dependency_is_satisfied(self, image, context):
+        geo = _TimedStep("geocoding", depends_on=("location",), title="geo")
+        result = StepScheduler(2).run([geo], lambda step, p: step.run(image, context, p), AnalysisResult())
+        assert result.title == "geo"
+
+    def test_failure_stops_scheduling(self, image, context):
+        class Boom(_TimedStep):
+            def run(self, image, context, partial):
+                raise RuntimeError("boom")
+
+        dependent = _TimedStep("enhancement", depends_on=("slide_profiles",))
+        pipeline = AnalysisPipeline(
+            [Boom("slide_profiles"), dependent], max_parallel_steps=2
+        )
+        with pytest.raises(AnalysisError, match="slide_profiles"):
+            pipeline.run(image, context)
+        assert dependent.seen is None
+
+    def test_enhancement_and_geocoding_declare_dependencies(self):
+        assert EnhancementStep.depends_on == ("slide_profiles",)
+        assert GeocodingStep.depends_on == ("location",)
+
+
 # ── build_pipeline / build_steps ─────────────────────────────────────
 
 class TestBuildPipeline:
@@ -308,6 +656,30 @@ class TestBuildPipeline:
         names = [s.name for s in pipeline._steps]
         assert names == ["metadata", "location", "enhancement", "slide_profiles", "geocoding"]
 
+    def test_local_slide_classifier_wraps_llm_step(self):
+        s = Settings(
+            openai={"api_key": "sk-test"},
+            analyzer_provider="openai",
+            pipeline={"mode": "stepped", "slide_classifier": "local"},
+        )
+        slide_step = next(st for st in build_steps(s) if st.name == "slide_profiles")
+        assert isinstance(slide_step, LocalSlideProfileStep)
+        assert isinstance(slide_step._fallback, SlideProfileStep)
+        assert slide_step._min_confidence == 60
+
+    @pytest.mark.parametrize("mode", ["replace", "context"])
+    def test_local_quality_wraps_enhancement_step(self, mode, monkeypatch):
+        monkeypatch.setenv("OPENAI_APIKEY", "sk-test")
+        s = Settings(
+            openai={"api_key": "sk-test"},
+            pipeline={"mode": "stepped", "local_quality": mode,
+                      "enhancement": {"provider": "openai"}},
+        )
+        step = next(st for st in build_steps(s) if st.name == "enhancement")
+        assert isinstance(step, LocalQualityStep)
+        assert isinstance(step._fallback, EnhancementStep)
+        assert step._mode == mode
+
     def test_disabled_slide_profiles_step(self):
         s = Settings(
             openai={"api_key": "sk-test"},
@@ -8,7 +8,8 @@ module-level helpers (``_str``, ``_to_list``, ``_join_parts``,
 from __future__ import annotations
 
 import base64
-from unittest.mock import patch
+import json
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -134,6 +135,231 @@ class TestParseJson:
         result = analyzer._parse_json(response)
         assert "raw_response" in result
 
+    def test_bare_json_fast_path(self, analyzer):
+        response = '{"location_detection": {"country": "Netherlands", "confidence": 90}}'
+        result = analyzer._parse_json(response, sections=["location"])
+        assert result["location_detection"]["country"] == "Netherlands"
+
+
+# ── Structured output ────────────────────────────────────────────────
+
+
+class TestStructuredOutput:
+    @pytest.fixture
+    def image(self):
+        return ImageData(path="x.jpg", mime_type="image/jpeg", base64_data="aGVsbG8=")
+
+    def test_openai_sends_json_schema(self, image):
+        with patch("picture_analyzer.analyzers.openai.OpenAI"):
+            analyzer = OpenAIAnalyzer(api_key="sk-test")
+        analyzer.structured_output = True
+        create = analyzer.client.chat.completions.create
+        create.return_value.choices[0].message.content = '{"location_detection": {}}'
+        analyzer._call_api(image, AnalysisContext(), prompt_override="where", sections=["location"])
+        response_format = create.call_args.kwargs["response_format"]
+        assert response_format["type"] == "json_schema"
+        assert response_format["json_schema"]["strict"] is True
+        assert response_format["json_schema"]["schema"]["required"] == ["location_detection"]
+
+    def test_openai_plain_without_structured_output(self, image):
+        with patch("picture_analyzer.analyzers.openai.OpenAI"):
+            analyzer = OpenAIAnalyzer(api_key="sk-test")
+        create = analyzer.client.chat.completions.create
+        create.return_value.choices[0].message.content = "{}"
+        analyzer._call_api(image, AnalysisContext(), prompt_override="where", sections=["location"])
+        assert "response_format" not in create.call_args.kwargs
+
+    def test_ollama_format_is_schema(self, image):
+        from picture_analyzer.analyzers.ollama import OllamaAnalyzer
+
+        with patch("picture_analyzer.analyzers.ollama.ollama.Client"):
+            analyzer = OllamaAnalyzer(model="llava")
+        analyzer.structured_output = True
+        analyzer.client.chat.return_value = {"message": {"content": "{}"}}
+        analyzer._call_api(image, AnalysisContext(), prompt_override="x", sections=["slide_profiles"])
+        fmt = analyzer.client.chat.call_args.kwargs["format"]
+        assert fmt["required"] == ["slide_profiles"]
+
+        analyzer.structured_output = False
+        analyzer._call_api(image, AnalysisContext(), prompt_override="x", sections=["slide_profiles"])
+        assert analyzer.client.chat.call_args.kwargs["format"] == "json"
+
+
+class TestReaskMissing:
+    _PART1 = {
+        "objects": "boat, quay",
+        "persons": "no persons visible",
+        "weather": "sunny",
+        "mood_atmosphere": "calm",
+        "time_of_day": "afternoon",
+        "season_date": "summer, 1970s",
+    }
+
+    @pytest.fixture
+    def analyzer(self):
+        with patch("picture_analyzer.analyzers.openai.OpenAI"):
+            analyzer = OpenAIAnalyzer(api_key="sk-test")
+        analyzer.structured_output = True
+        analyzer.reask_max_fields = 4
+        return analyzer
+
+    @pytest.fixture
+    def image(self):
+        return ImageData(path="x.jpg", mime_type="image/jpeg", base64_data="aGVsbG8=")
+
+    def test_asks_only_for_missing_fields(self, analyzer, image):
+        raw = {"metadata": {**self._PART1, "weather": "", "season_date": "summer, ear…"}}
+        create = analyzer.client.chat.completions.create
+        create.return_value.choices[0].message.content = (
+            '{"metadata": {"weather": "overcast", "season_date": "summer, early 1970s"}}'
+        )
+        merged = analyzer._reask_missing(raw, image, AnalysisContext(), ["metadata_part1"])
+
+        assert merged["metadata"]["weather"] == "overcast"
+        assert merged["metadata"]["season_date"] == "summer, early 1970s"
+        assert merged["metadata"]["objects"] == "boat, quay"
+        request = create.call_args.kwargs
+        schema = request["response_format"]["json_schema"]["schema"]
+        assert schema["properties"]["metadata"]["required"] == ["weather", "season_date"]
+        prompt = request["messages"][1]["content"][0]["text"]
+        assert "metadata.weather" in prompt and "metadata.objects" not in prompt
+        assert request["messages"][1]["content"][1]["image_url"]["url"].endswith("aGVsbG8=")
+        assert analyzer._last_call_stats["reasked"] == 2
+
+    def test_complete_response_is_not_reasked(self, analyzer, image):
+        raw = {"metadata": dict(self._PART1)}
+        assert analyzer._reask_missing(raw, image, AnalysisContext(), ["metadata_part1"]) is raw
+        analyzer.client.chat.completions.create.assert_not_called()
+
+    def test_too_many_missing_fields_keeps_gaps(self, analyzer, image):
+        raw = {"metadata": {"objects": "boat"}}
+        assert analyzer._reask_missing(raw, image, AnalysisContext(), ["metadata_part1"]) is raw
+        analyzer.client.chat.completions.create.assert_not_called()
+
+    def test_failed_reask_keeps_original(self, analyzer, image):
+        raw = {"metadata": {**self._PART1, "weather": None}}
+        analyzer._last_call_stats = {"prompt_tokens": 900, "output_tokens": 120}
+        analyzer.client.chat.completions.create.side_effect = RuntimeError("boom")
+        assert analyzer._reask_missing(raw, image, AnalysisContext(), ["metadata_part1"]) is raw
+        assert analyzer._last_call_stats == {"prompt_tokens": 900, "output_tokens": 120}
+
+    def test_checks_response_before_defaults_are_filled_in(self, analyzer, image):
+        enhancement = {
+            "lighting_quality": "even", "color_analysis": "faded", "sharpness_clarity": "soft",
+            "contrast_level": "low", "composition_issues": "none",
+            "recommended_enhancements": [], "overall_priority": "contrast",
+        }
+        create = analyzer.client.chat.completions.create
+        create.return_value.choices[0].message.content = json.dumps({"enhancement": enhancement})
+        analyzer.reask_max_fields = 0
+        result = analyzer.analyze_section(image, AnalysisContext(), ["enhancement"])
+        assert result.raw_response["enhancement"]["recommended_enhancements"]  # defaults
+
+        analyzer.reask_max_fields = 4
+        first = json.dumps({"enhancement": enhancement})
+        reask = json.dumps({"enhancement": {"recommended_enhancements": ["CONTRAST: boost by 20%"]}})
+        answers = iter([first, reask])
+
+        def reply(**_):
+            response = MagicMock()
+            response.choices[0].message.content = next(answers)
+            return response
+
+        create.side_effect = reply
+        result = analyzer.analyze_section(image, AnalysisContext(), ["enhancement"])
+        assert create.call_count == 3
+        assert result.raw_response["enhancement"]["recommended_enhancements"] == [
+            "CONTRAST: boost by 20%"
+        ]
+
+    def test_disabled_by_default(self, image):
+        with patch("picture_analyzer.analyzers.openai.OpenAI"):
+            analyzer = OpenAIAnalyzer(api_key="sk-test")
+        raw = {"metadata": {}}
+        assert analyzer._reask_missing(raw, image, AnalysisContext(), ["metadata_part1"]) is raw
+
+
+class TestPackedRequests:
+    _PART1 = TestReaskMissing._PART1
+
+    @pytest.fixture
+    def analyzer(self):
+        with patch("picture_analyzer.analyzers.openai.OpenAI"):
+            analyzer = OpenAIAnalyzer(api_key="sk-test", max_tokens=1000)
+        analyzer.structured_output = True
+        return analyzer
+
+    @pytest.fixture
+    def images(self, tmp_path):
+        images = []
+        for n, payload in enumerate(["aW1nMA==", "aW1nMQ=="]):
+            path = tmp_path / f"img{n}.jpg"
+            path.write_bytes(b"\xff\xd8" + b"\x00" * 20)
+            images.append(ImageData(path=path, mime_type="image/jpeg", base64_data=payload))
+        return images
+
+    def test_one_request_split_per_image(self, analyzer, images):
+        create = analyzer.client.chat.completions.create
+        create.return_value.choices[0].message.content = json.dumps({"images": [
+            {"index": 1, "metadata": {**self._PART1, "objects": "tram"}},
+            {"index": 0, "metadata": self._PART1},
+        ]})
+        results = analyzer.analyze_sections_packed(images, AnalysisContext(), ["metadata_part1"])
+
+        create.assert_called_once()
+        assert results[0].raw_response["metadata"]["objects"] == "boat, quay"
+        assert results[1].raw_response["metadata"]["objects"] == "tram"
+        request = create.call_args.kwargs
+        assert request["max_tokens"] == 2000
+        content = request["messages"][1]["content"]
+        assert "2 images" in content[0]["text"]
+        assert [part["text"] for part in content if part["type"] == "text"][1:] == ["Image 0:", "Image 1:"]
+        assert content[2]["image_url"]["url"].endswith("aW1nMA==")
+        assert content[4]["image_url"]["url"].endswith("aW1nMQ==")
+        schema = request["response_format"]["json_schema"]["schema"]
+        assert schema["properties"]["images"]["items"]["required"] == ["index", "metadata"]
+
+    def test_incomplete_or_missing_answer_is_none(self, analyzer, images):
+        create = analyzer.client.chat.completions.create
+        create.return_value.choices[0].message.content = json.dumps({"images": [
+            {"index": 0, "metadata": {**self._PART1, "weather": ""}},
+        ]})
+        results = analyzer.analyze_sections_packed(images, AnalysisContext(), ["metadata_part1"])
+        assert results == [None, None]
+
+    def test_max_tokens_capped_at_output_limit(self, images):
+        with patch("picture_analyzer.analyzers.openai.OpenAI"):
+            analyzer = OpenAIAnalyzer(api_key="sk-test", max_tokens=100_000)
+        create = analyzer.client.chat.completions.create
+        create.return_value.choices[0].message.content = json.dumps({"images": []})
+        analyzer.analyze_sections_packed(images, AnalysisContext(), ["metadata_part1"])
+        assert create.call_args.kwargs["max_tokens"] == 4096
+        assert analyzer.max_pack_size == 8
+
+    def test_pack_larger_than_output_cap_is_split(self, analyzer, tmp_path):
+        images = []
+        for n in range(analyzer.max_pack_size + 1):
+            path = tmp_path / f"img{n}.jpg"
+            path.write_bytes(b"\xff\xd8" + b"\x00" * 20)
+            images.append(ImageData(path=path, mime_type="image/jpeg", base64_data="aW1n"))
+        create = analyzer.client.chat.completions.create
+        create.return_value.choices[0].message.content = json.dumps({"images": []})
+
+        results = analyzer.analyze_sections_packed(images, AnalysisContext(), ["metadata_part1"])
+
+        assert results == [None] * len(images)
+        assert create.call_count == 2
+        assert [call.kwargs["max_tokens"] for call in create.call_args_list] == [
+            1000 * analyzer.max_pack_size, 1000,
+        ]
+
+    def test_offline_batch_does_not_pack(self, analyzer, images):
+        from picture_analyzer.analyzers.openai_batch import OfflineBatch
+
+        analyzer.offline_batch = OfflineBatch()
+        assert analyzer.analyze_sections_packed(images, AnalysisContext(), ["metadata"]) == [None, None]
+        analyzer.client.chat.completions.create.assert_not_called()
+
 
 # ── OpenAIAnalyzer._to_analysis_result ──────────────────────────────
 
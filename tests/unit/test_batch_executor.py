@@ -0,0 +1,185 @@
+"""Tests for the staged prefetch → analyze → write-back batch executor."""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from picture_analyzer.pipeline.batch import AsyncBatchExecutor, BatchExecutor
+
+
+class _Recorder:
+    """Stage functions that log events with timestamps."""
+
+    def __init__(self, analyze_delay: float = 0.0, finish_delay: float = 0.0):
+        self.events: list[tuple[str, int, float]] = []
+        self.callback_threads: set[int] = set()
+        self._lock = threading.Lock()
+        self._analyze_delay = analyze_delay
+        self._finish_delay = finish_delay
+        self.done: list[int] = []
+        self.failed: list[tuple[int, str]] = []
+
+    def _log(self, event: str, item: int) -> None:
+        with self._lock:
+            self.events.append((event, item, time.perf_counter()))
+
+    def prepare(self, item):
+        self._log("prepare", item)
+        return f"payload-{item}"
+
+    def analyze(self, item, payload):
+        assert payload == f"payload-{item}"
+        self._log("analyze-start", item)
+        time.sleep(self._analyze_delay)
+        self._log("analyze-end", item)
+        return item * 10
+
+    def finish(self, item, result):
+        time.sleep(self._finish_delay)
+        self._log("finish", item)
+        return result + 1
+
+    def on_done(self, item, written):
+        self.callback_threads.add(threading.get_ident())
+        assert written == item * 10 + 1
+        self.done.append(item)
+
+    def on_error(self, item, stage, exc):
+        self.callback_threads.add(threading.get_ident())
+        self.failed.append((item, stage))
+
+    def time_of(self, event: str, item: int) -> float:
+        return next(t for e, i, t in self.events if e == event and i == item)
+
+
+def _run(executor: BatchExecutor, recorder: _Recorder, items) -> None:
+    executor.run(
+        items, recorder.prepare, recorder.analyze, recorder.finish,
+        on_done=recorder.on_done, on_error=recorder.on_error,
+    )
+
+
+class TestBatchExecutor:
+    @pytest.mark.parametrize("prefetch, io_workers", [(0, 0), (1, 1), (2, 3)])
+    def test_processes_all_items_in_order(self, prefetch, io_workers):
+        recorder = _Recorder()
+        _run(BatchExecutor(prefetch=prefetch, io_workers=io_workers), recorder, range(6))
+        assert recorder.done == list(range(6))
+        analyzed = [i for e, i, _ in recorder.events if e == "analyze-start"]
+        assert analyzed == list(range(6))
+
+    def test_callbacks_run_in_calling_thread(self):
+        recorder = _Recorder()
+        _run(BatchExecutor(prefetch=1, io_workers=2), recorder, range(4))
+        assert recorder.callback_threads == {threading.get_ident()}
+
+    def test_next_image_prepared_during_inference(self):
+        recorder = _Recorder(analyze_delay=0.1)
+        _run(BatchExecutor(prefetch=1, io_workers=1), recorder, range(3))
+        assert recorder.time_of("prepare", 1) < recorder.time_of("analyze-end", 0)
+
+    def test_write_back_overlaps_next_inference(self):
+        recorder = _Recorder(analyze_delay=0.1, finish_delay=0.05)
+        _run(BatchExecutor(prefetch=1, io_workers=1), recorder, range(2))
+        assert recorder.time_of("finish", 0) < recorder.time_of("analyze-end", 1)
+
+    def test_backpressure_limits_pending_writes(self):
+        recorder = _Recorder(finish_delay=0.05)
+        _run(BatchExecutor(prefetch=0, io_workers=1, max_pending_writes=1), recorder, range(3))
+        # With one pending write allowed, item 2 cannot start before item 0 is written
+        assert recorder.time_of("analyze-start", 2) >= recorder.time_of("finish", 0)
+
+    @pytest.mark.parametrize("stage", ["prepare", "analyze", "finish"])
+    def test_stage_failure_reported_and_batch_continues(self, stage):
+        recorder = _Recorder()
+        original = getattr(recorder, stage)
+
+        def failing(item, *args):
+            if item == 1:
+                raise RuntimeError("boom")
+            return original(item, *args)
+
+        setattr(recorder, stage, failing)
+        _run(BatchExecutor(prefetch=1, io_workers=1), recorder, range(3))
+        assert recorder.failed == [(1, stage)]
+        assert recorder.done == [0, 2]
+
+
+class TestAsyncBatchExecutor:
+    @staticmethod
+    def _run_async(executor, recorder, items, in_flight=None):
+        active = [0]
+
+        async def analyze(item, payload):
+            active[0] += 1
+            if in_flight is not None:
+                in_flight.append(active[0])
+            await asyncio.sleep(0.02)
+            active[0] -= 1
+            return recorder.analyze(item, payload)
+
+        executor.run(
+            items, recorder.prepare, analyze, recorder.finish,
+            on_done=recorder.on_done, on_error=recorder.on_error,
+        )
+
+    def test_processes_all_items_concurrently(self):
+        recorder = _Recorder()
+        in_flight: list[int] = []
+        self._run_async(AsyncBatchExecutor(concurrency=3, io_workers=2), recorder, range(7), in_flight)
+        assert sorted(recorder.done) == list(range(7))
+        assert max(in_flight) == 3
+
+    def test_on_done_runs_off_the_event_loop(self):
+        recorder = _Recorder()
+        self._run_async(AsyncBatchExecutor(concurrency=2), recorder, range(3))
+        assert len(recorder.callback_threads) == 1
+        assert threading.get_ident() not in recorder.callback_threads
+
+    def test_blocking_on_done_does_not_stall_requests(self):
+        recorder = _Recorder()
+        release = threading.Event()
+        analyzed: list[int] = []
+
+        async def analyze(item, payload):
+            await asyncio.sleep(0.05 if item else 0)
+            analyzed.append(item)
+            if len(analyzed) == 3:
+                release.set()  # items 1 and 2 finished while item 0's callback blocked
+            return item * 10
+
+        def on_done(item, written):
+            if item == 0:
+                assert release.wait(timeout=5), "analyze stalled behind on_done"
+            recorder.done.append(item)
+
+        AsyncBatchExecutor(concurrency=3).run(
+            range(3), recorder.prepare, analyze, recorder.finish, on_done=on_done,
+        )
+        assert release.is_set()
+        assert recorder.done == [0, 1, 2]
+
+    def test_concurrency_one_is_sequential(self):
+        recorder = _Recorder()
+        in_flight: list[int] = []
+        self._run_async(AsyncBatchExecutor(concurrency=1), recorder, range(4), in_flight)
+        assert recorder.done == list(range(4))
+        assert max(in_flight) == 1
+
+    @pytest.mark.parametrize("stage", ["prepare", "finish"])
+    def test_stage_failure_reported_and_batch_continues(self, stage):
+        recorder = _Recorder()
+        original = getattr(recorder, stage)
+
+        def failing(item, *args):
+            if item == 1:
+                raise RuntimeError("boom")
+            return original(item, *args)
+
+        setattr(recorder, stage, failing)
+        self._run_async(AsyncBatchExecutor(concurrency=2), recorder, range(3))
+        assert recorder.failed == [(1, stage)]
+        assert sorted(recorder.done) == [0, 2]
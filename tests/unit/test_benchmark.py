@@ -0,0 +1,110 @@
+"""Tests for the filter/restoration benchmark suite."""
+from __future__ import annotations
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from picture_analyzer.cli.app import cli
+from picture_analyzer.enhancers import benchmark as bench
+from picture_analyzer.enhancers import filters as filter_module
+from picture_analyzer.enhancers.profiles.slide_restorer import SlideRestorer
+
+TINY = 0.01  # megapixels; keeps every case well under a second
+
+
+def test_synthetic_image_size():
+    image = bench.synthetic_image(0.06)
+    assert image.mode == "RGB"
+    assert image.size == (300, 200)
+
+
+def test_default_cases_cover_filters_and_profiles():
+    cases = bench.default_cases()
+    filters = {c.name for c in cases if c.group == "filter"}
+    assert filters == {name.removesuffix("Filter") for name in filter_module.__all__}
+    profiles = {c.name for c in cases if c.group == "profile"}
+    assert profiles == set(SlideRestorer().available_profiles)
+    recommendations = {c.name for c in cases if c.group == "recommendations"}
+    assert set(bench.RECOMMENDATION_CASES) <= recommendations
+    assert "full+shared_blurs" in recommendations
+
+
+def test_cases_build_quiet_pipelines(capsys):
+    for case in bench.default_cases():
+        assert len(case.build()) > 0
+    assert capsys.readouterr().out == ""
+
+
+def test_select_cases():
+    cases = bench.default_cases()
+    selected = bench.select_cases(cases, "PROFILE/")
+    assert selected and all(c.group == "profile" for c in selected)
+    assert bench.select_cases(cases, None) == cases
+
+
+def test_run_benchmarks_records_throughput():
+    cases = bench.select_cases(bench.default_cases(), "filter/Bright")
+    results = bench.run_benchmarks([TINY, 2 * TINY], cases, repeat=1)
+    assert [r.key for r in results] == ["filter/Brightness@0.01", "filter/Brightness@0.02"]
+    for result in results:
+        assert result.seconds > 0
+        assert result.mp_per_s == pytest.approx(
+            bench.synthetic_image(result.megapixels).size[0]
+            * bench.synthetic_image(result.megapixels).size[1]
+            / 1_000_000 / result.seconds
+        )
+        assert result.peak_mb is None or result.peak_mb >= 0
+
+
+def _result(key_name: str, mp_per_s: float) -> bench.BenchmarkResult:
+    return bench.BenchmarkResult("filter", key_name, 1, 1 / mp_per_s, mp_per_s, None)
+
+
+def test_baseline_round_trip(tmp_path):
+    path = tmp_path / "baseline.json"
+    bench.save_baseline([_result("Brightness", 120.0)], path)
+    assert bench.load_baseline(path) == {"filter/Brightness@1": 120.0}
+    assert json.loads(path.read_text())["filter/Brightness@1"]["group"] == "filter"
+
+
+def test_compare_flags_slowdowns_beyond_tolerance():
+    baseline = {"filter/A@1": 100.0, "filter/B@1": 100.0}
+    results = [_result("A", 80.0), _result("B", 70.0), _result("C", 1.0)]
+    regressions = bench.compare(results, baseline, tolerance=0.25)
+    assert [r.key for r in regressions] == ["filter/B@1"]
+    assert regressions[0].change == pytest.approx(-0.3)
+
+
+class TestBenchmarkCommand:
+    def test_saves_baseline(self, tmp_path):
+        path = tmp_path / "baseline.json"
+        result = CliRunner().invoke(cli, [
+            "benchmark", "--sizes", str(TINY), "--only", "filter/Contrast",
+            "--repeat", "1", "--save-baseline", str(path),
+        ])
+        assert result.exit_code == 0, result.output
+        assert "filter/Contrast" in result.output
+        assert list(bench.load_baseline(path)) == ["filter/Contrast@0.01"]
+
+    def test_fails_on_regression(self, tmp_path):
+        path = tmp_path / "baseline.json"
+        bench.save_baseline(
+            [bench.BenchmarkResult("filter", "Contrast", TINY, 1e-9, 1e9, None)], path
+        )
+        result = CliRunner().invoke(cli, [
+            "benchmark", "--sizes", str(TINY), "--only", "filter/Contrast",
+            "--repeat", "1", "--baseline", str(path),
+        ])
+        assert result.exit_code != 0
+        assert "regression" in result.output
+
+    def test_unknown_case(self):
+        result = CliRunner().invoke(cli, ["benchmark", "--only", "nope"])
+        assert result.exit_code != 0
+        assert "No benchmark cases" in result.output
+
+    def test_rejects_bad_sizes(self):
+        result = CliRunner().invoke(cli, ["benchmark", "--sizes", "1,x"])
+        assert result.exit_code != 0
@@ -0,0 +1,149 @@
+"""Tests for the small-model-first analyzer cascade."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from picture_analyzer.analyzers.cascade import (
+    CascadeAnalyzer,
+    CascadeStats,
+    escalation_reason,
+)
+from picture_analyzer.config.settings import Settings, resolve_step_config
+from picture_analyzer.core.models import (
+    AnalysisContext,
+    AnalysisResult,
+    ImageData,
+    LocationInfo,
+    SlideProfileDetection,
+)
+from picture_analyzer.pipeline.steps import LocationStep
+
+_LOCATION = {
+    "location_detection": {
+        "country": "Italy",
+        "region": "Veneto",
+        "city_or_area": "Venice",
+        "location_type": "canal, old town",
+        "confidence": 85,
+        "reasoning": "gondolas on a canal",
+    }
+}
+
+
+def _location_result(confidence: int, raw: dict | None = None) -> AnalysisResult:
+    return AnalysisResult(
+        location=LocationInfo(location_name="Venice", confidence=confidence),
+        raw_response=raw if raw is not None else _LOCATION,
+    )
+
+
+class _FakeAnalyzer:
+    def __init__(self, model: str, result: AnalysisResult | Exception):
+        self.model = model
+        self.result = result
+        self.calls = 0
+        self._last_call_stats = {"prompt_tokens": 100, "output_tokens": 10}
+
+    def analyze_section(self, image, context, sections):
+        self.calls += 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+@pytest.fixture
+def image() -> ImageData:
+    return ImageData(path=Path("x.jpg"), mime_type="image/jpeg", base64_data="abc=")
+
+
+class TestEscalationReason:
+    def test_confident_complete_answer_is_kept(self):
+        assert escalation_reason(_location_result(85), ["location"], 70) is None
+
+    def test_low_location_confidence(self):
+        assert "location confidence 40%" in escalation_reason(_location_result(40), ["location"], 70)
+
+    def test_missing_field(self):
+        raw = {"location_detection": {**_LOCATION["location_detection"], "country": ""}}
+        reason = escalation_reason(_location_result(85, raw), ["location"], 70)
+        assert "location_detection.country" in reason
+
+    def test_low_slide_profile_confidence(self):
+        result = AnalysisResult(
+            slide_profile=SlideProfileDetection(profile_name="faded", confidence=30),
+            raw_response={"slide_profiles": [{"profile": "faded", "confidence": 30}]},
+        )
+        assert "slide profile confidence 30%" in escalation_reason(result, ["slide_profiles"], 70)
+
+
+class TestCascadeAnalyzer:
+    def test_keeps_small_model_answer(self, image):
+        small = _FakeAnalyzer("mini", _location_result(90))
+        large = _FakeAnalyzer("big", _location_result(95))
+        cascade = CascadeAnalyzer(small, large, min_confidence=70)
+        result = cascade.analyze_section(image, AnalysisContext(), ["location"])
+        assert result.location.confidence == 90
+        assert (small.calls, large.calls) == (1, 0)
+        assert cascade.stats.calls == 1 and cascade.stats.escalated == 0
+        assert "escalated" not in cascade._last_call_stats
+
+    @pytest.mark.parametrize("small_result", [_location_result(20), RuntimeError("bad JSON")])
+    def test_escalates_to_large_model(self, image, small_result):
+        small = _FakeAnalyzer("mini", small_result)
+        large = _FakeAnalyzer("big", _location_result(95))
+        cascade = CascadeAnalyzer(small, large, min_confidence=70)
+        result = cascade.analyze_section(image, AnalysisContext(), ["location"])
+        assert result.location.confidence == 95
+        assert (small.calls, large.calls) == (1, 1)
+        assert cascade.stats.escalated == 1
+        assert cascade._last_call_stats["escalated"] == "big"
+
+    def test_model_name(self):
+        cascade = CascadeAnalyzer(_FakeAnalyzer("mini", None), _FakeAnalyzer("big", None))
+        assert cascade.model == "mini→big"
+
+
+class TestCascadeStats:
+    def test_time_saved(self):
+        # 10 calls: 1 s each on the small model, the 2 escalations took 5 s each
+        stats = CascadeStats(calls=10, escalated=2, small_seconds=10.0, large_seconds=10.0)
+        assert stats.time_saved == pytest.approx(50.0 - 20.0)
+        assert str(stats) == "2/10 escalated, ~30s saved"
+
+    def test_unknown_without_escalations(self):
+        stats = CascadeStats(calls=4, small_seconds=4.0)
+        assert stats.time_saved is None
+        assert "unknown" in str(stats)
+
+
+class TestCascadeConfig:
+    def test_resolves_small_model_config(self):
+        settings = Settings(
+            openai={"api_key": "sk-test"},
+            pipeline={"location": {"provider": "openai", "model": "gpt-4o",
+                                   "cascade_model": "llava:7b", "cascade_provider": "ollama",
+                                   "cascade_min_confidence": 60}},
+        )
+        resolved = resolve_step_config(settings.pipeline.location, settings)
+        assert resolved["model"] == "gpt-4o"
+        assert resolved["cascade"]["provider"] == "ollama"
+        assert resolved["cascade"]["model"] == "llava:7b"
+        assert resolved["cascade"]["cascade"] is None
+        assert resolved["cascade_min_confidence"] == 60
+
+    def test_no_cascade_by_default(self):
+        settings = Settings(openai={"api_key": "sk-test"})
+        assert resolve_step_config(settings.pipeline.location, settings)["cascade"] is None
+
+    def test_step_builds_cascade_analyzer(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_APIKEY", "sk-test")
+        settings = Settings(
+            openai={"api_key": "sk-test"},
+            pipeline={"location": {"provider": "openai", "model": "gpt-4o",
+                                   "cascade_model": "gpt-4o-mini"}},
+        )
+        step = LocationStep(config=resolve_step_config(settings.pipeline.location, settings))
+        assert isinstance(step._analyzer, CascadeAnalyzer)
+        assert step._analyzer.model == "gpt-4o-mini→gpt-4o"
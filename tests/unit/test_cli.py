@@ -154,12 +154,195 @@ class TestAnalyze:
         ])
         assert result.exit_code == 0
 
+    def test_analyze_restore_multiple_profiles(
+        self, runner, fake_image, mock_legacy, mock_provider_analysis, fake_analysis
+    ):
+        fake_analysis["slide_profiles"] = [
+            {"profile": "faded", "confidence": 80},
+            {"profile": "red_cast", "confidence": 60},
+        ]
+        with patch(
+            "picture_analyzer.enhancers.profiles.slide_restorer.SlideRestorer.restore_many"
+        ) as restore_many:
+            restore_many.return_value = {"faded": None, "red_cast": None}
+            result = runner.invoke(cli, [
+                "analyze", str(fake_image), "--restore-slide", "auto",
+            ])
+        assert result.exit_code == 0
+        assert "Suggested profiles: faded, red_cast" in result.output
+        (source, outputs), _ = restore_many.call_args
+        assert source.endswith("photo_analyzed.jpg")
+        assert list(outputs) == ["faded", "red_cast"]
+        assert outputs["red_cast"].endswith("photo_restored_red_cast.jpg")
+        mock_legacy["SlideRestoration"].restore_slide.assert_not_called()
+
+    def test_analyze_restore_single_profile_uses_same_engine(
+        self, runner, fake_image, mock_legacy, mock_provider_analysis
+    ):
+        with patch(
+            "picture_analyzer.enhancers.profiles.slide_restorer.SlideRestorer.restore"
+        ) as restore:
+            restore.return_value = None
+            result = runner.invoke(cli, [
+                "analyze", str(fake_image), "--restore-slide", "auto",
+            ])
+        assert result.exit_code == 0
+        (source, profile, output), _ = restore.call_args
+        assert source.endswith("photo_analyzed.jpg")
+        assert profile == "faded"
+        assert output.endswith("photo_restored.jpg")
+        mock_legacy["SlideRestoration"].restore_slide.assert_not_called()
+
     def test_analyze_batch(self, runner, fake_dir, mock_legacy, mock_provider_analysis):
         result = runner.invoke(cli, ["analyze", str(fake_dir), "--batch"])
         assert result.exit_code == 0
         assert "Found" in result.output
         assert "Batch complete" in result.output
 
+    def test_analyze_batch_enhance_inline(self, runner, fake_dir, mock_legacy, mock_provider_analysis):
+        result = runner.invoke(
+            cli, ["analyze", str(fake_dir), "--batch", "--enhance", "--cpu-workers", "0"]
+        )
+        assert result.exit_code == 0
+        assert mock_legacy["SmartEnhancer"].return_value.enhance_from_analysis.call_count == 3
+        assert "✓ 3 succeeded" in result.output
+
+    def test_analyze_batch_uses_configured_workers(
+        self, runner, fake_dir, mock_legacy, mock_provider_analysis
+    ):
+        with patch("picture_analyzer.enhancers.workers.EnhancementPool") as pool_cls:
+            result = runner.invoke(
+                cli, ["analyze", str(fake_dir), "--batch", "--enhance", "--cpu-workers", "3"]
+            )
+        assert result.exit_code == 0
+        pool_cls.assert_called_once_with(3)
+        assert pool_cls.return_value.submit.call_count == 3
+        pool_cls.return_value.close.assert_called_once()
+
+    def test_analyze_batch_passes_settings_to_workers(
+        self, runner, fake_dir, mock_legacy, mock_provider_analysis
+    ):
+        from picture_analyzer.config.settings import get_settings
+
+        settings = get_settings()
+        with patch("picture_analyzer.enhancers.workers.EnhancementPool") as pool_cls:
+            result = runner.invoke(
+                cli, ["analyze", str(fake_dir), "--batch", "--enhance", "--cpu-workers", "3"]
+            )
+        assert result.exit_code == 0
+        args = pool_cls.return_value.submit.call_args.args
+        assert args[-2:] == (settings.enhancement, settings.slide_restoration)
+
+    def test_postprocess_uses_passed_settings(self, tmp_path, mock_legacy, fake_analysis):
+        from picture_analyzer.cli.app import _postprocess_image
+        from picture_analyzer.config.settings import EnhancementConfig
+
+        with patch("picture_analyzer.cli.app.get_settings", side_effect=AssertionError("reloaded")):
+            _postprocess_image(
+                str(tmp_path / "photo.jpg"), fake_analysis, str(tmp_path), "photo",
+                True, None, EnhancementConfig(share_blurs=True, memory_budget_mb=64),
+            )
+        kwargs = mock_legacy["SmartEnhancer"].call_args.kwargs
+        assert kwargs["share_blurs"] is True
+        assert kwargs["memory_budget_mb"] == 64
+
+    def test_analyze_batch_closes_pool_on_error(
+        self, runner, fake_dir, mock_legacy, mock_provider_analysis
+    ):
+        with patch("picture_analyzer.enhancers.workers.EnhancementPool") as pool_cls, \
+                patch("picture_analyzer.pipeline.batch.BatchExecutor.run",
+                      side_effect=RuntimeError("boom")):
+            result = runner.invoke(
+                cli, ["analyze", str(fake_dir), "--batch", "--enhance", "--cpu-workers", "3"]
+            )
+        assert result.exit_code != 0
+        pool_cls.return_value.close.assert_called_once()
+
+    def test_analyze_no_cache_disables_response_cache(
+        self, runner, fake_image, mock_legacy, mock_provider_analysis
+    ):
+        from picture_analyzer.config.settings import get_settings, reset_settings
+
+        try:
+            with patch("picture_analyzer.cli.app.get_settings", wraps=get_settings) as gs:
+                result = runner.invoke(cli, ["analyze", str(fake_image), "--no-cache"])
+            assert result.exit_code == 0
+            gs.assert_any_call(response_cache={"enabled": False})
+            assert not get_settings().response_cache.enabled
+        finally:
+            reset_settings()
+
+    def test_analyze_batch_async_openai(self, runner, fake_dir, mock_legacy, mock_provider_analysis):
+        """openai.max_concurrency > 1 runs single-mode batches through analyze_async."""
+        from picture_analyzer.analyzers.rate_limit import RateLimiter
+        from picture_analyzer.config.settings import get_settings, reset_settings
+
+        analyzer = MagicMock()
+        analyzer.rate_limiter = RateLimiter(max_concurrency=4)
+
+        async def analyze_async(image, context):
+            return MagicMock(location=None)
+
+        analyzer.analyze_async.side_effect = analyze_async
+        try:
+            get_settings(openai={"max_concurrency": 4})
+            with patch("picture_analyzer.cli.app._build_analyzer", return_value=analyzer):
+                result = runner.invoke(cli, [
+                    "analyze", str(fake_dir), "--batch",
+                    "--provider", "openai", "--pipeline-mode", "single",
+                ])
+        finally:
+            reset_settings()
+        assert result.exit_code == 0, result.output
+        assert analyzer.analyze_async.call_count == 3
+        mock_provider_analysis["analyze"].assert_not_called()
+        assert "Up to 4 OpenAI request(s) in flight" in result.output
+        assert "✓ 3 succeeded" in result.output
+
+    def test_analyze_batch_submit_offline(self, runner, fake_dir, mock_legacy, tmp_path, monkeypatch):
+        """--submit-offline records the stepped requests, submits them and writes results."""
+        from picture_analyzer.analyzers.openai_batch import FileBatchBackend
+        from picture_analyzer.config.settings import get_settings, reset_settings
+
+        answer = {
+            "metadata": {"objects": "boat", "weather": "sunny", "scene_type": "harbour"},
+            "location_detection": {"country": "Netherlands", "confidence": 80},
+            "enhancement": {"recommended_enhancements": ["CONTRAST: boost by 10%"]},
+            "slide_profiles": [{"profile": "well_preserved", "confidence": 90}],
+        }
+
+        def responder(body):
+            return {"choices": [{"index": 0, "message": {"role": "assistant",
+                                                         "content": json.dumps(answer)}}]}
+
+        backend = FileBatchBackend(tmp_path / "api", responder=responder)
+        out = tmp_path / "out"
+        monkeypatch.setenv("OPENAI_APIKEY", "sk-test")
+        try:
+            get_settings(
+                analyzer_provider="openai",
+                geo={"provider": "none", "cache_path": str(tmp_path / "geo.json")},
+                response_cache={"enabled": False},
+                payload={"enabled": False, "cache_enabled": False},
+            )
+            with patch("picture_analyzer.cli.app._offline_batch_backend", return_value=backend), \
+                 patch("picture_analyzer.cli.app._analysis_to_legacy_dict") as to_legacy_mock:
+                to_legacy_mock.return_value = {"metadata": {}, "enhancement": {}}
+                result = runner.invoke(
+                    cli, ["analyze", str(fake_dir), "--batch", "--submit-offline", "-o", str(out)]
+                )
+        finally:
+            reset_settings()
+        assert result.exit_code == 0, result.output
+        assert "Submitted" in result.output
+        assert "✓ 3 succeeded" in result.output
+        requests = (out / "batch_requests.jsonl").read_text().splitlines()
+        ids = {json.loads(line)["custom_id"] for line in requests}
+        assert "img1.jpg#location" in ids and "img3.png#enhancement" in ids
+        assert not (out / ".openai_batch.json").exists()
+        analyzed = [call.args[0] for call in to_legacy_mock.call_args_list]
+        assert all(r.location and r.location.country == "Netherlands" for r in analyzed)
+
     def test_analyze_dir_implies_batch(self, runner, fake_dir, mock_legacy, mock_provider_analysis):
         """Passing a directory without --batch should still work."""
         result = runner.invoke(cli, ["analyze", str(fake_dir)])
@@ -310,6 +493,28 @@ class TestAnalyzePipelineMode:
             assert result.exit_code == 0
             assert pipeline.run.call_count >= 1
 
+    def test_stepped_batch_primes_metadata_packs(self, runner, fake_dir, mock_legacy):
+        """With metadata_pack_size the pipeline is primed once per pack of images."""
+        from picture_analyzer.config.settings import get_settings, reset_settings
+
+        try:
+            get_settings(pipeline={"mode": "stepped", "metadata_pack_size": 2})
+            with patch("picture_analyzer.pipeline.build_pipeline") as bp_mock, \
+                 patch("picture_analyzer.cli.app._analysis_to_legacy_dict") as to_legacy_mock:
+                pipeline = MagicMock()
+                pipeline.pack_size.return_value = 2
+                pipeline.run.return_value = self._make_analysis_result()
+                bp_mock.return_value = pipeline
+                to_legacy_mock.return_value = {"metadata": {}, "enhancement": {}}
+
+                result = runner.invoke(cli, ["analyze", str(fake_dir), "--batch"])
+        finally:
+            reset_settings()
+        assert result.exit_code == 0, result.output
+        packs = [[image.path.name for image, _ in c.args[0]] for c in pipeline.prime.call_args_list]
+        assert packs == [["img1.jpg", "img2.jpg"], ["img3.png"]]
+        assert pipeline.run.call_count == 3
+
 
 # ── Process command ──────────────────────────────────────────────────
 
@@ -385,10 +590,63 @@ class TestLegacyCommands:
         assert "Analysis file not found" in result.output
 
     def test_restore_slide_explicit_profile(self, runner, fake_image, mock_legacy):
+        with patch(
+            "picture_analyzer.enhancers.profiles.slide_restorer.SlideRestorer.restore"
+        ) as restore:
+            restore.return_value = "/out/photo_restored.jpg"
+            result = runner.invoke(cli, [
+                "restore-slide", str(fake_image), "-p", "faded",
+            ])
+        assert result.exit_code == 0
+        assert restore.call_args.args[1] == "faded"
+
+    def test_restore_slide_auto_uses_selected_profile(self, runner, fake_image, mock_legacy, tmp_path):
+        from PIL import Image
+
+        json_path = tmp_path / "analysis.json"
+        json_path.write_text(json.dumps({"slide_profiles": [{"profile": "red_cast", "confidence": 90}]}))
+        with patch(
+            "picture_analyzer.enhancers.profiles.slide_restorer.SlideRestorer.restore"
+        ) as restore, patch(
+            "picture_analyzer.enhancers.profiles.slide_restorer.SlideRestorer.preview"
+        ) as preview:
+            restore.return_value = "/out/photo_restored.jpg"
+            preview.return_value = Image.new("RGB", (8, 8))
+            for extra in ([], ["--preview"]):
+                result = runner.invoke(cli, [
+                    "restore-slide", str(fake_image), "-a", str(json_path), *extra,
+                ])
+                assert result.exit_code == 0
+        assert restore.call_args.args[1] == "red_cast"
+        assert preview.call_args.args[1] == "red_cast"
+        mock_legacy["SlideRestoration"].auto_restore_slide.assert_not_called()
+
+    def test_enhance_preview(self, runner, fake_image, mock_legacy, tmp_path):
+        json_path = tmp_path / f"{fake_image.stem}_analyzed.json"
+        json_path.write_text(json.dumps({"enhancement": {}}))
+        result = runner.invoke(cli, [
+            "enhance", str(fake_image), "-a", str(json_path),
+            "--preview", "--preview-size", "256",
+        ])
+        assert result.exit_code == 0
+        assert "Preview (256px" in result.output
+        enhancer = mock_legacy["SmartEnhancer"]
+        assert enhancer.call_args.kwargs["preview_long_edge"] == 256
+        (_, _, output_path), _ = enhancer.return_value.enhance_from_json.call_args
+        assert output_path.endswith("photo_enhanced_preview.jpg")
+
+    def test_restore_slide_preview(self, runner, tmp_path, mock_legacy):
+        from PIL import Image
+
+        image = tmp_path / "slide.jpg"
+        Image.new("RGB", (400, 200), (180, 120, 90)).save(str(image), "JPEG")
         result = runner.invoke(cli, [
-            "restore-slide", str(fake_image), "-p", "faded",
+            "restore-slide", str(image), "-p", "faded", "--preview", "--preview-size", "100",
         ])
         assert result.exit_code == 0
+        assert "Preview (100px" in result.output
+        assert Image.open(str(tmp_path / "slide_restored_preview.jpg")).size == (100, 50)
+        mock_legacy["SlideRestoration"].restore_slide.assert_not_called()
 
 
 # ── Config command ───────────────────────────────────────────────────
@@ -65,6 +65,15 @@ class TestSettings:
         assert ".jpg" in s.supported_formats
         assert ".heic" in s.supported_formats
 
+    def test_structured_output_defaults(self):
+        from picture_analyzer.config.settings import OllamaConfig, OpenAIConfig
+
+        assert OpenAIConfig().structured_output is True
+        # OpenAI-compatible servers and older Ollama reject JSON Schema output
+        assert OpenAIConfig(base_url="http://localhost:8000/v1").structured_output is False
+        assert OpenAIConfig(base_url="http://x/v1", structured_output=True).structured_output is True
+        assert OllamaConfig().structured_output is False
+
     def test_invalid_jpeg_quality_rejected(self):
         import pytest
         with pytest.raises(Exception):
@@ -199,3 +208,9 @@ class TestResolveStepConfig:
         result = resolve_step_config(StepConfig(prompt_template="custom.txt"), s)
         assert result["prompt_template"] == "custom.txt"
 
+
+    def test_ollama_hosts_fall_back_to_global(self):
+        s = self._settings(analyzer_provider="ollama", ollama={"hosts": ["http://a", "http://b"]})
+        assert resolve_step_config(StepConfig(), s)["hosts"] == ["http://a", "http://b"]
+        step = StepConfig(hosts=["http://c"])
+        assert resolve_step_config(step, s)["hosts"] == ["http://c"]
@@ -1,15 +1,24 @@
 """Tests for ImageFilter implementations and FilterPipeline."""
+import random
+
 import pytest
-from PIL import Image
+from PIL import ExifTags, Image
+from PIL import ImageFilter as PILFilter
 
 from picture_analyzer.core.interfaces import ImageFilter as ImageFilterProtocol
+from picture_analyzer.enhancers.filters import vectorized
 from picture_analyzer.enhancers.filters.advanced import (
     ClarityFilter,
+    ColorBalanceFilter,
     ColorChannelFilter,
     ColorTemperatureFilter,
+    DenoiseFilter,
+    DespeckleFilter,
     ShadowsHighlightsFilter,
+    SharedBlurFilter,
     UnsharpMaskFilter,
     VibranceFilter,
+    detail_blur,
 )
 from picture_analyzer.enhancers.filters.basic import (
     BrightnessFilter,
@@ -17,7 +26,13 @@ from picture_analyzer.enhancers.filters.basic import (
     SaturationFilter,
     SharpnessFilter,
 )
-from picture_analyzer.enhancers.pipeline import FilterPipeline, RecommendationParser
+from picture_analyzer.enhancers.pipeline import (
+    FilterPipeline,
+    RecommendationParser,
+    load_preview,
+    make_proxy,
+    upright,
+)
 
 # ── Fixtures ─────────────────────────────────────────────────────────
 
@@ -36,6 +51,29 @@ def red_image():
     return img
 
 
+@pytest.fixture
+def noisy_image():
+    """Create a 64x48 image covering the full colour range, greys included."""
+    rng = random.Random(42)
+    img = Image.new("RGB", (64, 48))
+    for i in range(64 * 48):
+        v = i % 256
+        pixel = (v, v, v) if i % 7 == 0 else tuple(rng.randrange(256) for _ in range(3))
+        img.putpixel((i % 64, i // 64), pixel)
+    return img
+
+
+def _max_channel_diff(a, b):
+    """Largest per-channel difference between two same-sized images."""
+    return max(abs(pa - pb) for pa, pb in zip(a.tobytes(), b.tobytes()))
+
+
+def _pixels(img):
+    """All pixels of *img* in row-major order."""
+    width, height = img.size
+    return [img.getpixel((x, y)) for y in range(height) for x in range(width)]
+
+
 # ── Protocol conformance ────────────────────────────────────────────
 
 
@@ -50,6 +88,9 @@ ALL_FILTERS = [
     ClarityFilter(strength=20),
     VibranceFilter(factor=1.2),
     ColorChannelFilter(channel="red", factor=0.9),
+    DespeckleFilter(size=3),
+    ColorBalanceFilter(red=1.1, green=1.0, blue=0.9),
+    DenoiseFilter(radius=0.5),
 ]
 
 
@@ -129,6 +170,63 @@ def test_color_channel_keeps_other_channels(red_image):
     assert new_b == orig_b
 
 
+# ── Vectorized colour filters ────────────────────────────────────────
+
+
+needs_numpy = pytest.mark.skipif(
+    not vectorized.HAS_NUMPY, reason="numpy not installed"
+)
+
+
+@needs_numpy
+@pytest.mark.parametrize(
+    "f",
+    [
+        ShadowsHighlightsFilter(shadow_adjust=25, highlight_adjust=-15),
+        ShadowsHighlightsFilter(shadow_adjust=-40, highlight_adjust=30),
+        VibranceFilter(factor=1.3),
+        VibranceFilter(factor=0.6),
+    ],
+    ids=repr,
+)
+def test_vectorized_matches_pixelwise(f, noisy_image):
+    """NumPy kernels must match the per-pixel reference within ±1 level."""
+    fast = f.apply(noisy_image)
+    reference = f._apply_pixelwise(noisy_image)
+    assert _max_channel_diff(fast, reference) <= 1
+
+
+def test_color_temperature_lut_matches_reference(noisy_image):
+    """The LUT version must reproduce the original per-pixel formula."""
+    f = ColorTemperatureFilter(kelvin=4800)
+    ratio = 4800 / 6500
+    result = f.apply(noisy_image)
+    for (r, g, b), out in zip(_pixels(noisy_image), _pixels(result)):
+        assert out == (int(min(255, r * ratio)), g, int(min(255, b / ratio)))
+
+
+def test_color_channel_lut_matches_reference(noisy_image):
+    """The LUT version must reproduce the original per-pixel formula."""
+    f = ColorChannelFilter(channel="blue", factor=1.25)
+    result = f.apply(noisy_image)
+    for (r, g, b), out in zip(_pixels(noisy_image), _pixels(result)):
+        assert out == (r, g, int(min(255, b * 1.25)))
+
+
+@pytest.mark.parametrize(
+    "f",
+    [ColorTemperatureFilter(kelvin=7000), ShadowsHighlightsFilter(10, -10),
+     VibranceFilter(1.2), ColorChannelFilter("green", 0.8)],
+    ids=repr,
+)
+def test_color_filters_accept_rgba(f):
+    """Colour filters convert non-RGB input and return an RGB image."""
+    img = Image.new("RGBA", (4, 4), color=(120, 90, 60, 128))
+    result = f.apply(img)
+    assert result.mode == "RGB"
+    assert result.size == (4, 4)
+
+
 # ── Pipeline tests ───────────────────────────────────────────────────
 
 
@@ -177,6 +275,311 @@ def test_pipeline_order_matters(sample_image):
     assert p2.filters[0].name == "Contrast"
 
 
+POINT_CHAIN = [
+    BrightnessFilter(1.1),
+    ColorTemperatureFilter(kelvin=5200),
+    ContrastFilter(1.25),
+    ColorChannelFilter("red", 0.9),
+]
+
+
+def test_pipeline_fuses_point_filters(noisy_image):
+    """A fused run of per-channel filters matches filter-by-filter output."""
+    exact = FilterPipeline(POINT_CHAIN, fuse=False).run(noisy_image)
+    fused = FilterPipeline(POINT_CHAIN).run(noisy_image)
+    # Contrast's pivot comes from histograms, which may shift it by a level.
+    assert _max_channel_diff(exact, fused) <= 1
+
+
+def test_pipeline_fused_run_is_one_pass(noisy_image, monkeypatch):
+    """Fusion replaces per-filter apply() calls with a single point()."""
+    sizes = []
+    for f in POINT_CHAIN:
+        original = f.apply
+        monkeypatch.setattr(
+            f, "apply", lambda img, original=original: sizes.append(img.size) or original(img)
+        )
+    FilterPipeline(POINT_CHAIN).run(noisy_image)
+    # apply() is only used to sample the 256-pixel ramp, never the image.
+    assert noisy_image.size not in sizes
+
+
+def test_pipeline_groups_split_on_spatial_filters():
+    """Spatial filters break fusion runs."""
+    pipeline = FilterPipeline([
+        BrightnessFilter(1.1),
+        ContrastFilter(1.1),
+        SharpnessFilter(1.2),
+        ColorChannelFilter("blue", 1.1),
+        SaturationFilter(1.2),
+    ])
+    groups = pipeline._groups(fusable=True)
+    assert [len(g) for g in groups] == [2, 1, 1, 1]
+
+
+def test_pipeline_lut3d_fuses_color_maps(noisy_image):
+    """With lut3d the channel-mixing filters join the run (approximately)."""
+    chain = [BrightnessFilter(1.05), SaturationFilter(1.3), VibranceFilter(1.1)]
+    pipeline = FilterPipeline(chain, lut3d=True)
+    assert [len(g) for g in pipeline._groups(fusable=True)] == [3]
+
+    exact = FilterPipeline(chain, fuse=False).run(noisy_image)
+    fused = pipeline.run(noisy_image)
+    diffs = [abs(a - b) for a, b in zip(exact.tobytes(), fused.tobytes())]
+    assert sum(diffs) / len(diffs) < 2
+
+
+def test_pipeline_rgba_is_not_fused():
+    """RGBA input keeps the per-filter path so alpha is preserved."""
+    img = Image.new("RGBA", (4, 4), color=(100, 150, 200, 77))
+    result = FilterPipeline([BrightnessFilter(1.2), ContrastFilter(1.1)]).run(img)
+    assert result.mode == "RGBA"
+    assert result.getpixel((0, 0))[3] == 77
+
+
+def test_contrast_fixed_mean_lut():
+    """A pinned contrast pivot makes the filter a lookup table."""
+    f = ContrastFilter(1.5, mean=100)
+    table = f.lut()
+    assert len(table) == 768
+    assert table[100] == 100
+    assert table[200] == 250
+    with pytest.raises(ValueError):
+        ContrastFilter(1.5).lut()
+
+
+# ── Strip (tiled) execution ──────────────────────────────────────────
+
+
+SPATIAL_CHAIN = [
+    DespeckleFilter(),
+    ColorBalanceFilter(1.1, 1.0, 0.9),
+    BrightnessFilter(1.05),
+    ContrastFilter(1.2),
+    DenoiseFilter(0.8),
+    SharpnessFilter(1.3),
+    UnsharpMaskFilter(radius=2.0, percent=80),
+    ContrastFilter(0.9),
+    ClarityFilter(strength=20),
+]
+
+
+@pytest.mark.parametrize("rows", [1, 5, 17, 48])
+def test_run_tiled_matches_whole_image(noisy_image, rows):
+    """Overlapping strips reproduce the whole-image result exactly."""
+    pipeline = FilterPipeline(SPATIAL_CHAIN, fuse=False)
+    expected = pipeline.run(noisy_image)
+    assert pipeline.run_tiled(noisy_image, rows).tobytes() == expected.tobytes()
+
+
+def test_run_tiled_in_place(noisy_image):
+    """In-place strips overwrite the source and still match."""
+    pipeline = FilterPipeline(SPATIAL_CHAIN)
+    expected = pipeline.run(noisy_image)
+    image = noisy_image.copy()
+    result = pipeline.run_tiled(image, 6, in_place=True)
+    assert result is image
+    assert result.tobytes() == expected.tobytes()
+
+
+def test_memory_budget_switches_to_strips(monkeypatch):
+    """run() uses strips once the image exceeds the memory budget."""
+    tall = Image.new("RGB", (64, 400), color=(90, 120, 150))
+    pipeline = FilterPipeline(SPATIAL_CHAIN, memory_budget_mb=0.01)
+    assert pipeline.strip_rows(tall) < tall.height
+    calls = []
+    monkeypatch.setattr(
+        FilterPipeline, "_process_strips",
+        staticmethod(lambda *args: calls.append(args[3])),
+    )
+    pipeline.run(tall)
+    assert calls
+
+
+def test_halo_sums_spatial_filters():
+    """Point filters need no context; spatial ones add their reach."""
+    assert FilterPipeline([BrightnessFilter(1.1), ColorTemperatureFilter()]).halo == 0
+    assert FilterPipeline([SharpnessFilter(1.2), DespeckleFilter(5)]).halo == 3
+
+
+def test_unknown_filter_disables_strips(noisy_image):
+    """Filters without a declared halo keep the whole-image path."""
+
+    class Custom:
+        name = "Custom"
+
+        def apply(self, image):
+            return image
+
+    pipeline = FilterPipeline([Custom()], memory_budget_mb=0.01)
+    assert pipeline.halo is None
+    assert pipeline.strip_rows(noisy_image) is None
+
+
+# ── Blur sharing ─────────────────────────────────────────────────────
+
+
+def test_share_blurs_merges_runs_with_a_common_kernel():
+    """Only consecutive sharpening filters that can reuse a blur are merged."""
+    chain = [
+        SharpnessFilter(1.2),
+        ClarityFilter(20),
+        UnsharpMaskFilter(radius=2.0, percent=60),
+        BrightnessFilter(1.1),
+        UnsharpMaskFilter(radius=1.0),
+        SharpnessFilter(1.2),
+    ]
+    stages = FilterPipeline(chain, share_blurs=True)._stage_filters()
+    assert [type(s).__name__ for s in stages] == [
+        "SharedBlurFilter", "BrightnessFilter", "UnsharpMaskFilter", "SharpnessFilter",
+    ]
+    assert stages[0].filters == chain[:3]
+    assert FilterPipeline(chain)._stage_filters() == chain
+
+
+def test_shared_blur_single_layer_is_one_unsharp_mask(noisy_image):
+    """Equal kernels and thresholds collapse into one PIL unsharp mask."""
+    shared = SharedBlurFilter([
+        UnsharpMaskFilter(radius=2.0, percent=80, threshold=3),
+        ClarityFilter(20),  # radius 2, 120 %, threshold 3
+    ])
+    expected = noisy_image.filter(PILFilter.UnsharpMask(radius=2.0, percent=200, threshold=3))
+    assert shared.apply(noisy_image).tobytes() == expected.tobytes()
+
+
+@pytest.mark.skipif(not vectorized.HAS_NUMPY, reason="numpy not installed")
+def test_shared_blur_matches_single_filters(noisy_image):
+    """With one member per kernel the shared pass reproduces each filter."""
+    for f in (SharpnessFilter(1.4), UnsharpMaskFilter(1.5, 80, 0), ClarityFilter(30)):
+        kernel, amount, threshold = f.detail()
+        layer = vectorized.to_array(detail_blur(noisy_image, kernel))
+        result = vectorized.from_array(
+            vectorized.add_details(vectorized.to_array(noisy_image), [(layer, amount, threshold)])
+        )
+        assert _max_channel_diff(result, f.apply(noisy_image)) <= 1
+
+
+@pytest.mark.skipif(not vectorized.HAS_NUMPY, reason="numpy not installed")
+def test_shared_blur_approximates_sequential():
+    """Parallel detail layers stay close to applying the filters in turn."""
+    gradient = Image.linear_gradient("L").resize((64, 48))
+    photo = Image.merge("RGB", (
+        gradient,
+        Image.effect_noise((64, 48), 12),
+        gradient.transpose(Image.Transpose.ROTATE_90).resize((64, 48)),
+    ))
+    chain = [SharpnessFilter(1.2), ClarityFilter(15), UnsharpMaskFilter(2.0, 40, 0)]
+    sequential = FilterPipeline(chain, verbose=False).run(photo)
+    shared = FilterPipeline(chain, verbose=False, share_blurs=True).run(photo)
+    diffs = [abs(a - b) for a, b in zip(sequential.tobytes(), shared.tobytes())]
+    assert sum(diffs) / len(diffs) < 3.0
+
+
+@pytest.mark.skipif(not vectorized.HAS_NUMPY, reason="numpy not installed")
+def test_shared_blur_summed_kernel_stays_within_tolerance():
+    """Same-kernel passes summed into one mask stay close to applying them in turn."""
+    gradient = Image.linear_gradient("L").resize((128, 96))
+    photo = Image.merge("RGB", (
+        gradient,
+        Image.effect_noise((128, 96), 12),
+        gradient.transpose(Image.Transpose.ROTATE_90).resize((128, 96)),
+    ))
+    chain = [UnsharpMaskFilter(2.0, 80, 3), ClarityFilter(20), BrightnessFilter(1.05)]
+    shared = FilterPipeline(chain, verbose=False, share_blurs=True)
+    assert len(shared._stage_filters()[0].layers()) == 1
+    sequential = FilterPipeline(chain, verbose=False, share_blurs=False).run(photo)
+    diffs = [abs(a - b) for a, b in zip(sequential.tobytes(), shared.run(photo).tobytes())]
+    assert sum(diffs) / len(diffs) < 3.0
+    assert max(diffs) <= 40
+
+
+def test_shared_blur_strips_match_whole_image(noisy_image):
+    """A merged stage reaches only as far as its widest blur."""
+    chain = [ClarityFilter(20), UnsharpMaskFilter(2.0, 60, 0), BrightnessFilter(1.1)]
+    pipeline = FilterPipeline(chain, share_blurs=True, verbose=False)
+    assert pipeline.halo == ClarityFilter().halo
+    expected = pipeline.run(noisy_image)
+    assert pipeline.run_tiled(noisy_image, 8).tobytes() == expected.tobytes()
+
+
+def test_make_proxy_limits_long_edge():
+    """Proxies keep the aspect ratio and never upscale."""
+    assert make_proxy(Image.new("RGB", (400, 100)), 200).size == (200, 50)
+    assert make_proxy(Image.new("L", (100, 400)), 200).size == (50, 200)
+    assert make_proxy(Image.new("L", (100, 400)), 200).mode == "RGB"
+    assert make_proxy(Image.new("RGB", (40, 30)), 200).size == (40, 30)
+
+
+def test_load_preview_uses_jpeg_draft(tmp_path, monkeypatch):
+    """JPEGs are decoded at a reduced DCT scale before resampling."""
+    path = tmp_path / "big.jpg"
+    Image.effect_noise((1600, 1200), 40).convert("RGB").save(str(path), "JPEG")
+    from PIL import JpegImagePlugin
+
+    drafts = []
+    original_draft = JpegImagePlugin.JpegImageFile.draft
+
+    def tracking_draft(self, mode, size):
+        result = original_draft(self, mode, size)
+        drafts.append(self.size)
+        return result
+
+    monkeypatch.setattr(JpegImagePlugin.JpegImageFile, "draft", tracking_draft)
+    proxy = load_preview(path, 300)
+    assert proxy.size == (300, 225)
+    assert drafts == [(400, 300)]
+
+
+def test_load_preview_is_upright_and_closes_the_file(tmp_path, monkeypatch):
+    """The proxy follows the EXIF orientation, and the file is not left open."""
+    path = tmp_path / "phone.jpg"
+    exif = Image.Exif()
+    exif[ExifTags.Base.Orientation] = 6  # rotate 90° clockwise to display
+    Image.new("RGB", (400, 300), "red").save(str(path), "JPEG", exif=exif)
+    opened = []
+    original_open = Image.open
+
+    def tracking_open(*args, **kwargs):
+        opened.append(original_open(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(Image, "open", tracking_open)
+    proxy = load_preview(path, 200)
+    monkeypatch.undo()
+    assert proxy.size == (150, 200)
+    assert [image.fp for image in opened] == [None]
+    with Image.open(str(path)) as source:
+        assert upright(source).size == (300, 400)
+
+
+def test_pipeline_preview_matches_run_on_proxy(noisy_image, tmp_path):
+    """preview() runs the same filter graph on the proxy."""
+    pipeline = FilterPipeline(
+        [BrightnessFilter(1.1), SharpnessFilter(1.4), VibranceFilter(1.2)],
+        memory_budget_mb=0.001,
+    )
+    expected = FilterPipeline(pipeline.filters).run(make_proxy(noisy_image, 20))
+    result = pipeline.preview(noisy_image, 20)
+    assert result.size == expected.size
+    assert result.tobytes() == expected.tobytes()
+    assert pipeline.memory_budget_mb == 0.001
+
+
+def test_pipeline_preview_leaves_budget_alone_while_running(noisy_image, monkeypatch):
+    """A pipeline shared between threads keeps its budget during previews."""
+    pipeline = FilterPipeline([BrightnessFilter(1.1)], memory_budget_mb=0.001, verbose=False)
+    seen = []
+    original_groups = FilterPipeline._groups
+
+    def recording_groups(self, *args, **kwargs):
+        seen.append(self.memory_budget_mb)
+        return original_groups(self, *args, **kwargs)
+
+    monkeypatch.setattr(FilterPipeline, "_groups", recording_groups)
+    pipeline.preview(noisy_image, 20)
+    assert seen == [0.001]
+
+
 def test_pipeline_repr():
     """Pipeline repr should list filter names."""
     pipeline = FilterPipeline([BrightnessFilter(1.2), ContrastFilter(1.1)])
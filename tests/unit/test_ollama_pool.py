@@ -0,0 +1,200 @@
+"""Tests for multi-host Ollama load balancing, against fake Ollama servers."""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import ollama
+import pytest
+
+from picture_analyzer.analyzers.ollama_pool import OllamaPool, is_oom_error
+
+
+class _FakeOllama:
+    """Minimal ``/api/chat`` server with a switchable failure mode."""
+
+    def __init__(self, eval_count: int = 50, eval_seconds: float = 1.0):
+        self.mode = "ok"  # ok | oom | slow
+        self.requests = 0
+        self.delay = 0.0
+        self.eval_count = eval_count
+        self.eval_seconds = eval_seconds
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                fake.requests += 1
+                if fake.mode == "oom":
+                    return self._reply(500, {"error": "model requires more system memory (9 GiB)"})
+                if fake.mode == "slow":
+                    time.sleep(2.0)
+                time.sleep(fake.delay)
+                if request.get("stream"):
+                    return self._stream(json.dumps({"port": fake.port}))
+                self._reply(200, {
+                    "model": request.get("model", ""),
+                    "created_at": "2026-01-01T00:00:00Z",
+                    "message": {"role": "assistant", "content": json.dumps({"port": fake.port})},
+                    "done": True,
+                    "eval_count": fake.eval_count,
+                    "eval_duration": int(fake.eval_seconds * 1e9),
+                })
+
+            def _stream(self, content):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                for piece in [content[:4], content[4:], ""]:
+                    line = {"model": "llava", "created_at": "2026-01-01T00:00:00Z",
+                            "message": {"role": "assistant", "content": piece}, "done": not piece}
+                    if not piece:
+                        line.update(eval_count=fake.eval_count, eval_duration=int(fake.eval_seconds * 1e9))
+                    self.wfile.write((json.dumps(line) + "\n").encode())
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def servers():
+    started = [_FakeOllama(), _FakeOllama()]
+    yield started
+    for server in started:
+        server.close()
+
+
+def _chat(pool: OllamaPool) -> int:
+    response = pool.chat(model="llava", messages=[{"role": "user", "content": "hi"}])
+    return json.loads(response.message.content)["port"]
+
+
+class TestOllamaPool:
+    def test_requires_a_host(self):
+        with pytest.raises(ValueError):
+            OllamaPool([])
+
+    def test_concurrent_requests_spread_over_hosts(self, servers):
+        for server in servers:
+            server.delay = 0.2
+        pool = OllamaPool([s.url for s in servers], timeout=10)
+        threads = [threading.Thread(target=_chat, args=(pool,)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert [s.requests for s in servers] == [2, 2]
+        assert all(state.in_flight == 0 for state in pool.hosts)
+
+    def test_prefers_faster_host_when_idle(self):
+        slow, fast = _FakeOllama(eval_seconds=5.0), _FakeOllama(eval_seconds=0.5)
+        try:
+            pool = OllamaPool([slow.url, fast.url], timeout=10)
+            _chat(pool)
+            _chat(pool)  # both hosts measured now
+            assert pool.hosts[1].tokens_per_second > pool.hosts[0].tokens_per_second
+            assert {_chat(pool) for _ in range(3)} == {fast.port}
+        finally:
+            slow.close()
+            fast.close()
+
+    def test_oom_fails_over_and_cools_down_host(self, servers):
+        servers[0].mode = "oom"
+        pool = OllamaPool([s.url for s in servers], timeout=10, cooldown=60)
+        assert _chat(pool) == servers[1].port
+        assert pool.hosts[0].failures == 1
+        before = servers[0].requests
+        assert _chat(pool) == servers[1].port
+        assert servers[0].requests == before  # skipped while cooling down
+
+    def test_timeout_fails_over(self, servers):
+        servers[0].mode = "slow"
+        pool = OllamaPool([s.url for s in servers], timeout=0.5)
+        assert _chat(pool) == servers[1].port
+
+    def test_connection_refused_fails_over(self, servers):
+        dead = _FakeOllama()
+        dead.close()
+        pool = OllamaPool([dead.url, servers[0].url], timeout=5)
+        assert _chat(pool) == servers[0].port
+        assert pool.hosts[0].failures == 1
+
+    def test_raises_when_every_host_fails(self, servers):
+        for server in servers:
+            server.mode = "oom"
+        pool = OllamaPool([s.url for s in servers], timeout=5)
+        with pytest.raises(ollama.ResponseError) as info:
+            _chat(pool)
+        assert is_oom_error(info.value)
+
+    def test_host_recovers_after_cooldown(self, servers):
+        now = [0.0]
+        servers[0].mode = "oom"
+        pool = OllamaPool([s.url for s in servers], timeout=5, cooldown=30, clock=lambda: now[0])
+        _chat(pool)
+        servers[0].mode = "ok"
+        now[0] = 31.0
+        servers[1].delay = 0.3
+        ports = set()
+        threads = [threading.Thread(target=lambda: ports.add(_chat(pool))) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert servers[0].port in ports
+        assert pool.hosts[0].healthy(now[0])
+
+    def test_stream_fails_over_and_releases_host(self, servers):
+        servers[0].mode = "oom"
+        pool = OllamaPool([s.url for s in servers], timeout=10)
+        chunks = pool.chat(model="llava", messages=[], stream=True)
+        content = "".join(chunk.message.content for chunk in chunks)
+        assert json.loads(content) == {"port": servers[1].port}
+        assert [state.in_flight for state in pool.hosts] == [0, 0]
+        assert pool.hosts[1].tokens_per_second == pytest.approx(50.0)
+
+    def test_shared_pool_per_host_list(self):
+        first = OllamaPool.shared(["http://a:1", "http://b:1"])
+        assert OllamaPool.shared(["http://a:1", "http://b:1"]) is first
+        assert OllamaPool.shared(["http://b:1"]) is not first
+
+
+class TestOllamaAnalyzerWithHosts:
+    def test_analyzer_routes_through_pool(self, servers):
+        from picture_analyzer.analyzers.ollama import OllamaAnalyzer
+        from picture_analyzer.analyzers.residency import ResidencyManager
+        from picture_analyzer.core.models import AnalysisContext, ImageData
+
+        servers[0].mode = "oom"
+        analyzer = OllamaAnalyzer(model="llava", hosts=[s.url for s in servers], timeout=10)
+        analyzer.residency = ResidencyManager(idle_timers=False)
+        image = ImageData(path="x.jpg", mime_type="image/jpeg", base64_data="aGVsbG8=")
+        text = analyzer._call_api(image, AnalysisContext())
+        assert json.loads(text) == {"port": servers[1].port}
+        assert analyzer.residency.is_resident("llava", host=servers[1].url)
+        assert not analyzer.residency.is_resident("llava", host=servers[0].url)
@@ -0,0 +1,146 @@
+"""Tests for the async OpenAI analyzer, against a local mock API endpoint."""
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from picture_analyzer.analyzers.openai import OpenAIAnalyzer
+from picture_analyzer.analyzers.rate_limit import RateLimiter
+from picture_analyzer.core.models import AnalysisContext, ImageData
+
+_CONTENT = {
+    "metadata": {"objects": "boat, quay", "weather": "sunny"},
+    "location_detection": {"country": "Netherlands", "confidence": 80},
+}
+
+
+class _FakeOpenAI:
+    """``/v1/chat/completions`` with a request delay and leading 429s."""
+
+    def __init__(self, delay: float = 0.05, rate_limited: int = 0):
+        self.delay = delay
+        self.rate_limited = rate_limited
+        self.requests = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                with fake._lock:
+                    fake.requests += 1
+                    limited = fake.rate_limited > 0
+                    if limited:
+                        fake.rate_limited -= 1
+                    fake.active += 1
+                    fake.peak = max(fake.peak, fake.active)
+                try:
+                    if limited:
+                        return self._reply(
+                            429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                            {"retry-after-ms": "20"},
+                        )
+                    time.sleep(fake.delay)
+                    self._reply(200, {
+                        "id": "chatcmpl-1",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": request.get("model", ""),
+                        "choices": [{
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {"role": "assistant", "content": json.dumps(_CONTENT)},
+                        }],
+                        "usage": {"prompt_tokens": 900, "completion_tokens": 40, "total_tokens": 940},
+                    })
+                finally:
+                    with fake._lock:
+                        fake.active -= 1
+
+            def _reply(self, status, body, headers=None):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def server():
+    fake = _FakeOpenAI()
+    yield fake
+    fake.close()
+
+
+def _analyzer(server, max_concurrency: int) -> OpenAIAnalyzer:
+    analyzer = OpenAIAnalyzer(api_key="sk-test", base_url=server.url)
+    analyzer.rate_limiter = RateLimiter(max_concurrency=max_concurrency, max_retries=5)
+    return analyzer
+
+
+def _image(n: int = 0) -> ImageData:
+    return ImageData(path=f"img{n}.jpg", mime_type="image/jpeg", base64_data="aGVsbG8=")
+
+
+class TestAnalyzeAsync:
+    def test_analyze_async_parses_response(self, server):
+        analyzer = _analyzer(server, max_concurrency=2)
+        result = asyncio.run(analyzer.analyze_async(_image(), AnalysisContext(language="en")))
+        assert result.location.country == "Netherlands"
+        assert analyzer._last_call_stats["prompt_tokens"] == 900
+
+    def test_analyze_section_async(self, server):
+        analyzer = _analyzer(server, max_concurrency=2)
+        result = asyncio.run(
+            analyzer.analyze_section_async(_image(), AnalysisContext(language="en"), ["location"])
+        )
+        assert result.location.country == "Netherlands"
+
+    def test_requests_run_concurrently_up_to_limit(self, server):
+        analyzer = _analyzer(server, max_concurrency=4)
+
+        async def main():
+            context = AnalysisContext(language="en")
+            return await asyncio.gather(*(analyzer.analyze_async(_image(n), context) for n in range(10)))
+
+        started = time.perf_counter()
+        results = asyncio.run(main())
+        elapsed = time.perf_counter() - started
+        assert len(results) == 10
+        assert server.peak == 4
+        assert elapsed < 10 * server.delay  # well below one-at-a-time
+
+    def test_429_is_retried(self, server):
+        server.rate_limited = 3
+        analyzer = _analyzer(server, max_concurrency=2)
+
+        async def main():
+            context = AnalysisContext(language="en")
+            return await asyncio.gather(*(analyzer.analyze_async(_image(n), context) for n in range(3)))
+
+        assert len(asyncio.run(main())) == 3
+        assert analyzer.rate_limiter.stats.rate_limited == 3
+        assert server.requests == 6
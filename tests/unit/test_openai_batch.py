@@ -0,0 +1,169 @@
+"""Tests for OpenAI Batch API submission, against the file-based stand-in."""
+from __future__ import annotations
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from picture_analyzer.analyzers import openai_batch
+from picture_analyzer.analyzers.openai import OpenAIAnalyzer
+from picture_analyzer.analyzers.openai_batch import (
+    FileBatchBackend,
+    OfflineBatch,
+    OfflineBatchRunner,
+    attach_offline_batch,
+    custom_id,
+    parse_output,
+)
+from picture_analyzer.core.exceptions import AnalysisError
+from picture_analyzer.core.models import AnalysisContext, ImageData
+
+_LOCATION = {"location_detection": {"country": "Netherlands", "region": "Zeeland",
+                                    "city_or_area": "Veere", "location_type": "harbour",
+                                    "confidence": 80, "reasoning": "sign"}}
+
+
+def _completion(content: dict) -> dict:
+    return {
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": json.dumps(content)}}],
+        "usage": {"prompt_tokens": 900, "completion_tokens": 40},
+    }
+
+
+def _responder(body: dict) -> dict:
+    return _completion(_LOCATION)
+
+
+def _recorded(n: int = 2) -> OfflineBatch:
+    batch = OfflineBatch()
+    for i in range(n):
+        batch.exchange(f"img{i}.jpg#location", {"model": "gpt-4o-mini", "messages": []})
+    return batch
+
+
+class TestOfflineBatch:
+    def test_submit_mode_records_each_request_once(self):
+        batch = OfflineBatch()
+        assert batch.exchange("a.jpg#location", {"model": "m"}) == "{}"
+        batch.exchange("a.jpg#location", {"model": "m"})
+        assert batch.requests == [{
+            "custom_id": "a.jpg#location",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {"model": "m"},
+        }]
+        assert not batch.collecting
+
+    def test_collect_mode_answers_by_id(self):
+        batch = OfflineBatch({"a.jpg#location": '{"x": 1}'})
+        assert batch.exchange("a.jpg#location", {}) == '{"x": 1}'
+        with pytest.raises(AnalysisError):
+            batch.exchange("b.jpg#location", {})
+
+    def test_write_requests_splits_files(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(openai_batch, "MAX_REQUESTS_PER_FILE", 2)
+        files = _recorded(5).write_requests(tmp_path / "requests.jsonl")
+        assert [f.name for f in files] == ["requests.jsonl", "requests.1.jsonl", "requests.2.jsonl"]
+        lines = [json.loads(line) for f in files for line in f.read_text().splitlines()]
+        assert [line["custom_id"] for line in lines] == [f"img{i}.jpg#location" for i in range(5)]
+
+    def test_custom_id(self):
+        assert custom_id("/photos/img1.jpg", ["metadata_part1"]) == "img1.jpg#metadata_part1"
+        assert custom_id("img1.jpg", None) == "img1.jpg#all"
+
+
+class TestParseOutput:
+    def test_answers_and_errors(self):
+        text = "\n".join([
+            json.dumps({"custom_id": "a", "response": {"status_code": 200, "body": _completion({"k": 1})}}),
+            json.dumps({"custom_id": "b", "response": {"status_code": 400,
+                                                       "body": {"error": {"message": "bad image"}}}}),
+            json.dumps({"custom_id": "c", "response": None, "error": {"message": "expired"}}),
+        ])
+        results, errors = parse_output(text)
+        assert results == {"a": '{"k": 1}'}
+        assert errors == {"b": "bad image", "c": "expired"}
+
+
+class TestOfflineBatchRunner:
+    def _runner(self, tmp_path, backend):
+        return OfflineBatchRunner(backend, tmp_path / "state.json", poll_interval=0, sleep=lambda s: None)
+
+    def test_submit_and_collect(self, tmp_path):
+        runner = self._runner(tmp_path, FileBatchBackend(tmp_path / "api", responder=_responder))
+        batch_ids = runner.submit(_recorded(2), tmp_path / "requests.jsonl")
+        assert runner.pending() == batch_ids
+        answers = runner.collect(batch_ids)
+        assert json.loads(answers.exchange("img1.jpg#location", {})) == _LOCATION
+        runner.clear()
+        assert runner.pending() == []
+
+    def test_waits_until_output_appears(self, tmp_path):
+        backend = FileBatchBackend(tmp_path / "api")
+        polls = []
+
+        def sleep(seconds):
+            polls.append(seconds)
+            # The "API" finishes the batch while we wait
+            output = json.dumps({"custom_id": "img0.jpg#location",
+                                 "response": {"status_code": 200, "body": _completion(_LOCATION)}})
+            (tmp_path / "api" / "batches" / f"{batch_ids[0]}.output.jsonl").write_text(output)
+
+        runner = OfflineBatchRunner(backend, tmp_path / "state.json", poll_interval=5, sleep=sleep)
+        batch_ids = runner.submit(_recorded(1), tmp_path / "requests.jsonl")
+        answers = runner.collect(batch_ids)
+        assert polls == [5]
+        assert "img0.jpg#location" in answers.results
+
+    def test_failed_batch_raises(self, tmp_path):
+        backend = FileBatchBackend(tmp_path / "api", responder=_responder)
+        runner = self._runner(tmp_path, backend)
+        batch_ids = runner.submit(_recorded(1), tmp_path / "requests.jsonl")
+        record = json.loads((tmp_path / "api" / "batches" / f"{batch_ids[0]}.json").read_text())
+        record["status"]["status"] = "expired"
+        (tmp_path / "api" / "batches" / f"{batch_ids[0]}.json").write_text(json.dumps(record))
+        with pytest.raises(AnalysisError, match="expired"):
+            runner.collect(batch_ids)
+
+
+class TestAnalyzerOfflineBatch:
+    @pytest.fixture
+    def analyzer(self):
+        with patch("picture_analyzer.analyzers.openai.OpenAI"):
+            analyzer = OpenAIAnalyzer(api_key="sk-test")
+        analyzer.structured_output = True
+        analyzer.reask_max_fields = 6
+        return analyzer
+
+    @pytest.fixture
+    def image(self):
+        return ImageData(path="/photos/img1.jpg", mime_type="image/jpeg", base64_data="aGVsbG8=")
+
+    def test_submit_records_instead_of_calling(self, analyzer, image):
+        recorder = OfflineBatch()
+        assert attach_offline_batch([("location", analyzer)], recorder) == ["location"]
+        analyzer.analyze_section(image, AnalysisContext(language="en"), ["location"])
+
+        analyzer.client.chat.completions.create.assert_not_called()
+        [request] = recorder.requests  # no re-ask for the empty placeholder answer
+        assert request["custom_id"] == "img1.jpg#location"
+        assert request["body"]["model"] == analyzer.model
+        assert request["body"]["response_format"]["json_schema"]["strict"] is True
+
+    def test_collect_answers_through_to_analysis_result(self, analyzer, image):
+        answers = OfflineBatch({"img1.jpg#location": json.dumps(_LOCATION)})
+        attach_offline_batch([("location", analyzer)], answers)
+        result = analyzer.analyze_section(image, AnalysisContext(language="en"), ["location"])
+        assert result.location.country == "Netherlands"
+        analyzer.client.chat.completions.create.assert_not_called()
+
+    def test_ollama_analyzers_are_skipped(self):
+        from picture_analyzer.analyzers.ollama import OllamaAnalyzer
+
+        with patch("picture_analyzer.analyzers.ollama.ollama.Client"):
+            ollama_analyzer = OllamaAnalyzer(model="llava")
+        assert attach_offline_batch([("metadata", ollama_analyzer)], OfflineBatch()) == []
+        assert ollama_analyzer.offline_batch is None
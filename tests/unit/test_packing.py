@@ -0,0 +1,49 @@
+"""Tests for the multi-image packing helpers."""
+from __future__ import annotations
+
+import json
+
+from picture_analyzer.analyzers.packing import packed_schema, split_packed
+from picture_analyzer.data.prompt_loader import PromptLoader
+
+
+class TestPackedSchema:
+    def test_wraps_section_schema_in_indexed_array(self):
+        schema = PromptLoader().schema(["metadata"])
+        packed = packed_schema(schema)
+        item = packed["properties"]["images"]["items"]
+        assert packed["required"] == ["images"]
+        assert item["required"][0] == "index"
+        assert item["properties"]["metadata"] == schema["properties"]["metadata"]
+        assert "index" not in schema["properties"]  # the section schema is not modified
+
+
+class TestSplitPacked:
+    def test_wrapped_object(self):
+        text = json.dumps({"images": [
+            {"index": 1, "metadata": {"objects": "boat"}},
+            {"index": 0, "metadata": {"objects": "tram"}},
+        ]})
+        assert split_packed(text, 2) == {
+            0: {"metadata": {"objects": "tram"}},
+            1: {"metadata": {"objects": "boat"}},
+        }
+
+    def test_bare_array_in_code_fence(self):
+        text = 'Here you go:\n```json\n[{"index": "0", "metadata": {}}]\n```'
+        assert split_packed(text, 1) == {0: {"metadata": {}}}
+
+    def test_drops_bad_and_duplicate_indices(self):
+        text = json.dumps({"images": [
+            {"index": 0, "metadata": {"objects": "a"}},
+            {"index": 0, "metadata": {"objects": "b"}},
+            {"index": 5, "metadata": {}},
+            {"metadata": {}},
+            "not an object",
+            {"index": 1, "metadata": {"objects": "c"}},
+        ]})
+        assert split_packed(text, 2) == {1: {"metadata": {"objects": "c"}}}
+
+    def test_unparseable_response(self):
+        assert split_packed("sorry, I cannot help with that", 3) == {}
+        assert split_packed('{"metadata": {}}', 1) == {}
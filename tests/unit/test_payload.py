@@ -0,0 +1,128 @@
+"""Tests for model payload preparation (resize, re-encode, disk cache)."""
+from __future__ import annotations
+
+import base64
+import io
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from picture_analyzer.analyzers.payload import (
+    PayloadPreparer,
+    attach_payload,
+    file_hash,
+)
+from picture_analyzer.config.settings import Settings
+from picture_analyzer.core.models import ImageData
+
+
+def _image_data(path: Path, mime_type: str = "image/jpeg") -> ImageData:
+    return ImageData(path=path, mime_type=mime_type)
+
+
+def _decode(image: ImageData) -> Image.Image:
+    return Image.open(io.BytesIO(base64.b64decode(image.base64_data)))
+
+
+@pytest.fixture
+def large_jpeg(tmp_path: Path) -> Path:
+    path = tmp_path / "scan.jpg"
+    Image.effect_noise((800, 600), 40).convert("RGB").save(str(path), "JPEG", quality=95)
+    return path
+
+
+class TestPayloadPreparer:
+    def test_downscales_to_max_long_edge(self, large_jpeg, tmp_path):
+        preparer = PayloadPreparer(max_long_edge=200, cache_dir=None)
+        prepared = preparer.prepare(_image_data(large_jpeg))
+        assert (prepared.width, prepared.height) == (200, 150)
+        assert _decode(prepared).size == (200, 150)
+        assert prepared.mime_type == "image/jpeg"
+
+    def test_small_image_in_target_format_sent_as_is(self, large_jpeg):
+        prepared = PayloadPreparer(max_long_edge=2048, cache_dir=None).prepare(_image_data(large_jpeg))
+        assert base64.b64decode(prepared.base64_data) == large_jpeg.read_bytes()
+
+    def test_converts_format(self, tmp_path):
+        path = tmp_path / "photo.png"
+        Image.new("RGBA", (40, 30), (10, 20, 30, 255)).save(str(path))
+        prepared = PayloadPreparer(format="jpeg", cache_dir=None).prepare(_image_data(path, "image/png"))
+        assert prepared.mime_type == "image/jpeg"
+        assert _decode(prepared).format == "JPEG"
+
+    def test_applies_exif_orientation(self, tmp_path):
+        path = tmp_path / "rotated.jpg"
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotate 90° clockwise on display
+        Image.new("RGB", (40, 30), "white").save(str(path), "JPEG", exif=exif.tobytes())
+        prepared = PayloadPreparer(cache_dir=None).prepare(_image_data(path))
+        assert (prepared.width, prepared.height) == (30, 40)
+
+    def test_undecodable_file_sent_as_is(self, tmp_path):
+        path = tmp_path / "photo.heic"
+        path.write_bytes(b"not an image")
+        prepared = PayloadPreparer(cache_dir=None).prepare(_image_data(path, "image/heic"))
+        assert base64.b64decode(prepared.base64_data) == b"not an image"
+        assert prepared.mime_type == "image/heic"
+
+    def test_unknown_format_rejected(self):
+        with pytest.raises(ValueError):
+            PayloadPreparer(format="gif")
+
+
+class TestPayloadCache:
+    def test_reuses_cached_payload(self, large_jpeg, tmp_path):
+        preparer = PayloadPreparer(max_long_edge=200, cache_dir=tmp_path / "cache")
+        first = preparer.prepare(_image_data(large_jpeg))
+        assert preparer.cache_path(file_hash(large_jpeg)).is_file()
+
+        with patch.object(PayloadPreparer, "_render") as render:
+            second = preparer.prepare(_image_data(large_jpeg))
+        render.assert_not_called()
+        assert second.base64_data == first.base64_data
+        assert (second.width, second.height) == (200, 150)
+
+    def test_settings_are_part_of_the_key(self, large_jpeg, tmp_path):
+        cache = tmp_path / "cache"
+        PayloadPreparer(max_long_edge=200, cache_dir=cache).prepare(_image_data(large_jpeg))
+        other = PayloadPreparer(max_long_edge=100, cache_dir=cache).prepare(_image_data(large_jpeg))
+        assert (other.width, other.height) == (100, 75)
+        assert len(list(cache.iterdir())) == 2
+
+    def test_passthrough_not_cached(self, large_jpeg, tmp_path):
+        cache = tmp_path / "cache"
+        PayloadPreparer(max_long_edge=2048, cache_dir=cache).prepare(_image_data(large_jpeg))
+        assert not cache.exists()
+
+    def test_evicts_least_recently_used(self, large_jpeg, tmp_path):
+        cache = tmp_path / "cache"
+        first = PayloadPreparer(max_long_edge=200, cache_dir=cache)
+        first.prepare(_image_data(large_jpeg))
+        old = first.cache_path(file_hash(large_jpeg))
+        os.utime(old, (1, 1))
+        # Room for the first payload only: storing a second evicts the older one
+        second = PayloadPreparer(
+            max_long_edge=100, cache_dir=cache, cache_max_mb=old.stat().st_size / 1024 / 1024
+        )
+        second.prepare(_image_data(large_jpeg))
+        assert list(cache.iterdir()) == [second.cache_path(file_hash(large_jpeg))]
+
+
+class TestAttachPayload:
+    def test_uses_preparer(self, large_jpeg):
+        image, owned = attach_payload(
+            _image_data(large_jpeg), PayloadPreparer(max_long_edge=100, cache_dir=None)
+        )
+        assert owned
+        assert image.width == 100
+
+    def test_from_settings_disabled(self):
+        assert PayloadPreparer.from_settings(Settings(payload={"enabled": False})) is None
+
+    def test_from_settings(self, tmp_path):
+        settings = Settings(payload={"max_long_edge": 512, "quality": 80, "cache_enabled": False})
+        preparer = PayloadPreparer.from_settings(settings)
+        assert (preparer.max_long_edge, preparer.quality, preparer.cache_dir) == (512, 80, None)
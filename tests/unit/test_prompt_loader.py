@@ -102,3 +102,49 @@ class TestPromptLoaderShim:
         import prompts
         # The shim uses language="{language}" so the placeholder stays
         assert "{language}" in prompts.ANALYSIS_PROMPT
+
+
+class TestPromptLoaderSchema:
+    """Test the JSON Schemas that mirror the footer templates."""
+
+    @pytest.mark.parametrize("section, key", [
+        ("metadata", "metadata"),
+        ("metadata_part1", "metadata"),
+        ("metadata_part2", "metadata"),
+        ("location", "location_detection"),
+        ("enhancement", "enhancement"),
+        ("slide_profiles", "slide_profiles"),
+    ])
+    def test_section_schema_matches_footer(self, section, key):
+        schema = PromptLoader().schema([section])
+        assert schema["required"] == [key]
+        footer = PromptLoader().load(f"footer_{section}")
+        nested = schema["properties"][key]
+        fields = nested.get("properties") or nested["items"]["properties"]
+        for field in fields:
+            assert field in footer
+
+    def test_strict_mode_shape(self):
+        """Every object lists all its properties as required and allows no others."""
+        def check(node):
+            if node.get("type") == "object":
+                assert node["additionalProperties"] is False
+                assert set(node["required"]) == set(node["properties"])
+                for child in node["properties"].values():
+                    check(child)
+            elif node.get("type") == "array":
+                check(node["items"])
+
+        check(PromptLoader().schema())
+
+    def test_default_sections_merged(self):
+        schema = PromptLoader().schema()
+        assert schema["required"] == ["metadata", "location_detection", "enhancement", "slide_profiles"]
+
+    def test_merge_returns_copy(self):
+        loader = PromptLoader()
+        loader.schema(["location"])["properties"]["location_detection"]["properties"].clear()
+        assert loader.schema(["location"])["properties"]["location_detection"]["properties"]
+
+    def test_section_without_schema_returns_none(self):
+        assert PromptLoader().schema(["metadata", "nonexistent"]) is None
@@ -0,0 +1,108 @@
+"""Tests for local image-quality measurement and its recommendations."""
+from __future__ import annotations
+
+from dataclasses import replace
+
+import pytest
+from PIL import Image, ImageEnhance, ImageFilter
+
+from picture_analyzer.enhancers.pipeline import RecommendationParser
+from picture_analyzer.enhancers.quality import (
+    QualityStats,
+    assess_quality,
+    measure_quality,
+    recommend,
+)
+
+# ── Helpers ──────────────────────────────────────────────────────────
+
+
+def _scene(size: tuple[int, int] = (320, 240)) -> Image.Image:
+    """A colourful, full-range, detailed test image."""
+    hue = Image.linear_gradient("L").transpose(Image.Transpose.ROTATE_90).resize(size)
+    sat = Image.linear_gradient("L").resize(size).point(lambda v: 90 + v * 0.6)
+    val = Image.effect_noise(size, 70).point(lambda v: min(250, max(6, v)))
+    return Image.merge("HSV", (hue, sat, val)).convert("RGB")
+
+
+_GOOD = QualityStats(
+    luminance=0.5, shadows_clipped=0.0, highlights_clipped=0.0, tonal_range=0.85,
+    red_green=0.0, yellow_blue=0.0, saturation=0.4, sharpness=500.0,
+)
+
+
+# ── Measurement ──────────────────────────────────────────────────────
+
+
+class TestMeasureQuality:
+    def test_well_exposed_scene(self):
+        stats = measure_quality(_scene())
+        assert 0.3 < stats.luminance < 0.7
+        assert stats.tonal_range > 0.6
+        assert stats.sharpness > 100
+
+    def test_dark_flat_blurred_image(self):
+        image = ImageEnhance.Contrast(_scene()).enhance(0.4)
+        image = ImageEnhance.Brightness(image).enhance(0.5).filter(ImageFilter.GaussianBlur(4))
+        stats = measure_quality(image)
+        assert stats.luminance < 0.35
+        assert stats.tonal_range < 0.4
+        assert stats.sharpness < 20
+
+    def test_clipping(self):
+        image = Image.new("L", (100, 100), 128)
+        image.paste(0, (0, 0, 100, 10))
+        image.paste(255, (0, 90, 100, 100))
+        stats = measure_quality(image)
+        assert stats.shadows_clipped == pytest.approx(0.1, abs=0.01)
+        assert stats.highlights_clipped == pytest.approx(0.1, abs=0.01)
+
+    def test_assess_reads_path(self, tmp_path):
+        path = tmp_path / "scene.jpg"
+        _scene().save(path)
+        report = assess_quality(path)
+        assert report.recommendations == recommend(report.stats)
+        assert set(report.as_dict()) == set(QualityStats.__dataclass_fields__)
+
+
+# ── Recommendations ──────────────────────────────────────────────────
+
+
+class TestRecommend:
+    def test_good_image_needs_nothing(self):
+        assert recommend(_GOOD) == []
+
+    def test_yellow_red_cast_dark_flat_soft(self):
+        stats = replace(
+            _GOOD, yellow_blue=0.2, red_green=0.12, luminance=0.25, tonal_range=0.45, sharpness=40.0
+        )
+        assert recommend(stats) == [
+            "COLOR_TEMPERATURE: cool by 800K",
+            "RED_CHANNEL: reduce by 7%",
+            "BRIGHTNESS: increase by 8%",
+            "CONTRAST: boost by 18%",
+            "SHARPNESS: increase by 10%",
+        ]
+
+    def test_one_exposure_correction_only(self):
+        stats = replace(_GOOD, luminance=0.2, shadows_clipped=0.1, highlights_clipped=0.05)
+        recs = recommend(stats)
+        assert recs == ["HIGHLIGHTS: reduce by 15%"]
+
+    def test_monochrome_is_not_saturated(self):
+        assert recommend(replace(_GOOD, saturation=0.0)) == []
+        assert recommend(replace(_GOOD, saturation=0.15)) == ["SATURATION: increase by 20%"]
+
+    def test_recommendations_parse_with_the_right_sign(self):
+        stats = replace(
+            _GOOD, yellow_blue=-0.15, red_green=-0.1, highlights_clipped=0.04,
+            saturation=0.1, sharpness=5.0,
+        )
+        recs = recommend(stats)
+        filters = {type(f).__name__: f for f in RecommendationParser().parse(recs).filters}
+        assert filters["ColorTemperatureFilter"].kelvin > 6500  # warmed up
+        assert filters["ColorChannelFilter"].channel == "green"
+        assert filters["ColorChannelFilter"].factor < 1.0
+        assert filters["ShadowsHighlightsFilter"].highlight_adjust < 0
+        assert filters["SaturationFilter"].factor > 1.0
+        assert "UnsharpMaskFilter" in filters
@@ -0,0 +1,169 @@
+"""Tests for async concurrency limiting and HTTP 429 backoff."""
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from picture_analyzer.analyzers.rate_limit import RateLimiter, retry_after
+
+
+def _rate_limit_error(headers: dict | None = None) -> openai.RateLimitError:
+    request = httpx.Request("POST", "http://test/v1/chat/completions")
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+def _server_error(status: int = 502) -> openai.APIStatusError:
+    request = httpx.Request("POST", "http://test/v1/chat/completions")
+    response = httpx.Response(status, request=request)
+    return openai.InternalServerError("server error", response=response, body=None)
+
+
+class _FakeTime:
+    """Clock and sleep that advance virtual time instantly."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def clock(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+class TestRetryAfter:
+    def test_seconds_and_milliseconds(self):
+        assert retry_after(_rate_limit_error({"retry-after": "3"})) == 3.0
+        assert retry_after(_rate_limit_error({"retry-after-ms": "250"})) == 0.25
+
+    def test_missing_or_unparseable(self):
+        assert retry_after(_rate_limit_error()) is None
+        assert retry_after(_rate_limit_error({"retry-after": "soon"})) is None
+        assert retry_after(RuntimeError("x")) is None
+
+
+class TestRateLimiter:
+    def test_bounds_concurrency(self):
+        limiter = RateLimiter(max_concurrency=3)
+        active = [0]
+        peak = [0]
+
+        async def send():
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.01)
+            active[0] -= 1
+            return "ok"
+
+        async def main():
+            return await asyncio.gather(*(limiter.call(send) for _ in range(10)))
+
+        assert asyncio.run(main()) == ["ok"] * 10
+        assert peak[0] == 3
+        assert limiter.stats.max_in_flight == 3
+        assert limiter.stats.requests == 10
+
+    def test_retries_429_after_retry_after(self):
+        fake = _FakeTime()
+        limiter = RateLimiter(max_retries=3, sleep=fake.sleep, clock=fake.clock)
+        attempts = []
+
+        async def send():
+            attempts.append(fake.now)
+            if len(attempts) < 3:
+                raise _rate_limit_error({"retry-after": "2"})
+            return "ok"
+
+        assert asyncio.run(limiter.call(send)) == "ok"
+        assert attempts == [0.0, 2.0, 4.0]
+        assert limiter.stats.rate_limited == 2
+        assert limiter.stats.backoff_seconds == 4.0
+
+    def test_backoff_pauses_other_calls(self):
+        fake = _FakeTime()
+        limiter = RateLimiter(max_concurrency=2, sleep=fake.sleep, clock=fake.clock)
+        sent: list[tuple[str, float]] = []
+        limited = [False]
+
+        async def first():
+            sent.append(("first", fake.now))
+            if not limited[0]:
+                limited[0] = True
+                raise _rate_limit_error({"retry-after": "5"})
+            return 1
+
+        async def second():
+            sent.append(("second", fake.now))
+            return 2
+
+        async def main():
+            one = asyncio.ensure_future(limiter.call(first))
+            await asyncio.sleep(0)  # first call hits the 429 before the second is sent
+            return await asyncio.gather(one, limiter.call(second))
+
+        assert asyncio.run(main()) == [1, 2]
+        assert ("second", 5.0) in sent
+
+    def test_gives_up_after_max_retries(self):
+        fake = _FakeTime()
+        limiter = RateLimiter(max_retries=2, sleep=fake.sleep, clock=fake.clock)
+
+        async def send():
+            raise _rate_limit_error()
+
+        with pytest.raises(openai.RateLimitError):
+            asyncio.run(limiter.call(send))
+        assert limiter.stats.requests == 3
+        assert all(0 < s <= 2.0 for s in fake.sleeps)
+
+    @pytest.mark.parametrize("error", [
+        _server_error(502),
+        openai.APIConnectionError(request=httpx.Request("POST", "http://test")),
+        openai.APITimeoutError(request=httpx.Request("POST", "http://test")),
+    ])
+    def test_retries_transient_errors(self, error):
+        fake = _FakeTime()
+        limiter = RateLimiter(max_retries=3, sleep=fake.sleep, clock=fake.clock)
+        attempts = []
+
+        async def send():
+            attempts.append(fake.now)
+            if len(attempts) < 2:
+                raise error
+            return "ok"
+
+        assert asyncio.run(limiter.call(send)) == "ok"
+        assert len(attempts) == 2
+        assert limiter.stats.transient_errors == 1
+        assert limiter.stats.rate_limited == 0
+        assert limiter._paused_until == 0.0  # other calls are not held back
+
+    def test_client_errors_are_not_retried(self):
+        limiter = RateLimiter()
+        request = httpx.Request("POST", "http://test")
+
+        async def send():
+            raise openai.BadRequestError(
+                "bad", response=httpx.Response(400, request=request), body=None
+            )
+
+        with pytest.raises(openai.BadRequestError):
+            asyncio.run(limiter.call(send))
+        assert limiter.stats.requests == 1
+
+    def test_other_errors_are_not_retried(self):
+        limiter = RateLimiter()
+
+        async def send():
+            raise ValueError("bad request")
+
+        with pytest.raises(ValueError):
+            asyncio.run(limiter.call(send))
+        assert limiter.stats.requests == 1
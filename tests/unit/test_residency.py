@@ -0,0 +1,164 @@
+"""Tests for the Ollama model residency manager."""
+from __future__ import annotations
+
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import ollama
+import pytest
+
+from picture_analyzer.analyzers.residency import ResidencyManager
+from picture_analyzer.core.models import AnalysisContext, ImageData
+
+
+class _FakeClient:
+    """Records load/unload requests made through ``generate``."""
+
+    def __init__(self, clock=None, load_time: float = 0.0):
+        self.calls: list[tuple[str, int]] = []
+        self._clock = clock
+        self._load_time = load_time
+
+    def generate(self, model, prompt, keep_alive):
+        self.calls.append((model, keep_alive))
+        if self._clock is not None and keep_alive:
+            self._clock.now += self._load_time
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def manager(clock):
+    return ResidencyManager(clock=clock, idle_timers=False)
+
+
+class TestResidencyManager:
+    def test_loads_once_and_times_load(self, manager, clock):
+        client = _FakeClient(clock, load_time=7.5)
+        assert manager.ensure_loaded(client, "llava", keep_alive=600) is True
+        assert manager.ensure_loaded(client, "llava", keep_alive=600) is False
+        assert client.calls == [("llava", 600)]
+        assert manager.stats.loads == 1
+        assert manager.stats.load_seconds == pytest.approx(7.5)
+        assert manager.is_resident("llava")
+
+    def test_zero_keep_alive_is_left_to_ollama(self, manager):
+        client = _FakeClient()
+        assert manager.ensure_loaded(client, "llava", keep_alive=0) is False
+        assert client.calls == []
+        assert not manager.is_resident("llava")
+
+    def test_models_tracked_per_host(self, manager):
+        client = _FakeClient()
+        manager.ensure_loaded(client, "llava", 600, host="http://a")
+        manager.ensure_loaded(client, "llava", 600, host="http://b")
+        assert manager.stats.loads == 2
+
+    def test_slow_load_does_not_block_other_hosts(self, manager):
+        release = threading.Event()
+
+        class _SlowClient(_FakeClient):
+            def generate(self, model, prompt, keep_alive):
+                release.wait(5)
+                super().generate(model, prompt, keep_alive)
+
+        slow = threading.Thread(
+            target=manager.ensure_loaded, args=(_SlowClient(), "llava", 600, "http://a")
+        )
+        slow.start()
+        try:
+            assert manager.ensure_loaded(_FakeClient(), "llava", 600, host="http://b") is True
+            assert not manager.is_resident("llava", host="http://a")
+        finally:
+            release.set()
+            slow.join()
+        assert manager.is_resident("llava", host="http://a")
+
+    def test_idle_model_unloaded_after_keep_alive(self, manager, clock):
+        client = _FakeClient()
+        manager.ensure_loaded(client, "llava", keep_alive=60)
+        with manager.in_use("llava"):
+            clock.now += 120
+            manager.check_idle()  # busy: never unloaded mid-request
+            assert manager.is_resident("llava")
+        clock.now += 30
+        manager.check_idle()
+        assert manager.is_resident("llava")
+        clock.now += 30
+        manager.check_idle()
+        assert not manager.is_resident("llava")
+        assert client.calls[-1] == ("llava", 0)
+        assert manager.stats.unloads == 1
+
+    def test_memory_pressure_frees_idle_models_on_host(self, manager):
+        client = _FakeClient()
+        manager.ensure_loaded(client, "llava", 600, host="h")
+        manager.ensure_loaded(client, "busy", 600, host="h")
+        manager.ensure_loaded(client, "idle", 600, host="h")
+        manager.ensure_loaded(client, "other-host", 600, host="g")
+        with manager.in_use("llava", host="h"), manager.in_use("busy", host="h"):
+            manager.memory_pressure("llava", host="h")
+        assert not manager.is_resident("llava", host="h")
+        assert not manager.is_resident("idle", host="h")
+        assert manager.is_resident("busy", host="h")
+        assert manager.is_resident("other-host", host="g")
+        assert manager.stats.oom_unloads == 2
+
+    def test_unload_failure_is_not_fatal(self, manager):
+        client = _FakeClient()
+        manager.ensure_loaded(client, "llava", 600)
+
+        def broken(**kwargs):
+            raise ConnectionError("server gone")
+
+        client.generate = broken
+        manager.unload_all()
+        assert not manager.is_resident("llava")
+
+
+class TestOllamaAnalyzerResidency:
+    @pytest.fixture
+    def analyzer(self, manager):
+        from picture_analyzer.analyzers.ollama import OllamaAnalyzer
+
+        with patch("picture_analyzer.analyzers.ollama.ollama.Client"):
+            analyzer = OllamaAnalyzer(model="llava", keep_alive=600)
+        analyzer.residency = manager
+        return analyzer
+
+    @staticmethod
+    def _response(text: str = "{}"):
+        return SimpleNamespace(message=SimpleNamespace(content=text))
+
+    def test_model_warmed_once_across_calls(self, analyzer, manager):
+        analyzer.client.chat.return_value = self._response()
+        image = ImageData(path="x.jpg", mime_type="image/jpeg", base64_data="aGVsbG8=")
+        analyzer._call_api(image, AnalysisContext())
+        analyzer._call_api(image, AnalysisContext())
+        assert analyzer.client.generate.call_count == 1
+        assert analyzer.client.chat.call_count == 2
+        assert manager.is_resident("llava")
+
+    def test_oom_unloads_and_reloads(self, analyzer, manager):
+        analyzer.client.chat.side_effect = [
+            ollama.ResponseError("model requires more system memory"),
+            self._response(),
+        ]
+        image = ImageData(path="x.jpg", mime_type="image/jpeg", base64_data="aGVsbG8=")
+        with patch("picture_analyzer.analyzers.ollama.time.sleep"):
+            analyzer._call_api(image, AnalysisContext())
+        assert manager.stats.oom_unloads == 1
+        assert manager.stats.loads == 2
+        assert manager.is_resident("llava")
@@ -0,0 +1,151 @@
+"""Tests for the persistent model response cache."""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from picture_analyzer.analyzers.cache import ResponseCache
+from picture_analyzer.analyzers.ollama import OllamaAnalyzer
+from picture_analyzer.analyzers.openai import OpenAIAnalyzer
+from picture_analyzer.config.settings import Settings
+from picture_analyzer.core.models import AnalysisContext, ImageData
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> ResponseCache:
+    return ResponseCache(tmp_path / "cache", max_mb=1)
+
+
+@pytest.fixture
+def image() -> ImageData:
+    return ImageData(path=Path("photo.jpg"), mime_type="image/jpeg", base64_data="aW1hZ2U=")
+
+
+# ── Keys ─────────────────────────────────────────────────────────────
+
+
+class TestKey:
+    def test_stable(self):
+        a = ResponseCache.key(image="abc", prompt="p", model="m", options={"x": 1, "y": 2})
+        b = ResponseCache.key(image="abc", prompt="p", model="m", options={"y": 2, "x": 1})
+        assert a == b
+
+    @pytest.mark.parametrize(
+        "change", [{"image": "abd"}, {"prompt": "q"}, {"model": "n"}, {"options": {"x": 2}}]
+    )
+    def test_sensitive_to_every_part(self, change):
+        base = {"image": "abc", "prompt": "p", "model": "m", "options": {"x": 1}}
+        assert ResponseCache.key(**base) != ResponseCache.key(**{**base, **change})
+
+
+# ── Storage ──────────────────────────────────────────────────────────
+
+
+class TestResponseCache:
+    def test_round_trip_and_stats(self, cache):
+        key = cache.key(image="abc", prompt="p")
+        assert cache.get(key) is None
+        cache.put(key, '{"title": "x"}')
+        assert cache.get(key) == '{"title": "x"}'
+        assert (cache.stats.hits, cache.stats.misses, cache.stats.stores) == (1, 1, 1)
+        assert cache.stats.hit_rate == pytest.approx(0.5)
+
+    def test_persists_across_instances(self, cache):
+        key = cache.key(prompt="p")
+        cache.put(key, "answer")
+        assert ResponseCache(cache.directory).get(key) == "answer"
+
+    def test_disabled_bypasses_reads_and_writes(self, tmp_path):
+        cache = ResponseCache(tmp_path / "cache", enabled=False)
+        cache.put("k" * 64, "answer")
+        assert cache.get("k" * 64) is None
+        assert not (tmp_path / "cache").exists()
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = ResponseCache(tmp_path / "cache", max_mb=0.002)  # ~2 KB
+        keys = [cache.key(prompt=str(i)) for i in range(3)]
+        for age, key in zip((300, 200, 100), keys):
+            cache.put(key, "x" * 600)
+            path = cache._path(key)
+            os.utime(path, (path.stat().st_atime - age, path.stat().st_mtime - age))
+        cache.get(keys[0])  # oldest write, but most recently used
+
+        cache.put(cache.key(prompt="new"), "x" * 600)
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None
+        assert cache.stats.evictions == 1
+        assert cache.size_bytes() <= cache.max_bytes
+
+    def test_first_put_counted_once(self, cache):
+        key = cache.key(prompt="p")
+        cache.put(key, "answer")
+        assert cache.size_bytes() == cache._path(key).stat().st_size
+
+    def test_corrupt_entry_is_a_miss(self, cache):
+        key = cache.key(prompt="p")
+        cache.put(key, "answer")
+        cache._path(key).write_text("{not json", encoding="utf-8")
+        assert cache.get(key) is None
+
+    def test_from_settings(self, tmp_path):
+        assert ResponseCache.from_settings(Settings(response_cache={"enabled": False})) is None
+        cache = ResponseCache.from_settings(
+            Settings(response_cache={"directory": str(tmp_path), "max_mb": 5})
+        )
+        assert cache.directory == tmp_path
+        assert cache.max_bytes == 5 * 1024 * 1024
+
+
+# ── Analyzer integration ─────────────────────────────────────────────
+
+
+class TestAnalyzerCaching:
+    def _openai(self, cache) -> OpenAIAnalyzer:
+        with patch("picture_analyzer.analyzers.openai.OpenAI"):
+            analyzer = OpenAIAnalyzer(api_key="sk-test")
+        response = MagicMock()
+        response.choices[0].message.content = '{"metadata": {}}'
+        analyzer.client.chat.completions.create.return_value = response
+        analyzer.response_cache = cache
+        return analyzer
+
+    def test_openai_repeat_served_from_cache(self, cache, image):
+        analyzer = self._openai(cache)
+        ctx = AnalysisContext()
+        first = analyzer._call_api(image, ctx, prompt_override="describe")
+        second = analyzer._call_api(image, ctx, prompt_override="describe")
+        assert first == second
+        assert analyzer.client.chat.completions.create.call_count == 1
+        assert analyzer._last_call_stats == {"cached": True}
+
+    def test_openai_prompt_change_misses(self, cache, image):
+        analyzer = self._openai(cache)
+        ctx = AnalysisContext()
+        analyzer._call_api(image, ctx, prompt_override="describe")
+        analyzer._call_api(image, ctx, prompt_override="describe the location")
+        assert analyzer.client.chat.completions.create.call_count == 2
+
+    def test_no_cache_by_default(self, image):
+        analyzer = self._openai(None)
+        ctx = AnalysisContext()
+        analyzer._call_api(image, ctx, prompt_override="describe")
+        analyzer._call_api(image, ctx, prompt_override="describe")
+        assert analyzer.client.chat.completions.create.call_count == 2
+
+    def test_ollama_repeat_served_from_cache(self, cache, image):
+        with patch("picture_analyzer.analyzers.ollama.ollama.Client"):
+            analyzer = OllamaAnalyzer(model="llava")
+        analyzer.client.chat.return_value = {"message": {"content": '{"metadata": {}}'}}
+        analyzer.response_cache = cache
+        ctx = AnalysisContext()
+        analyzer._call_api(image, ctx, prompt_override="describe")
+        assert analyzer._call_api(image, ctx, prompt_override="describe") == '{"metadata": {}}'
+        assert analyzer.client.chat.call_count == 1
+        # A different model is a different request
+        analyzer.model = "llava:13b"
+        analyzer._call_api(image, ctx, prompt_override="describe")
+        assert analyzer.client.chat.call_count == 2
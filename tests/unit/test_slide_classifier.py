@@ -0,0 +1,118 @@
+"""Tests for the local histogram-based slide-condition classifier."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from PIL import Image, ImageEnhance
+
+from picture_analyzer.enhancers.profiles.classifier import (
+    SlideClassifier,
+    SlideFeatures,
+    extract_features,
+    score_profiles,
+)
+
+# ── Helpers ──────────────────────────────────────────────────────────
+
+
+def _scene(size: tuple[int, int] = (240, 160)) -> Image.Image:
+    """A colourful, full-range test image (hue, saturation and value ramps)."""
+    w, h = size
+    hue = Image.linear_gradient("L").transpose(Image.Transpose.ROTATE_90).resize(size)
+    sat = Image.linear_gradient("L").resize(size).point(lambda v: 60 + v * 0.7)
+    val = (
+        Image.linear_gradient("L")
+        .transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+        .resize(size)
+        .point(lambda v: 20 + v * 0.9)
+    )
+    return Image.merge("HSV", (hue, sat, val)).convert("RGB")
+
+
+def _tint(image: Image.Image, red: float, green: float, blue: float) -> Image.Image:
+    return Image.merge(
+        "RGB",
+        [
+            band.point(lambda v, f=factor: min(255, int(v * f)))
+            for band, factor in zip(image.split(), (red, green, blue))
+        ],
+    )
+
+
+def _fade(image: Image.Image) -> Image.Image:
+    return ImageEnhance.Contrast(ImageEnhance.Color(image).enhance(0.45)).enhance(0.55)
+
+
+# ── Features ─────────────────────────────────────────────────────────
+
+
+class TestExtractFeatures:
+    def test_neutral_image_has_no_cast(self):
+        features = extract_features(_scene())
+        assert features.cast_strength < 0.05
+
+    def test_red_tint_points_towards_red(self):
+        features = extract_features(_tint(_scene(), 1.15, 0.9, 0.85))
+        assert features.red_green > 0.1
+        assert -30 <= features.cast_angle <= 45
+
+    def test_fading_lowers_saturation_and_contrast(self):
+        plain = extract_features(_scene())
+        faded = extract_features(_fade(_scene()))
+        assert faded.saturation < plain.saturation
+        assert faded.contrast_range < plain.contrast_range
+
+    def test_accepts_non_rgb_modes(self):
+        features = extract_features(_scene().convert("L"))
+        assert features.saturation == 0.0
+
+
+class TestScoreProfiles:
+    def test_scores_every_builtin_profile(self):
+        features = SlideFeatures(0.0, 0.0, 0.4, 0.2, 0.8)
+        scores = score_profiles(features)
+        assert set(scores) == {
+            "well_preserved", "aged", "faded", "red_cast", "yellow_cast", "color_cast",
+        }
+        assert all(0.0 <= v <= 1.0 for v in scores.values())
+
+
+# ── Classification ───────────────────────────────────────────────────
+
+
+class TestSlideClassifier:
+    @pytest.mark.parametrize(
+        "image, expected",
+        [
+            (_scene(), "well_preserved"),
+            (_tint(_scene(), 1.15, 0.9, 0.85), "red_cast"),
+            (_tint(_scene(), 1.05, 1.0, 0.75), "yellow_cast"),
+            (_tint(_scene(), 0.8, 1.0, 1.1), "color_cast"),
+            (_fade(_scene()), "faded"),
+        ],
+    )
+    def test_picks_expected_profile(self, image, expected):
+        result = SlideClassifier().classify(image)
+        profile, confidence = result.best
+        assert profile == expected
+        assert confidence >= 60
+
+    def test_ranking_is_sorted_and_compatible_with_llm_format(self):
+        result = SlideClassifier().classify(_tint(_scene(), 1.15, 0.9, 0.85))
+        confidences = [conf for _, conf in result.profiles]
+        assert confidences == sorted(confidences, reverse=True)
+        entries = result.as_slide_profiles()
+        assert entries[0] == {"profile": "red_cast", "confidence": result.confidence}
+
+    def test_mild_degradation_reports_low_confidence(self):
+        image = _tint(
+            ImageEnhance.Contrast(ImageEnhance.Color(_scene()).enhance(0.8)).enhance(0.85),
+            1.03, 1.0, 0.95,
+        )
+        assert SlideClassifier().classify(image).confidence < 60
+
+    def test_classifies_from_path(self, tmp_path: Path):
+        path = tmp_path / "slide.jpg"
+        _tint(_scene((800, 600)), 1.05, 1.0, 0.75).save(str(path), "JPEG", quality=90)
+        assert SlideClassifier().classify(path).best[0] == "yellow_cast"
@@ -154,6 +154,156 @@ class TestRestore:
         assert result is None
 
 
+# ══════════════════════════════════════════════════════════════════════
+# Strip (tiled) restoration
+# ══════════════════════════════════════════════════════════════════════
+
+
+class TestStripRestore:
+    @pytest.fixture
+    def noisy_jpeg(self, tmp_path: Path) -> Path:
+        path = tmp_path / "noisy.jpg"
+        Image.effect_noise((200, 300), 60).convert("RGB").save(str(path), "JPEG")
+        return path
+
+    def test_build_pipeline_follows_profile(self):
+        profile = _make_profile(
+            denoise=True, color_balance=ColorBalance(red=1.1, green=1.0, blue=0.9)
+        )
+        names = [f.name for f in SlideRestorer().build_pipeline(profile).filters]
+        assert names == [
+            "Despeckle", "ColorBalance", "Brightness", "Contrast",
+            "Saturation", "Denoise", "Sharpness",
+        ]
+
+    def test_build_pipeline_skips_disabled_steps(self):
+        pipeline = SlideRestorer().build_pipeline(
+            _make_profile(denoise=True), denoise=False, despeckle=False
+        )
+        names = [f.name for f in pipeline.filters]
+        assert "Despeckle" not in names
+        assert "Denoise" not in names
+
+    def test_strips_match_whole_image(self, noisy_jpeg, tmp_path):
+        profile = _make_profile(
+            brightness=1.1, contrast=1.3, saturation=1.2, sharpness=1.4,
+            denoise=True, color_balance=ColorBalance(red=1.05, green=1.0, blue=0.9),
+        )
+        profiles = {"test": profile, "aged": profile}
+        whole = SlideRestorer(profiles=profiles, jpeg_quality=100)
+        # 200 px wide × 3 bytes × 4 copies → roughly 40-row strips.
+        strips = SlideRestorer(profiles=profiles, jpeg_quality=100, memory_budget_mb=0.1)
+
+        source = Image.open(str(noisy_jpeg)).convert("RGB")
+        expected = whole._run(whole.build_pipeline(profile), source.copy())
+        actual = strips._run(strips.build_pipeline(profile), source.copy())
+        assert strips.build_pipeline(profile).strip_rows(source) < source.height
+        assert actual.tobytes() == expected.tobytes()
+
+    def test_restore_with_memory_budget(self, noisy_jpeg, tmp_path):
+        profile = _make_profile(denoise=True)
+        sr = SlideRestorer(profiles={"aged": profile}, memory_budget_mb=0.1)
+        out = tmp_path / "out.jpg"
+        assert sr.restore(noisy_jpeg, "aged", out) == str(out)
+        assert Image.open(str(out)).size == (200, 300)
+
+
+# ══════════════════════════════════════════════════════════════════════
+# Multi-profile restore
+# ══════════════════════════════════════════════════════════════════════
+
+
+class TestRestoreMany:
+    @pytest.fixture
+    def noisy_jpeg(self, tmp_path: Path) -> Path:
+        path = tmp_path / "noisy.jpg"
+        Image.effect_noise((80, 60), 60).convert("RGB").save(str(path), "JPEG")
+        return path
+
+    @pytest.fixture
+    def restorer(self) -> SlideRestorer:
+        return SlideRestorer(
+            profiles={
+                "aged": _make_profile(contrast=1.2, sharpness=1.3),
+                "faded": _make_profile(saturation=1.4, denoise=True),
+                "red_cast": _make_profile(
+                    color_balance=ColorBalance(red=0.9, green=1.0, blue=1.05)
+                ),
+            },
+            jpeg_quality=100,
+        )
+
+    def test_matches_individual_restores(self, noisy_jpeg, tmp_path, restorer):
+        outputs = {name: tmp_path / f"many_{name}.jpg" for name in ("aged", "faded", "red_cast")}
+        results = restorer.restore_many(noisy_jpeg, outputs)
+        assert results == {name: str(path) for name, path in outputs.items()}
+
+        for name, path in outputs.items():
+            single = tmp_path / f"single_{name}.jpg"
+            restorer.restore(noisy_jpeg, name, single)
+            assert Image.open(str(path)).tobytes() == Image.open(str(single)).tobytes()
+
+    def test_decodes_and_despeckles_once(self, noisy_jpeg, tmp_path, restorer, monkeypatch):
+        opened: list[str] = []
+        original_open = Image.open
+
+        def tracking_open(fp, *args, **kwargs):
+            opened.append(str(fp))
+            return original_open(fp, *args, **kwargs)
+
+        monkeypatch.setattr(Image, "open", tracking_open)
+        outputs = {name: tmp_path / f"{name}.jpg" for name in ("aged", "faded")}
+        restorer.restore_many(noisy_jpeg, outputs)
+
+        assert opened == [str(noisy_jpeg)]
+        for name in outputs:
+            assert "Despeckle" not in [
+                f.name for f in restorer.build_pipeline(
+                    restorer.get_profile(name), despeckle=False
+                ).filters
+            ]
+
+    def test_unknown_profile_falls_back_to_aged(self, noisy_jpeg, tmp_path, restorer):
+        out = tmp_path / "x.jpg"
+        assert restorer.restore_many(noisy_jpeg, {"nonexistent": out}) == {"nonexistent": str(out)}
+
+    def test_invalid_path_returns_none_per_profile(self, tmp_path, restorer):
+        results = restorer.restore_many(
+            tmp_path / "missing.jpg", {"aged": tmp_path / "a.jpg", "faded": tmp_path / "f.jpg"}
+        )
+        assert results == {"aged": None, "faded": None}
+
+    def test_with_memory_budget(self, noisy_jpeg, tmp_path, restorer):
+        restorer.memory_budget_mb = 0.01
+        outputs = {"aged": tmp_path / "a.jpg", "faded": tmp_path / "f.jpg"}
+        results = restorer.restore_many(noisy_jpeg, outputs)
+        assert all(results.values())
+        assert Image.open(str(outputs["faded"])).size == (80, 60)
+
+
+# ══════════════════════════════════════════════════════════════════════
+# Preview
+# ══════════════════════════════════════════════════════════════════════
+
+
+class TestPreview:
+    def test_preview_is_proxy_sized(self, tmp_path):
+        jpeg = _make_jpeg(tmp_path / "slide.jpg", size=(400, 300))
+        sr = SlideRestorer(profiles={"aged": _make_profile(contrast=1.3)})
+        preview = sr.preview(jpeg, "aged", long_edge=100)
+        assert preview.size == (100, 75)
+        assert preview.mode == "RGB"
+
+    def test_preview_does_not_write(self, tmp_path):
+        jpeg = _make_jpeg(tmp_path / "slide.jpg")
+        SlideRestorer(profiles={"aged": _make_profile()}).preview(jpeg, "aged", long_edge=32)
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["slide.jpg"]
+
+    def test_preview_invalid_path_raises(self, tmp_path):
+        with pytest.raises(OSError):
+            SlideRestorer().preview(tmp_path / "missing.jpg")
+
+
 # ══════════════════════════════════════════════════════════════════════
 # Auto-restore
 # ══════════════════════════════════════════════════════════════════════
@@ -0,0 +1,85 @@
+"""Tests for the legacy SmartEnhancer's in-memory adjustment path."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from picture_enhancer import SmartEnhancer
+from PIL import Image
+
+
+@pytest.fixture
+def jpeg(tmp_path: Path) -> Path:
+    path = tmp_path / "photo.jpg"
+    Image.effect_noise((40, 30), 50).convert("RGB").save(str(path), "JPEG")
+    return path
+
+
+ENHANCEMENT = {
+    "recommended_enhancements": [
+        "BRIGHTNESS: increase by 10%",
+        "CONTRAST: boost by 15%",
+        "COLOR_TEMPERATURE: warm by 500K",
+        "UNSHARP_MASK: radius=1.5px, strength=80%, threshold=0",
+        "CLARITY: boost by 20%",
+    ]
+}
+
+
+class TestBuildPipeline:
+    def test_basic_before_advanced(self):
+        adjustments = {
+            "basic": {"sharpness": 1.1, "brightness": 1.2},
+            "advanced": [
+                {"type": "vibrance", "factor": 1.2},
+                {"type": "channel", "channel": "red", "factor": 0.9},
+            ],
+        }
+        pipeline = SmartEnhancer()._build_pipeline(adjustments)
+        names = [f.name for f in pipeline.filters]
+        assert names == ["Brightness", "Sharpness", "Vibrance", "RedChannel"]
+
+    def test_clarity_strength_scaled_to_percent(self):
+        adjustments = {"basic": {}, "advanced": [{"type": "clarity", "strength": 0.25}]}
+        (clarity,) = SmartEnhancer()._build_pipeline(adjustments).filters
+        assert clarity.strength == pytest.approx(25.0)
+
+    def test_memory_budget_passed_to_pipeline(self):
+        pipeline = SmartEnhancer(memory_budget_mb=64)._build_pipeline({})
+        assert pipeline.memory_budget_mb == 64
+
+    def test_share_blurs_passed_to_pipeline(self):
+        assert SmartEnhancer(share_blurs=True)._build_pipeline({}).share_blurs
+        assert not SmartEnhancer()._build_pipeline({}).share_blurs
+
+
+class TestEnhanceFromAnalysis:
+    def test_writes_output_once(self, jpeg, tmp_path, monkeypatch):
+        saved: list[str] = []
+        original_save = Image.Image.save
+
+        def tracking_save(self, fp, *args, **kwargs):
+            saved.append(str(fp))
+            return original_save(self, fp, *args, **kwargs)
+
+        monkeypatch.setattr(Image.Image, "save", tracking_save)
+        out = tmp_path / "enhanced.jpg"
+        result = SmartEnhancer().enhance_from_analysis(str(jpeg), ENHANCEMENT, str(out))
+
+        assert result == str(out)
+        assert saved == [str(out)]
+
+    def test_preview_renders_proxy(self, tmp_path):
+        source = tmp_path / "large.jpg"
+        Image.effect_noise((400, 300), 50).convert("RGB").save(str(source), "JPEG")
+        out = tmp_path / "preview.jpg"
+        result = SmartEnhancer(preview_long_edge=100).enhance_from_analysis(
+            str(source), ENHANCEMENT, str(out)
+        )
+        assert result == str(out)
+        assert Image.open(str(out)).size == (100, 75)
+
+    def test_overwrites_source_without_output_path(self, jpeg):
+        result = SmartEnhancer().enhance_from_analysis(str(jpeg), ENHANCEMENT)
+        assert result == str(jpeg)
+        assert Image.open(str(jpeg)).size == (40, 30)
@@ -0,0 +1,224 @@
+"""Tests for streamed responses with early stop and runaway detection."""
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from picture_analyzer.analyzers.streaming import (
+    DRAIN_CHUNKS,
+    STOP_COMPLETE,
+    STOP_LENGTH,
+    STOP_REPETITION,
+    StreamLimits,
+    StreamMonitor,
+    close_json,
+    find_runaway,
+)
+from picture_analyzer.config.settings import StreamingConfig
+from picture_analyzer.core.models import AnalysisContext, ImageData
+
+
+def _feed_all(monitor: StreamMonitor, chunks) -> int:
+    """Feed until the monitor stops; return how many chunks were consumed."""
+    for count, chunk in enumerate(chunks, 1):
+        if monitor.feed(chunk):
+            return count
+    return len(chunks)
+
+
+def _pieces(text: str, size: int = 5) -> list[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class TestStreamMonitor:
+    def test_stops_when_json_object_closes(self):
+        body = '{"a": {"b": [1, 2]}, "c": "x}y{\\"z"}'
+        monitor = StreamMonitor()
+        chunks = _pieces(body + "\n" * 500)
+        consumed = _feed_all(monitor, chunks)
+        assert monitor.stop_reason == STOP_COMPLETE
+        assert consumed < len(chunks)
+        assert json.loads(monitor.salvage()) == json.loads(body)
+
+    def test_text_before_object_is_ignored(self):
+        monitor = StreamMonitor()
+        _feed_all(monitor, _pieces('Sure! ```json\n{"a": 1}\n```'))
+        assert monitor.stop_reason == STOP_COMPLETE
+        assert monitor.salvage().endswith('{"a": 1}')
+
+    def test_braces_in_think_block_are_skipped(self):
+        monitor = StreamMonitor()
+        body = '{"a": 1}'
+        _feed_all(monitor, _pieces('<think>Maybe {"a": 0}? No.</think>\n' + body + "\n" * 100))
+        assert monitor.stop_reason == STOP_COMPLETE
+        assert monitor.salvage().endswith(body)
+
+    def test_example_object_in_preamble_is_not_the_answer(self):
+        monitor = StreamMonitor()
+        body = '{"a": 1, "b": [2]}'
+        text = 'The format is {"a": <int>}. Here it is:\n```json\n' + body + "\n```"
+        _feed_all(monitor, _pieces(text))
+        assert monitor.stop_reason == STOP_COMPLETE
+        assert monitor.salvage().endswith(body)
+
+    def test_object_after_unfenced_prose_is_not_cut_short(self):
+        monitor = StreamMonitor()
+        text = 'Like {"a": 0} but:\n{"a": 1}'
+        _feed_all(monitor, _pieces(text))
+        assert monitor.stop_reason is None
+        assert monitor.salvage() == text
+
+    def test_aborts_repetition_loop_and_salvages(self):
+        monitor = StreamMonitor(min_repeat_span=100)
+        chunks = _pieces('{"metadata": {"objects": "' + "badkamermeubel, " * 200)
+        consumed = _feed_all(monitor, chunks)
+        assert monitor.stop_reason == STOP_REPETITION
+        assert consumed < len(chunks) // 2
+        assert json.loads(monitor.salvage()) == {"metadata": {"objects": "badkamermeubel, "}}
+
+    def test_aborts_length_blow_up(self):
+        monitor = StreamMonitor(max_chars=300)
+        text = '{"items": [' + ", ".join(f'"item {i}"' for i in range(200))
+        _feed_all(monitor, _pieces(text, 20))
+        assert monitor.stop_reason == STOP_LENGTH
+        salvaged = json.loads(monitor.salvage())
+        assert salvaged["items"][0] == "item 0"
+
+    def test_counts_chunks_live(self):
+        monitor = StreamMonitor()
+        monitor.feed('{"a"')
+        monitor.feed(": 1")
+        assert monitor.chunks == 2
+        assert monitor.stop_reason is None
+        assert monitor.elapsed_ns >= 0
+
+
+class TestRunawayHelpers:
+    def test_normal_json_is_not_a_runaway(self):
+        text = json.dumps({f"field_{i}": f"value number {i}" for i in range(40)}, indent=2)
+        assert find_runaway(text, 100) is None
+
+    def test_runaway_keeps_one_unit(self):
+        text = "prefix " + "ab" * 200
+        start = find_runaway(text, 100)
+        assert text[:start] == "prefix ab"
+
+    @pytest.mark.parametrize("truncated, expected", [
+        ('{"a": "tex', {"a": "tex"}),
+        ('{"a": [1, 2,', {"a": [1, 2]}),
+        ('{"a": 1, "b":', {"a": 1, "b": None}),
+        ('{"a": 1, "b"', {"a": 1, "b": None}),
+        ('{"a": {"b": ["x", "y"', {"a": {"b": ["x", "y"]}}),
+        ('{"a": 1}', {"a": 1}),
+    ])
+    def test_close_json(self, truncated, expected):
+        assert json.loads(close_json(truncated)) == expected
+
+
+class TestStreamLimits:
+    def test_from_config(self):
+        assert StreamLimits.from_config(StreamingConfig(enabled=False)) is None
+        assert StreamLimits.from_config(None) is None
+        limits = StreamLimits.from_config(StreamingConfig(max_chars=1000))
+        assert limits.monitor().max_chars == 1000
+
+
+@pytest.fixture
+def image():
+    return ImageData(path="x.jpg", mime_type="image/jpeg", base64_data="aGVsbG8=")
+
+
+class TestOllamaStreaming:
+    @pytest.fixture
+    def analyzer(self):
+        from picture_analyzer.analyzers.ollama import OllamaAnalyzer
+
+        with patch("picture_analyzer.analyzers.ollama.ollama.Client"):
+            analyzer = OllamaAnalyzer(model="llava")
+        analyzer.streaming = StreamLimits(min_repeat_span=100)
+        return analyzer
+
+    @staticmethod
+    def _stream(pieces, consumed: list, final=None):
+        def chunks():
+            for piece in pieces:
+                consumed.append(piece)
+                yield SimpleNamespace(message=SimpleNamespace(content=piece), done=False)
+            if final is not None:
+                yield final
+        return chunks()
+
+    def test_runaway_stream_closed_early(self, analyzer, image):
+        consumed: list[str] = []
+        pieces = _pieces('{"metadata": {"objects": "' + "stoel, " * 400)
+        analyzer.client.chat.return_value = self._stream(pieces, consumed)
+        analyzer.response_cache = MagicMock()
+        analyzer.response_cache.get.return_value = None
+
+        text = analyzer._call_api(image, AnalysisContext())
+
+        assert analyzer.client.chat.call_args.kwargs["stream"] is True
+        assert len(consumed) < len(pieces) // 2
+        assert json.loads(text) == {"metadata": {"objects": "stoel, "}}
+        assert analyzer._last_call_stats["stopped"] == STOP_REPETITION
+        analyzer.response_cache.put.assert_not_called()
+
+    def test_complete_stream_uses_final_stats(self, analyzer, image):
+        final = SimpleNamespace(
+            message=SimpleNamespace(content=""), done=True,
+            prompt_eval_count=900, eval_count=12, eval_duration=2_000_000_000,
+        )
+        analyzer.client.chat.return_value = self._stream(_pieces('{"a": 1}'), [], final)
+        assert analyzer._call_api(image, AnalysisContext()) == '{"a": 1}'
+        assert analyzer._last_call_stats == {
+            "prompt_tokens": 900, "output_tokens": 12, "eval_duration_ns": 2_000_000_000,
+        }
+
+    def test_stop_on_complete_before_trailing_whitespace(self, analyzer, image):
+        consumed: list[str] = []
+        pieces = _pieces('{"a": 1}') + ["\n"] * 1000
+        analyzer.client.chat.return_value = self._stream(pieces, consumed)
+        assert analyzer._call_api(image, AnalysisContext()) == '{"a": 1}'
+        assert len(consumed) <= 2 + DRAIN_CHUNKS
+        assert "stopped" not in analyzer._last_call_stats
+
+
+class TestOpenAIStreaming:
+    @pytest.fixture
+    def analyzer(self):
+        from picture_analyzer.analyzers.openai import OpenAIAnalyzer
+
+        with patch("picture_analyzer.analyzers.openai.OpenAI"):
+            analyzer = OpenAIAnalyzer(api_key="sk-test")
+        analyzer.streaming = StreamLimits()
+        return analyzer
+
+    def test_stream_stops_and_closes(self, analyzer, image):
+        chunks = [
+            SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=p))])
+            for p in _pieces('{"a": "b"}   ') + [" "] * 50
+        ]
+        stream = MagicMock()
+        stream.__iter__.return_value = iter(chunks)
+        analyzer.client.chat.completions.create.return_value = stream
+
+        assert analyzer._call_api(image, AnalysisContext()) == '{"a": "b"}'
+        kwargs = analyzer.client.chat.completions.create.call_args.kwargs
+        assert kwargs["stream"] is True
+        stream.close.assert_called_once()
+        assert analyzer._last_call_stats["output_tokens"] == 2
+
+    def test_usage_chunk_read_after_json_closes(self, analyzer, image):
+        chunks = [
+            SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=p))])
+            for p in _pieces('{"a": "b"}')
+        ]
+        chunks.append(SimpleNamespace(usage=SimpleNamespace(prompt_tokens=800, completion_tokens=6), choices=[]))
+        analyzer.client.chat.completions.create.return_value = iter(chunks)
+
+        analyzer._call_api(image, AnalysisContext())
+        assert analyzer._last_call_stats["prompt_tokens"] == 800
+        assert analyzer._last_call_stats["output_tokens"] == 6
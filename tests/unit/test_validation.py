@@ -0,0 +1,104 @@
+"""Tests for missing-field detection and targeted re-ask helpers."""
+from __future__ import annotations
+
+import json
+
+from picture_analyzer.analyzers.validation import (
+    describe_fields,
+    find_missing,
+    merge_fields,
+    skeleton,
+    subset_schema,
+)
+from picture_analyzer.data.prompt_loader import PromptLoader
+
+
+def _schema(*sections):
+    return PromptLoader().schema(list(sections))
+
+
+class TestFindMissing:
+    def test_empty_none_and_truncated_fields(self):
+        data = {"metadata": {
+            "objects": "boat, quay",
+            "persons": "",
+            "weather": None,
+            "mood_atmosphere": "calm and…",
+            "time_of_day": "afternoon...",
+            "season_date": "summer",
+        }}
+        assert find_missing(data, _schema("metadata_part1")) == [
+            "metadata.persons", "metadata.weather",
+            "metadata.mood_atmosphere", "metadata.time_of_day",
+        ]
+
+    def test_absent_section_reported_whole(self):
+        assert find_missing({}, _schema("location")) == ["location_detection"]
+        assert find_missing({"slide_profiles": []}, _schema("slide_profiles")) == ["slide_profiles"]
+
+    def test_complete_response(self):
+        data = {"location_detection": {
+            "country": "Netherlands", "region": "Zeeland", "city_or_area": "Veere",
+            "location_type": "harbour", "confidence": 0, "reasoning": "sign",
+        }}
+        assert find_missing(data, _schema("location")) == []
+
+    def test_empty_location_is_an_answer(self):
+        data = {"location_detection": {
+            "country": "", "region": "", "city_or_area": "",
+            "location_type": "", "confidence": 0, "reasoning": "indoor, no clues",
+        }}
+        assert find_missing(data, _schema("location")) == []
+        data["location_detection"]["region"] = "Zeeland"
+        assert find_missing(data, _schema("location")) == [
+            "location_detection.country", "location_detection.city_or_area",
+            "location_detection.location_type",
+        ]
+
+
+class TestSubsetSchema:
+    def test_keeps_only_requested_fields(self):
+        schema = _schema("metadata_part1", "location")
+        subset = subset_schema(schema, ["metadata.weather", "location_detection"])
+        assert subset["required"] == ["metadata", "location_detection"]
+        assert subset["additionalProperties"] is False
+        metadata = subset["properties"]["metadata"]
+        assert list(metadata["properties"]) == ["weather"]
+        assert metadata["required"] == ["weather"]
+        assert subset["properties"]["location_detection"] == schema["properties"]["location_detection"]
+
+    def test_does_not_modify_source(self):
+        schema = _schema("metadata_part1")
+        subset_schema(schema, ["metadata.weather"])["properties"]["metadata"]["properties"]["weather"]["x"] = 1
+        assert "x" not in schema["properties"]["metadata"]["properties"]["weather"]
+
+
+class TestPromptHelpers:
+    def test_describe_fields(self):
+        text = describe_fields(_schema("metadata_part1"), ["metadata.weather"])
+        assert text == "- metadata.weather: Weather conditions"
+
+    def test_skeleton(self):
+        subset = subset_schema(_schema("slide_profiles"), ["slide_profiles"])
+        assert json.loads(skeleton(subset)) == {
+            "slide_profiles": [{"profile": "<text>", "confidence": 0}]
+        }
+
+
+class TestMergeFields:
+    def test_fills_only_missing_paths(self):
+        data = {"metadata": {"objects": "boat", "weather": ""}}
+        answer = {"metadata": {"weather": "rain", "objects": "car"}}
+        merged = merge_fields(data, answer, ["metadata.weather"])
+        assert merged == {"metadata": {"objects": "boat", "weather": "rain"}}
+        assert data["metadata"]["weather"] == ""
+
+    def test_empty_answer_keeps_original(self):
+        data = {"metadata": {"weather": "sunn…"}}
+        merged = merge_fields(data, {"metadata": {"weather": ""}}, ["metadata.weather"])
+        assert merged == data
+
+    def test_whole_section(self):
+        answer = {"location_detection": {"country": "Netherlands"}}
+        merged = merge_fields({"metadata": {}}, answer, ["location_detection"])
+        assert merged["location_detection"] == {"country": "Netherlands"}
@@ -0,0 +1,77 @@
+"""Tests for the bounded enhancement process pool."""
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from picture_analyzer.enhancers.workers import EnhancementPool
+
+
+def _square(x: int) -> int:
+    return x * x
+
+
+def _pid(_: int) -> int:
+    return os.getpid()
+
+
+def _fail(x: int) -> int:
+    raise ValueError(f"bad {x}")
+
+
+class TestInline:
+    def test_runs_in_calling_process(self):
+        results = []
+        pool = EnhancementPool(workers=0)
+        pool.submit(_pid, 1, callback=lambda r, e: results.append(r))
+        pool.close()
+        assert results == [os.getpid()]
+
+    def test_error_reported_to_callback(self):
+        errors = []
+        with EnhancementPool(workers=0) as pool:
+            pool.submit(_fail, 3, callback=lambda r, e: errors.append(e))
+        assert isinstance(errors[0], ValueError)
+
+
+class TestProcesses:
+    def test_results_and_errors(self):
+        results, errors = [], []
+
+        def callback(result, error):
+            (errors if error else results).append(error or result)
+
+        with EnhancementPool(workers=2) as pool:
+            for x in range(5):
+                pool.submit(_square, x, callback=callback)
+            pool.submit(_fail, 9, callback=callback)
+
+        assert sorted(results) == [0, 1, 4, 9, 16]
+        assert len(errors) == 1 and "bad 9" in str(errors[0])
+
+    def test_runs_in_worker_process(self):
+        pids = []
+        with EnhancementPool(workers=1) as pool:
+            pool.submit(_pid, 0, callback=lambda r, e: pids.append(r))
+        assert pids and pids[0] != os.getpid()
+
+    def test_workers_are_not_forked(self):
+        # Forking next to the batch loop's threads can deadlock a worker
+        with EnhancementPool(workers=1) as pool:
+            assert pool._executor._mp_context.get_start_method() in ("forkserver", "spawn")
+
+    def test_queue_is_bounded(self):
+        with EnhancementPool(workers=1, max_pending=2) as pool:
+            for x in range(6):
+                pool.submit(_square, x)
+                assert pool.pending <= 2
+        assert pool.pending == 0
+
+    @pytest.mark.parametrize("workers,expected", [(0, 1), (3, 6)])
+    def test_default_max_pending(self, workers, expected):
+        pool = EnhancementPool(workers=workers)
+        try:
+            assert pool.max_pending == expected
+        finally:
+            pool.close()